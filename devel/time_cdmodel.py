@@ -0,0 +1,80 @@
+# Copyright (c) 2012-2019 by the GalSim developers team on GitHub
+# https://github.com/GalSim-developers
+#
+# This file is part of GalSim: The modular galaxy image simulation toolkit.
+# https://github.com/GalSim-developers/GalSim
+#
+# GalSim is free software: redistribution and use in source and binary forms,
+# with or without modification, are permitted provided that the following
+# conditions are met:
+#
+# 1. Redistributions of source code must retain the above copyright notice, this
+#    list of conditions, and the disclaimer given in the accompanying LICENSE
+#    file.
+# 2. Redistributions in binary form must reproduce the above copyright notice,
+#    this list of conditions, and the disclaimer given in the documentation
+#    and/or other materials provided with the distribution.
+#
+
+from __future__ import print_function
+import time
+import numpy as np
+
+import galsim
+
+def apply_cd_numpy(a, cd):
+    """Apply the model to the array a with numpy, doing each term of the kernel for the whole
+    image at once.  This is the same calculation as the reference in tests/test_cdmodel.py.
+    """
+    a = a.astype(np.float64)
+    ny, nx = a.shape
+    n = cd.n
+    y = np.arange(ny)[:,np.newaxis]
+    x = np.arange(nx)[np.newaxis,:]
+    fT = np.zeros_like(a)
+    fB = np.zeros_like(a)
+    fL = np.zeros_like(a)
+    fR = np.zeros_like(a)
+    fT[:-1,:] = (a[:-1,:] + a[1:,:]) / 2.
+    fB[1:,:] = (a[1:,:] + a[:-1,:]) / 2.
+    fR[:,:-1] = (a[:,:-1] + a[:,1:]) / 2.
+    fL[:,1:] = (a[:,1:] + a[:,:-1]) / 2.
+    padded = np.zeros((ny+2*n, nx+2*n))
+    padded[n:n+ny, n:n+nx] = a
+    delta = np.zeros_like(a)
+    for iy in range(-n, n+1):
+        mT = (y+1-iy >= 0) & (y+1-iy < ny)
+        mB = (y-1-iy >= 0) & (y-1-iy < ny)
+        for ix in range(-n, n+1):
+            mL = (x-1-ix >= 0) & (x-1-ix < nx)
+            mR = (x+1-ix >= 0) & (x+1-ix < nx)
+            q = padded[n+iy:n+iy+ny, n+ix:n+ix+nx]
+            delta += q * (fT * mT * cd.a_t.array[iy+n,ix+n] +
+                          fB * mB * cd.a_b.array[iy+n,ix+n] +
+                          fL * mL * cd.a_l.array[iy+n,ix+n] +
+                          fR * mR * cd.a_r.array[iy+n,ix+n])
+    return a + delta
+
+def time_cdmodel(nx=4096, ny=4096, n=2):
+    """Time applying a charge deflection model to a full CCD-sized image, comparing the C++
+    implementation with doing the same calculation in numpy.
+    """
+    cd = galsim.cdmodel.PowerLawCD(n, 2.e-7, 1.e-7, 1.e-8, 1.e-8, 1.e-9, 1.e-9, 2.)
+    rng = galsim.BaseDeviate(1234)
+
+    for dtype in (np.float64, np.float32):
+        im = galsim.Image(nx, ny, dtype=dtype)
+        im.addNoise(galsim.PoissonNoise(rng, sky_level=1000.))
+
+        t1 = time.time()
+        ref = apply_cd_numpy(im.array, cd)
+        t2 = time.time()
+        new = cd.applyForward(im)
+        t3 = time.time()
+        print('%s %dx%d, %dx%d kernel: applyForward time = %.2f s (numpy: %.2f s)'%(
+              np.dtype(dtype).name, nx, ny, 2*n+1, 2*n+1, t3-t2, t2-t1))
+        print('    max relative difference = %.2e'%(
+              np.max(np.abs(new.array - ref) / np.abs(ref))))
+
+if __name__ == "__main__":
+    time_cdmodel()
@@ -0,0 +1,48 @@
+# Copyright (c) 2012-2019 by the GalSim developers team on GitHub
+# https://github.com/GalSim-developers
+#
+# This file is part of GalSim: The modular galaxy image simulation toolkit.
+# https://github.com/GalSim-developers/GalSim
+#
+# GalSim is free software: redistribution and use in source and binary forms,
+# with or without modification, are permitted provided that the following
+# conditions are met:
+#
+# 1. Redistributions of source code must retain the above copyright notice, this
+#    list of conditions, and the disclaimer given in the accompanying LICENSE
+#    file.
+# 2. Redistributions in binary form must reproduce the above copyright notice,
+#    this list of conditions, and the disclaimer given in the documentation
+#    and/or other materials provided with the distribution.
+#
+
+from __future__ import print_function
+import time
+
+import galsim
+
+def time_geometric_shoot(n_photons=2000000, nlayers=6, screen_size=102.4, nrep=3):
+    """Time geometric photon shooting through an atmosphere-only PhaseScreenPSF.
+    """
+    rng = galsim.BaseDeviate(1234)
+    atm = galsim.Atmosphere(screen_size=screen_size, screen_scale=0.1,
+                            altitude=[2.*i for i in range(nlayers)], r0_500=0.16,
+                            speed=[5.*(i+1) for i in range(nlayers)],
+                            direction=[60.*i*galsim.degrees for i in range(nlayers)], rng=rng)
+    aper = galsim.Aperture(diam=8.36, obscuration=0.61, lam=700., screen_list=atm)
+    psf = atm.makePSF(lam=700., aper=aper, exptime=30., second_kick=False)
+    # Instantiate the screens outside of the timing.
+    psf.drawImage(nx=32, ny=32, scale=0.2, method='phot', n_photons=1000, rng=rng)
+
+    photons = galsim.PhotonArray(n_photons)
+    best = None
+    for i in range(nrep):
+        t1 = time.time()
+        psf._shoot(photons, rng)
+        t2 = time.time()
+        best = t2-t1 if best is None else min(best, t2-t1)
+    print('%d layers, %s m screens: %d photons in %.3f s = %.3g photons/s'%(
+          nlayers, screen_size, n_photons, best, n_photons/best))
+
+if __name__ == "__main__":
+    time_geometric_shoot()
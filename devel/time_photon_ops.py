@@ -0,0 +1,60 @@
+# Copyright (c) 2012-2019 by the GalSim developers team on GitHub
+# https://github.com/GalSim-developers
+#
+# This file is part of GalSim: The modular galaxy image simulation toolkit.
+# https://github.com/GalSim-developers/GalSim
+#
+# GalSim is free software: redistribution and use in source and binary forms,
+# with or without modification, are permitted provided that the following
+# conditions are met:
+#
+# 1. Redistributions of source code must retain the above copyright notice, this
+#    list of conditions, and the disclaimer given in the accompanying LICENSE
+#    file.
+# 2. Redistributions in binary form must reproduce the above copyright notice,
+#    this list of conditions, and the disclaimer given in the documentation
+#    and/or other materials provided with the distribution.
+#
+
+from __future__ import print_function
+import sys
+import time
+import numpy as np
+
+import galsim
+
+def time_photon_ops(nphotons=10**6, nrep=5):
+    """Time applying the usual surface ops to a photon array, either one at a time in Python
+    or fused together with a PhotonOpPipeline.
+    """
+    bandpass = galsim.Bandpass('LSST_r.dat', 'nm')
+    sed = galsim.SED('CWW_E_ext.sed', wave_type='ang', flux_type='flambda')
+    rng = galsim.BaseDeviate(1234)
+    sampler = galsim.WavelengthSampler(sed, bandpass, rng)
+    angles = galsim.FRatioAngles(1.234, 0.606, rng)
+    dcr = galsim.PhotonDCR(base_wavelength=bandpass.effective_wavelength,
+                           zenith_angle=30*galsim.degrees, parallactic_angle=20*galsim.degrees,
+                           alpha=-0.2)
+    ops = [sampler, angles, dcr]
+    local_wcs = galsim.PixelScale(0.2).withOrigin(galsim.PositionD(0,0))
+    photons = galsim.Gaussian(fwhm=0.7).shoot(nphotons, rng)
+    photons.scaleXY(1./0.2)
+
+    # Build the wavelength sampler ahead of time, since it is cached for both methods.
+    sed.sampleWavelength(1, bandpass)
+
+    t1 = time.time()
+    for i in range(nrep):
+        for op in ops:
+            op.applyTo(photons, local_wcs)
+    t2 = time.time()
+    pipeline = galsim.PhotonOpPipeline(ops)
+    for i in range(nrep):
+        pipeline.applyTo(photons, local_wcs)
+    t3 = time.time()
+    print('%d photons: separate ops: %.3f s, pipeline: %.3f s, speedup = %.1f'%(
+          nphotons, (t2-t1)/nrep, (t3-t2)/nrep, (t2-t1)/(t3-t2)))
+
+if __name__ == "__main__":
+    nphotons = int(float(sys.argv[1])) if len(sys.argv) > 1 else 10**6
+    time_photon_ops(nphotons)
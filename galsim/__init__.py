@@ -130,7 +130,7 @@ from .errors import GalSimWarning, GalSimDeprecationWarning
 from .image import Image, ImageS, ImageI, ImageF, ImageD, ImageCF, ImageCD, ImageUS, ImageUI, _Image
 
 # PhotonArray
-from .photon_array import PhotonArray, WavelengthSampler, FRatioAngles, PhotonDCR
+from .photon_array import PhotonArray, WavelengthSampler, FRatioAngles, PhotonDCR, PhotonOpPipeline
 
 # Noise
 from .random import BaseDeviate, UniformDeviate, GaussianDeviate, PoissonDeviate, DistDeviate
@@ -153,7 +153,7 @@ from .sersic import Sersic, DeVaucouleurs
 from .spergel import Spergel
 from .deltafunction import DeltaFunction
 from .real import RealGalaxy, RealGalaxyCatalog, ChromaticRealGalaxy
-from .phase_psf import Aperture, PhaseScreenList, PhaseScreenPSF, OpticalPSF
+from .phase_psf import Aperture, PhaseScreenList, PhaseScreenPSF, OpticalPSF, OpticalPSFField
 from .phase_screens import AtmosphericScreen, Atmosphere, OpticalScreen
 from .shapelet import Shapelet
 from .inclined import InclinedExponential, InclinedSersic
@@ -176,7 +176,7 @@ from .chromatic import ChromaticConvolution, ChromaticDeconvolution, ChromaticAu
 from .chromatic import ChromaticAutoCorrelation, ChromaticTransformation
 from .chromatic import ChromaticFourierSqrtProfile
 from .chromatic import ChromaticOpticalPSF, ChromaticAiry, InterpolatedChromaticObject
-from .sed import SED
+from .sed import SED, BatchFluxCalculator, SEDTemplateSet
 from .bandpass import Bandpass
 
 # WCS
@@ -191,9 +191,9 @@ from .lensing_ps import PowerSpectrum
 from .nfw_halo import NFWHalo, Cosmology
 
 # Detector effects
-from .sensor import Sensor, SiliconSensor
+from .sensor import Sensor, SiliconSensor, ApproxSiliconSensor
 from . import detectors  # Everything here is a method of Image, so nothing to import by name.
-from .utilities import set_omp_threads  # This one we bring into the main scope.
+from .utilities import set_omp_threads, get_omp_threads  # These we bring into the main scope.
 
 # Deprecated functionality
 from . import deprecated
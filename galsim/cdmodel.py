@@ -78,36 +78,44 @@ class BaseCDModel(object):
         self.a_b = Image(a_b, dtype=np.float64, make_const=True)
         self.a_t = Image(a_t, dtype=np.float64, make_const=True)
 
-    def applyForward(self, image, gain_ratio=1.):
+    def applyForward(self, image, gain_ratio=1., in_place=False):
         """Apply the charge deflection model in the forward direction.
 
         Returns an image with the forward charge deflection transformation applied.  The input image
-        is not modified, but its WCS is included in the returned image.
+        is not modified (unless ``in_place=True``), but its WCS is included in the returned image.
 
         Parameters:
+            image:      The `Image` to which to apply the model.
             gain_ratio: Ratio of gain_image/gain_flat when shift coefficients were derived from
                         flat fields; default value is 1., which assumes the common case that your
                         flat and science images have the same gain value
+            in_place:   Whether to modify the input image in place rather than making a copy.
+                        This avoids the extra memory of the copy for large images.
+                        [default: False]
         """
-        ret = image.copy()
+        ret = image if in_place else image.copy()
         with convert_cpp_errors():
             _galsim._ApplyCD(
                 ret._image, image._image, self.a_l._image, self.a_r._image, self.a_b._image,
                 self.a_t._image, int(self.n), float(gain_ratio))
         return ret
 
-    def applyBackward(self, image, gain_ratio=1.):
+    def applyBackward(self, image, gain_ratio=1., in_place=False):
         """Apply the charge deflection model in the backward direction (accurate to linear order).
 
         Returns an image with the backward charge deflection transformation applied.  The input
-        image is not modified, but its WCS is included in the returned image.
+        image is not modified (unless ``in_place=True``), but its WCS is included in the returned
+        image.
 
         Parameters:
+            image:      The `Image` to which to apply the model.
             gain_ratio: Ratio of gain_image/gain_flat when shift coefficients were derived from
                         flat fields; default value is 1., which assumes the common case that your
                         flat and science images have the same gain value
+            in_place:   Whether to modify the input image in place rather than making a copy.
+                        [default: False]
         """
-        retimage = self.applyForward(image, gain_ratio=-gain_ratio)
+        retimage = self.applyForward(image, gain_ratio=-gain_ratio, in_place=in_place)
         return retimage
 
     def __repr__(self):
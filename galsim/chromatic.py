@@ -17,6 +17,8 @@
 #
 
 import numpy as np
+import os
+import sys
 
 from .gsobject import GSObject
 from .sed import SED
@@ -317,6 +319,10 @@ class ChromaticObject(object):
                                 interpolated `SED` at that wavelength.  Thus, the flux of the
                                 interpolated object should be correct, at the possible expense of
                                 other features. [default: True]
+            file_name:          If given, the name of a file in which to store the grid of images.
+                                If the file already exists, the images are memory-mapped from it
+                                rather than being drawn again.  Otherwise, the images are drawn and
+                                then written to this file.  [default: None]
 
         Returns:
             the version of the Chromatic object that uses interpolation
@@ -336,11 +342,21 @@ class ChromaticObject(object):
         """
         return self.SED.dimensionless
 
+    @staticmethod
+    def _integrator_waves(integrator, bandpass):
+        # The wavelengths at which the integrator will evaluate the profile, if known in advance.
+        if isinstance(integrator, (integ.SampleIntegrator, integ.ContinuousIntegrator)):
+            return integrator.calculateWaves(bandpass)
+        else:
+            return None
+
     @staticmethod
     def _get_integrator(integrator, wave_list):
         # Decide on integrator.  If the user passed one of the integrators from galsim.integ, that's
         # fine.  Otherwise we decide based on the adopted integration rule and the presence/absence
-        # of `wave_list`.
+        # of `wave_list`.  None means the default, 'trapezoidal'.
+        if integrator is None:
+            integrator = 'trapezoidal'
         if isinstance(integrator, str):
             if integrator == 'trapezoidal':
                 rule = integ.trapzRule
@@ -357,7 +373,7 @@ class ChromaticObject(object):
             raise TypeError("Invalid type passed in for integrator!")
         return integrator
 
-    def drawImage(self, bandpass, image=None, integrator='trapezoidal', **kwargs):
+    def drawImage(self, bandpass, image=None, integrator=None, **kwargs):
         """Base implementation for drawing an image of a `ChromaticObject`.
 
         Some subclasses may choose to override this for specific efficiency gains.  For instance,
@@ -387,6 +403,26 @@ class ChromaticObject(object):
             >>> integrator = galsim.ContinuousIntegrator(rule=galsim.integ.midptRule, N=100)
             >>> image = chromatic_obj.drawImage(bandpass, integrator=integrator)
 
+        Alternatively, `galsim.integ.AdaptiveIntegrator` chooses the wavelengths adaptively until
+        a given relative accuracy of the integrated image is reached, which usually requires many
+        fewer monochromatic images for smooth SEDs and bandpasses::
+
+            >>> integrator = galsim.integ.AdaptiveIntegrator(rel_err=1.e-4)
+            >>> image = chromatic_obj.drawImage(bandpass, integrator=integrator)
+            >>> print(integrator.last_n_eval)  # The number of images that were drawn.
+
+        When drawing with ``method='phot'`` and no ``integrator``, most profiles are drawn by
+        chromatic photon shooting rather than by integrating monochromatic images.  Each photon is given a wavelength drawn
+        from the `SED` times the bandpass throughput, and then a position drawn from the profile at
+        that wavelength.  The cost then scales with the number of photons rather than with the
+        number of wavelengths, and the photons carry their wavelengths into any ``sensor`` (e.g.
+        `SiliconSensor`) or ``surface_ops``.  Thus, there is no need to include a
+        `WavelengthSampler` in the ``surface_ops`` in this case.  This is implemented for separable
+        profiles, `ChromaticTransformation`, `ChromaticAtmosphere`, `ChromaticAiry`, and
+        convolutions and sums of these.  Other profiles (e.g. `InterpolatedChromaticObject`), or
+        any profile if an ``integrator`` is given explicitly, are drawn with the integrator as
+        usual, shooting photons for each monochromatic image.
+
         Finally, this method uses a cache to avoid recomputing the integral over the product of
         the bandpass and object `SED` when possible (i.e., for separable profiles).  Because the
         cache size is finite, users may find that it is more efficient when drawing many images
@@ -403,9 +439,10 @@ class ChromaticObject(object):
                             be one of the image integrators from galsim.integ, or a string
                             'trapezoidal' or 'midpoint', in which case the routine will use a
                             `SampleIntegrator` or `ContinuousIntegrator` depending on whether or
-                            not the object has a ``wave_list``.  [default: 'trapezoidal',
-                            which will try to select an appropriate integrator using the
-                            trapezoidal integration rule automatically.]
+                            not the object has a ``wave_list``.  [default: None, which will
+                            try to select an appropriate integrator using the trapezoidal
+                            integration rule automatically, or with ``method='phot'``, use
+                            chromatic photon shooting if possible.]
             **kwargs:       For all other kwarg options, see `GSObject.drawImage`
 
         Returns:
@@ -422,6 +459,15 @@ class ChromaticObject(object):
         image = prof0.drawImage(image=image, setup_only=True, **kwargs)
         _remove_setup_kwargs(kwargs)
 
+        # Photon wavelengths are drawn from the SED, so it must be non-negative.
+        # An explicit integrator means the user wants the monochromatic images integrated.
+        if (kwargs.get('method', None) == 'phot' and integrator is None and self._shootable
+                and _is_nonnegative(self.SED)):
+            prof = _ChromaticPhotonProfile(self, bandpass, prof0)
+            image = prof.drawImage(image=image, **kwargs)
+            self._last_wcs = image.wcs
+            return image
+
         # determine combined self.wave_list and bandpass.wave_list
         wave_list, _, _ = utilities.combine_wave_list(self, bandpass)
 
@@ -443,7 +489,8 @@ class ChromaticObject(object):
                                             interpolant='linear'), 'nm')
 
         add_to_image = kwargs.pop('add_to_image', False)
-        integral = integrator(self.evaluateAtWavelength, bandpass, image, kwargs)
+        plan = _make_eval_plan(self, self._integrator_waves(integrator, bandpass))
+        integral = integrator(plan, bandpass, image, kwargs, wave_list=wave_list)
 
         # For performance profiling, store the number of evaluations used for the last integration
         # performed.  Note that this might not be very useful for ChromaticSum instances, which are
@@ -521,7 +568,8 @@ class ChromaticObject(object):
                                 wave_type='nm')
 
         add_to_image = kwargs.pop('add_to_image', False)
-        image_int = integrator(self.evaluateAtWavelength, bandpass, image, kwargs, doK=True)
+        plan = _make_eval_plan(self, self._integrator_waves(integrator, bandpass))
+        image_int = integrator(plan, bandpass, image, kwargs, doK=True, wave_list=wave_list)
 
         # For performance profiling, store the number of evaluations used for the last integration
         # performed.  Note that this might not be very useful for ChromaticSum instances, which are
@@ -553,6 +601,39 @@ class ChromaticObject(object):
                     "Subclasses of ChromaticObject must override evaluateAtWavelength()")
         return self._obj.evaluateAtWavelength(wave)
 
+    @property
+    def _shootable(self):
+        # Whether _shoot is able to shoot photons for this object at arbitrary wavelengths.
+        # Separable profiles are always ok.  Subclasses that can do better should override this.
+        if self.separable:
+            return True
+        return self.__class__ == ChromaticObject and _is_shootable(self._obj)
+
+    def _shoot(self, photons, rng):
+        """Shoot photons into the given `PhotonArray` at the wavelengths already set in
+        ``photons.wavelength``.
+
+        Unlike `GSObject._shoot`, the photons are normalized to have unit total flux, since the
+        normalization of a `ChromaticObject` is carried by its `SED`.  So each photon is placed
+        according to the profile at its own wavelength, normalized to unit flux.
+
+        Parameters:
+            photons:    A `PhotonArray` instance with allocated wavelengths, into which the
+                        photons should be placed.
+            rng:        A `BaseDeviate` instance to use for the photon shooting.
+        """
+        if self.separable:
+            # The spatial profile doesn't depend on wavelength, so any wavelength with nonzero
+            # flux will do.  Since the photon wavelengths were drawn from the SED, the first one
+            # qualifies.
+            prof = self.evaluateAtWavelength(photons.wavelength[0])
+            _shoot_at_wavelengths(prof, photons, rng)
+        elif self.__class__ == ChromaticObject:
+            _shoot_at_wavelengths(self._obj, photons, rng)
+        else:
+            raise GalSimNotImplementedError(
+                "%s does not implement chromatic photon shooting"%self.__class__.__name__)
+
     # Make op* and op*= work to adjust the flux of the object
     def __mul__(self, flux_ratio):
         """Scale the flux of the object by the given flux ratio, which may be an `SED`, a float, or
@@ -677,7 +758,8 @@ class ChromaticObject(object):
         # those wavelengths.
         if len(bandpass.wave_list) > 0 or len(self.wave_list) > 0:
             w, _, _ = utilities.combine_wave_list(self, bandpass)
-            objs = [self.evaluateAtWavelength(ww) for ww in w]
+            plan = _make_eval_plan(self, w)
+            objs = [plan(ww) for ww in w]
             fluxes = [o.flux for o in objs]
             centroids = [o.centroid for o in objs]
             xcentroids = np.array([c.x for c in centroids])
@@ -1084,8 +1166,13 @@ class InterpolatedChromaticObject(ChromaticObject):
                         interpolated `SED` at that wavelength.  Thus, the flux of the interpolated
                         object should be correct, at the possible expense of other features.
                         [default: True]
+        file_name:      If given, the name of a file in which to store the grid of images.  If
+                        the file already exists, the images are memory-mapped from it rather than
+                        being drawn again (cf. `InterpolatedChromaticObject.read`).  Otherwise, the
+                        images are drawn and then written to this file (cf.
+                        `InterpolatedChromaticObject.write`).  [default: None]
     """
-    def __init__(self, original, waves, oversample_fac=1.0, use_exact_SED=True):
+    def __init__(self, original, waves, oversample_fac=1.0, use_exact_SED=True, file_name=None):
 
         self.waves = np.sort(np.array(waves))
         self.oversample = oversample_fac
@@ -1098,12 +1185,20 @@ class InterpolatedChromaticObject(ChromaticObject):
 
         # Don't interpolate an interpolation.  Go back to the original.
         self.deinterpolated = original.deinterpolated
-        self._build_objs()
+        if file_name is not None and os.path.isfile(file_name):
+            self._read_objs(file_name)
+        else:
+            self._build_objs()
+            if file_name is not None:
+                self.write(file_name)
+                self._read_objs(file_name, check=False)
 
     def _build_objs(self):
         # Make the objects between which we are going to interpolate.  Note that these do not have
         # to be saved for later, unlike the images.
-        objs = [ self.deinterpolated.evaluateAtWavelength(wave) for wave in self.waves ]
+        self._file_name = None
+        plan = _make_eval_plan(self.deinterpolated, self.waves)
+        objs = [ plan(wave) for wave in self.waves ]
 
         # Find the Nyquist scale for each, and to be safe, choose the minimum value to use for the
         # array of images that is being stored.
@@ -1126,6 +1221,102 @@ class InterpolatedChromaticObject(ChromaticObject):
                      for obj in objs ]
         self.fluxes = [ obj.flux for obj in objs ]
 
+    def _read_objs(self, file_name, check=True):
+        # Set up the images, etc. from a file written by write().  The images are views into
+        # a read-only memory map of the file.  Unless check=False (for a file that was just
+        # written), check that the file was written for this object.
+        from .image import Image
+        cube, meta = _read_interp_cube(file_name)
+        if check:
+            content_hash = _content_hash(self.deinterpolated)
+            if content_hash is None:
+                raise GalSimIncompatibleValuesError(
+                    "Cannot check that the file %s was written for this "
+                    "InterpolatedChromaticObject, since the repr of the original object does "
+                    "not describe its content."%file_name,
+                    file_name=file_name, original=self.deinterpolated)
+            if (meta['hash'] != content_hash or
+                not np.array_equal(meta['waves'], self.waves) or
+                meta['oversample'] != self.oversample):
+                raise GalSimIncompatibleValuesError(
+                    "The file %s was not written for this InterpolatedChromaticObject"%file_name,
+                    file_name=file_name, original=self.deinterpolated, waves=self.waves,
+                    oversample_fac=self.oversample)
+        self.stepk_vals = meta['stepk_vals']
+        self.maxk_vals = meta['maxk_vals']
+        self.fluxes = meta['fluxes']
+        self.ims = [ Image(cube[k], scale=meta['scale']) for k in range(len(cube)) ]
+        self._file_name = file_name
+
+    def write(self, file_name):
+        """Write the grid of images used for the interpolation to a file.
+
+        The file holds two arrays in numpy's .npy format, one after the other.  The first is the
+        bytes of a JSON description of the wavelengths, the stepk, maxk and flux values at each
+        wavelength, and the repr of the original (non-interpolated) object along with a hash of
+        it, which is used to check that the file matches the object.  The second is the images
+        as a 3-d array.  Both can be read with successive calls to ``numpy.load`` on an open
+        file.  The file can be read back in with
+        `InterpolatedChromaticObject.read`, which memory-maps the images rather than reading them
+        into memory, so many processes reading the same file will share the same pages of memory.
+
+        The file is first written to a temporary file, which is then renamed, so other processes
+        never see a partially written file.
+
+        Parameters:
+            file_name:  The name of the file to write.
+        """
+        import json
+        cube = np.array([ im.array for im in self.ims ])
+        with utilities.printoptions(threshold=sys.maxsize, floatmode='unique'):
+            original_repr = repr(self.deinterpolated)
+        meta = {
+            'repr' : original_repr,
+            'hash' : _content_hash(self.deinterpolated),
+            'waves' : [ float(w) for w in self.waves ],
+            'oversample' : self.oversample,
+            'use_exact_SED' : self.use_exact_SED,
+            'scale' : self.ims[0].scale,
+            'stepk_vals' : [ float(k) for k in self.stepk_vals ],
+            'maxk_vals' : [ float(k) for k in self.maxk_vals ],
+            'fluxes' : [ float(f) for f in self.fluxes ],
+        }
+        # Pad the description with spaces to keep the images aligned for memory mapping.
+        meta = json.dumps(meta).encode('utf-8')
+        meta = np.frombuffer(meta + b' '*(-len(meta)%64), dtype=np.uint8)
+        with utilities.atomic_write(file_name) as tmp_file:
+            with open(tmp_file, 'wb') as fout:
+                np.save(fout, meta)
+                np.save(fout, cube)
+
+    @classmethod
+    def read(cls, file_name, original=None):
+        """Make an `InterpolatedChromaticObject` from a file written by
+        `InterpolatedChromaticObject.write`.
+
+        The images are memory-mapped from the file rather than being drawn again, so this is
+        much faster than building the object from scratch.  Only the parts of the images that
+        are actually used are read from disk, and these pages are shared by all processes that
+        use the same file.
+
+        If ``original`` is None, the original object is reconstructed by evaluating the repr
+        stored in the file.  So only read files that you trust, just as for pickle files.
+
+        Parameters:
+            file_name:  The name of the file to read.
+            original:   The original `ChromaticObject` that was interpolated, which must match
+                        the one used to write the file.  [default: None, which means to use the
+                        repr stored in the file]
+
+        Returns:
+            an `InterpolatedChromaticObject`
+        """
+        _, meta = _read_interp_cube(file_name)
+        if original is None:
+            original = _eval_repr(meta['repr'])
+        return cls(original, meta['waves'], oversample_fac=meta['oversample'],
+                   use_exact_SED=meta['use_exact_SED'], file_name=file_name)
+
     @property
     def gsparams(self):
         """The `GSParams` for this object.
@@ -1165,6 +1356,19 @@ class InterpolatedChromaticObject(ChromaticObject):
     def __str__(self):
         return 'galsim.InterpolatedChromaticObject(%s,%s)'%(self.deinterpolated, self.waves)
 
+    def __getstate__(self):
+        d = self.__dict__.copy()
+        # If the images are memory-mapped from a file, just map them again after unpickling.
+        if self._file_name is not None:
+            del d['ims']
+        return d
+
+    def __setstate__(self, d):
+        self.__dict__ = d
+        if self._file_name is not None:
+            # The file was already checked (or written) when this object was made.
+            self._read_objs(self._file_name, check=False)
+
     def _imageAtWavelength(self, wave):
         """
         Get an image of the object at a particular wavelength, using linear interpolation between
@@ -1216,6 +1420,8 @@ class InterpolatedChromaticObject(ChromaticObject):
     def _get_interp_image(self, bandpass, image=None, integrator='trapezoidal',
                           _flux_ratio=None, **kwargs):
         from .interpolatedimage import InterpolatedImage
+        if integrator is None:
+            integrator = 'trapezoidal'
         if integrator not in ('trapezoidal', 'midpoint'):
             if not isinstance(integrator, str):
                 raise TypeError("Integrator should be a string indicating trapezoidal"
@@ -1505,6 +1711,25 @@ class ChromaticAtmosphere(ChromaticObject):
         """
         return self.build_obj().evaluateAtWavelength(wave)
 
+    @property
+    def _shootable(self):
+        return True
+
+    def _shoot(self, photons, rng):
+        # Equivalent to build_obj()._shoot, but with the dilation and DCR shift vectorized over
+        # the photon wavelengths.
+        from . import dcr
+        from .angle import radians
+        _shoot_at_wavelengths(self.base_obj, photons, rng)
+        wave = photons.wavelength
+        scale = (wave/self.base_wavelength)**self.alpha
+        shift = dcr.get_refraction(wave, self.zenith_angle, **self.kw)
+        shift -= self.base_refraction
+        shift *= radians / self.scale_unit
+        sinp, cosp = self.parallactic_angle.sincos()
+        photons.x = photons.x * scale - shift * sinp
+        photons.y = photons.y * scale + shift * cosp
+
 
 class ChromaticTransformation(ChromaticObject):
     """A class for modeling a wavelength-dependent affine transformation of a `ChromaticObject`
@@ -1728,7 +1953,32 @@ class ChromaticTransformation(ChromaticObject):
         return Transformation(ret, jac=jac, offset=offset, flux_ratio=flux_ratio,
                               gsparams=self._gsparams, propagate_gsparams=self._propagate_gsparams)
 
-    def drawImage(self, bandpass, image=None, integrator='trapezoidal', **kwargs):
+    @property
+    def _shootable(self):
+        return self.separable or _is_shootable(self.original)
+
+    @doc_inherit
+    def _shoot(self, photons, rng):
+        if self.separable:
+            return ChromaticObject._shoot(self, photons, rng)
+        # The flux_ratio and the jacobian determinant are already accounted for in the SED, so
+        # only the positions need to be transformed here.
+        _shoot_at_wavelengths(self.original, photons, rng)
+        wave = photons.wavelength
+        if hasattr(self._jac, '__call__'):
+            dudx, dudy, dvdx, dvdy = _eval_at_photon_wavelengths(self._jac, wave)
+        else:
+            dudx, dudy, dvdx, dvdy = self._jac.ravel()
+        if hasattr(self._offset, '__call__'):
+            dx, dy = _eval_at_photon_wavelengths(self._offset, wave)
+        else:
+            dx, dy = self._offset
+        x = photons.x.copy()
+        y = photons.y.copy()
+        photons.x = dudx * x + dudy * y + dx
+        photons.y = dvdx * x + dvdy * y + dy
+
+    def drawImage(self, bandpass, image=None, integrator=None, **kwargs):
         """
         See `ChromaticObject.drawImage` for a full description.
 
@@ -1745,9 +1995,10 @@ class ChromaticTransformation(ChromaticObject):
                             be one of the image integrators from galsim.integ, or a string
                             'trapezoidal' or 'midpoint', in which case the routine will use a
                             `SampleIntegrator` or `ContinuousIntegrator` depending on whether or
-                            not the object has a ``wave_list``.  [default: 'trapezoidal',
-                            which will try to select an appropriate integrator using the
-                            trapezoidal integration rule automatically.]
+                            not the object has a ``wave_list``.  [default: None, which will
+                            try to select an appropriate integrator using the trapezoidal
+                            integration rule automatically, or with ``method='phot'``, use
+                            chromatic photon shooting if possible.]
                             If the object being transformed is an `InterpolatedChromaticObject`,
                             then ``integrator`` can only be a string, either 'midpoint' or
                             'trapezoidal'.
@@ -1973,7 +2224,37 @@ class ChromaticSum(ChromaticObject):
         return Add([obj.evaluateAtWavelength(wave) for obj in self.obj_list],
                    gsparams=self._gsparams, propagate_gsparams=self._propagate_gsparams)
 
-    def drawImage(self, bandpass, image=None, integrator='trapezoidal', **kwargs):
+    @property
+    def _shootable(self):
+        # The components are picked with probabilities proportional to their SEDs, so this only
+        # works if none of the SEDs are negative.
+        return all(_is_shootable(obj) and _is_nonnegative(obj.SED) for obj in self.obj_list)
+
+    @doc_inherit
+    def _shoot(self, photons, rng):
+        from .photon_array import PhotonArray
+        from .random import UniformDeviate
+        # At a given wavelength, the profile is the sum of the components weighted by their SEDs.
+        # So pick a component for each photon with probability proportional to its SED at the
+        # photon's wavelength.  (_shootable checks that the SEDs are all non-negative.)
+        N = len(photons)
+        wave = photons.wavelength
+        cumw = np.cumsum([obj.SED(wave) for obj in self.obj_list], axis=0)
+        u = np.empty(N)
+        UniformDeviate(rng).generate(u)
+        u *= cumw[-1]
+        index = np.sum(u >= cumw[:-1], axis=0)
+        for i, obj in enumerate(self.obj_list):
+            use = index == i
+            n = np.sum(use)
+            if n == 0: continue
+            p1 = PhotonArray(n, wavelength=wave[use])
+            _shoot_at_wavelengths(obj, p1, rng)
+            photons.x[use] = p1.x
+            photons.y[use] = p1.y
+            photons.flux[use] = p1.flux * (float(n) / N)
+
+    def drawImage(self, bandpass, image=None, integrator=None, **kwargs):
         """Slightly optimized draw method for `ChromaticSum` instances.
 
         Draws each summand individually and add resulting images together.  This might waste time if
@@ -1992,9 +2273,10 @@ class ChromaticSum(ChromaticObject):
                             be one of the image integrators from galsim.integ, or a string
                             'trapezoidal' or 'midpoint', in which case the routine will use a
                             `SampleIntegrator` or `ContinuousIntegrator` depending on whether or
-                            not the object has a ``wave_list``.  [default: 'trapezoidal',
-                            which will try to select an appropriate integrator using the
-                            trapezoidal integration rule automatically.]
+                            not the object has a ``wave_list``.  [default: None, which will
+                            try to select an appropriate integrator using the trapezoidal
+                            integration rule automatically, or with ``method='phot'``, use
+                            chromatic photon shooting if possible.]
             **kwargs:       For all other kwarg options, see `GSObject.drawImage`.
 
         Returns:
@@ -2004,13 +2286,19 @@ class ChromaticSum(ChromaticObject):
         self._last_bp = bandpass
         if self.SED.dimensionless:
             raise GalSimSEDError("Can only draw ChromaticObjects with spectral SEDs.", self.SED)
+        # With photon shooting, it is more efficient to shoot all the components together.
+        if kwargs.get('method', None) == 'phot' and integrator is None and self._shootable:
+            image = ChromaticObject.drawImage(self, bandpass, image=image, **kwargs)
+            self._last_wcs = image.wcs
+            return image
         add_to_image = kwargs.pop('add_to_image', False)
         # Use given add_to_image for the first one, then add_to_image=False for the rest.
         image = self.obj_list[0].drawImage(
-                bandpass, image=image, add_to_image=add_to_image, **kwargs)
+                bandpass, image=image, integrator=integrator, add_to_image=add_to_image, **kwargs)
         _remove_setup_kwargs(kwargs)
         for obj in self.obj_list[1:]:
-            image = obj.drawImage(bandpass, image=image, add_to_image=True, **kwargs)
+            image = obj.drawImage(bandpass, image=image, integrator=integrator, add_to_image=True,
+                                  **kwargs)
         self._last_wcs = image.wcs
         return image
 
@@ -2165,8 +2453,7 @@ class ChromaticConvolution(ChromaticObject):
         return ret
 
     @staticmethod
-    def _get_effective_prof(insep_obj, bandpass, iimult, integrator, gsparams):
-        from .interpolatedimage import InterpolatedImage
+    def _draw_effective_prof(insep_obj, bandpass, iimult, integrator):
         # Find scale at which to draw effective profile
         _, prof0 = insep_obj._fiducial_profile(bandpass)
         iiscale = prof0.nyquist_scale
@@ -2184,19 +2471,46 @@ class ChromaticConvolution(ChromaticObject):
                     bandpass, scale=iiscale, integrator=integrator,
                     method='no_pixel')
 
-        return InterpolatedImage(effective_prof_image, gsparams=gsparams)
+        return effective_prof_image
 
     @staticmethod
-    def resize_effective_prof_cache(maxsize):
+    def resize_effective_prof_cache(maxsize=None, max_bytes=None):
         """Resize the cache containing effective profiles.
 
         These are wavelength-integrated products of separable profile SEDs, inseparable profiles,
         and Bandpasses) used by `ChromaticConvolution.drawImage`.
 
+        The cache is limited both by the number of effective profiles and, optionally, by the
+        total size in bytes of their images.  The least recently used profiles are removed
+        when either limit is exceeded.
+
         Parameters:
-            maxsize:    The new number of effective profiles to cache.
+            maxsize:    The new number of effective profiles to cache. [default: None, which
+                        means to leave the current value unchanged]
+            max_bytes:  The maximum total size in bytes of the cached images, or 0 for no limit.
+                        [default: None, which means to leave the current value unchanged]
         """
-        ChromaticConvolution._effective_prof_cache.resize(maxsize)
+        ChromaticConvolution._effective_prof_cache.resize(maxsize, max_bytes)
+
+    @staticmethod
+    def effective_prof_cache_info():
+        """Return statistics about the cache of effective profiles.
+
+        Returns:
+            a dict with the number of cache ``hits`` and ``misses`` in memory, the number of the
+            misses that were read from the disk cache, ``disk_hits``, the ``maxsize`` and
+            ``max_bytes`` limits, the number of profiles currently cached, ``currsize``, and the
+            total size of their images in bytes, ``nbytes``.
+        """
+        return ChromaticConvolution._effective_prof_cache.cache_info()
+
+    @staticmethod
+    def clear_effective_prof_cache():
+        """Remove all effective profiles from the in-memory cache and reset its statistics.
+
+        Files in the disk cache (if any) are not removed.
+        """
+        ChromaticConvolution._effective_prof_cache.clear()
 
     def __eq__(self, other):
         return (self is other or
@@ -2230,7 +2544,29 @@ class ChromaticConvolution(ChromaticObject):
         return Convolve([obj.evaluateAtWavelength(wave) for obj in self.obj_list],
                         gsparams=self._gsparams, propagate_gsparams=self._propagate_gsparams)
 
-    def drawImage(self, bandpass, image=None, integrator='trapezoidal', iimult=None, **kwargs):
+    @property
+    def _shootable(self):
+        return all(_is_shootable(obj) for obj in self.obj_list)
+
+    @doc_inherit
+    def _shoot(self, photons, rng):
+        from .photon_array import PhotonArray
+        _shoot_at_wavelengths(self.obj_list[0], photons, rng)
+        N = len(photons)
+        for obj in self.obj_list[1:]:
+            p1 = PhotonArray(N, wavelength=photons.wavelength)
+            _shoot_at_wavelengths(obj, p1, rng)
+            # This is PhotonArray.convolve, but done here so that each photon keeps its
+            # wavelength if the photons need to be shuffled.
+            if photons.isCorrelated() and p1.isCorrelated():
+                _shuffle_photons(photons, rng)
+            photons.x += p1.x
+            photons.y += p1.y
+            photons.flux *= p1.flux * N
+            if p1.isCorrelated():
+                photons.setCorrelated()
+
+    def drawImage(self, bandpass, image=None, integrator=None, iimult=None, **kwargs):
         """Optimized draw method for the `ChromaticConvolution` class.
 
         Works by finding sums of profiles which include separable portions, which can then be
@@ -2244,6 +2580,13 @@ class ChromaticConvolution(ChromaticObject):
         cache more often.  The default cache size is 10, but may be resized using the
         `ChromaticConvolution.resize_effective_prof_cache` method.
 
+        The cache is keyed by a hash of the repr of the inputs, so an equivalent PSF that is
+        constructed again as a new object still finds its effective profile.  If there
+        is an 'effective_prof' disk cache directory (cf. `utilities.get_cache_dir`), the images
+        of the effective profiles are also saved in that directory, so other processes using the same directory can read them
+        rather than drawing them again.  Note that objects whose repr is not complete (e.g.
+        ones using lambda functions) only get cache hits within a single process.
+
         Parameters:
             bandpass:       A `Bandpass` object representing the filter against which to
                             integrate.
@@ -2253,9 +2596,10 @@ class ChromaticConvolution(ChromaticObject):
                             be one of the image integrators from galsim.integ, or a string
                             'trapezoidal' or 'midpoint', in which case the routine will use a
                             `SampleIntegrator` or `ContinuousIntegrator` depending on whether or
-                            not the object has a ``wave_list``.  [default: 'trapezoidal',
-                            which will try to select an appropriate integrator using the
-                            trapezoidal integration rule automatically.]
+                            not the object has a ``wave_list``.  [default: None, which will
+                            try to select an appropriate integrator using the trapezoidal
+                            integration rule automatically, or with ``method='phot'``, use
+                            chromatic photon shooting if possible.]
             iimult:         Oversample any intermediate `InterpolatedImage` created to hold
                             effective profiles by this amount. [default: None]
             **kwargs:       For all other kwarg options, see `GSObject.drawImage`.
@@ -2269,8 +2613,12 @@ class ChromaticConvolution(ChromaticObject):
         if self.SED.dimensionless:
             raise GalSimSEDError("Can only draw ChromaticObjects with spectral SEDs.", self.SED)
         # `ChromaticObject.drawImage()` can just as efficiently handle separable cases.
-        if self.separable:
-            image = ChromaticObject.drawImage(self, bandpass, image=image, **kwargs)
+        # It also handles photon shooting, where each photon can be shot through the full
+        # convolution at its own wavelength, so there is no need for effective profiles.
+        if self.separable or (kwargs.get('method', None) == 'phot' and integrator is None
+                              and self._shootable):
+            image = ChromaticObject.drawImage(self, bandpass, image=image, integrator=integrator,
+                                              **kwargs)
             self._last_wcs = image.wcs
             return image
 
@@ -2343,6 +2691,8 @@ class ChromaticConvolution(ChromaticObject):
 
         # If program gets this far, the objects in obj_list should be atomic (non-ChromaticSum
         # and non-ChromaticConvolution).  (The latter case was dealt with in the constructor.)
+        if integrator is None:
+            integrator = 'trapezoidal'
 
         # setup output image (semi-arbitrarily using the bandpass effective wavelength)
         wave0, prof0 = self._fiducial_profile(bandpass)
@@ -2405,8 +2755,96 @@ class ChromaticConvolution(ChromaticObject):
         return covspec.toNoise(self._last_bp, other, self._last_wcs)  # rng=?
 
 
-ChromaticConvolution._effective_prof_cache = utilities.LRU_Cache(
-    ChromaticConvolution._get_effective_prof, maxsize=10)
+class _EffectiveProfCache(object):
+    # The cache of effective profiles used by ChromaticConvolution.drawImage.
+    #
+    # The profiles are keyed by an md5 hash of the repr of the arguments (with any arrays
+    # written out in full), which is stable across processes, so it can also be used as a file
+    # name in the disk cache.  (Except when the repr isn't complete, in which case the arguments
+    # themselves are the key.)  Computing the repr can
+    # be slow for objects with large tables, so the hash for a given set of arguments is itself
+    # cached in an LRU_Cache keyed by the usual equality of the arguments.
+    def __init__(self, maxsize=10, max_bytes=0):
+        # The values are (profile, nbytes) tuples.
+        self._cache = utilities.LRU_Dict(maxsize, max_bytes, nbytes=lambda value: value[1])
+        self._keys = utilities.LRU_Cache(_effective_prof_key, maxsize=max(maxsize, 100))
+        self.disk_hits = 0
+
+    def __call__(self, insep_obj, bandpass, iimult, integrator, gsparams):
+        from .interpolatedimage import InterpolatedImage
+        key = self._keys(insep_obj, bandpass, iimult, integrator, gsparams)
+        value = self._cache.get(key)
+        if value is not None:
+            return value[0]
+
+        # Only use the disk cache for content-based keys.
+        cache_dir = utilities.get_cache_dir('effective_prof') if isinstance(key, str) else None
+        image = None
+        if cache_dir is not None:
+            file_name = os.path.join(cache_dir, 'effective_prof_%s.npz'%key)
+            image = _read_effective_prof(file_name)
+            if image is not None:
+                self.disk_hits += 1
+        if image is None:
+            image = ChromaticConvolution._draw_effective_prof(insep_obj, bandpass, iimult,
+                                                              integrator)
+            if cache_dir is not None:
+                _write_effective_prof(file_name, image)
+
+        prof = InterpolatedImage(image, gsparams=gsparams)
+        self._cache[key] = (prof, image.array.nbytes)
+        return prof
+
+    def resize(self, maxsize=None, max_bytes=None):
+        if maxsize is not None:
+            if maxsize <= 0:
+                raise GalSimValueError("Invalid maxsize", maxsize)
+            self._keys.resize(max(maxsize, 100))
+        self._cache.resize(maxsize, max_bytes)
+
+    def cache_info(self):
+        info = self._cache.cache_info()
+        info['disk_hits'] = self.disk_hits
+        return info
+
+    def clear(self):
+        self._cache.clear()
+        self._keys.clear()
+        self.disk_hits = 0
+
+def _effective_prof_key(insep_obj, bandpass, iimult, integrator, gsparams):
+    import hashlib
+    if isinstance(integrator, str):
+        integ_key = integrator
+    else:
+        # The last_* attributes record the previous integration, so leave them out.  The
+        # integration rule is a function, so use its name.
+        integ_key = (type(integrator).__name__,
+                     sorted((k, getattr(v, '__name__', v)) for k, v in vars(integrator).items()
+                            if not k.startswith('last_')))
+    key = utilities._content_repr((insep_obj, bandpass, iimult, integ_key, gsparams))
+    if key is None:
+        # The repr doesn't fully describe the content (e.g. it includes the address of a lambda
+        # function, which could even be reused by a different object).  Use the arguments
+        # themselves as the key, which keeps them alive.
+        return (insep_obj, bandpass, iimult, integrator, gsparams)
+    return hashlib.md5(key.encode('utf-8')).hexdigest()
+
+def _read_effective_prof(file_name):
+    from .image import Image
+    if not os.path.isfile(file_name):
+        return None
+    with np.load(file_name) as data:
+        return Image(data['array'], scale=float(data['scale']),
+                     xmin=int(data['xmin']), ymin=int(data['ymin']))
+
+def _write_effective_prof(file_name, image):
+    with utilities.atomic_write(file_name) as tmp_file:
+        with open(tmp_file, 'wb') as fout:
+            np.savez(fout, array=image.array, scale=image.scale,
+                     xmin=image.xmin, ymin=image.ymin)
+
+ChromaticConvolution._effective_prof_cache = _EffectiveProfCache(maxsize=10)
 
 
 class ChromaticDeconvolution(ChromaticObject):
@@ -3047,6 +3485,311 @@ class ChromaticAiry(ChromaticObject):
             gsparams=self.gsparams, **self.kwargs)
         return ret
 
+    @property
+    def _shootable(self):
+        return True
+
+    @doc_inherit
+    def _shoot(self, photons, rng):
+        # The Airy profile at any wavelength is just the profile at self.lam dilated by wave/lam.
+        _shoot_at_wavelengths(self.evaluateAtWavelength(self.lam), photons, rng)
+        scale = photons.wavelength / self.lam
+        photons.x *= scale
+        photons.y *= scale
+
+class _ChromaticPhotonProfile(GSObject):
+    """A `GSObject` that shoots the photons of a `ChromaticObject` observed through a `Bandpass`.
+
+    Each photon is given a wavelength drawn from the object's `SED` times the bandpass throughput,
+    and then a position drawn from the profile at that wavelength.  Wrapping this as a `GSObject`
+    lets `GSObject.drawImage` handle all the usual photon shooting details (wcs, offsets,
+    n_photons, sensors, surface_ops, etc.).
+
+    This is only used by `ChromaticObject.drawImage` with ``method='phot'``.  It cannot be
+    drawn with any other method.
+
+    Parameters:
+        obj:        The `ChromaticObject` to shoot.
+        bandpass:   The `Bandpass` through which the object is observed.
+        prof0:      The fiducial profile of ``obj``, which is used for the size and photon
+                    shooting statistics of the profile.
+    """
+    _is_analytic_x = False
+    _is_analytic_k = False
+
+    def __init__(self, obj, bandpass, prof0):
+        self._obj = obj
+        self._bandpass = bandpass
+        self._prof0 = prof0
+        self._gsparams = prof0.gsparams
+        # Note: grab the SED once, since for compound objects it is built on the fly, and the
+        # SED caches the DistDeviate used for sampling the wavelengths.
+        self._sed = obj.SED
+        self._flux = obj.calculateFlux(bandpass)
+
+    @property
+    def _maxk(self):
+        return self._prof0.maxk
+
+    @property
+    def _stepk(self):
+        return self._prof0.stepk
+
+    @lazy_property
+    def _negative_flux(self):
+        # Use the fraction of negative photons in the fiducial profile.
+        prof0 = self._prof0
+        eta = prof0.negative_flux / (prof0.positive_flux + prof0.negative_flux)
+        return abs(self._flux) * eta / (1.-2.*eta)
+
+    @lazy_property
+    def _max_sb(self):
+        return self._prof0.max_sb * abs(self._flux / self._prof0.flux)
+
+    def __repr__(self):
+        return 'galsim.chromatic._ChromaticPhotonProfile(%r, %r, %r)'%(
+                self._obj, self._bandpass, self._prof0)
+
+    def __str__(self):
+        return 'galsim.chromatic._ChromaticPhotonProfile(%s, %s)'%(self._obj, self._bandpass)
+
+    def _shoot(self, photons, rng):
+        photons.wavelength = self._sed.sampleWavelength(len(photons), self._bandpass, rng)
+        self._obj._shoot(photons, rng)
+        photons.scaleFlux(self._flux)
+
+def _is_shootable(obj):
+    # Helper function to check whether obj, which may be either a GSObject or a ChromaticObject,
+    # can shoot photons at arbitrary wavelengths.
+    return isinstance(obj, GSObject) or obj._shootable
+
+def _is_nonnegative(sed):
+    # Helper function to check whether an SED is non-negative at all wavelengths.  It is checked
+    # at any tabulated wavelengths (where a tabulated SED's values are) and on a fine grid over
+    # the wavelength range of the SED (for SEDs given as functions).
+    blue = max(sed.blue_limit, 10.)
+    red = min(sed.red_limit, 1.e5)
+    waves = np.geomspace(blue, red, 1000) if red > blue else np.array([sed.blue_limit])
+    if len(sed.wave_list) > 0:
+        waves = np.union1d(waves[(waves >= sed.blue_limit) & (waves <= sed.red_limit)],
+                           sed.wave_list)
+    return np.all(np.asarray(sed(waves)) >= 0.)
+
+def _shoot_at_wavelengths(obj, photons, rng):
+    # Helper function to shoot photons for obj, which may be either a GSObject or a
+    # ChromaticObject, at the wavelengths in photons.wavelength.  Either way, the photons are
+    # normalized to unit total flux.
+    obj._shoot(photons, rng)
+    if isinstance(obj, GSObject):
+        photons.scaleFlux(1./obj.flux)
+
+def _eval_at_photon_wavelengths(func, wave, ngrid=256):
+    # Helper function to evaluate a function of wavelength, returning a scalar or array, at each
+    # of the photon wavelengths in wave.  Calling a python function for each photon would be
+    # prohibitively slow, so we evaluate it on a grid spanning the photon wavelengths and
+    # interpolate.  Chromatic transformations are smooth functions of wavelength, so linear
+    # interpolation on this grid is very accurate.
+    # Returns an array of shape (len(func(w).ravel()), len(wave)).
+    wmin = np.min(wave)
+    wmax = np.max(wave)
+    if wmax > wmin:
+        wgrid = np.linspace(wmin, wmax, ngrid)
+    else:
+        wgrid = np.array([wmin])
+    vals = np.array([np.asarray(func(w), dtype=float).ravel() for w in wgrid])
+    return np.array([np.interp(wave, wgrid, v) for v in vals.T])
+
+class _EvalPlan(object):
+    # A plan for evaluating a ChromaticObject at many wavelengths.
+    #
+    # evaluateAtWavelength walks the whole tree of chromatic objects for each wavelength, and
+    # some nodes (e.g. ChromaticAtmosphere) rebuild their wavelength-dependent structure each
+    # time.  A plan analyzes the tree once, and only the wavelength-dependent parameters
+    # (transformations and flux ratios) are computed at each wavelength.  If the wavelengths are
+    # known in advance, prepare computes these for all of them at once, vectorized where
+    # possible.  Calling the plan returns the same profile as obj.evaluateAtWavelength(wave).
+    #
+    # This base class is used for objects without a more specific plan.  It just calls
+    # evaluateAtWavelength.
+    def __init__(self, obj):
+        self.obj = obj
+
+    def prepare(self, waves):
+        pass
+
+    def __call__(self, wave):
+        return self.obj.evaluateAtWavelength(wave)
+
+class _ConstantPlan(_EvalPlan):
+    # A ChromaticObject wrapping a GSObject, which is the same at all wavelengths.
+    def __call__(self, wave):
+        return self.obj
+
+class _TransformationPlan(_EvalPlan):
+    # A ChromaticTransformation: the original object's plan, plus a jacobian, offset and
+    # flux ratio at each wavelength.
+    def __init__(self, obj):
+        self.original = _make_eval_plan(obj.original)
+        self.jac = obj._jac
+        self.offset = obj._offset
+        self.flux_ratio = obj._flux_ratio
+        self.gsparams = obj._gsparams
+        self.propagate_gsparams = obj._propagate_gsparams
+        if not hasattr(self.offset, '__call__'):
+            self.offset = PositionD(*self.offset)
+        self._params = {}
+
+    def _calculate_params(self, waves):
+        # Return lists of the jacobian, offset and flux ratio at each of waves.
+        n = len(waves)
+        if hasattr(self.jac, '__call__'):
+            jac = [self.jac(w) for w in waves]
+        else:
+            jac = [self.jac] * n
+        if hasattr(self.offset, '__call__'):
+            offset = [PositionD(*self.offset(w)) for w in waves]
+        else:
+            offset = [self.offset] * n
+        if isinstance(self.flux_ratio, SED):
+            # Constant SEDs return a scalar here, so broadcast to the right length.
+            flux_ratio = np.empty(n, dtype=float)
+            flux_ratio[:] = self.flux_ratio(np.asarray(waves, dtype=float))
+        else:
+            flux_ratio = [self.flux_ratio(w) for w in waves]
+        return jac, offset, flux_ratio
+
+    def prepare(self, waves):
+        self.original.prepare(waves)
+        params = self._calculate_params(waves)
+        self._params = dict(zip(waves, zip(*params)))
+
+    def __call__(self, wave):
+        from .transform import Transformation
+        ret = self.original(wave)
+        if wave in self._params:
+            jac, offset, flux_ratio = self._params[wave]
+        else:
+            jac, offset, flux_ratio = (p[0] for p in self._calculate_params([wave]))
+        return Transformation(ret, jac=jac, offset=offset, flux_ratio=flux_ratio,
+                              gsparams=self.gsparams, propagate_gsparams=self.propagate_gsparams)
+
+class _AtmospherePlan(_EvalPlan):
+    # A ChromaticAtmosphere: the plan for the ChromaticTransformation from build_obj, which is
+    # only built once.  As for the ChromaticAtmosphere itself, this is built on demand (and not
+    # pickled), since the transformation uses local functions, which cannot be pickled.
+    def __init__(self, obj):
+        self.obj = obj
+        self._plan = None
+        self._waves = None
+
+    @property
+    def plan(self):
+        if self._plan is None:
+            self._plan = _TransformationPlan(self.obj.build_obj())
+            if self._waves is not None:
+                self._plan.prepare(self._waves)
+        return self._plan
+
+    def prepare(self, waves):
+        self._waves = waves
+        if self._plan is not None:
+            self._plan.prepare(waves)
+
+    def __call__(self, wave):
+        return self.plan(wave)
+
+    def __getstate__(self):
+        d = self.__dict__.copy()
+        d['_plan'] = None
+        return d
+
+    def __setstate__(self, d):
+        self.__dict__ = d
+
+class _SumPlan(_EvalPlan):
+    # A ChromaticSum or ChromaticConvolution: combine the plans of the components.
+    def __init__(self, obj, combine):
+        self.plans = [_make_eval_plan(o) for o in obj.obj_list]
+        self.combine = combine
+        self.gsparams = obj._gsparams
+        self.propagate_gsparams = obj._propagate_gsparams
+
+    def prepare(self, waves):
+        for plan in self.plans:
+            plan.prepare(waves)
+
+    def __call__(self, wave):
+        return self.combine([plan(wave) for plan in self.plans],
+                            gsparams=self.gsparams, propagate_gsparams=self.propagate_gsparams)
+
+def _make_eval_plan(obj, waves=None):
+    # Make an _EvalPlan for the given object, and if waves is given, prepare it for those
+    # wavelengths.
+    from .sum import Add
+    from .convolve import Convolve
+    if type(obj) is ChromaticObject and isinstance(obj._obj, GSObject):
+        plan = _ConstantPlan(obj._obj)
+    elif type(obj) is ChromaticTransformation:
+        plan = _TransformationPlan(obj)
+    elif type(obj) is ChromaticAtmosphere:
+        plan = _AtmospherePlan(obj)
+    elif type(obj) is ChromaticSum:
+        plan = _SumPlan(obj, Add)
+    elif type(obj) is ChromaticConvolution:
+        plan = _SumPlan(obj, Convolve)
+    else:
+        plan = _EvalPlan(obj)
+    if waves is not None:
+        plan.prepare(list(waves))
+    return plan
+
+def _shuffle_photons(photons, rng):
+    # Helper function to randomly reorder photons, keeping each photon's wavelength with it.
+    from .random import UniformDeviate
+    u = np.empty(len(photons))
+    UniformDeviate(rng).generate(u)
+    index = np.argsort(u)
+    photons.x = photons.x[index]
+    photons.y = photons.y[index]
+    photons.flux = photons.flux[index]
+    photons.wavelength = photons.wavelength[index]
+    photons.setCorrelated(False)
+
+def _read_interp_cube(file_name):
+    # Helper function to read a file written by InterpolatedChromaticObject.write.
+    # Returns the images as a read-only memory-mapped 3-d array and the dict of other values.
+    import json
+    from numpy.lib import format
+    with open(file_name, 'rb') as fin:
+        meta = json.loads(np.load(fin).tobytes().decode('utf-8'))
+        version = format.read_magic(fin)
+        if version == (1,0):
+            shape, fortran_order, dtype = format.read_array_header_1_0(fin)
+        else:
+            shape, fortran_order, dtype = format.read_array_header_2_0(fin)
+        offset = fin.tell()
+    cube = np.memmap(file_name, dtype=dtype, mode='r', shape=shape, offset=offset,
+                     order='F' if fortran_order else 'C')
+    return cube, meta
+
+def _content_hash(obj):
+    # Helper function to get an md5 hash of the full content of obj, or None if its repr doesn't
+    # describe the content.
+    import hashlib
+    s = utilities._content_repr(obj)
+    return None if s is None else hashlib.md5(s.encode('utf-8')).hexdigest()
+
+def _eval_repr(s):
+    # Helper function to reconstruct an object from its repr.
+    import galsim
+    import coord
+    namespace = { 'galsim': galsim, 'coord': coord, 'array': np.array, 'inf': np.inf }
+    # The dtypes that may appear in the repr of an array.
+    for dtype in ('uint16', 'uint32', 'int16', 'int32', 'float32', 'float64',
+                  'complex64', 'complex128'):
+        namespace[dtype] = getattr(np, dtype)
+    return eval(s, namespace)
+
 def _findWave(wave_list, wave):
     # Helper routine to search a sorted NumPy array of wavelengths (not necessarily evenly spaced)
     # to find where a particular wavelength ``wave`` would fit in, and return the index below along
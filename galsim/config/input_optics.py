@@ -0,0 +1,114 @@
+# Copyright (c) 2012-2019 by the GalSim developers team on GitHub
+# https://github.com/GalSim-developers
+#
+# This file is part of GalSim: The modular galaxy image simulation toolkit.
+# https://github.com/GalSim-developers/GalSim
+#
+# GalSim is free software: redistribution and use in source and binary forms,
+# with or without modification, are permitted provided that the following
+# conditions are met:
+#
+# 1. Redistributions of source code must retain the above copyright notice, this
+#    list of conditions, and the disclaimer given in the accompanying LICENSE
+#    file.
+# 2. Redistributions in binary form must reproduce the above copyright notice,
+#    this list of conditions, and the disclaimer given in the documentation
+#    and/or other materials provided with the distribution.
+#
+
+from .input import InputLoader, GetInputObj, RegisterInputType
+from .value import ParseValue, GetAllParams
+from .gsobject import RegisterObjectType
+from ..gsparams import GSParams
+from ..bounds import BoundsD
+from ..errors import GalSimConfigError
+from ..phase_psf import OpticalPSFField
+
+# This file adds input type optical_psf_field and gsobject type OpticalPSFField.
+
+class _LinearAberrations(object):
+    """A simple model of the aberrations as a function of position, which is linear in the
+    field position normalized to run from -1 to 1 across the bounds.
+    """
+    def __init__(self, bounds, aberrations, aberrations_x, aberrations_y):
+        self.bounds = bounds
+        self.aberrations = aberrations
+        self.aberrations_x = aberrations_x
+        self.aberrations_y = aberrations_y
+
+    def __call__(self, pos):
+        b = self.bounds
+        u = (2.*pos.x - b.xmin - b.xmax) / (b.xmax - b.xmin)
+        v = (2.*pos.y - b.ymin - b.ymax) / (b.ymax - b.ymin)
+        n = max(len(self.aberrations), len(self.aberrations_x), len(self.aberrations_y))
+        aber = [0.] * n
+        for i, a in enumerate(self.aberrations): aber[i] += a
+        for i, a in enumerate(self.aberrations_x): aber[i] += a * u
+        for i, a in enumerate(self.aberrations_y): aber[i] += a * v
+        return aber
+
+class OpticalPSFFieldLoader(InputLoader):
+
+    def getKwargs(self, config, base, logger):
+        """Parse the config dict and return the kwargs needed to build the OpticalPSFField object.
+
+        Parameters:
+            config:     The configuration dict for 'optical_psf_field'
+            base:       The base configuration dict
+            logger:     If given, a logger object to log progress.
+
+        Returns:
+            kwargs, safe
+        """
+        req = dict(OpticalPSFField._req_params)
+        req.update({ 'xmin' : float, 'xmax' : float, 'ymin' : float, 'ymax' : float })
+        aber_keys = [ 'aberrations', 'aberrations_x', 'aberrations_y' ]
+        kwargs, safe = GetAllParams(config, base, req=req, opt=OpticalPSFField._opt_params,
+                                    ignore=aber_keys)
+        bounds = BoundsD(kwargs.pop('xmin'), kwargs.pop('xmax'),
+                         kwargs.pop('ymin'), kwargs.pop('ymax'))
+
+        # As for OpticalPSF, the aberration lists start at Noll index 4 (defocus).
+        aber_lists = []
+        for key in aber_keys:
+            aber_list = []
+            if key in config:
+                aberrations = config[key]
+                if not isinstance(aberrations,list):
+                    raise GalSimConfigError(
+                        "%s entry for config.optical_psf_field entry is not a list."%key)
+                aber_list = [0.0] * 4  # Initial 4 values are ignored.
+                for i in range(len(aberrations)):
+                    value, safe1 = ParseValue(aberrations, i, base, float)
+                    aber_list.append(value)
+                    safe = safe and safe1
+            aber_lists.append(aber_list)
+
+        kwargs['bounds'] = bounds
+        kwargs['aberrations'] = _LinearAberrations(bounds, *aber_lists)
+        return kwargs, safe
+
+# Register this as a valid input type
+RegisterInputType('optical_psf_field', OpticalPSFFieldLoader(OpticalPSFField))
+
+
+def _BuildOpticalPSFField(config, base, ignore, gsparams, logger):
+    """Build an InterpolatedImage of the PSF at the current position from the optical_psf_field
+    input item.
+    """
+    psf_field = GetInputObj('optical_psf_field', config, base, 'OpticalPSFField')
+
+    opt = { 'flux' : float, 'num' : int }
+    kwargs = GetAllParams(config, base, opt=opt, ignore=ignore)[0]
+
+    if 'image_pos' not in base:
+        raise GalSimConfigError("OpticalPSFField requested, but no image_pos defined.")
+    psf = psf_field.getPSF(base['image_pos'])
+    if 'flux' in kwargs: psf = psf.withFlux(kwargs['flux'])
+    if gsparams: psf = psf.withGSParams(GSParams(**gsparams))
+
+    # The PSF depends on the position, so it is not safe to reuse.
+    return psf, False
+
+# Register this as a valid gsobject type
+RegisterObjectType('OpticalPSFField', _BuildOpticalPSFField, input_type='optical_psf_field')
@@ -39,17 +39,25 @@ def air_refractive_index_minus_one(wave, pressure=69.328, temperature=293.15, H2
     Returns:
         the refractive index minus 1.
     """
-    P = pressure * 7.50061683 # kPa -> mmHg
-    T = temperature - 273.15 # K -> C
-    W = H2O_pressure * 7.50061683 # kPa -> mmHg
+    pfactor, wfactor = _refraction_factors(pressure, temperature, H2O_pressure)
 
     sigma_squared = 1.0 / (wave * 1.e-3)**2.0 # inverse wavenumber squared in micron^-2
     n_minus_one = (64.328 + (29498.1 / (146.0 - sigma_squared))
                    + (255.4 / (41.0 - sigma_squared))) * 1.e-6
-    n_minus_one *= P * (1.0 + (1.049 - 0.0157 * T) * 1.e-6 * P) / (720.883 * (1.0 + 0.003661 * T))
-    n_minus_one -= (0.0624 - 0.000680 * sigma_squared)/(1.0 + 0.003661 * T) * W * 1.e-6
+    n_minus_one *= pfactor
+    n_minus_one -= (0.0624 - 0.000680 * sigma_squared) * wfactor * 1.e-6
     return n_minus_one
 
+def _refraction_factors(pressure=69.328, temperature=293.15, H2O_pressure=1.067):
+    # The wavelength-independent factors in air_refractive_index_minus_one for the dry air and
+    # water vapor terms.  These are also used by PhotonOpPipeline in the C++ layer.
+    P = pressure * 7.50061683 # kPa -> mmHg
+    T = temperature - 273.15 # K -> C
+    W = H2O_pressure * 7.50061683 # kPa -> mmHg
+    pfactor = P * (1.0 + (1.049 - 0.0157 * T) * 1.e-6 * P) / (720.883 * (1.0 + 0.003661 * T))
+    wfactor = W / (1.0 + 0.003661 * T)
+    return pfactor, wfactor
+
 def get_refraction(wave, zenith_angle, **kwargs):
     """Compute the angle of refraction for a photon entering the atmosphere.
 
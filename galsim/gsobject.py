@@ -1565,7 +1565,7 @@ class GSObject(object):
         from .convolve import Convolve, Convolution, Deconvolve
         from .box import Pixel
         from .wcs import PixelScale
-        from .photon_array import PhotonArray
+        from .photon_array import PhotonArray, PhotonOpPipeline
 
         # Check that image is sane
         if image is not None and not isinstance(image, Image):
@@ -1733,8 +1733,7 @@ class GSObject(object):
 
             if sensor is not None:
                 photons = PhotonArray.makeFromImage(draw_image, rng=rng)
-                for op in surface_ops:
-                    op.applyTo(photons, local_wcs)
+                PhotonOpPipeline(surface_ops).applyTo(photons, local_wcs)
                 if imview.dtype in (np.float32, np.float64):
                     added_photons = sensor.accumulate(photons, imview, orig_center)
                 else:
@@ -2139,6 +2138,7 @@ class GSObject(object):
             - photons is the `PhotonArray` that was applied to the image.
         """
         from .sensor import Sensor
+        from .photon_array import PhotonOpPipeline
         from .image import ImageD
         # Make sure the type of n_photons is correct and has a valid value:
         if n_photons < 0.:
@@ -2168,6 +2168,9 @@ class GSObject(object):
         if gain != 1.:
             g /= gain
 
+        # Combine the surface ops into a pipeline, so they can be applied in a single pass.
+        surface_ops = PhotonOpPipeline(surface_ops)
+
         # total flux falling inside image bounds, this will be returned on exit.
         added_flux = 0.
 
@@ -2198,8 +2201,7 @@ class GSObject(object):
             if image.scale != 1.:
                 photons.scaleXY(1./image.scale)  # Convert x,y to image coords if necessary
 
-            for op in surface_ops:
-                op.applyTo(photons, local_wcs)
+            surface_ops.applyTo(photons, local_wcs)
 
             if image.dtype in (np.float32, np.float64):
                 added_flux += sensor.accumulate(photons, image, orig_center, resume=resume)
@@ -21,6 +21,7 @@ from functools import reduce
 
 from . import _galsim
 from .errors import GalSimError, GalSimRangeError, GalSimValueError, convert_cpp_errors
+from .errors import galsim_warn
 
 def int1d(func, min, max, rel_err=1.e-6, abs_err=1.e-12):
     """Integrate a 1-dimensional function from min to max.
@@ -158,7 +159,8 @@ class ImageIntegrator(object):
     #    argument, and a list of evaluation wavelengths as its second argument, and returns
     #    an approximation to the integral.  (E.g., the function midptRule above)
 
-    def __call__(self, evaluateAtWavelength, bandpass, image, drawImageKwargs, doK=False):
+    def __call__(self, evaluateAtWavelength, bandpass, image, drawImageKwargs, doK=False,
+                 wave_list=None):
         """
         Parameters:
             evaluateAtWavelength:   Function that returns a monochromatic surface brightness
@@ -169,6 +171,10 @@ class ImageIntegrator(object):
                                     function.
             doK:                    Integrate up results of `ChromaticObject.drawKImage` instead of
                                     results of `ChromaticObject.drawImage`.  [default: False]
+            wave_list:              Wavelengths at which the integrand may have a kink.  This is
+                                    ignored here, since the wavelengths are given by
+                                    `calculateWaves`, but it is used by `AdaptiveIntegrator`.
+                                    [default: None]
 
         Returns:
             the result of integral as an `Image`
@@ -200,7 +206,6 @@ class SampleIntegrator(ImageIntegrator):
 
                     - galsim.integ.midptRule: Use the midpoint integration rule
                     - galsim.integ.trapzRule: Use the trapezoidal integration rule
-
     """
     def __init__(self, rule):
         self.rule = rule
@@ -246,3 +251,149 @@ class ContinuousIntegrator(ImageIntegrator):
             return [bandpass.blue_limit + h * i for i in range(self.N+1)]
         else:
             return [bandpass.blue_limit + h * (i+0.5) for i in range(self.N)]
+
+
+class AdaptiveIntegrator(ImageIntegrator):
+    """Create a chromatic surface brightness profile integrator, which will integrate over
+    wavelength using a `Bandpass` as a weight function, choosing the wavelengths at which to
+    draw the monochromatic images adaptively.
+
+    This integrator starts by dividing the interval from bandpass.blue_limit to
+    bandpass.red_limit into ``N_initial`` equal sub-intervals, further split at any tabulated
+    wavelengths of the bandpass and SED, and drawing images at the ends and midpoint of each one.
+    (If there are too many tabulated wavelengths to fit within ``max_eval``, an evenly spaced
+    subset of them is used.)  The error in the trapezoidal rule estimate for each sub-interval is
+    estimated from the difference between the estimates with and without the midpoint.  Then
+    the sub-interval with the largest error is split in two, which requires two more images, and
+    so on until the total estimated error is less than ``rel_err`` times the integrated image.
+
+    The error of an image is measured as the sum of the absolute values of its pixels, so the
+    criterion is that the estimated total absolute error summed over all pixels is less than
+    ``rel_err`` times the sum of the absolute values of the pixels in the integrated image.
+
+    For smooth SEDs and bandpasses, this typically requires many fewer images than the
+    `ContinuousIntegrator` or `SampleIntegrator` for the same accuracy.  After each integration,
+    the number of images drawn is available as the attribute ``last_n_eval``, the wavelengths
+    that were used as ``last_waves``, and the final estimated relative error as ``last_rel_err``.
+
+    Parameters:
+        rel_err:        The target relative error of the integrated image. [default: 1.e-4]
+        N_initial:      The number of equal sub-intervals to start with.  This should be large
+                        enough to resolve the main features of the bandpass and SED, so that
+                        the initial error estimates are reasonable. [default: 4]
+        max_eval:       The maximum number of monochromatic images to draw.  If the target
+                        accuracy has not been reached by then, a warning is emitted and the
+                        current estimate is returned. [default: 250]
+    """
+    def __init__(self, rel_err=1.e-4, N_initial=4, max_eval=250):
+        if rel_err <= 0.:
+            raise GalSimRangeError("rel_err must be positive", rel_err, 0.)
+        if N_initial < 1:
+            raise GalSimRangeError("N_initial must be at least 1", N_initial, 1)
+        if max_eval < 2*N_initial+1:
+            raise GalSimRangeError("max_eval must be at least 2*N_initial+1",
+                                   max_eval, 2*N_initial+1)
+        self.rel_err = rel_err
+        self.N_initial = int(N_initial)
+        self.max_eval = int(max_eval)
+
+    def __call__(self, evaluateAtWavelength, bandpass, image, drawImageKwargs, doK=False,
+                 wave_list=None):
+        """
+        Parameters:
+            evaluateAtWavelength:   Function that returns a monochromatic surface brightness
+                                    profile as a function of wavelength.
+            bandpass:               `Bandpass` object representing the filter being imaged through.
+            image:                  `Image` used to set size and scale of output
+            drawImageKwargs:        dict with other kwargs to send to `ChromaticObject.drawImage`
+                                    function.
+            doK:                    Integrate up results of `ChromaticObject.drawKImage` instead of
+                                    results of `ChromaticObject.drawImage`.  [default: False]
+            wave_list:              Wavelengths at which the integrand may have a kink, such as
+                                    the tabulated wavelengths of the bandpass and SED, which are
+                                    used as edges of the initial sub-intervals.
+                                    [default: None, which means to use bandpass.wave_list]
+
+        Returns:
+            the result of integral as an `Image`
+        """
+        import heapq
+        drawImageKwargs.pop('add_to_image', None) # Make sure add_to_image isn't in kwargs
+
+        def draw(w):
+            prof = evaluateAtWavelength(w) * bandpass(w)
+            if not doK:
+                return prof.drawImage(image=image.copy(), **drawImageKwargs)
+            else:
+                return prof.drawKImage(image=image.copy(), **drawImageKwargs)
+
+        def norm(im):
+            return np.sum(np.abs(im.array))
+
+        def interval(a, b, fa, fm, fb):
+            # The trapezoidal estimates with and without the midpoint, and the Richardson
+            # estimate of the error in the former.
+            h = b - a
+            fine = (fa + 2*fm + fb) * (h/4.)
+            err = norm((2*fm - fa - fb) * (h/4.)) / 3.
+            return (-err, a, b, fa, fm, fb, fine)
+
+        if wave_list is None:
+            wave_list = bandpass.wave_list
+        wave_list = np.asarray(wave_list, dtype=float)
+        edges = np.linspace(bandpass.blue_limit, bandpass.red_limit, self.N_initial+1)
+        wave_list = wave_list[(wave_list > edges[0]) & (wave_list < edges[-1])]
+        edges = np.union1d(edges, wave_list)
+        # Each sub-interval needs two images, plus one for the blue limit.
+        n_max = (self.max_eval - 1) // 2
+        if len(edges) - 1 > n_max:
+            index = np.round(np.linspace(0, len(edges)-1, n_max+1)).astype(int)
+            edges = edges[index]
+        n_initial = len(edges) - 1
+        mids = 0.5 * (edges[1:] + edges[:-1])
+        waves = list(edges) + list(mids)
+        images = [draw(w) for w in waves]
+        fedges = images[:len(edges)]
+        fmids = images[len(edges):]
+        heap = []
+        for i in range(n_initial):
+            heap.append(interval(edges[i], edges[i+1], fedges[i], fmids[i], fedges[i+1]))
+        heapq.heapify(heap)
+
+        total = heap[0][6].copy()
+        for iv in heap[1:]:
+            total += iv[6]
+        err = -sum(iv[0] for iv in heap)
+
+        while err > self.rel_err * norm(total):
+            if len(waves) + 2 > self.max_eval:
+                galsim_warn("AdaptiveIntegrator reached max_eval=%d with estimated relative "
+                            "error %g > rel_err=%g"%(self.max_eval, err/norm(total),
+                                                     self.rel_err))
+                break
+            minus_err, a, b, fa, fm, fb, fine = heapq.heappop(heap)
+            m = 0.5 * (a + b)
+            m1 = 0.5 * (a + m)
+            m2 = 0.5 * (m + b)
+            waves.extend([m1, m2])
+            fm1, fm2 = draw(m1), draw(m2)
+            iv1 = interval(a, m, fa, fm1, fm)
+            iv2 = interval(m, b, fm, fm2, fb)
+            heapq.heappush(heap, iv1)
+            heapq.heappush(heap, iv2)
+            total -= fine
+            total += iv1[6]
+            total += iv2[6]
+            err += minus_err - iv1[0] - iv2[0]
+
+        # Recompute the sum to avoid any accumulated rounding errors.
+        heap.sort(key=lambda iv: iv[1])
+        total = heap[0][6].copy()
+        for iv in heap[1:]:
+            total += iv[6]
+        err = -sum(iv[0] for iv in heap)
+
+        self.last_n_eval = len(waves)
+        self.last_waves = np.sort(waves)
+        self.last_rel_err = err / norm(total) if norm(total) > 0. else 0.
+        return total
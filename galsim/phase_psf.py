@@ -16,6 +16,7 @@
 #    and/or other materials provided with the distribution.
 #
 
+import os
 import sys
 from past.builtins import basestring
 from itertools import chain
@@ -23,6 +24,7 @@ from builtins import range
 from heapq import heappush, heappop
 import numpy as np
 
+from . import _galsim
 from .gsobject import GSObject
 from .gsparams import GSParams
 from .angle import radians, degrees, arcsec, Angle, AngleUnit
@@ -30,9 +32,9 @@ from .image import Image, _Image
 from .bounds import _BoundsI
 from .wcs import PixelScale
 from .interpolatedimage import InterpolatedImage
-from .utilities import doc_inherit, OrderedWeakRef, rotate_xy, lazy_property
+from .utilities import doc_inherit, OrderedWeakRef, rotate_xy, lazy_property, LRU_Dict
 from .errors import GalSimError, GalSimValueError, GalSimRangeError, GalSimIncompatibleValuesError
-from .errors import GalSimFFTSizeError, galsim_warn
+from .errors import GalSimFFTSizeError, GalSimBoundsError, galsim_warn
 
 class Aperture(object):
     """Class representing a telescope aperture embedded in a larger pupil plane array -- for use
@@ -121,6 +123,17 @@ class Aperture(object):
     The ``pupil_plane_size`` and ``lam`` keywords are both ignored when constructing an Aperture
     from an image.
 
+    **Pupil plane cache**:
+
+    Making the pupil plane array can be slow, especially when it is read from a file or rotated.
+    So the illuminated array and the corresponding ``u`` and ``v`` arrays are kept in a cache,
+    keyed by everything that determines them, and shared (read-only) by all Apertures that end up
+    with the same pupil plane.  E.g. the many `OpticalPSF` objects made by `galsim.wfirst.getPSF`
+    for different positions on the focal plane all use the same pupil plane arrays.  By default,
+    the cache holds up to 10 of the most recently used pupil planes, as long as their arrays take
+    less than 1 GB in total.  See `Aperture.resize_pupil_cache`, `Aperture.pupil_cache_info` and
+    `Aperture.clear_pupil_cache`.
+
     Parameters:
         diam:               Aperture diameter in meters.
         lam:                Wavelength in nanometers.  [default: None]
@@ -283,10 +296,31 @@ class Aperture(object):
 
     @lazy_property
     def _illuminated(self):
+        return self._pupil.illuminated
+
+    @lazy_property
+    def _pupil(self):
         # Now that we have good candidate sizes and scales, we load or generate the pupil plane
-        # array.
-        if self._pupil_plane_im is not None:  # Use image of pupil plane
-            return self._load_pupil_plane()
+        # array, or find it in the cache.
+        if '_illuminated' in self.__dict__:
+            # An unpickled Aperture with a loaded pupil plane.
+            return _PupilPlane(self._illuminated, self._npix, self._pupil_plane_scale,
+                               self._pupil_plane_size)
+        elif self._pupil_plane_im is not None:  # Use image of pupil plane
+            key = self._load_key()
+            pupil = Aperture._pupil_cache.get(key) if key is not None else None
+            if pupil is None:
+                illuminated = self._load_pupil_plane()
+                pupil = _PupilPlane(illuminated, self._npix, self._pupil_plane_scale,
+                                    self._pupil_plane_size)
+                if key is not None:
+                    Aperture._pupil_cache[key] = pupil
+            else:
+                self._npix = pupil.npix
+                self._pupil_plane_scale = pupil.scale
+                self._pupil_plane_size = pupil.size
+                self._check_pupil_plane_scale()
+            return pupil
         else:  # Use geometric parameters.
             if self._input_pupil_plane_scale is not None:
                 self._pupil_plane_scale = self._input_pupil_plane_scale
@@ -310,7 +344,83 @@ class Aperture(object):
                                 "check PhaseScreenPSF outputs for signs of undersampling."%ratio)
             else:
                 self._pupil_plane_size = self.good_pupil_size
-            return self._generate_pupil_plane()
+            key = ('geometric', self.diam, self._circular_pupil, self.obscuration, self._nstruts,
+                   self._strut_thick, self._strut_angle.rad, self._pupil_plane_scale,
+                   self._pupil_plane_size, self.gsparams.maximum_fft_size)
+            pupil = Aperture._pupil_cache.get(key)
+            if pupil is None:
+                illuminated = self._generate_pupil_plane()
+                pupil = _PupilPlane(illuminated, self._npix, self._pupil_plane_scale,
+                                    self._pupil_plane_size, self._uv)
+                Aperture._pupil_cache[key] = pupil
+            else:
+                self._npix = pupil.npix
+                self._pupil_plane_scale = pupil.scale
+            return pupil
+
+    def _load_key(self):
+        # The key for a loaded pupil plane in the cache, which needs to include the content of
+        # the image (or the modification time of the file) as well as everything else that is
+        # used by _load_pupil_plane.  Returns None if the pupil plane shouldn't be cached.
+        import hashlib
+        im = self._pupil_plane_im
+        if isinstance(im, np.ndarray):
+            im = Image(im)
+        if isinstance(im, Image):
+            arr = np.ascontiguousarray(im.array)
+            im_key = ('image', arr.shape, arr.dtype.str, hashlib.md5(arr).hexdigest(), im.scale)
+        else:
+            file_name = os.path.abspath(im)
+            if not os.path.isfile(file_name):
+                # Let fits.read raise the appropriate error.
+                return None
+            im_key = ('file', file_name, os.path.getmtime(file_name),
+                      os.path.getsize(file_name))
+        return (im_key, self.diam, self._input_pupil_plane_scale, self.good_pupil_size,
+                self._pupil_angle.rad, self.gsparams.maximum_fft_size)
+
+    def _check_pupil_plane_scale(self):
+        # Check sampling interval and warn if it's not good enough.
+        if self._pupil_plane_scale > self.good_pupil_scale:
+            ratio = self._pupil_plane_scale / self.good_pupil_scale
+            galsim_warn("Input pupil plane image may not be sampled well enough!\n"
+                        "Consider increasing sampling by a factor %f, and/or check "
+                        "PhaseScreenPSF outputs for signs of folding in real space."%ratio)
+
+    @staticmethod
+    def resize_pupil_cache(maxsize=None, max_bytes=None):
+        """Resize the cache of pupil plane arrays shared by Apertures with the same pupil plane.
+
+        The cache is limited both by the number of pupil planes and, optionally, by the total
+        size in bytes of their arrays.  The least recently used pupil planes are removed when
+        either limit is exceeded.  Apertures that are already using a pupil plane keep it.
+
+        Parameters:
+            maxsize:    The new number of pupil planes to cache. [default: None, which means to
+                        leave the current value unchanged]
+            max_bytes:  The maximum total size in bytes of the cached arrays, or 0 for no limit.
+                        [default: None, which means to leave the current value unchanged]
+        """
+        if maxsize is not None and maxsize <= 0:
+            raise GalSimValueError("Invalid maxsize", maxsize)
+        Aperture._pupil_cache.resize(maxsize, max_bytes)
+
+    @staticmethod
+    def pupil_cache_info():
+        """Return statistics about the cache of pupil plane arrays.
+
+        Returns:
+            a dict with the number of cache ``hits`` and ``misses``, the ``maxsize`` and
+            ``max_bytes`` limits, the number of pupil planes currently cached, ``currsize``, and
+            the total size of their arrays in bytes, ``nbytes``.
+        """
+        return Aperture._pupil_cache.cache_info()
+
+    @staticmethod
+    def clear_pupil_cache():
+        """Remove all pupil planes from the cache and reset its statistics.
+        """
+        Aperture._pupil_cache.clear()
 
     def _generate_pupil_plane(self):
         """ Create an array of illuminated pixels parameterically.
@@ -416,12 +526,7 @@ class Aperture(object):
             self._npix = new_npix
             self._pupil_plane_size = self._pupil_plane_scale * self._npix
 
-        # Check sampling interval and warn if it's not good enough.
-        if self._pupil_plane_scale > self.good_pupil_scale:
-            ratio = self._pupil_plane_scale / self.good_pupil_scale
-            galsim_warn("Input pupil plane image may not be sampled well enough!\n"
-                        "Consider increasing sampling by a factor %f, and/or check "
-                        "PhaseScreenPSF outputs for signs of folding in real space."%ratio)
+        self._check_pupil_plane_scale()
 
         if self._pupil_angle.rad == 0.:
             return pp_arr.astype(bool)
@@ -570,9 +675,9 @@ class Aperture(object):
             # Need this check, since `_uv` is used by `_illuminated`, so need to make sure we
             # don't have an infinite loop.
             self._illuminated
-        u = np.fft.fftshift(np.fft.fftfreq(self._npix, 1./self._pupil_plane_size))
-        u, v =  np.meshgrid(u, u)
-        return u, v
+        if '_pupil' in self.__dict__:
+            return self._pupil.uv
+        return _pupil_uv(self._npix, self._pupil_plane_size)
 
     @property
     def u(self):
@@ -584,17 +689,17 @@ class Aperture(object):
         """Pupil vertical coordinate array in meters."""
         return self._uv[1]
 
-    @lazy_property
+    @property
     def u_illuminated(self):
         """The u values for only the `illuminated` pixels.
         """
-        return self.u[self.illuminated]
+        return self._pupil.u_illuminated
 
-    @lazy_property
+    @property
     def v_illuminated(self):
         """The v values for only the `illuminated` pixels.
         """
-        return self.v[self.illuminated]
+        return self._pupil.v_illuminated
 
     @lazy_property
     def rsqr(self):
@@ -615,7 +720,7 @@ class Aperture(object):
         # Let unpickled object reconstruct cached values on-the-fly instead of including them in the
         # pickle.
         d = self.__dict__.copy()
-        for k in ('rho', '_uv', 'rsqr', 'u_illuminated', 'v_illuminated'):
+        for k in ('rho', '_uv', 'rsqr', '_pupil'):
             d.pop(k, None)
         # Only reconstruct _illuminated if we made it from geometry.  If loaded, it's probably
         # faster to serialize the array.
@@ -688,6 +793,99 @@ class Aperture(object):
         return (lam*1e-9) / self.pupil_plane_scale * radians/scale_unit
 
 
+def _read_only(a):
+    a.flags.writeable = False
+    return a
+
+
+def _pupil_uv(npix, size):
+    u = np.fft.fftshift(np.fft.fftfreq(npix, 1./size))
+    u, v =  np.meshgrid(u, u)
+    return u, v
+
+
+def _use_mft(shape, bounds, nout):
+    # Whether a matrix Fourier transform of the illuminated box onto the central nout x nout
+    # pixels is likely to be faster than the FFT of the full pupil array.  The factor of 3 was
+    # found empirically, since the matrix products are much more efficient per operation.
+    ny, nx = shape
+    if nout >= ny and nout >= nx:
+        return False
+    j0, j1, i0, i1 = bounds
+    mft_cost = nout * (j1-j0) * (i1-i0) + nout**2 * (i1-i0)
+    fft_cost = nx * ny * np.log2(max(nx, ny))
+    return mft_cost < 3 * fft_cost
+
+
+def _mft_power_spectra(expwf, illuminated, bounds, nout):
+    # Compute the central nout x nout pixels of the power spectra of a batch of complex pupil
+    # functions.  The values of each pupil function are given for the illuminated pixels only.
+    # The result is identical to the corresponding pixels of the (centered) FFT of the full
+    # pupil array, but only the box containing the illuminated pixels is transformed, and only
+    # the requested output pixels are computed.
+    ny, nx = illuminated.shape
+    j0, j1, i0, i1 = bounds
+    box = np.zeros((len(expwf), j1-j0, i1-i0), dtype=np.complex128)
+    box[:, illuminated[j0:j1, i0:i1]] = expwf
+    q = np.arange(nout) - nout//2
+    ey = np.exp((-2j*np.pi/ny) * np.outer(q, np.arange(j0, j1)))
+    ex = np.exp((-2j*np.pi/nx) * np.outer(np.arange(i0, i1), q))
+    kimg = np.matmul(np.matmul(ey, box), ex)
+    return kimg.real**2 + kimg.imag**2
+
+
+class _PupilPlane(object):
+    # The pupil plane arrays of an Aperture, which may be shared by many Apertures.  The arrays
+    # are read-only, and the ones that aren't needed to make the illuminated array are only made
+    # if they are used.
+    def __init__(self, illuminated, npix, scale, size, uv=None):
+        self.illuminated = _read_only(illuminated)
+        self.npix = npix
+        self.scale = scale
+        self.size = size
+        if uv is not None:
+            self.uv = (_read_only(uv[0]), _read_only(uv[1]))
+
+    @lazy_property
+    def uv(self):
+        u, v = _pupil_uv(self.npix, self.size)
+        return _read_only(u), _read_only(v)
+
+    @lazy_property
+    def u_illuminated(self):
+        return _read_only(self.uv[0][self.illuminated])
+
+    @lazy_property
+    def v_illuminated(self):
+        return _read_only(self.uv[1][self.illuminated])
+
+    @lazy_property
+    def illuminated_bounds(self):
+        # The (j0, j1, i0, i1) slice limits of the smallest box containing the illuminated pixels.
+        rows = np.flatnonzero(self.illuminated.any(axis=1))
+        cols = np.flatnonzero(self.illuminated.any(axis=0))
+        if len(rows) == 0:
+            return 0, 0, 0, 0
+        return rows[0], rows[-1]+1, cols[0], cols[-1]+1
+
+    @property
+    def nbytes(self):
+        nbytes = self.illuminated.nbytes
+        if 'uv' in self.__dict__:
+            nbytes += self.uv[0].nbytes + self.uv[1].nbytes
+        for k in ('u_illuminated', 'v_illuminated'):
+            if k in self.__dict__:
+                nbytes += self.__dict__[k].nbytes
+        return nbytes
+
+
+# The cache of pupil planes used by Aperture, keyed by everything that goes into making them.
+# Most of the memory is in the u, v arrays, which are only made when needed, but LRU_Dict
+# recomputes the total size whenever it's needed.  Processes forked after the cache has been
+# filled share its (read-only) arrays with the parent.
+Aperture._pupil_cache = LRU_Dict(maxsize=10, max_bytes=2**30, nbytes=lambda pupil: pupil.nbytes)
+
+
 class PhaseScreenList(object):
     """List of phase screens that can be turned into a PSF.  Screens can be either atmospheric
     layers or optical phase screens.  Generally, one would assemble a PhaseScreenList object using
@@ -705,9 +903,18 @@ class PhaseScreenList(object):
         # Switch the first and second layer.  Silly, but works...
         >>> screens[0], screens[1] = screens[1], screens[0]
 
+    When drawing several `PhaseScreenPSF` objects made from the same PhaseScreenList, the
+    instantaneous PSFs for all of them with the same wavelength and aperture (e.g. a grid of field
+    positions) are computed together at each time step.  The number of PSFs done together is at
+    most the ``batch_size`` attribute, which may be set either for a particular PhaseScreenList or
+    for the class as a whole.  Each PSF in a batch uses about 24*N**2 bytes of temporary memory,
+    where N is the size of the aperture's pupil plane array.  [default: 16]
+
     Parameters:
         layers:     Sequence of phase screens.
     """
+    batch_size = 16
+
     def __init__(self, *layers):
         from .phase_screens import AtmosphericScreen, OpticalScreen
         if len(layers) == 1:
@@ -831,6 +1038,41 @@ class PhaseScreenList(object):
                 if _bar:
                     _bar.update()
 
+    def write(self, file_name):
+        """Write the screens in this `PhaseScreenList` to a file.
+
+        Each `AtmosphericScreen` is stored as its realized screen array along with its parameters,
+        k range, time and random number generator state, as for `AtmosphericScreen.write`.  Any
+        uninstantiated atmospheric screens are instantiated with the full power spectrum first.
+        Other screens, such as `OpticalScreen`, are stored by their repr.
+
+        Parameters:
+            file_name:  The name of the file to write.
+        """
+        from .phase_screens import _write_screens
+        _write_screens(file_name, self._layers)
+
+    @classmethod
+    def read(cls, file_name, mp_context=None, memmap=False):
+        """Make a `PhaseScreenList` from a file written by `PhaseScreenList.write`.
+
+        None of the atmospheric screens are generated again.  See `AtmosphericScreen.read` for
+        details.  Screens that are stored by their repr are reconstructed by evaluating it, so only
+        read files that you trust, just as for pickle files.
+
+        Parameters:
+            file_name:  The name of the file to read.
+            mp_context: The multiprocessing launch context to use for the shared memory.
+                        [default: None]
+            memmap:     Whether to memory-map the atmospheric screens from the file rather than
+                        copying them into shared memory.  [default: False]
+
+        Returns:
+            a `PhaseScreenList`
+        """
+        from .phase_screens import _read_screens
+        return cls(_read_screens(file_name, mp_context, memmap))
+
     def _delayCalculation(self, psf):
         """Add psf to delayed calculation list."""
         heappush(self._pending, (psf.t0, OrderedWeakRef(psf)))
@@ -842,11 +1084,11 @@ class PhaseScreenList(object):
         # See if we have any dynamic screens.  If not, then we can immediately compute each PSF
         # in a simple loop.
         if not self.dynamic:
-            for _, psfref in self._pending:
-                psf = psfref()
-                if psf is not None:
-                    psf._step()
-                    psf._finalize()
+            psfs = [psfref() for _, psfref in self._pending]
+            psfs = [psf for psf in psfs if psf is not None]
+            self._stepPSFs(psfs)
+            for psf in psfs:
+                psf._finalize()
             self._pending = []
             self._update_time_heap = []
             return
@@ -855,23 +1097,83 @@ class PhaseScreenList(object):
         # careful to always stop at multiples of each PSF's time_step attribute to update that PSF.
         # Use a heap (in _pending list) to track the next time to stop at.
         while(self._pending):
-            # Get and seek to next time that has a PSF update.
+            # Get and seek to next time that has a PSF update.  All the PSFs that need an update
+            # at this time are updated together.
             t, psfref = heappop(self._pending)
-            # Check if this PSF weakref is still alive
-            psf = psfref()
-            if psf is not None:
-                # If it's alive, update this PSF
+            psfrefs = [psfref]
+            while self._pending and self._pending[0][0] == t:
+                psfrefs.append(heappop(self._pending)[1])
+            # Check if these PSF weakrefs are still alive
+            psfs = [psfref() for psfref in psfrefs]
+            psfs = [psf for psf in psfs if psf is not None]
+            if psfs:
+                # Update the ones that are alive
                 self._seek(t)
-                psf._step()
+                self._stepPSFs(psfs)
+            for psf in psfs:
                 # If that PSF's next possible update time doesn't extend past its exptime, then
                 # push it back on the heap.
-                t += psf.time_step
-                if t < psf.t0 + psf.exptime:
-                    heappush(self._pending, (t, OrderedWeakRef(psf)))
+                if t + psf.time_step < psf.t0 + psf.exptime:
+                    heappush(self._pending, (t + psf.time_step, OrderedWeakRef(psf)))
                 else:
                     psf._finalize()
         self._pending = []
 
+    def _stepPSFs(self, psfs):
+        """Add the current instantaneous PSF to each of the given PhaseScreenPSFs.
+
+        PSFs with the same wavelength, aperture and image size are done together, ``batch_size``
+        at a time.  The wavefronts for all of their field angles are evaluated at once and the FFTs
+        are done as a single batched transform.  If the PSFs only need the central part of the
+        image (cf. the ``max_size`` parameter of `PhaseScreenPSF`), then a matrix Fourier
+        transform of just those pixels is done instead when that is cheaper than the full FFT.
+        """
+        # Group the PSFs by wavelength, aperture and image size.  Usually, most PSFs will share the
+        # same Aperture instance, so check that first to avoid comparing the apertures.
+        groups = []
+        for psf in psfs:
+            for lam, aper, nout, group in groups:
+                if (psf.lam == lam and psf._nout == nout and
+                        (psf.aper is aper or psf.aper == aper)):
+                    group.append(psf)
+                    break
+            else:
+                groups.append((psf.lam, psf.aper, psf._nout, [psf]))
+
+        # This is where I need to make sure the screens are instantiated for FFT.
+        if groups:
+            self.instantiate(check='FFT')
+
+        for lam, aper, nout, group in groups:
+            u = aper.u_illuminated
+            v = aper.v_illuminated
+            shape = aper.illuminated.shape
+            index = np.flatnonzero(aper.illuminated).astype(np.int32)
+            bounds = aper._pupil.illuminated_bounds
+            use_mft = _use_mft(shape, bounds, nout)
+            batch_size = max(int(self.batch_size), 1)
+            for k in range(0, len(group), batch_size):
+                batch = group[k:k+batch_size]
+                wf = self._wavefront_thetas(u, v, None, [psf.theta for psf in batch])
+                expwf = np.exp((2j*np.pi/lam) * wf)
+                if use_mft:
+                    img = _mft_power_spectra(expwf, aper.illuminated, bounds, nout)
+                else:
+                    img = np.empty((len(batch),) + shape, dtype=float)
+                    _galsim.powerSpectra(expwf.ctypes.data, index.ctypes.data, len(index),
+                                         len(batch), shape[1], shape[0], img.ctypes.data)
+                    if nout < shape[0] or nout < shape[1]:
+                        j0 = shape[0]//2 - nout//2
+                        i0 = shape[1]//2 - nout//2
+                        img = np.ascontiguousarray(img[:, j0:j0+nout, i0:i0+nout])
+                for psf, im in zip(batch, img):
+                    if psf._img is None:
+                        psf._img = im
+                    else:
+                        psf._img += im
+                    if psf._bar:  # pragma: no cover
+                        psf._bar.update()
+
     def wavefront(self, u, v, t, theta=(0.0*radians, 0.0*radians)):
         """ Compute cumulative wavefront due to all phase screens in `PhaseScreenList`.
 
@@ -930,9 +1232,29 @@ class PhaseScreenList(object):
         else:
             return self._layers[0]._wavefront(u, v, t, theta)
 
+    def _wavefront_thetas(self, u, v, t, thetas):
+        # Same as _wavefront, but for a list of thetas at once.  The result has shape
+        # (len(thetas),) + u.shape.
+        wf = None
+        for layer in self:
+            if hasattr(layer, '_wavefront_thetas'):
+                w = layer._wavefront_thetas(u, v, t, thetas)
+            else:
+                w = np.array([layer._wavefront(u, v, t, theta) for theta in thetas])
+            wf = w if wf is None else wf + w
+        return wf
+
     def _wavefront_gradient(self, u, v, t, theta):
-        gradx, grady = self._layers[0]._wavefront_gradient(u, v, t, theta)
-        for layer in self._layers[1:]:
+        from .phase_screens import AtmosphericScreen, _sum_wavefront_gradients
+        # The atmospheric layers are all done together in C++.
+        atm_layers = [layer for layer in self._layers if isinstance(layer, AtmosphericScreen)]
+        other_layers = [layer for layer in self._layers if not isinstance(layer, AtmosphericScreen)]
+        if atm_layers:
+            gradx, grady = _sum_wavefront_gradients(atm_layers, u, v, t, theta)
+        else:
+            gradx, grady = other_layers[0]._wavefront_gradient(u, v, t, theta)
+            other_layers = other_layers[1:]
+        for layer in other_layers:
             gx, gy = layer._wavefront_gradient(u, v, t, theta)
             gradx += gx
             grady += gy
@@ -1161,6 +1483,14 @@ class PhaseScreenPSF(GSObject):
                             produce similar results, we caution the user to compare the affected
                             geometric PSFs against Fourier optics PSFs carefully before changing
                             this value.  [default: 0.2]
+        max_size:           The largest size (in units of ``scale_unit``) of the PSF image that
+                            will be needed.  If this is smaller than the field of view implied by
+                            the `Aperture` sampling, then only the central part of the PSF image
+                            is computed, which is usually done with a matrix Fourier transform of
+                            just the illuminated part of the pupil.  This can be much faster than
+                            the full FFT for small stamps.  Any flux outside of this region is
+                            lost, and the remaining flux is renormalized to ``flux``.
+                            [default: None, which means to use the full field of view]
         gsparams:           An optional `GSParams` argument. [default: None]
 
     The following are optional keywords to use to setup the aperture if ``aper`` is not provided:
@@ -1210,7 +1540,8 @@ class PhaseScreenPSF(GSObject):
                  theta=(0.0*arcsec, 0.0*arcsec), interpolant=None,
                  scale_unit=arcsec, ii_pad_factor=4., suppress_warning=False,
                  geometric_shooting=True, aper=None, second_kick=None, kcrit=0.2,
-                 gsparams=None, _force_stepk=0., _force_maxk=0., _bar=None, **kwargs):
+                 max_size=None, gsparams=None, _force_stepk=0., _force_maxk=0., _bar=None,
+                 **kwargs):
         # Hidden `_bar` kwarg can be used with astropy.console.utils.ProgressBar to print out a
         # progress bar during long calculations.
 
@@ -1241,6 +1572,11 @@ class PhaseScreenPSF(GSObject):
         self._gsparams = GSParams.check(gsparams)
         self.scale = aper._sky_scale(self.lam, self.scale_unit)
 
+        if max_size is not None and max_size <= 0.:
+            raise GalSimRangeError("Invalid max_size.", max_size, 0.)
+        self.max_size = max_size
+        self._nout = self._getNOut()
+
         self._force_stepk = _force_stepk
         self._force_maxk = _force_maxk
 
@@ -1261,6 +1597,14 @@ class PhaseScreenPSF(GSObject):
         self._screen_list._delayCalculation(self)
         self._finalized = False
 
+    def _getNOut(self):
+        # The number of pixels on a side of the PSF image to compute.
+        if self.max_size is None:
+            return self.aper.npix
+        nout = int(np.ceil(self.max_size / self.scale))
+        nout += nout % 2
+        return min(max(nout, 2), self.aper.npix)
+
     @lazy_property
     def _real_ii(self):
         ii = InterpolatedImage(
@@ -1291,6 +1635,7 @@ class PhaseScreenPSF(GSObject):
             stepk = self._screen_list._getStepK(lam=self.lam, diam=self.aper.diam,
                                                 obscuration=self.aper.obscuration,
                                                 gsparams=self._gsparams)
+            stepk = max(stepk, 2.*np.pi / (self._nout * self.scale))
         if self._force_maxk > 0.:
             maxk = self._force_maxk
         else:
@@ -1370,6 +1715,7 @@ class PhaseScreenPSF(GSObject):
             ret.__dict__.pop(attr, None)
         ret._gsparams = gsparams
         ret.aper = aper
+        ret._nout = ret._getNOut()
         # Make sure we mark that we need to recalculate any previously finalized InterpolatedImage
         ret._finalized = False
         ret._screen_list._delayCalculation(ret)
@@ -1382,9 +1728,10 @@ class PhaseScreenPSF(GSObject):
 
     def __repr__(self):
         outstr = ("galsim.PhaseScreenPSF(%r, lam=%r, exptime=%r, flux=%r, aper=%r, theta=%r, "
-                  "interpolant=%r, scale_unit=%r, gsparams=%r)")
+                  "interpolant=%r, scale_unit=%r, max_size=%r, gsparams=%r)")
         return outstr % (self._screen_list, self.lam, self.exptime, self.flux, self.aper,
-                         self.theta, self.interpolant, self.scale_unit, self.gsparams)
+                         self.theta, self.interpolant, self.scale_unit, self.max_size,
+                         self.gsparams)
 
     def __eq__(self, other):
         # Even if two PSFs were generated with different sets of parameters, they will act
@@ -1402,12 +1749,14 @@ class PhaseScreenPSF(GSObject):
                  self._force_stepk == other._force_stepk and
                  self._force_maxk == other._force_maxk and
                  self._ii_pad_factor == other._ii_pad_factor and
+                 self.max_size == other.max_size and
                  self.gsparams == other.gsparams))
 
     def __hash__(self):
         return hash(("galsim.PhaseScreenPSF", tuple(self._screen_list), self.lam, self.aper,
                      self.t0, self.exptime, self.time_step, self._flux, self.interpolant,
-                     self._force_stepk, self._force_maxk, self._ii_pad_factor, self.gsparams))
+                     self._force_stepk, self._force_maxk, self._ii_pad_factor, self.max_size,
+                     self.gsparams))
 
     def _prepareDraw(self):
         # Trigger delayed computation of all pending PSFs.
@@ -1415,26 +1764,12 @@ class PhaseScreenPSF(GSObject):
 
     def _step(self):
         """Compute the current instantaneous PSF and add it to the developing integrated PSF."""
-        from . import fft
-        u = self.aper.u_illuminated
-        v = self.aper.v_illuminated
-        # This is where I need to make sure the screens are instantiated for FFT.
-        self._screen_list.instantiate(check='FFT')
-        wf = self._screen_list._wavefront(u, v, None, self.theta)
-        expwf = np.exp((2j*np.pi/self.lam) * wf)
-        expwf_grid = np.zeros_like(self.aper.illuminated, dtype=np.complex128)
-        expwf_grid[self.aper.illuminated] = expwf
-        ftexpwf = fft.fft2(expwf_grid, shift_in=True, shift_out=True)
-        if self._img is None:
-            self._img = np.zeros(self.aper.illuminated.shape, dtype=np.float64)
-        self._img += np.abs(ftexpwf)**2
-        if self._bar:  # pragma: no cover
-            self._bar.update()
+        self._screen_list._stepPSFs([self])
 
     def _finalize(self):
         """Take accumulated integrated PSF image and turn it into a proper GSObject."""
         self._img *= self._flux / self._img.sum(dtype=float)
-        b = _BoundsI(1,self.aper.npix,1,self.aper.npix)
+        b = _BoundsI(1,self._img.shape[1],1,self._img.shape[0])
         self._img = _Image(self._img, b, PixelScale(self.scale))
 
         self._finalized = True
@@ -1564,7 +1899,8 @@ class PhaseScreenPSF(GSObject):
         else:
             return PhaseScreenPSF(self._screen_list, lam=self.lam, exptime=self.exptime, flux=flux,
                                   aper=self.aper, theta=self.theta, interpolant=self.interpolant,
-                                  scale_unit=self.scale_unit, gsparams=self.gsparams)
+                                  scale_unit=self.scale_unit, max_size=self.max_size,
+                                  gsparams=self.gsparams)
 
 
 class OpticalPSF(GSObject):
@@ -1994,3 +2330,164 @@ class OpticalPSF(GSObject):
                 aberrations=screen.aberrations, annular_zernike=screen.annular_zernike,
                 flux=flux, _force_stepk=self._force_stepk, _force_maxk=self._force_maxk,
                 ii_pad_factor=self._ii_pad_factor)
+
+
+class OpticalPSFField(object):
+    """A field-dependent `OpticalPSF`, which is calculated on a grid of positions in the field
+    and interpolated to other positions.
+
+    Making an `OpticalPSF` at the position of every object in a simulation requires a Fourier
+    transform of the pupil plane for each object, which is often the dominant cost.  This class
+    instead makes the `OpticalPSF` only at the nodes of a coarse ``nx`` by ``ny`` grid spanning the
+    given ``bounds``, and draws each one into an image.  Then `getPSF` bilinearly interpolates
+    between the images of the four nodes surrounding the requested position and returns the result
+    as an `InterpolatedImage`.  The returned profiles have exactly the given ``flux``, so any
+    flux of the `OpticalPSF` that falls outside of the ``image_size`` is redistributed within it.
+
+    The aberrations are given either as a single list, which is used everywhere, or as a
+    function of position returning a list of aberrations (in the same format as the
+    ``aberrations`` parameter of `OpticalPSF`).  The positions are in whatever coordinates the
+    ``bounds`` and the positions passed to `getPSF` use, typically image coordinates.
+
+    The interpolation is only accurate if the PSF varies slowly enough across each grid cell.
+    If ``tolerance`` is given, the images at the centers of all the grid cells are also calculated
+    directly and compared to the interpolated images.  The maximum absolute difference relative to
+    the peak of the direct image is saved as the ``interpolation_error`` attribute, and a warning
+    is emitted if it is larger than ``tolerance``, in which case you should use a finer grid.
+    This is only an estimate of the error, since it is not necessarily largest at the centers of
+    the cells.  It also roughly doubles the set up time, so it is off by default.
+
+    Parameters:
+        bounds:         The `BoundsD` (or `BoundsI`) of the region of the field to cover.
+        lam:            Wavelength in nanometers.
+        diam:           Telescope diameter in meters.
+        aberrations:    Either a list of aberrations, or a function of a `PositionD` that returns
+                        a list of aberrations.  See `OpticalPSF` for the format.
+                        [default: None, meaning no aberrations]
+        nx:             The number of grid nodes in the x direction. [default: 5]
+        ny:             The number of grid nodes in the y direction. [default: 5]
+        scale:          The pixel scale of the images at the grid nodes. [default: None, which
+                        means to use the Nyquist scale of the PSF at the first node]
+        image_size:     The size of the images at the grid nodes. [default: None, which means to
+                        use the largest good image size of the PSFs at the nodes for this scale]
+        interpolant:    The interpolant to use for the returned `InterpolatedImage`.
+                        [default: 'quintic']
+        tolerance:      If given, the maximum acceptable relative interpolation error.
+                        [default: None]
+        flux:           The flux of the returned PSFs. [default: 1]
+        gsparams:       An optional `GSParams` argument. [default: None]
+        **kwargs:       Any other arguments are passed on to `OpticalPSF`, e.g. ``obscuration``,
+                        ``nstruts``, ``pupil_plane_im``, etc.
+    """
+    _req_params = { 'lam' : float, 'diam' : float }
+    _opt_params = {
+        'nx' : int,
+        'ny' : int,
+        'scale' : float,
+        'image_size' : int,
+        'interpolant' : str,
+        'tolerance' : float,
+        'flux' : float,
+        'annular_zernike': bool,
+        'circular_pupil': bool,
+        'obscuration': float,
+        'oversampling': float,
+        'pad_factor': float,
+        'suppress_warning': bool,
+        'nstruts': int,
+        'strut_thick': float,
+        'strut_angle': Angle,
+        'pupil_plane_im': str,
+        'pupil_angle': Angle,
+        'pupil_plane_scale': float,
+        'pupil_plane_size': float,
+    }
+    _single_params = []
+    _takes_rng = False
+
+    def __init__(self, bounds, lam, diam, aberrations=None, nx=5, ny=5, scale=None,
+                 image_size=None, interpolant=None, tolerance=None, flux=1., gsparams=None,
+                 **kwargs):
+        from .bounds import BoundsD
+        from .position import PositionD
+        if nx < 2 or ny < 2:
+            raise GalSimRangeError("nx and ny must be at least 2.", (nx, ny), 2)
+        if not bounds.isDefined() or bounds.area() == 0.:
+            raise GalSimValueError("bounds must have a non-zero area.", bounds)
+        self.bounds = BoundsD(bounds)
+        self.lam = float(lam)
+        self.diam = float(diam)
+        self.aberrations = aberrations
+        self.nx = nx
+        self.ny = ny
+        self.interpolant = 'quintic' if interpolant is None else interpolant
+        self.tolerance = tolerance
+        self.flux = float(flux)
+        self.gsparams = GSParams.check(gsparams)
+        self.kwargs = kwargs
+
+        self._x = np.linspace(self.bounds.xmin, self.bounds.xmax, nx)
+        self._y = np.linspace(self.bounds.ymin, self.bounds.ymax, ny)
+        psfs = [[self._makePSF(PositionD(x, y)) for x in self._x] for y in self._y]
+        self.scale = psfs[0][0].nyquist_scale if scale is None else float(scale)
+        if image_size is None:
+            image_size = max(psf.getGoodImageSize(self.scale) for row in psfs for psf in row)
+        self.image_size = image_size
+        self._images = np.array([[self._drawPSF(psf) for psf in row] for row in psfs])
+        self._stepk = min(psf.stepk for row in psfs for psf in row)
+        self._maxk = max(psf.maxk for row in psfs for psf in row)
+
+        self.interpolation_error = None
+        if tolerance is not None:
+            self._checkInterpolation()
+
+    def _makePSF(self, pos):
+        aberrations = self.aberrations(pos) if callable(self.aberrations) else self.aberrations
+        return OpticalPSF(lam=self.lam, diam=self.diam, aberrations=aberrations,
+                          gsparams=self.gsparams, **self.kwargs)
+
+    def _drawPSF(self, psf):
+        image = psf.drawImage(nx=self.image_size, ny=self.image_size, scale=self.scale,
+                              method='no_pixel')
+        return image.array
+
+    def _interpolate(self, x, y):
+        # The bilinear interpolation of the node images at (x,y).
+        i = min(max(np.searchsorted(self._x, x) - 1, 0), self.nx-2)
+        j = min(max(np.searchsorted(self._y, y) - 1, 0), self.ny-2)
+        ax = (x - self._x[i]) / (self._x[i+1] - self._x[i])
+        ay = (y - self._y[j]) / (self._y[j+1] - self._y[j])
+        return ((1.-ax) * (1.-ay) * self._images[j,i] + ax * (1.-ay) * self._images[j,i+1] +
+                (1.-ax) * ay * self._images[j+1,i] + ax * ay * self._images[j+1,i+1])
+
+    def _checkInterpolation(self):
+        from .position import PositionD
+        err = 0.
+        for y in 0.5 * (self._y[1:] + self._y[:-1]):
+            for x in 0.5 * (self._x[1:] + self._x[:-1]):
+                direct = self._drawPSF(self._makePSF(PositionD(x, y)))
+                interp = self._interpolate(x, y)
+                err = max(err, np.max(np.abs(interp - direct)) / np.max(np.abs(direct)))
+        self.interpolation_error = float(err)
+        if err > self.tolerance:
+            galsim_warn("The interpolation error of OpticalPSFField (%g) is larger than the "
+                        "tolerance (%g).  Consider increasing nx and ny."%(err, self.tolerance))
+
+    def getPSF(self, pos):
+        """Return the PSF at a position in the field.
+
+        Parameters:
+            pos:    The position as a `PositionD` or `PositionI`.  It must be within ``bounds``.
+
+        Returns:
+            the PSF as an `InterpolatedImage`.
+        """
+        if not self.bounds.includes(pos):
+            raise GalSimBoundsError("pos is outside the bounds of the OpticalPSFField.",
+                                    pos, self.bounds)
+        array = self._interpolate(pos.x, pos.y)
+        b = _BoundsI(1, self.image_size, 1, self.image_size)
+        image = _Image(array, b, PixelScale(self.scale))
+        return InterpolatedImage(image, x_interpolant=self.interpolant, flux=self.flux,
+                                 _force_stepk=self._stepk, _force_maxk=self._maxk,
+                                 gsparams=self.gsparams)
@@ -18,13 +18,15 @@
 
 from builtins import range, zip
 import sys
+import os
 import numpy as np
 import multiprocessing
 
 from .random import BaseDeviate, GaussianDeviate
 from .image import Image
 from .angle import radians
-from .table import LookupTable2D, _LookupTable2D
+from .table import _LookupTable2D
+from . import _galsim
 from . import utilities
 from . import fft
 from . import zernike
@@ -185,6 +187,18 @@ class AtmosphericScreen(object):
 
         screen = pickle.load(open('myScreen.pkl', 'rb'))
 
+    **Memory-mapped screens**:
+
+    Very large frozen-flow screens (e.g., 819.2 m at 1 cm resolution) will not fit in memory at all.
+    For these, you can use the ``memmap_file`` keyword argument to have the screen generated out of
+    core, in blocks of rows and columns, directly into a memory-mapped file.  Wavefront and
+    wavefront gradient lookups are then served from the mapped file, so only the parts of the
+    screen actually being used (plus whatever the operating system decides to keep in its page
+    cache) need to be resident in memory.  Since the file is accessed by name, it can also be
+    shared by worker processes, including ones started without the shared memory machinery
+    described above, as long as they can see the same file system.  Memory-mapped screens are
+    currently only supported for frozen-flow screens (``alpha == 1``).
+
     Parameters:
         screen_size:        Physical extent of square phase screen in meters.  This should be large
                             enough to accommodate the desired field-of-view of the telescope as
@@ -230,6 +244,10 @@ class AtmosphericScreen(object):
                             multiprocessing.  Use this keyword to set the launch context for
                             multiprocessing.  Usually it will be sufficient to leave this at its
                             default.  [default: None]
+        memmap_file:        If given, the name of a file in which to generate and store the screen
+                            as a memory-mapped array, rather than keeping it in memory.  (See
+                            above.)  Any existing file with this name will be overwritten when the
+                            screen is instantiated.  [default: None]
 
     Relevant SPIE paper:
     "Remembrance of phases past: An autoregressive method for generating realistic atmospheres in
@@ -242,7 +260,7 @@ class AtmosphericScreen(object):
     """
     def __init__(self, screen_size, screen_scale=None, altitude=0.0, r0_500=0.2, L0=25.0,
                  vx=0.0, vy=0.0, alpha=1.0, time_step=None, rng=None, suppress_warning=False,
-                 mp_context=None):
+                 mp_context=None, memmap_file=None, _npix=None):
         if mp_context is not None:
             assert sys.version_info >= (3,4), "Use of mp_context requires Python version >= 3.4"
         if (alpha != 1.0 and time_step is None):
@@ -256,10 +274,15 @@ class AtmosphericScreen(object):
         if (alpha != 1.0 and mp_context is not None):
             raise GalSimNotImplementedError(
                 "Shared memory use is only supported for frozen-flow screens")
+        if (alpha != 1.0 and memmap_file is not None):
+            raise GalSimNotImplementedError(
+                "Memory-mapped screens are only supported for frozen-flow screens")
         if screen_scale is None:
             # We copy Jee+Tyson(2011) and (arbitrarily) set the screen scale equal to r0 by default.
             screen_scale = r0_500
-        self.npix = Image.good_fft_size(int(np.ceil(screen_size/screen_scale)))
+        if _npix is None:
+            _npix = Image.good_fft_size(int(np.ceil(screen_size/screen_scale)))
+        self.npix = _npix
         self.screen_scale = screen_scale
         self.screen_size = screen_scale * self.npix
         self._altitude = altitude * 1000.  # meters
@@ -271,6 +294,8 @@ class AtmosphericScreen(object):
         self.vx = vx
         self.vy = vy
         self.alpha = alpha
+        self._memmap_file = memmap_file
+        self._memmap_offset = 0
 
         if rng is None:
             rng = BaseDeviate()
@@ -290,7 +315,8 @@ class AtmosphericScreen(object):
         # A unique id for this screen, created in the parent process, that can be used to find the
         # correct shared memory object in child processes.
         self._shareKey = id(self)
-        self._objDict = AtmosphericScreen._initObjDict(self.mp_context, self.npix, alpha=self.alpha)
+        self._objDict = AtmosphericScreen._initObjDict(self.mp_context, self.npix, alpha=self.alpha,
+                                                       memmap=memmap_file is not None)
         _GSScreenShare[self._shareKey] = self._objDict
 
     @staticmethod
@@ -298,7 +324,7 @@ class AtmosphericScreen(object):
         ctx, npix,
         alpha=1.0, time=0.0, kmin=-1.0, kmax=-1.0,
         x0=0.0, y0=0.0, xperiod=0.0, yperiod=0.0,
-        instantiated=False, refcount=1,
+        instantiated=False, refcount=1, memmap=False,
         f=None, x=None, y=None, **kwargs
     ):
         if ctx is not None:
@@ -309,7 +335,8 @@ class AtmosphericScreen(object):
             from multiprocessing.sharedctypes import RawArray, RawValue
             from multiprocessing import Lock
         _objDict = {
-            'f':RawArray('d', (npix+1)*(npix+1)),
+            # Memory-mapped screens keep f in their file, not in shared memory.
+            'f':RawArray('d', 0 if memmap else (npix+1)*(npix+1)),
             'x':RawArray('d', npix+1),
             'y':RawArray('d', npix+1),
             'alpha':RawValue('d', alpha),
@@ -337,7 +364,7 @@ class AtmosphericScreen(object):
         if screenShare and shareKey not in _GSScreenShare:
             _GSScreenShare[shareKey] = AtmosphericScreen._initObjDict(
                 self.mp_context, self.npix,
-                refcount=0, **screenShare
+                refcount=0, memmap=self._memmap_file is not None, **screenShare
             )
         self._objDict = _GSScreenShare[shareKey]
         with self._objDict['lock']:
@@ -462,9 +489,10 @@ class AtmosphericScreen(object):
                 if not self._objDict['instantiated'].value:  # pragma: no branch
                     self._objDict['kmin'].value = kmin
                     self._objDict['kmax'].value = kmax
-                    self._init_psi()
+                    if self._memmap_file is None:
+                        self._init_psi()
                     self._reset()
-                    if self.reversible:
+                    if self.reversible and self._memmap_file is None:
                         del self._psi, self._screen, self._xs, self._ys
                     self._objDict['instantiated'].value = True
 
@@ -508,51 +536,128 @@ class AtmosphericScreen(object):
 
     def _init_psi(self):
         """Assemble 2D von Karman sqrt power spectrum.
+
+        Since the screens are real, we only need the kx >= 0 half of it, in the layout used by
+        rfft2.
         """
         fx = np.fft.fftfreq(self.npix, self.screen_scale)
-        fx, fy = np.meshgrid(fx, fx)
+        self._psi = self._psi_block(fx, np.fft.rfftfreq(self.npix, self.screen_scale))
+
+    def _psi_block(self, fy, fx):
+        """Return the von Karman sqrt power spectrum at frequencies (fy[:,None], fx[None,:]).
+        """
         # Faster to avoid as many temporary arrays as possible.  This is just ksq = fx**2 + fy**2.
-        ksq = fx
-        ksq[:,:] *= fx
-        ksq[:,:] += fy*fy
+        ksq = np.empty((len(fy), len(fx)))
+        ksq[:,:] = fx*fx
+        ksq[:,:] += (fy*fy)[:,None]
 
         # We'll use ksq as our array for psi too.  So save this mask for later.
-        m = (ksq < self.kmin**2) | (ksq > self.kmax**2)
+        m = (ksq < self.kmin**2) | (ksq > self.kmax**2) | (ksq == 0.)
 
         old_settings = np.seterr(all='ignore')
-        self._psi = ksq
+        psi = ksq
         if self.L0 is not None:
             L0_inv = 1./self.L0
-            self._psi[:,:] += L0_inv*L0_inv
-        self._psi[:,:] **= -11./12.
+            psi[:,:] += L0_inv*L0_inv
+        psi[:,:] **= -11./12.
         # Note the multiplication by 500 here so we can divide by arbitrary lam later.
-        self._psi[:,:] *= (self._kolmogorov_constant * self.r0_500**(-5.0/6.0) * self.npix *
-                           500. / self.screen_size)
-        self._psi[0, 0] = 0.0
-        self._psi[m] = 0.0
+        psi[:,:] *= (self._kolmogorov_constant * self.r0_500**(-5.0/6.0) * self.npix *
+                     500. / self.screen_size)
+        psi[m] = 0.0
         np.seterr(**old_settings)
+        return psi
 
-    def _random_screen(self):
-        """Generate a random phase screen with power spectrum given by self._psi**2"""
+    def _random_screen(self, nscreens=1):
+        """Generate a random phase screen with power spectrum given by self._psi**2
+
+        If nscreens > 1, then return the sum over i=1..nscreens of alpha**(nscreens-i) times the
+        ith of nscreens random screens, which is what is needed for nscreens boiling updates.
+        This only needs one pair of FFTs, since it is equivalent to filtering the corresponding
+        sum of the noise arrays.
+        """
+        gd = GaussianDeviate(self.rng)
+        noise = utilities.rand_arr((self.npix, self.npix), gd)
+        if nscreens > 1:
+            tmp = np.empty_like(noise)
+            for _ in range(nscreens-1):
+                noise *= self.alpha
+                gd.generate(tmp.ravel())
+                noise += tmp
+        return fft.irfft2(fft.rfft2(noise)*self._psi)
+
+    # Rough upper limit on the size in bytes of each block of rows or columns held in memory at
+    # once while generating a memory-mapped screen.
+    _memmap_block_size = 2**28
+
+    def _memmap_screen(self):
+        """Generate a random phase screen into self._memmap_file, without ever holding the whole
+        screen (or its Fourier transform) in memory.
+
+        This is the same calculation as _random_screen, but done as a real FFT along rows followed
+        by an FFT along columns, each of which only needs a block of rows or columns at a time.
+        The half-plane Fourier transform is kept in a temporary memory-mapped work file.
+        """
+        npix = self.npix
+        nk = npix//2 + 1
+        nblock = max(1, self._memmap_block_size // (16*npix))
+        fx = np.fft.fftfreq(npix, self.screen_scale)
+        fxr = np.fft.rfftfreq(npix, self.screen_scale)
         gd = GaussianDeviate(self.rng)
-        noise = utilities.rand_arr(self._psi.shape, gd)
-        return fft.ifft2(fft.fft2(noise)*self._psi).real
 
-    def _setShare(self):
-        tab2d = LookupTable2D(self._xs, self._ys, self._screen, edge_mode='wrap')
+        work_file = self._memmap_file + '.%d.work'%os.getpid()
+        try:
+            work = np.memmap(work_file, dtype=np.complex128, mode='w+', shape=(npix, nk))
+            # Noise is drawn a block of rows at a time, in the same order as rand_arr.
+            noise = np.empty((nblock, npix), dtype=float)
+            for i0 in range(0, npix, nblock):
+                i1 = min(i0+nblock, npix)
+                gd.generate(noise[:i1-i0].ravel())
+                work[i0:i1] = np.fft.rfft(noise[:i1-i0], axis=1)
+            del noise
+            for j0 in range(0, nk, nblock):
+                j1 = min(j0+nblock, nk)
+                block = np.fft.fft(work[:,j0:j1], axis=0)
+                block *= self._psi_block(fx, fxr[j0:j1])
+                work[:,j0:j1] = np.fft.ifft(block, axis=0)
+            del block
+
+            # The table needs the first row and column repeated at the end for wrapping.
+            with utilities.atomic_write(self._memmap_file) as tmp_file:
+                f = np.memmap(tmp_file, dtype=float, mode='w+', shape=(npix+1, npix+1))
+                for i0 in range(0, npix, nblock):
+                    i1 = min(i0+nblock, npix)
+                    f[i0:i1,:npix] = np.fft.irfft(work[i0:i1], npix, axis=1)
+                    f[i0:i1,npix] = f[i0:i1,0]
+                f[npix] = f[0]
+                f.flush()
+                del f
+            del work
+        finally:
+            if os.path.exists(work_file):
+                os.remove(work_file)
+        self._setGrid()
+
+    def _setGrid(self):
+        # Set the shared x, y, and periods of the table.  These are the same as LookupTable2D
+        # would make for the 'linear' interpolant.
+        xs = self._xs
+        dx = np.diff(xs)[0]
+        np.frombuffer(self._objDict['x'], dtype=np.float64)[:] = np.hstack([xs, xs[-1]+dx])
+        ys = self._ys
+        np.frombuffer(self._objDict['y'], dtype=np.float64)[:] = np.hstack([ys, ys[-1]+dx])
+        self._objDict['x0'].value = self._objDict['y0'].value = xs[0]
+        self._objDict['xperiod'].value = self._objDict['yperiod'].value = xs[-1]-xs[0]+dx
+        self.__dict__.pop('_tab2d', None)
 
-        xshare = np.frombuffer(self._objDict['x'], dtype=np.float64)
-        yshare = np.frombuffer(self._objDict['y'], dtype=np.float64)
+    def _setShare(self):
+        # Copy the screen into shared memory, with its first row and column repeated at the end
+        # as LookupTable2D would do for edge_mode='wrap'.
         fshare = np.frombuffer(self._objDict['f'], dtype=np.float64)
         fshare = fshare.reshape((self.npix+1, self.npix+1))
-        xshare[:] = tab2d.x
-        yshare[:] = tab2d.y
-        fshare[:] = tab2d.f
-        self._objDict['x0'].value = tab2d.x0
-        self._objDict['y0'].value = tab2d.y0
-        self._objDict['xperiod'].value = tab2d.xperiod
-        self._objDict['yperiod'].value = tab2d.yperiod
-        self.__dict__.pop('_tab2d', None)
+        fshare[:-1,:-1] = self._screen
+        fshare[:-1,-1] = self._screen[:,0]
+        fshare[-1] = fshare[0]
+        self._setGrid()
 
     @lazy_property
     def _tab2d(self):
@@ -560,14 +665,118 @@ class AtmosphericScreen(object):
         # set it up from shared memory.
         xshare = np.frombuffer(self._objDict['x'], dtype=np.float64)
         yshare = np.frombuffer(self._objDict['y'], dtype=np.float64)
-        fshare = np.frombuffer(self._objDict['f'], dtype=np.float64)
-        fshare = fshare.reshape((self.npix+1, self.npix+1))
+        if self._memmap_file is not None:
+            fshare = np.memmap(self._memmap_file, dtype=np.float64, mode='r',
+                               offset=self._memmap_offset, shape=(self.npix+1, self.npix+1))
+        else:
+            fshare = np.frombuffer(self._objDict['f'], dtype=np.float64)
+            fshare = fshare.reshape((self.npix+1, self.npix+1))
         return _LookupTable2D(
             xshare, yshare, fshare, 'linear', 'wrap', 0.0,
             x0=self._objDict['x0'].value, y0=self._objDict['y0'].value,
             xperiod=self._objDict['xperiod'].value, yperiod=self._objDict['yperiod'].value
         )
 
+    def write(self, file_name):
+        """Write the instantiated screen to a file.
+
+        The file holds the realized screen array, along with the parameters of the screen, the
+        k range used to instantiate it, the current time, and the state of the random number
+        generator.  It can be read back in with `AtmosphericScreen.read`, which is much faster than
+        generating the screen again.  If the screen has not been instantiated yet, it will be
+        instantiated with the full power spectrum first.
+
+        The file is first written to a temporary file, which is then renamed, so other processes
+        never see a partially written file.
+
+        Parameters:
+            file_name:  The name of the file to write.
+        """
+        _write_screens(file_name, [self])
+
+    @classmethod
+    def read(cls, file_name, mp_context=None, memmap=False):
+        """Make an `AtmosphericScreen` from a file written by `AtmosphericScreen.write`.
+
+        The screen is not generated again.  Its array is either copied from the file into shared
+        memory, or with ``memmap=True``, used directly from the file as a read-only memory-mapped
+        array (cf. the ``memmap_file`` option of `AtmosphericScreen`).  Memory mapping is only
+        possible for frozen-flow screens.
+
+        Parameters:
+            file_name:  The name of the file to read.
+            mp_context: The multiprocessing launch context to use for the shared memory.
+                        [default: None]
+            memmap:     Whether to memory-map the screen from the file rather than copying it
+                        into shared memory.  [default: False]
+
+        Returns:
+            an `AtmosphericScreen`
+        """
+        layers = _read_screens(file_name, mp_context, memmap)
+        if len(layers) != 1 or not isinstance(layers[0], AtmosphericScreen):
+            raise GalSimValueError("File does not contain a single AtmosphericScreen", file_name)
+        return layers[0]
+
+    def _getFileMeta(self):
+        # Return a dict describing this screen for write, not including the screen array.
+        self.instantiate()
+        return {
+            'type': 'AtmosphericScreen',
+            'screen_size': self.screen_size,
+            'screen_scale': self.screen_scale,
+            'npix': self.npix,
+            'altitude': self.altitude,
+            'r0_500': self.r0_500,
+            'L0': self.L0,
+            'vx': self.vx,
+            'vy': self.vy,
+            'alpha': self.alpha,
+            'time_step': self.time_step,
+            'rng_type': type(self._orig_rng).__name__,
+            'rng_args': list(self._orig_rng._rng_args),
+            'orig_rng': self._orig_rng.serialize(),
+            'rng': self.rng.serialize(),
+            'kmin': self.kmin,
+            'kmax': self.kmax,
+            'time': self._time,
+        }
+
+    @classmethod
+    def _fromFile(cls, meta, file_name, offset, mp_context, memmap):
+        # Make a screen from its dict in the file and the offset of its array in the file.
+        from . import random
+        rng_type = getattr(random, meta['rng_type'])
+        orig_rng = rng_type(meta['orig_rng'], *meta['rng_args'])
+        if memmap and meta['alpha'] != 1.0:
+            raise GalSimNotImplementedError(
+                "Memory-mapped screens are only supported for frozen-flow screens")
+        ret = cls(meta['screen_size'], meta['screen_scale'],
+                  altitude=meta['altitude'], r0_500=meta['r0_500'], L0=meta['L0'],
+                  vx=meta['vx'], vy=meta['vy'], alpha=meta['alpha'], time_step=meta['time_step'],
+                  rng=orig_rng, mp_context=mp_context, memmap_file=file_name if memmap else None,
+                  _npix=meta['npix'])
+        ret.rng = rng_type(meta['rng'], *meta['rng_args'])
+        ret._objDict['kmin'].value = meta['kmin']
+        ret._objDict['kmax'].value = meta['kmax']
+        ret._objDict['time'].value = meta['time']
+        f = np.memmap(file_name, dtype=np.float64, mode='r', offset=offset,
+                      shape=(ret.npix+1, ret.npix+1))
+        if memmap:
+            ret._memmap_offset = offset
+            ret._setGrid()
+        else:
+            ret._setGrid()
+            fshare = np.frombuffer(ret._objDict['f'], dtype=np.float64)
+            fshare.reshape(f.shape)[:] = f
+        if not ret.reversible:
+            # Boiling updates continue from the current screen.
+            ret._screen = np.array(f[:-1,:-1])
+            ret._init_psi()
+        del f
+        ret._objDict['instantiated'].value = True
+        return ret
+
     def _seek(self, t):
         """Set layer's internal clock to time t."""
         if t == self._time:
@@ -583,11 +792,13 @@ class AtmosphericScreen(object):
             final_update_number = int(t // self.time_step)
             n_updates = final_update_number - previous_update_number
             if n_updates > 0:
-                for _ in range(n_updates):
-                    self._screen *= self.alpha
-                    self._screen += np.sqrt(1.-self.alpha**2) * self._random_screen()
-                # Make a table, copy the x,y,f arrays to shared memory, make a new table that
-                # points to those locations.
+                # Do all the updates at once.  After n updates, the screen is alpha**n times the
+                # current screen plus sqrt(1-alpha**2) times a weighted sum of n random screens.
+                new_screen = self._random_screen(n_updates)
+                new_screen *= np.sqrt(1.-self.alpha**2)
+                self._screen *= self.alpha**n_updates
+                self._screen += new_screen
+                # Copy the new screen to shared memory.
                 self._setShare()
         self._time = float(t)
 
@@ -598,8 +809,11 @@ class AtmosphericScreen(object):
 
         # Only need to reset/create tab2d if not frozen or doesn't already exist
         if not self.reversible or not self._objDict['instantiated'].value:
-            self._screen = self._random_screen()
-            self._setShare()
+            if self._memmap_file is not None:
+                self._memmap_screen()
+            else:
+                self._screen = self._random_screen()
+                self._setShare()
 
     # Note -- use **kwargs here so that AtmosphericScreen.stepk and OpticalScreen.stepk
     # can use the same signature, even though they depend on different parameters.
@@ -688,6 +902,20 @@ class AtmosphericScreen(object):
             v += self._altitude*theta[1].tan()
         return self._tab2d._call_wrap(u.ravel(), v.ravel()).reshape(u.shape)
 
+    def _wavefront_thetas(self, u, v, t, thetas):
+        # Same as _wavefront, but for a list of thetas at once, with a single lookup into the
+        # table.  The result has shape (len(thetas),) + u.shape.
+        if t is None:
+            t = self._time
+        u = u - t*self.vx
+        v = v - t*self.vy
+        du = [self._altitude*th[0].tan() if th[0].rad != 0. else 0. for th in thetas]
+        dv = [self._altitude*th[1].tan() if th[1].rad != 0. else 0. for th in thetas]
+        shape = (len(thetas),) + (1,)*u.ndim
+        u = u + np.reshape(du, shape)
+        v = v + np.reshape(dv, shape)
+        return self._tab2d._call_wrap(u.ravel(), v.ravel()).reshape(u.shape)
+
     def wavefront_gradient(self, u, v, t=None, theta=(0.0*radians, 0.0*radians)):
         """ Compute gradient of wavefront due to atmospheric phase screen.
 
@@ -753,6 +981,77 @@ class AtmosphericScreen(object):
         return dfdx.reshape(u.shape), dfdy.reshape(u.shape)
 
 
+def _sum_wavefront_gradients(layers, u, v, t, theta):
+    # Same as the sum of layer._wavefront_gradient(u, v, t, theta) over a list of
+    # AtmosphericScreens, but done in C++ in a single pass over u, v, t for each layer, without
+    # making any temporary arrays.  This is the bulk of the work when photon shooting with the
+    # geometric approximation.
+    u = np.ascontiguousarray(u, dtype=float)
+    v = np.ascontiguousarray(v, dtype=float)
+    t = np.ascontiguousarray(np.broadcast_to(t, u.shape), dtype=float)
+    tabs = [layer._tab2d for layer in layers]
+    params = np.array([(tab.x0, tab.y0, tab.xperiod, tab.yperiod, layer.vx, layer.vy,
+                        layer._altitude*theta[0].tan() if theta[0].rad != 0. else 0.,
+                        layer._altitude*theta[1].tan() if theta[1].rad != 0. else 0.)
+                       for layer, tab in zip(layers, tabs)], dtype=float)
+    xargs = np.array([tab.x.ctypes.data for tab in tabs], dtype=np.uintp)
+    yargs = np.array([tab.y.ctypes.data for tab in tabs], dtype=np.uintp)
+    vals = np.array([tab.f.ctypes.data for tab in tabs], dtype=np.uintp)
+    nx = np.array([len(tab.x) for tab in tabs], dtype=np.int32)
+    ny = np.array([len(tab.y) for tab in tabs], dtype=np.int32)
+    dfdx = np.empty(u.shape, dtype=float)
+    dfdy = np.empty(u.shape, dtype=float)
+    _galsim.SumWrappedGradients(u.ctypes.data, v.ctypes.data, t.ctypes.data,
+                                dfdx.ctypes.data, dfdy.ctypes.data, u.size, len(layers),
+                                xargs.ctypes.data, yargs.ctypes.data, vals.ctypes.data,
+                                nx.ctypes.data, ny.ctypes.data, params.ctypes.data)
+    return dfdx, dfdy
+
+
+def _write_screens(file_name, layers):
+    # Helper function to write a list of phase screens to a file.  The file is a series of arrays
+    # in numpy's .npy format.  The first is the bytes of a JSON description of the layers.  Then
+    # there is the screen array of each AtmosphericScreen.  Other screens are stored by their repr.
+    import json
+    meta = []
+    arrays = []
+    for layer in layers:
+        if isinstance(layer, AtmosphericScreen):
+            meta.append(layer._getFileMeta())
+            arrays.append(layer._tab2d.f)
+        else:
+            meta.append({'repr': repr(layer)})
+    # Pad the description with spaces to keep the following arrays aligned for memory mapping.
+    meta = json.dumps({'layers': meta}).encode('utf-8')
+    meta = np.frombuffer(meta + b' '*(-len(meta)%64), dtype=np.uint8)
+    with utilities.atomic_write(file_name) as tmp_file:
+        with open(tmp_file, 'wb') as fout:
+            np.save(fout, meta)
+            for f in arrays:
+                np.save(fout, f)
+
+def _read_screens(file_name, mp_context, memmap):
+    # Helper function to read the list of phase screens in a file written by _write_screens.
+    import json
+    from numpy.lib import format
+    from .chromatic import _eval_repr
+    offsets = []
+    with open(file_name, 'rb') as fin:
+        meta = json.loads(np.load(fin).tobytes().decode('utf-8'))['layers']
+        for m in meta:
+            if 'repr' in m: continue
+            version = format.read_magic(fin)
+            if version == (1,0):
+                shape, _, dtype = format.read_array_header_1_0(fin)
+            else:
+                shape, _, dtype = format.read_array_header_2_0(fin)
+            offsets.append(fin.tell())
+            fin.seek(int(np.prod(shape)) * dtype.itemsize, 1)
+    offsets = iter(offsets)
+    return [_eval_repr(m['repr']) if 'repr' in m else
+            AtmosphericScreen._fromFile(m, file_name, next(offsets), mp_context, memmap)
+            for m in meta]
+
 def Atmosphere(screen_size, rng=None, _bar=None, **kwargs):
     r"""Create an atmosphere as a list of turbulent phase screens at different altitudes.  The
     atmosphere model can then be used to simulate atmospheric PSFs.
@@ -1086,6 +1385,11 @@ class OpticalScreen(object):
         # Note, this phase screen is actually independent of time and theta.
         return self._zernike.evalCartesian(u, v) * self.lam_0
 
+    def _wavefront_thetas(self, u, v, t, thetas):
+        # Same as _wavefront, but for a list of thetas at once.
+        wf = self._wavefront(u, v, t, None)
+        return np.broadcast_to(wf, (len(thetas),) + wf.shape)
+
     def wavefront_gradient(self, u, v, t=None, theta=None):
         """ Compute gradient of wavefront due to optical phase screen.
 
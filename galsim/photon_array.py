@@ -647,3 +647,111 @@ class PhotonDCR(object):
         dy = local_wcs._y(du, dv)
         photon_array.x += dx
         photon_array.y += dy
+
+class PhotonOpPipeline(object):
+    """A sequence of surface operations that are applied together to a `PhotonArray`.
+
+    Applying the ops in a ``surface_ops`` list one at a time means a separate pass over the
+    photon arrays for each op, much of it in Python.  This class instead combines consecutive
+    `WavelengthSampler`, `FRatioAngles` and `PhotonDCR` ops into a single pass in C++.  Any other
+    kind of op (including subclasses of these) is applied normally with its own ``applyTo``
+    method, in the order given.
+
+    The random numbers are drawn from each op's own random number generator in the same order as
+    the individual ops would draw them, so the results are the same (up to numerical rounding)
+    as applying the ops one at a time.  The wavelength sampler for each (`SED`, `Bandpass`) pair
+    is built once and reused for each subsequent call.
+
+    `GSObject.drawImage` automatically uses a PhotonOpPipeline for its ``surface_ops``, so there
+    is normally no need to make one explicitly.  However, it may be useful when applying the
+    same ops to many photon arrays directly.
+
+    Parameters:
+        ops:        A list of surface operations.  These may include other PhotonOpPipeline
+                    instances, whose ops are included in sequence.
+    """
+    def __init__(self, ops=()):
+        self.ops = []
+        for op in ops:
+            if isinstance(op, PhotonOpPipeline):
+                self.ops.extend(op.ops)
+            else:
+                self.ops.append(op)
+
+        # Split the ops into steps, each of which is either a single op to apply directly or
+        # a list of ops to apply together in C++.  Within a fused step, the C++ layer applies
+        # the wavelengths first, then the angles, then DCR, so a step can include at most one
+        # of each, and a WavelengthSampler can't follow a PhotonDCR.
+        self._steps = []
+        fused = []
+        for op in self.ops:
+            if type(op) in (WavelengthSampler, FRatioAngles, PhotonDCR):
+                types = [type(f) for f in fused]
+                if (type(op) in types or
+                        (type(op) is WavelengthSampler and PhotonDCR in types)):
+                    self._steps.append(fused)
+                    fused = []
+                fused.append(op)
+            else:
+                if fused:
+                    self._steps.append(fused)
+                    fused = []
+                self._steps.append(op)
+        if fused:
+            self._steps.append(fused)
+
+    def applyTo(self, photon_array, local_wcs=None):
+        """Apply all the ops to the photons in photon_array."""
+        for step in self._steps:
+            if isinstance(step, list):
+                self._apply_fused(step, photon_array, local_wcs)
+            else:
+                step.applyTo(photon_array, local_wcs)
+
+    @staticmethod
+    def _apply_fused(ops, photon_array, local_wcs):
+        from . import dcr
+        wave_cdf = wave_vals = None
+        wave_factor = 1.
+        do_angles = False
+        sin_obs = sin_pupil = 0.
+        do_dcr = False
+        dcr_args = (0., 1., 0., 0., 0., 0., 0., 0., 0., 0.)
+
+        # First draw all the random numbers in order, storing the uniform deviates in the
+        # arrays that will be converted into the final values by the C++ layer.
+        for op in ops:
+            if isinstance(op, WavelengthSampler):
+                wave_cdf, wave_vals = op.sed._get_sampler(op.bandpass, op.npoints)
+                wave_factor = 1. + op.sed.redshift
+                UniformDeviate(op.rng).generate(photon_array.wavelength)
+            elif isinstance(op, FRatioAngles):
+                do_angles = True
+                sin_obs = np.sin(np.arctan(0.5 * op.obscuration / op.fratio))
+                sin_pupil = np.sin(np.arctan(0.5 / op.fratio))
+                op.ud.generate(photon_array.dxdz)
+                op.ud.generate(photon_array.dydz)
+            else:
+                if wave_cdf is None and not photon_array.hasAllocatedWavelengths():
+                    raise GalSimError("PhotonDCR requires that wavelengths be set")
+                do_dcr = True
+                pfactor, wfactor = dcr._refraction_factors(**op.kw)
+                # The shift in x,y per radian of refraction.
+                sinp, cosp = op.parallactic_angle.sincos()
+                factor = radians / op.scale_unit
+                ax = local_wcs._x(-sinp * factor, cosp * factor)
+                ay = local_wcs._y(-sinp * factor, cosp * factor)
+                dcr_args = (op.alpha, op.base_wavelength,
+                            local_wcs.origin.x, local_wcs.origin.y,
+                            op.zenith_angle.tan(), op.base_refraction, pfactor, wfactor, ax, ay)
+
+        with convert_cpp_errors():
+            if wave_cdf is None:
+                wave_args = (0, 0, 0)
+            else:
+                wave_args = (wave_cdf.ctypes.data, wave_vals.ctypes.data, len(wave_cdf))
+            photon_array._pa.applySurfaceOps(*(wave_args + (wave_factor, do_angles, sin_obs,
+                                             sin_pupil, do_dcr) + dcr_args))
+
+    def __repr__(self):
+        return 'galsim.PhotonOpPipeline(%r)'%self.ops
@@ -25,6 +25,7 @@ from .position import PositionD
 from .angle import arcsec, AngleUnit, radians
 from .deltafunction import DeltaFunction
 from .errors import convert_cpp_errors
+from .table import _load_cached_tables, _table_cache_info
 
 class SecondKick(GSObject):
     """Class describing the expectation value of the high-k turbulence portion of an atmospheric
@@ -71,6 +72,11 @@ class SecondKick(GSObject):
 
         Peterson et al.  2015  ApJSS  vol. 218
 
+    The lookup tables for this profile depend only on ``kcrit`` and ``gsparams``, and they are
+    shared by all SecondKick instances in a process.  If there is a 'table' disk cache directory
+    (cf. `utilities.get_cache_dir`), they are also saved in that directory, so other processes read them rather than computing them again.  See
+    `SecondKick.prewarm_cache` and `SecondKick.table_cache_info`.
+
     Parameters:
         lam:            Wavelength in nanometers
         r0:             Fried parameter in meters.
@@ -115,8 +121,50 @@ class SecondKick(GSObject):
     def _sbs(self):
         lam_over_r0 = (1.e-9*self._lam/self._r0)*self._scale
         with convert_cpp_errors():
+            _load_sk_tables(self._kcrit, self._gsparams)
             return _galsim.SBSecondKick(lam_over_r0, self._kcrit, self._flux, self._gsparams._gsp)
 
+    @staticmethod
+    def prewarm_cache(kcrit=0.2, gsparams=None, cache_dir=None):
+        """Compute the lookup tables for a given ``kcrit`` ahead of time.
+
+        Calling this function in the parent process before starting worker processes means that
+        the workers (at least those that are forked) start with these tables already available.
+        If ``cache_dir`` is given (or there is a 'table' disk cache directory), the tables are
+        also saved there, or read from there if some other process already saved them.
+
+        Parameters:
+            kcrit:      The critical Fourier mode in units of 1/r0.  [default: 0.2]
+            gsparams:   An optional `GSParams` argument. [default: None]
+            cache_dir:  A directory in which to save the tables.  [default: None, which means to
+                        use ``galsim.utilities.get_cache_dir('table')``]
+
+        Returns:
+            the name of the cache file, or None if no cache directory is being used.
+        """
+        kcrit = float(kcrit)
+        gsparams = GSParams.check(gsparams)
+        with convert_cpp_errors():
+            file_name = _load_sk_tables(kcrit, gsparams, cache_dir)
+            if file_name is None:
+                _galsim.GetSKTables(kcrit, gsparams._gsp)
+        return file_name
+
+    @staticmethod
+    def table_cache_info(cache_dir=None):
+        """Return information about the cached SecondKick lookup tables.
+
+        Parameters:
+            cache_dir:  The directory of the disk cache.  [default: None, which means to use
+                        ``galsim.utilities.get_cache_dir('table')``]
+
+        Returns:
+            a dict with the number of sets of tables in memory (currsize), the cache directory
+            (cache_dir), and the number of files (disk_files) and their total size in bytes
+            (disk_bytes) in the cache directory.
+        """
+        return _table_cache_info('second_kick', _galsim.SKCacheSize(), cache_dir)
+
     @lazy_property
     def _sba(self):
         lam_over_diam = (1.e-9*self._lam/self._diam)*self._scale
@@ -251,3 +299,12 @@ class SecondKick(GSObject):
         return SecondKick(lam=self.lam, r0=self.r0, diam=self.diam, obscuration=self.obscuration,
                           kcrit=self.kcrit, flux=flux, scale_unit=self.scale_unit,
                           gsparams=self.gsparams)
+
+def _load_sk_tables(kcrit, gsparams, cache_dir=None):
+    gsp = gsparams._gsp
+    return _load_cached_tables(
+        'second_kick', (kcrit, gsparams),
+        lambda: _galsim.HasSKTables(kcrit, gsp),
+        lambda: _galsim.GetSKTables(kcrit, gsp),
+        lambda data, n: _galsim.SetSKTables(kcrit, gsp, data, n),
+        cache_dir)
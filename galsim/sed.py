@@ -22,6 +22,7 @@ from astropy import units
 from astropy import constants
 import weakref
 
+from . import _galsim
 from .gsobject import GSObject
 from .table import LookupTable
 from . import utilities
@@ -964,10 +965,64 @@ class SED(object):
     def _cache_deviate(self):
         return dict()
 
+    def _get_sampler(self, bandpass, npoints):
+        # Return the inverse cdf table (cdf, rest-frame wavelengths) used by sampleWavelength.
+        # These are somewhat expensive to build, so they are cached both on this object and in
+        # a process-wide cache keyed by the values of the SED and bandpass, so equivalent SEDs
+        # created separately (e.g. one per galaxy) share the same tables.
+        key = (bandpass,npoints)
+        if key in self._cache_deviate:
+            sampler = self._cache_deviate[key]
+        else:
+            sampler = SED._sampler_cache(self, bandpass, npoints)
+            self._cache_deviate[key] = sampler
+        return sampler
+
+    def _build_sampler(self, bandpass, npoints):
+        from .random import DistDeviate
+        if bandpass is None:
+            sed = self
+        else:
+            sed = self._mul_bandpass(bandpass)
+
+        if isinstance(sed._fast_spec, LookupTable):
+            dev = DistDeviate(function=sed._fast_spec, npoints=npoints)
+        else:
+            xmin = sed.blue_limit / (1.+self.redshift)
+            xmax = sed.red_limit / (1.+self.redshift)
+            dev = DistDeviate(function=sed._fast_spec, x_min=xmin, x_max=xmax,
+                              npoints=npoints)
+        cdf = np.ascontiguousarray(dev._inverse_cdf.x, dtype=float)
+        waves = np.ascontiguousarray(dev._inverse_cdf.f, dtype=float)
+        return cdf, waves
+
+    @staticmethod
+    def resize_sampler_cache(maxsize):
+        """Resize the cache (default size=100) of the tables used by `SED.sampleWavelength`.
+
+        Parameters:
+            maxsize:    The new number of `SED` and `Bandpass` combinations to cache.
+        """
+        SED._sampler_cache.resize(maxsize)
+
+    @staticmethod
+    def sampler_cache_info():
+        """Return statistics about the cache of tables used by `SED.sampleWavelength`.
+
+        Returns:
+            a dict with the number of cache ``hits`` and ``misses``, the ``maxsize`` of the cache
+            and the number of tables currently cached, ``currsize``.
+        """
+        return SED._sampler_cache.cache_info()
+
     def sampleWavelength(self, nphotons, bandpass, rng=None, npoints=None):
         """Sample a number of random wavelength values from the `SED`, possibly as observed through
         a `Bandpass` bandpass.
 
+        The tabulated inverse cumulative distribution used for the sampling is cached, so repeated
+        calls with the same (or an equal) `SED` and `Bandpass` only need to draw the random
+        numbers.  See `SED.sampler_cache_info` and `SED.resize_sampler_cache`.
+
         Parameters:
             nphotons:    Number of samples (photons) to randomly draw.
             bandpass:    A `Bandpass` object representing a filter, or None to sample over the full
@@ -978,33 +1033,14 @@ class SED(object):
             npoints:     Number of points `DistDeviate` should use for its internal interpolation
                          tables. [default: None, which uses the `DistDeviate` default]
         """
-        from .random import DistDeviate
+        from .random import UniformDeviate
         nphotons=int(nphotons)
-
-        key = (bandpass,npoints)
-        if key in self._cache_deviate:
-            dev = self._cache_deviate[key]
-        else:
-            if bandpass is None:
-                sed = self
-            else:
-                sed = self._mul_bandpass(bandpass)
-
-            if isinstance(sed._fast_spec, LookupTable):
-                dev = DistDeviate(function=sed._fast_spec, npoints=npoints)
-            else:
-                xmin = sed.blue_limit / (1.+self.redshift)
-                xmax = sed.red_limit / (1.+self.redshift)
-                dev = DistDeviate(function=sed._fast_spec, x_min=xmin, x_max=xmax,
-                                  npoints=npoints)
-            self._cache_deviate[key] = dev
-
-        # Reset the deviate explicitly
-        if rng is not None: dev.reset(rng)
+        cdf, waves = self._get_sampler(bandpass, npoints)
 
         ret = np.empty(nphotons)
-        dev.generate(ret)
-        ret *= (1. + self.redshift)
+        UniformDeviate(rng).generate(ret)
+        _galsim.SampleInverseCDF(ret.ctypes.data, nphotons, cdf.ctypes.data, waves.ctypes.data,
+                                 len(cdf), 1. + self.redshift)
         return ret
 
     def __eq__(self, other):
@@ -1059,3 +1095,583 @@ class SED(object):
         if '_spec' not in d:
             self._initialize_spec()
         self._setup_funcs()
+
+SED._sampler_cache = utilities.LRU_Cache(SED._build_sampler, maxsize=100)
+
+
+def _trapz_weights(waves, bandpass):
+    # The trapezoidal quadrature weights for integrating a function tabulated at the sorted
+    # wavelengths waves, times the bandpass throughput at those wavelengths.
+    dw = np.diff(waves)
+    weights = np.zeros_like(waves)
+    weights[:-1] += 0.5 * dw
+    weights[1:] += 0.5 * dw
+    weights *= bandpass(waves)
+    return weights
+
+
+class BatchFluxCalculator(object):
+    """A class for calculating the fluxes or magnitudes of many SEDs through a set of bandpasses
+    at once.
+
+    `SED.calculateFlux` integrates a single `SED` against a single `Bandpass`.  For a large
+    catalog of galaxies, e.g. a few template SEDs at many different redshifts, observed in
+    several bands, doing this one at a time is quite slow.  This class instead precomputes
+    trapezoidal quadrature weights for each bandpass on a common wavelength grid.  Then the
+    fluxes of many SEDs through all of the bandpasses are given by a single matrix product of
+    the SED values on this grid with the matrix of weights.
+
+    The common grid includes the tabulated wavelengths of all the bandpasses (their
+    ``wave_list``), plus a regular grid with spacing ``dw`` covering each bandpass.  The SEDs
+    are only sampled on this grid, so features in an SED narrower than ``dw`` are not fully
+    resolved, and the results will differ slightly from those of `SED.calculateFlux`, which
+    also includes the wavelengths in the SED's ``wave_list``.  Use a smaller ``dw`` for more
+    accurate results at the expense of speed.
+
+    The SEDs may also be given as an `SEDTemplateSet`, in which case the fluxes are interpolated
+    from tables of the flux of each template versus redshift, which is faster still for large
+    numbers of galaxies.
+
+    Example::
+
+        >>> calc = galsim.BatchFluxCalculator([bp_u, bp_g, bp_r, bp_i, bp_z])
+        >>> flux = calc.calculateFlux(sed, redshift=z)   # shape (len(z), 5)
+        >>> mags = calc.calculateMagnitude(seds, redshift=z, index=itemplate)
+        >>> templates = galsim.SEDTemplateSet(seds)
+        >>> mags = calc.calculateMagnitude(templates, redshift=z, index=itemplate)
+
+    Parameters:
+        bandpasses:     A list of `Bandpass` instances.
+        dw:             The maximum spacing (in nm) of the common wavelength grid within each
+                        bandpass. [default: 1]
+        max_size:       The maximum number of SED values to hold in memory at once.  Larger
+                        batches are done in chunks of this size. [default: 10**7]
+
+    Attributes:
+        bandpasses:     The list of bandpasses.
+        waves:          The common wavelength grid in nm.
+        weights:        The quadrature weights, an array of shape (len(bandpasses), len(waves)).
+    """
+    def __init__(self, bandpasses, dw=1., max_size=10**7):
+        from .bandpass import Bandpass
+        if isinstance(bandpasses, Bandpass):
+            bandpasses = [bandpasses]
+        self.bandpasses = list(bandpasses)
+        self.dw = float(dw)
+        self.max_size = int(max_size)
+        if len(self.bandpasses) == 0:
+            raise GalSimValueError("bandpasses may not be empty", bandpasses)
+        if self.dw <= 0.:
+            raise GalSimRangeError("dw must be positive", self.dw, 0.)
+        if self.max_size <= 0:
+            raise GalSimRangeError("max_size must be positive", self.max_size, 1)
+
+        waves = []
+        for bp in self.bandpasses:
+            n = int(np.ceil((bp.red_limit - bp.blue_limit) / self.dw)) + 1
+            waves.append(np.linspace(bp.blue_limit, bp.red_limit, n))
+            waves.append(bp.wave_list)
+        self.waves = np.unique(np.concatenate(waves))
+
+        self.weights = np.zeros((len(self.bandpasses), len(self.waves)))
+        for j, bp in enumerate(self.bandpasses):
+            use = (self.waves >= bp.blue_limit) & (self.waves <= bp.red_limit)
+            self.weights[j, use] = _trapz_weights(self.waves[use], bp)
+
+    def calculateFlux(self, seds, redshift=None, index=None):
+        """Return the fluxes (photons/cm^2/s) of some SEDs through each of the bandpasses.
+
+        There are three ways to specify the SEDs:
+
+        1. ``seds`` is a single `SED` or a list of SEDs, and ``redshift`` is None.  The SEDs are
+           used as is.  The returned array has shape (len(seds), len(bandpasses)), or just
+           (len(bandpasses),) if ``seds`` is a single `SED`.
+        2. ``seds`` is a single template `SED` and ``redshift`` is an array.  The flux is
+           calculated for ``seds.atRedshift(z)`` for each value z in ``redshift``.
+        3. ``seds`` is a list of template SEDs and ``redshift`` is an array.  Then ``index``
+           gives which template to use for each redshift.  If ``index`` is None, ``redshift``
+           must have the same length as ``seds``, giving the redshift of each one.
+
+        In cases 2 and 3, the returned array has shape (len(redshift), len(bandpasses)).
+
+        ``seds`` may also be an `SEDTemplateSet`, which is treated the same as the list of its
+        (rest-frame) templates, except that the fluxes are interpolated from its tables of the
+        flux of each template versus redshift (cf. `SEDTemplateSet`) rather than calculated on
+        the common wavelength grid of this class.
+
+        Parameters:
+            seds:       A single `SED`, a list of SEDs, or an `SEDTemplateSet`.
+            redshift:   An optional array of redshifts. [default: None]
+            index:      An optional integer array of indices into ``seds``, one for each
+                        redshift. [default: None]
+
+        Returns:
+            the array of fluxes.
+        """
+        templates = seds if isinstance(seds, SEDTemplateSet) else None
+        single = isinstance(seds, SED)
+        if single:
+            seds = [seds]
+        elif templates is not None:
+            seds = templates.seds
+        seds = list(seds)
+        for sed in seds:
+            if sed.dimensionless:
+                raise GalSimSEDError("Cannot calculate flux of dimensionless SED.", sed)
+
+        if redshift is None:
+            if index is not None:
+                raise GalSimIncompatibleValuesError(
+                    "index is only allowed when redshift is given", index=index, redshift=None)
+            if templates is not None:
+                # The templates are in their rest frames.
+                return templates._calculateFlux(self.bandpasses, np.arange(len(seds)),
+                                                np.zeros(len(seds)))
+            for sed in seds:
+                self._check_range(sed, np.ones(1))
+            vals = np.array([sed(self.waves) for sed in seds])
+            flux = vals.dot(self.weights.T)
+            return flux[0] if single else flux
+
+        redshift = np.atleast_1d(np.asarray(redshift, dtype=float))
+        if redshift.ndim != 1:
+            raise GalSimValueError("redshift must be a 1-d array", redshift)
+        if np.any(redshift <= -1.):
+            raise GalSimRangeError("Invalid redshift", redshift, -1.)
+        if index is None:
+            if len(seds) == 1:
+                index = np.zeros(len(redshift), dtype=int)
+            elif len(seds) == len(redshift):
+                index = np.arange(len(redshift))
+            else:
+                raise GalSimIncompatibleValuesError(
+                    "index is required when seds and redshift have different lengths",
+                    seds=seds, redshift=redshift)
+        else:
+            index = np.atleast_1d(np.asarray(index, dtype=int))
+            if index.shape != redshift.shape:
+                raise GalSimIncompatibleValuesError(
+                    "index and redshift must have the same shape", index=index, redshift=redshift)
+            if np.any(index < 0) or np.any(index >= len(seds)):
+                raise GalSimRangeError("index out of range", index, 0, len(seds)-1)
+        if templates is not None:
+            return templates._calculateFlux(self.bandpasses, index, redshift)
+
+        flux = np.empty((len(redshift), len(self.bandpasses)))
+        nchunk = max(1, self.max_size // len(self.waves))
+        for k, sed in enumerate(seds):
+            use = np.where(index == k)[0]
+            if len(use) == 0:
+                continue
+            # Work in the rest frame of the template, so the redshift is just a rescaling of the
+            # wavelengths at which to evaluate the spectrum.
+            zfactor = (1. + redshift[use]) / (1. + sed.redshift)
+            self._check_range(sed, zfactor)
+            for i in range(0, len(use), nchunk):
+                u = use[i:i+nchunk]
+                rest_waves = np.outer(1./zfactor[i:i+nchunk], self.waves) / (1.+sed.redshift)
+                vals = np.asarray(sed._fast_spec(rest_waves.ravel())).reshape(rest_waves.shape)
+                flux[u] = vals.dot(self.weights.T)
+        return flux
+
+    def calculateMagnitude(self, seds, redshift=None, index=None):
+        """Return the magnitudes of some SEDs through each of the bandpasses.
+
+        Note that this requires all of the bandpasses to have been assigned a zeropoint using
+        `Bandpass.withZeropoint`.
+
+        The parameters are the same as for `calculateFlux`.
+
+        Returns:
+            the array of magnitudes.
+        """
+        zp = [bp.zeropoint for bp in self.bandpasses]
+        if any(z is None for z in zp):
+            raise GalSimError("Cannot do this calculation for a bandpass without an assigned "
+                              "zeropoint")
+        flux = self.calculateFlux(seds, redshift, index)
+        return -2.5 * np.log10(flux) + np.array(zp)
+
+    def _check_range(self, sed, zfactor):
+        # Make sure the SED, stretched by each factor in zfactor, covers the whole grid.
+        slop = 1e-6 # nm
+        if (sed.blue_limit * np.max(zfactor) > self.waves[0] + slop
+                or sed.red_limit * np.min(zfactor) < self.waves[-1] - slop):
+            raise GalSimRangeError("Bandpasses are not completely within defined wavelength "
+                                   "range for this SED.",
+                                   (self.waves[0], self.waves[-1]),
+                                   sed.blue_limit * np.max(zfactor),
+                                   sed.red_limit * np.min(zfactor))
+
+    def __eq__(self, other):
+        return (self is other or
+                (isinstance(other, BatchFluxCalculator) and
+                 self.bandpasses == other.bandpasses and
+                 self.dw == other.dw and
+                 self.max_size == other.max_size))
+    def __ne__(self, other): return not self.__eq__(other)
+
+    def __hash__(self):
+        return hash(("galsim.BatchFluxCalculator", tuple(self.bandpasses), self.dw, self.max_size))
+
+    def __repr__(self):
+        return 'galsim.BatchFluxCalculator(%r, dw=%r, max_size=%r)'%(
+                self.bandpasses, self.dw, self.max_size)
+
+    def __str__(self):
+        return 'galsim.BatchFluxCalculator(%s)'%([str(bp) for bp in self.bandpasses])
+
+
+class SEDTemplateSet(object):
+    """A set of template SEDs tabulated on a common rest-frame log-wavelength grid, which can be
+    evaluated for many combinations of template, redshift and amplitude at once.
+
+    Mock catalogs typically assign one of a small number of template SEDs to each galaxy, along
+    with a redshift and a normalization.  Making a separate `SED` for each galaxy with
+    `SED.atRedshift` (and perhaps `SED.thin`) is relatively slow, and each evaluation of such an
+    `SED` needs to rescale the wavelengths again.  This class instead tabulates the templates
+    once, in photons/nm/cm^2/s, on a grid that is uniform in log(wavelength).  On such a grid, a
+    redshift is just a shift of the grid, so the spectrum of any galaxy is found with array
+    operations only.
+
+    - `SEDTemplateSet.__call__` evaluates the spectra of arrays of template indices, redshifts
+      and amplitudes at given observed wavelengths.
+    - `SEDTemplateSet.sampleWavelength` draws photon wavelengths for one galaxy.
+    - The fluxes and magnitudes through a set of bandpasses are computed by passing the
+      `SEDTemplateSet` in place of the list of SEDs to `BatchFluxCalculator.calculateFlux` or
+      `BatchFluxCalculator.calculateMagnitude`.  The first time a `Bandpass` is used, this
+      tabulates the flux of each template through it at the redshifts for which 1+z is on the
+      log-wavelength grid, with one correlation per template.  The fluxes at any redshift are
+      then interpolated from these tables, so the cost per galaxy is tiny.  The interpolation
+      error is of order ``dlnw**2`` times the second derivative of the flux with respect to
+      ln(1+z), which is typically negligible.
+
+    When a regular `SED` is required, e.g. to build a `ChromaticObject`, `SEDTemplateSet.getSED`
+    returns one based on the tabulated template, which is much faster than redshifting and
+    thinning the original template.
+
+    Example::
+
+        >>> templates = galsim.SEDTemplateSet([sed_E, sed_Sbc, sed_Scd, sed_Im])
+        >>> calc = galsim.BatchFluxCalculator(bandpasses)
+        >>> mags = calc.calculateMagnitude(templates, redshift=z, index=itemp)
+        >>> gal = galsim.Exponential(half_light_radius=0.5) * templates.getSED(itemp[0], z[0])
+
+    Parameters:
+        seds:           A list of `SED` instances to use as the templates.  Any redshift they
+                        have is removed; i.e. the templates are tabulated in their rest frames.
+        dlnw:           The spacing of the grid in ln(wavelength). [default: 1.e-3]
+        blue_limit:     The blue end of the rest-frame grid in nm. [default: None, which means
+                        to use the largest of the templates' blue limits]
+        red_limit:      The red end of the rest-frame grid in nm. [default: None, which means
+                        to use the smallest of the templates' red limits]
+
+    Attributes:
+        seds:           The list of template SEDs.
+        waves:          The rest-frame wavelength grid in nm.
+        spec:           The tabulated templates in photons/nm/cm^2/s, an array of shape
+                        (len(seds), len(waves)).
+    """
+    def __init__(self, seds, dlnw=1.e-3, blue_limit=None, red_limit=None):
+        if isinstance(seds, SED):
+            seds = [seds]
+        self.seds = list(seds)
+        self.dlnw = float(dlnw)
+        if len(self.seds) == 0:
+            raise GalSimValueError("seds may not be empty", seds)
+        for sed in self.seds:
+            if sed.dimensionless:
+                raise GalSimSEDError("Template SEDs must not be dimensionless.", sed)
+        if self.dlnw <= 0.:
+            raise GalSimRangeError("dlnw must be positive", self.dlnw, 0.)
+
+        rest_blue = max(sed.blue_limit / (1.+sed.redshift) for sed in self.seds)
+        rest_red = min(sed.red_limit / (1.+sed.redshift) for sed in self.seds)
+        if blue_limit is None:
+            blue_limit = rest_blue
+        if red_limit is None:
+            red_limit = rest_red
+        if blue_limit < rest_blue or red_limit > rest_red:
+            raise GalSimRangeError("Requested range is not within all of the templates.",
+                                   (blue_limit, red_limit), rest_blue, rest_red)
+        if not blue_limit < red_limit or red_limit == np.inf:
+            raise GalSimRangeError("Invalid wavelength range for SEDTemplateSet",
+                                   (blue_limit, red_limit), 0., np.inf)
+        self._blue_limit = blue_limit
+        self._red_limit = red_limit
+
+        nw = int(np.ceil(np.log(red_limit / blue_limit) / self.dlnw)) + 1
+        self._lnw0 = np.log(blue_limit)
+        self.waves = blue_limit * np.exp(self.dlnw * np.arange(nw))
+        self.waves[-1] = red_limit
+        self.spec = np.array([sed._fast_spec(self.waves) for sed in self.seds], dtype=float)
+        self._init_caches()
+
+    def _init_caches(self):
+        # The rest-frame SED of each template, made as needed by getSED.
+        self._rest_seds = [None] * len(self.seds)
+        # The flux tables for each bandpass used so far.
+        self._flux_tables = utilities.LRU_Dict(maxsize=SEDTemplateSet._flux_table_maxsize,
+                                               max_bytes=SEDTemplateSet._flux_table_max_bytes,
+                                               nbytes=_flux_table_nbytes)
+
+    @property
+    def blue_limit(self):
+        """The blue limit of the rest-frame wavelength grid.
+        """
+        return self._blue_limit
+
+    @property
+    def red_limit(self):
+        """The red limit of the rest-frame wavelength grid.
+        """
+        return self._red_limit
+
+    def _parse_args(self, index, redshift, amplitude):
+        index = np.asarray(index, dtype=int)
+        redshift = np.asarray(redshift, dtype=float)
+        amplitude = np.asarray(amplitude, dtype=float)
+        scalar = index.ndim == 0 and redshift.ndim == 0 and amplitude.ndim == 0
+        try:
+            index, redshift, amplitude = np.broadcast_arrays(np.atleast_1d(index),
+                                                             np.atleast_1d(redshift),
+                                                             np.atleast_1d(amplitude))
+        except ValueError:
+            raise GalSimIncompatibleValuesError(
+                "index, redshift and amplitude must have the same length",
+                index=index, redshift=redshift, amplitude=amplitude)
+        if index.ndim != 1:
+            raise GalSimValueError("index, redshift and amplitude must be scalars or 1-d arrays",
+                                   index)
+        if np.any(index < 0) or np.any(index >= len(self.seds)):
+            raise GalSimRangeError("index out of range", index, 0, len(self.seds)-1)
+        if np.any(redshift <= -1.):
+            raise GalSimRangeError("Invalid redshift", redshift, -1.)
+        return index, redshift, amplitude, scalar
+
+    def _check_range(self, wave, redshift):
+        slop = 1e-6 # nm
+        zmin = np.min(redshift)
+        zmax = np.max(redshift)
+        if (self.blue_limit * (1.+zmax) > np.min(wave) + slop or
+                self.red_limit * (1.+zmin) < np.max(wave) - slop):
+            raise GalSimRangeError("Wavelengths are not within the range of the templates at "
+                                   "the given redshifts.",
+                                   (np.min(wave), np.max(wave)),
+                                   self.blue_limit * (1.+zmax), self.red_limit * (1.+zmin))
+
+    def _eval(self, wave, index, redshift, amplitude):
+        # The values of the spectra at observed wavelengths wave.  This interpolates linearly in
+        # wavelength between the grid points, the same as the LookupTable in getSED, but finds
+        # the grid cell for each value directly from its log.
+        zfactor = 1. + redshift[:,np.newaxis]
+        rest = wave[np.newaxis,:] / zfactor
+        nw = len(self.waves)
+        u = (np.log(wave) - self._lnw0)[np.newaxis,:] - np.log(zfactor)
+        u /= self.dlnw
+        k = u.astype(int)
+        np.clip(k, 0, nw-2, out=k)
+        w0 = self.waves[k]
+        t = (rest - w0) / (self.waves[k+1] - w0)
+        # Index into the flattened spec array.
+        k += (index * nw)[:,np.newaxis]
+        spec = self.spec.ravel()
+        f = spec[k]
+        f += t * (spec[k+1] - f)
+        f *= amplitude[:,np.newaxis]
+        return f
+
+    def __call__(self, wave, index, redshift=0., amplitude=1.):
+        """Return the photon density (photons/nm/cm^2/s) of the given templates at observed
+        wavelengths ``wave``.
+
+        Parameters:
+            wave:       The observed wavelengths in nm.  Either a scalar or a 1-d array.
+            index:      The index of the template to use.  Either a scalar or a 1-d array.
+            redshift:   The redshift of the galaxy. [default: 0]
+            amplitude:  A factor by which to multiply the template. [default: 1]
+
+        Returns:
+            the photon density.  If ``index``, ``redshift`` and ``amplitude`` are all scalars, then
+            this has the same shape as ``wave``.  Otherwise, it has shape (n, len(wave)), where n
+            is the length of the other arrays.
+        """
+        index, redshift, amplitude, scalar = self._parse_args(index, redshift, amplitude)
+        wave = np.asarray(wave, dtype=float)
+        wave1 = np.atleast_1d(wave)
+        self._check_range(wave1, redshift)
+        f = self._eval(wave1, index, redshift, amplitude)
+        if scalar:
+            return f[0] if wave.ndim > 0 else f[0,0]
+        else:
+            return f
+
+    def getSED(self, index, redshift=0., amplitude=1.):
+        """Return an `SED` for a single template, redshift and amplitude.
+
+        The returned `SED` uses the tabulated template, so it is equal to ``self(wave, index,
+        redshift, amplitude)`` at all wavelengths.  The SEDs returned for a given template all
+        share the same table, so they are cheap to make for many galaxies.  (With
+        ``amplitude != 1``, the table has to be copied, so it is faster to set the flux of the
+        `ChromaticObject` instead, e.g. with ``withFlux`` or ``withMagnitude``.)
+
+        Parameters:
+            index:      The index of the template to use.
+            redshift:   The redshift of the galaxy. [default: 0]
+            amplitude:  A factor by which to multiply the template. [default: 1]
+
+        Returns:
+            an `SED` instance.
+        """
+        index = int(index)
+        if index < 0 or index >= len(self.seds):
+            raise GalSimRangeError("index out of range", index, 0, len(self.seds)-1)
+        sed = self._rest_seds[index]
+        if sed is None:
+            table = LookupTable(self.waves, self.spec[index], interpolant='linear')
+            sed = self._rest_seds[index] = SED(table, 'nm', 'fphotons')
+        sed = sed.atRedshift(redshift)
+        if amplitude != 1.:
+            sed = sed._mul_scalar(amplitude)
+        return sed
+
+    def _get_flux_table(self, bandpass):
+        # Return the flux of each template through bandpass at every redshift on the grid
+        # 1+z = exp(m dlnw), along with the range of m.
+        #
+        # On an observed-frame grid with the same log spacing as self.waves, the template
+        # redshifted by m grid steps is just the tabulated template shifted by m, so the fluxes
+        # at all m are a correlation of the template with the bandpass quadrature weights.
+        cached = self._flux_tables.get(bandpass)
+        if cached is not None:
+            return cached
+        nw = len(self.waves)
+        k0 = int(np.floor((np.log(bandpass.blue_limit) - self._lnw0) / self.dlnw))
+        k1 = int(np.ceil((np.log(bandpass.red_limit) - self._lnw0) / self.dlnw))
+        obs_waves = np.exp(self._lnw0 + self.dlnw * np.arange(k0, k1+1))
+        if len(obs_waves) > nw:
+            raise GalSimRangeError("Bandpass is wider than the range of the templates.",
+                                   (bandpass.blue_limit, bandpass.red_limit),
+                                   self.blue_limit, self.red_limit)
+        weights = _trapz_weights(obs_waves, bandpass)
+        table = np.array([np.correlate(spec, weights, mode='valid') for spec in self.spec])
+        # table[:,n] is the flux for m = k0 - n.  Reverse it to be in order of increasing m.
+        table = np.ascontiguousarray(table[:,::-1])
+        m_min = k0 - (table.shape[1] - 1)
+        self._flux_tables[bandpass] = (table, m_min)
+        return table, m_min
+
+    def _calculateFlux(self, bandpasses, index, redshift):
+        # The fluxes of templates index at the given redshifts through each of the bandpasses,
+        # interpolated from the flux tables.  cf. BatchFluxCalculator.calculateFlux.
+        m = np.log1p(redshift) / self.dlnw
+        flux = np.empty((len(index), len(bandpasses)))
+        for j, bp in enumerate(bandpasses):
+            table, m_min = self._get_flux_table(bp)
+            u = m - m_min
+            if np.min(u) < 0. or np.max(u) > table.shape[1] - 1:
+                raise GalSimRangeError("Bandpass is not within the range of the templates at the "
+                                       "given redshifts.", redshift,
+                                       np.expm1(m_min * self.dlnw),
+                                       np.expm1((m_min + table.shape[1] - 1) * self.dlnw))
+            n = np.minimum(u.astype(int), table.shape[1] - 2)
+            t = u - n
+            f = table[index, n]
+            f += t * (table[index, n+1] - f)
+            flux[:,j] = f
+        return flux
+
+    def sampleWavelength(self, nphotons, bandpass, index, redshift=0., rng=None):
+        """Sample a number of random wavelength values from a single template at a given
+        redshift, possibly as observed through a `Bandpass` bandpass.
+
+        This gives the same distribution as ``getSED(index, redshift).sampleWavelength``, but
+        without making the `SED` or caching its tables, which is faster for galaxies with
+        different redshifts.
+
+        Parameters:
+            nphotons:   Number of samples (photons) to randomly draw.
+            bandpass:   A `Bandpass` object representing a filter, or None to sample over the
+                        full range of the templates.
+            index:      The index of the template to use.
+            redshift:   The redshift of the galaxy. [default: 0]
+            rng:        If provided, a random number generator that is any kind of `BaseDeviate`
+                        object. If ``rng`` is None, one will be automatically created from the
+                        system. [default: None]
+
+        Returns:
+            an array of wavelengths in nm.
+        """
+        from .random import UniformDeviate
+        nphotons = int(nphotons)
+        index, redshift, amplitude, scalar = self._parse_args(index, redshift, 1.)
+        if not scalar:
+            raise GalSimValueError("sampleWavelength requires a scalar index and redshift",
+                                   index)
+        if bandpass is None:
+            waves = self.waves * (1.+redshift[0])
+            pdf = self.spec[index[0]]
+        else:
+            # Use the same wavelengths as the product of getSED(index, redshift) and bandpass.
+            obs_waves = self.waves * (1.+redshift[0])
+            blue_limit = max(obs_waves[0], bandpass.blue_limit)
+            red_limit = min(obs_waves[-1], bandpass.red_limit)
+            if blue_limit >= red_limit:
+                raise GalSimRangeError("Bandpass does not overlap the template at this redshift.",
+                                       (bandpass.blue_limit, bandpass.red_limit),
+                                       obs_waves[0], obs_waves[-1])
+            waves = np.union1d(obs_waves, bandpass.wave_list)
+            waves = waves[(waves >= blue_limit) & (waves <= red_limit)]
+            waves = np.union1d([blue_limit, red_limit], waves)
+            pdf = self._eval(waves, index, redshift, amplitude)[0] * bandpass(waves)
+        # Cumulative trapezoid integral, as DistDeviate does for a LookupTable.
+        cdf = np.empty_like(waves)
+        cdf[0] = 0.
+        np.cumsum(0.5 * (pdf[1:] + pdf[:-1]) * np.diff(waves), out=cdf[1:])
+        if not cdf[-1] > 0.:
+            raise GalSimError("Template has no flux in the given bandpass")
+        cdf /= cdf[-1]
+
+        ret = np.empty(nphotons)
+        UniformDeviate(rng).generate(ret)
+        _galsim.SampleInverseCDF(ret.ctypes.data, nphotons, cdf.ctypes.data, waves.ctypes.data,
+                                 len(cdf), 1.)
+        return ret
+
+    def __getstate__(self):
+        d = self.__dict__.copy()
+        del d['_rest_seds']
+        del d['_flux_tables']
+        return d
+
+    def __setstate__(self, d):
+        self.__dict__ = d
+        self._init_caches()
+
+    def __eq__(self, other):
+        return (self is other or
+                (isinstance(other, SEDTemplateSet) and
+                 self.seds == other.seds and
+                 self.dlnw == other.dlnw and
+                 self.blue_limit == other.blue_limit and
+                 self.red_limit == other.red_limit))
+    def __ne__(self, other): return not self.__eq__(other)
+
+    def __hash__(self):
+        return hash(("galsim.SEDTemplateSet", tuple(self.seds), self.dlnw, self.blue_limit,
+                     self.red_limit))
+
+    def __repr__(self):
+        return 'galsim.SEDTemplateSet(%r, dlnw=%r, blue_limit=%r, red_limit=%r)'%(
+                self.seds, self.dlnw, self.blue_limit, self.red_limit)
+
+    def __str__(self):
+        return 'galsim.SEDTemplateSet(%s)'%([str(sed) for sed in self.seds])
+
+# The limits of the cache of flux tables in each SEDTemplateSet.
+SEDTemplateSet._flux_table_maxsize = 100
+SEDTemplateSet._flux_table_max_bytes = 2**28
+
+def _flux_table_nbytes(value):
+    # The size of an item in SEDTemplateSet._flux_tables, which is a (table, m_min) tuple.
+    return value[0].nbytes
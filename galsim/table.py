@@ -15,17 +15,76 @@
 #    this list of conditions, and the disclaimer given in the documentation
 #    and/or other materials provided with the distribution.
 #
+import os
 import numpy as np
 import numbers
 
 from . import _galsim
 from .utilities import lazy_property, convert_interpolant, find_out_of_bounds_position
+from .utilities import atomic_write, get_cache_dir
 from .position import PositionD
 from .bounds import BoundsD
 from .errors import GalSimRangeError, GalSimBoundsError, GalSimValueError
 from .errors import GalSimIncompatibleValuesError, convert_cpp_errors, galsim_warn
 from .interpolant import Interpolant
 
+# If there is a 'table' disk cache directory (cf. utilities.get_cache_dir), the lookup tables that
+# SecondKick and VonKarman compute in C++ are saved there the first time they are needed, and
+# later processes using the same parameters read them back rather than computing them again.
+# The file names include a hash of the parameters and the GalSim version, so a new version never
+# uses stale tables.
+
+# The cache files that are known to match the tables in the C++ caches.
+_saved_tables = set()
+
+def _table_cache_file(cache_dir, prefix, key):
+    import hashlib
+    from ._version import __version__
+    tag = hashlib.md5(repr((key, __version__)).encode('utf-8')).hexdigest()
+    return os.path.join(cache_dir, '%s_%s.npy'%(prefix, tag))
+
+def _load_cached_tables(prefix, key, has_tables, get_tables, set_tables, cache_dir=None):
+    # Make sure the C++ tables for the given key are in memory, reading them from the disk
+    # cache if they are there, or else computing them and writing them to the disk cache.
+    #   has_tables() returns whether the tables are already in the C++ cache.
+    #   get_tables() returns the tables as a string, computing them if necessary.
+    #   set_tables(data, n) restores the tables from an array of n values.
+    # Returns the name of the cache file, or None if no cache directory is being used.
+    cache_dir = get_cache_dir('table', cache_dir)
+    if cache_dir is None:
+        return None
+    file_name = _table_cache_file(cache_dir, prefix, key)
+    if file_name in _saved_tables and has_tables():
+        return file_name
+
+    if os.path.isfile(file_name):
+        if has_tables():
+            _saved_tables.add(file_name)
+            return file_name
+        try:
+            data = np.load(file_name)
+            set_tables(data.ctypes.data, len(data))
+            _saved_tables.add(file_name)
+            return file_name
+        except (OSError, ValueError, RuntimeError):  # pragma: no cover
+            # If the file is corrupt, fall through to compute the tables and rewrite it.
+            pass
+
+    data = np.array(get_tables().split(), dtype=float)
+    with atomic_write(file_name) as tmp_file:
+        with open(tmp_file, 'wb') as fout:
+            np.save(fout, data)
+    _saved_tables.add(file_name)
+    return file_name
+
+def _table_cache_info(prefix, currsize, cache_dir=None):
+    # The occupancy of the C++ cache and the disk cache of the tables with the given prefix.
+    import glob
+    cache_dir = get_cache_dir('table', cache_dir)
+    files = [] if cache_dir is None else glob.glob(os.path.join(cache_dir, prefix + '_*.npy'))
+    return dict(currsize=currsize, cache_dir=cache_dir, disk_files=len(files),
+                disk_bytes=sum(os.path.getsize(f) for f in files))
+
 class LookupTable(object):
     """
     LookupTable represents a lookup table to store function values that may be slow to calculate,
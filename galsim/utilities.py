@@ -17,10 +17,12 @@
 #
 import functools
 from contextlib import contextmanager
+from collections import OrderedDict
 from future.utils import iteritems
 from builtins import range, object
 import weakref
 import os
+import sys
 import numpy as np
 
 from . import _galsim
@@ -355,53 +357,6 @@ def _convertPositions(pos, units, func):
 
     return pos
 
-def _lin_approx_err(x, f, i):
-    r"""Error as \int abs(f(x) - approx(x)) when using ith data point to make piecewise linear
-    approximation."""
-    xleft, xright = x[:i+1], x[i:]
-    fleft, fright = f[:i+1], f[i:]
-    xi, fi = x[i], f[i]
-    mleft = (fi-f[0])/(xi-x[0])
-    mright = (f[-1]-fi)/(x[-1]-xi)
-    f2left = f[0]+mleft*(xleft-x[0])
-    f2right = fi+mright*(xright-xi)
-    return np.trapz(np.abs(fleft-f2left), xleft), np.trapz(np.abs(fright-f2right), xright)
-
-def _exact_lin_approx_split(x, f):
-    r"""Split a tabulated function into a two-part piecewise linear approximation by exactly
-    minimizing \int abs(f(x) - approx(x)) dx.  Operates in O(N^2) time.
-    """
-    errs = [_lin_approx_err(x, f, i) for i in range(1, len(x)-1)]
-    i = np.argmin(np.sum(errs, axis=1))
-    return i+1, errs[i]
-
-def _lin_approx_split(x, f):
-    r"""Split a tabulated function into a two-part piecewise linear approximation by approximately
-    minimizing \int abs(f(x) - approx(x)) dx.  Chooses the split point by exactly minimizing
-    \int (f(x) - approx(x))^2 dx in O(N) time.
-    """
-    dx = x[2:] - x[:-2]
-    # Error contribution on the left.
-    ff0 = f[1:-1]-f[0]  # Only need to search between j=1..(N-1)
-    xx0 = x[1:-1]-x[0]
-    mleft = ff0/xx0  # slope
-    errleft = (np.cumsum(dx*ff0**2)
-               - 2*mleft*np.cumsum(dx*ff0*xx0)
-               + mleft**2*np.cumsum(dx*xx0**2))
-    # Error contribution on the right.
-    dx = dx[::-1]  # Reversed so that np.cumsum effectively works right-to-left.
-    ffN = f[-2:0:-1]-f[-1]
-    xxN = x[-2:0:-1]-x[-1]
-    mright = ffN/xxN
-    errright = (np.cumsum(dx*ffN**2)
-                - 2*mright*np.cumsum(dx*ffN*xxN)
-                + mright**2*np.cumsum(dx*xxN**2))
-    errright = errright[::-1]
-
-    # Get absolute error for the found point.
-    i = np.argmin(errleft+errright)
-    return i+1, _lin_approx_err(x, f, i+1)
-
 def thin_tabulated_values(x, f, rel_err=1.e-4, trim_zeros=True, preserve_range=True,
                           fast_search=True):
     """
@@ -431,15 +386,44 @@ def thin_tabulated_values(x, f, rel_err=1.e-4, trim_zeros=True, preserve_range=T
                         that retains fewer samples while still meeting the relative error
                         requirement.  [default: True]
 
+    The results are cached, keyed by a hash of the input values and the other parameters, so
+    thinning the same tabulation again (e.g. the same `Bandpass` read in again from a file)
+    just returns the previous result.  The size of this cache may be changed with
+    `resize_thin_cache`.
+
     Returns:
         a tuple of lists (x_new, y_new) with the thinned tabulation.
     """
-    from heapq import heappush, heappop
+    import hashlib
+    x = np.ascontiguousarray(x, dtype=float)
+    f = np.ascontiguousarray(f, dtype=float)
+
+    md5 = hashlib.md5(x.tobytes())
+    md5.update(f.tobytes())
+    key = (md5.hexdigest(), float(rel_err), bool(trim_zeros), bool(preserve_range),
+           bool(fast_search))
+    cached = _thin_cache.get(key)
+    if cached is None:
+        cached = _thin_tabulated_values(x, f, rel_err, trim_zeros, preserve_range, fast_search)
+        _thin_cache[key] = cached
+    newx, newf = cached
+    # Return copies, so the cached values can't be modified.
+    return newx.copy(), newf.copy()
+
+def resize_thin_cache(maxsize):
+    """Resize the cache of results from `thin_tabulated_values`.
 
-    split_fn = _lin_approx_split if fast_search else _exact_lin_approx_split
+    Parameters:
+        maxsize:    The maximum number of thinned tabulations to keep.  Use 0 to turn off the
+                    caching.
+    """
+    if maxsize < 0:
+        raise GalSimValueError("maxsize must be >= 0", maxsize)
+    _thin_cache.resize(maxsize)
 
-    x = np.asarray(x, dtype=float)
-    f = np.asarray(f, dtype=float)
+def _thin_tabulated_values(x, f, rel_err, trim_zeros, preserve_range, fast_search):
+    # The implementation of thin_tabulated_values, without the cache.
+    from . import _galsim
 
     # Check for valid inputs
     if len(x) != len(f):
@@ -466,23 +450,27 @@ def thin_tabulated_values(x, f, rel_err=1.e-4, trim_zeros=True, preserve_range=T
 
     x_range = x[-1] - x[0]
     if not preserve_range:
+        # The integral of each interval, for finding how much we can trim from either end.
+        seg = 0.5 * (abs(f[:-1]) + abs(f[1:])) * (x[1:] - x[:-1])
+        n = len(x)
+
         # Remove values from the front that integrate to less than thresh.
-        err_integ1 = 0.5 * (abs(f[0]) + abs(f[1])) * (x[1] - x[0])
-        k0 = 0
-        while k0 < len(x)-2 and err_integ1 < thresh * (x[k0+1]-x[0]) / x_range:
-            k0 = k0+1
-            err_integ1 += 0.5 * (abs(f[k0]) + abs(f[k0+1])) * (x[k0+1] - x[k0])
-        # Now the integral from 0 to k0+1 (inclusive) is a bit too large.
+        # k0 is the first k < n-2 for which the integral from 0 to k+1 is not less than
+        # thresh * (x[k+1]-x[0]) / x_range, or n-2 if there is no such k.
+        # Then the integral from 0 to k0+1 (inclusive) is a bit too large.
         # That means k0 is the largest value we can use that will work as the starting value.
+        err_integ1 = np.cumsum(seg[:n-2])
+        ok = err_integ1 < thresh * (x[1:n-1]-x[0]) / x_range
+        k0 = np.argmin(ok) if not ok.all() else n-2
 
         # Remove values from the back that integrate to less than thresh.
-        k1 = len(x)-1
-        err_integ2 = 0.5 * (abs(f[k1-1]) + abs(f[k1])) * (x[k1] - x[k1-1])
-        while k1 > k0 and err_integ2 < thresh * (x[-1]-x[k1-1]) / x_range:
-            k1 = k1-1
-            err_integ2 += 0.5 * (abs(f[k1-1]) + abs(f[k1])) * (x[k1] - x[k1-1])
-        # Now the integral from k1-1 to len(x)-1 (inclusive) is a bit too large.
+        # Likewise, k1 is the last k > k0 for which the integral from k-1 to the end is not less
+        # than thresh * (x[-1]-x[k-1]) / x_range, or k0 if there is no such k.
+        # Then the integral from k1-1 to len(x)-1 (inclusive) is a bit too large.
         # That means k1 is the smallest value we can use that will work as the ending value.
+        err_integ2 = np.cumsum(seg[k0:][::-1])
+        ok = err_integ2 < thresh * (x[-1]-x[k0:n-1][::-1]) / x_range
+        k1 = n-1 - np.argmin(ok) if not ok.all() else k0
 
         # Subtract the error so far from thresh
         thresh -= np.trapz(abs(f[:k0]),x[:k0]) + np.trapz(abs(f[k1:]),x[k1:])
@@ -498,17 +486,15 @@ def thin_tabulated_values(x, f, rel_err=1.e-4, trim_zeros=True, preserve_range=T
         return x,f
 
     # Thin interior points.  Start with no interior points and then greedily add them back in one at
-    # a time until relative error goal is met.
-    # Use a heap to track:
-    heap = [(-2*thresh,  # -err; initialize large enough to trigger while loop below.
-             0,          # first index of interval
-             len(x)-1)]  # last index of interval
-    while (-sum(h[0] for h in heap) > thresh):
-        _, left, right = heappop(heap)
-        i, (errleft, errright) = split_fn(x[left:right+1], f[left:right+1])
-        heappush(heap, (-errleft, left, i+left))
-        heappush(heap, (-errright, i+left, right))
-    splitpoints = sorted([0]+[h[2] for h in heap])
+    # a time, splitting the interval with the largest error, until relative error goal is met.
+    # This is done in C++, where each split takes O(N) time in the size of the interval for
+    # fast_search, so O(N log N) in total.
+    x = np.ascontiguousarray(x)
+    f = np.ascontiguousarray(f)
+    splitpoints = np.empty(len(x), dtype=np.int32)
+    nkeep = _galsim.ThinTabulatedValues(x.ctypes.data, f.ctypes.data, len(x), thresh,
+                                        bool(fast_search), splitpoints.ctypes.data)
+    splitpoints = splitpoints[:nkeep]
     return x[splitpoints], f[splitpoints]
 
 def old_thin_tabulated_values(x, f, rel_err=1.e-4, preserve_range=False): # pragma: no cover
@@ -1069,12 +1055,17 @@ class LRU_Cache:
         >>> cache = galsim.utilities.LRU_Cache(slow_function)
         >>> v1 = cache(*k1)  # Returns slow_function(*k1), slowly the first time
         >>> v1 = cache(*k1)  # Returns slow_function(*k1) again, but fast this time.
+
+    The numbers of cache hits and misses are available as the attributes ``hits`` and
+    ``misses``, and together with the size of the cache from `cache_info`.
     """
     def __init__(self, user_function, maxsize=1024):
         # Link layout:     [PREV, NEXT, KEY, RESULT]
         self.root = root = [None, None, None, None]
         self.user_function = user_function
         self.cache = cache = {}
+        self.hits = 0
+        self.misses = 0
 
         last = root
         for i in range(maxsize):
@@ -1088,6 +1079,7 @@ class LRU_Cache:
         link = cache.get(key)
         if link is not None:
             # Cache hit: move link to last position
+            self.hits += 1
             link_prev, link_next, _, result = link
             link_prev[1] = link_next
             link_next[0] = link_prev
@@ -1098,6 +1090,7 @@ class LRU_Cache:
             return result
         # Cache miss: evaluate and insert new key/value at root, then increment root
         #             so that just-evaluated value is in last position.
+        self.misses += 1
         result = self.user_function(*key)
         root = self.root  # re-establish root in case user_function modified it due to recursion
         root[2] = key
@@ -1143,6 +1136,138 @@ class LRU_Cache:
                     root[1][0] = link
                     root[1] = link
 
+    def cache_info(self):
+        """Return a dict with the number of cache ``hits`` and ``misses``, the ``maxsize`` of the
+        cache, and the number of items currently in it, ``currsize``.
+        """
+        # Empty slots are keyed by plain object() instances, real entries by tuples.
+        currsize = sum(1 for key in self.cache if isinstance(key, tuple))
+        return dict(hits=self.hits, misses=self.misses, maxsize=len(self.cache),
+                    currsize=currsize)
+
+    def clear(self):
+        """Remove all items from the cache and reset the hit and miss counts.
+        """
+        self.__init__(self.user_function, len(self.cache))
+
+
+class LRU_Dict(object):
+    """A dict-like cache of the most recently used items, limited both by the number of items and,
+    optionally, by their total size in bytes.
+
+    Unlike `LRU_Cache`, which wraps a function, the values are stored explicitly with
+    ``cache[key] = value`` and looked up with `get`.  When either limit is exceeded, the least
+    recently used items are removed.  The byte limit always leaves at least the most recently
+    added item in the cache.
+
+    Parameters:
+        maxsize:    Maximum number of items to cache.  Use 0 to not store anything.
+                    [default: 1024]
+        max_bytes:  Maximum total size in bytes of the cached values, or 0 for no limit.
+                    [default: 0]
+        nbytes:     A function that returns the size in bytes of a cached value.  The sizes are
+                    recomputed whenever they are needed, so they may change after an item is
+                    added (e.g. for objects that build their arrays lazily).  [default: None,
+                    which means the sizes are not tracked]
+
+    Example::
+
+        >>> cache = galsim.utilities.LRU_Dict(maxsize=10, max_bytes=2**20,
+        ...                                   nbytes=lambda a: a.nbytes)
+        >>> arr = cache.get(key)
+        >>> if arr is None:
+        ...     arr = cache[key] = make_array(key)
+    """
+    def __init__(self, maxsize=1024, max_bytes=0, nbytes=None):
+        if maxsize < 0:
+            raise GalSimValueError("Invalid maxsize", maxsize)
+        if max_bytes < 0:
+            raise GalSimValueError("Invalid max_bytes", max_bytes)
+        self._cache = OrderedDict()  # Ordered from least to most recently used.
+        self._nbytes = nbytes
+        self.maxsize = maxsize
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key, default=None):
+        """Return the value for ``key``, marking it as the most recently used item, or
+        ``default`` if it isn't in the cache.
+        """
+        if key in self._cache:
+            self.hits += 1
+            value = self._cache.pop(key)
+            self._cache[key] = value
+            return value
+        self.misses += 1
+        return default
+
+    def __setitem__(self, key, value):
+        self._cache.pop(key, None)
+        self._cache[key] = value
+        self._trim()
+
+    def __contains__(self, key):
+        return key in self._cache
+
+    def __len__(self):
+        return len(self._cache)
+
+    @property
+    def nbytes(self):
+        """The total size in bytes of the cached values.
+        """
+        if self._nbytes is None:
+            return 0
+        return sum(self._nbytes(value) for value in self._cache.values())
+
+    def _trim(self):
+        while len(self._cache) > self.maxsize:
+            self._cache.popitem(last=False)
+        if self.max_bytes and self._nbytes is not None:
+            nbytes = self.nbytes
+            while len(self._cache) > 1 and nbytes > self.max_bytes:
+                _, value = self._cache.popitem(last=False)
+                nbytes -= self._nbytes(value)
+
+    def resize(self, maxsize=None, max_bytes=None):
+        """Change the limits of the cache, removing the least recently used items as needed.
+
+        Parameters:
+            maxsize:    The new maximum number of items. [default: None, which means to leave
+                        the current value unchanged]
+            max_bytes:  The new maximum total size in bytes, or 0 for no limit. [default: None,
+                        which means to leave the current value unchanged]
+        """
+        if maxsize is not None:
+            if maxsize < 0:
+                raise GalSimValueError("Invalid maxsize", maxsize)
+            self.maxsize = maxsize
+        if max_bytes is not None:
+            if max_bytes < 0:
+                raise GalSimValueError("Invalid max_bytes", max_bytes)
+            self.max_bytes = max_bytes
+        self._trim()
+
+    def cache_info(self):
+        """Return a dict with the number of cache ``hits`` and ``misses``, the ``maxsize`` and
+        ``max_bytes`` limits, the number of items currently in the cache, ``currsize``, and their
+        total size in bytes, ``nbytes``.
+        """
+        return dict(hits=self.hits, misses=self.misses, maxsize=self.maxsize,
+                    max_bytes=self.max_bytes, currsize=len(self._cache), nbytes=self.nbytes)
+
+    def clear(self):
+        """Remove all items from the cache and reset the hit and miss counts.
+        """
+        self._cache.clear()
+        self.hits = 0
+        self.misses = 0
+
+
+# The cache of results from thin_tabulated_values.
+_thin_cache = LRU_Dict(maxsize=100)
+
 
 @contextmanager
 def printoptions(*args, **kwargs):
@@ -1170,6 +1295,21 @@ def printoptions(*args, **kwargs):
         np.set_printoptions(**original)
 
 
+def _content_repr(obj):
+    """Return a repr of obj that fully describes its content, or None if there isn't one.
+
+    Any numpy arrays in the repr are written out in full, with enough digits to recover each
+    value exactly, rather than being summarized with ``...`` as numpy does by default.  If the
+    repr is still not a complete description of the object, e.g. because it includes the address
+    of some object or a repr that abbreviates its contents, then None is returned.
+    """
+    with printoptions(threshold=sys.maxsize, floatmode='unique'):
+        s = repr(obj)
+    if ' at 0x' in s or '...' in s:
+        return None
+    return s
+
+
 _pickle_shared = False
 
 @contextmanager
@@ -1795,6 +1935,71 @@ def ensure_dir(target):
                       "name already exists" % dir)
 
 
+@contextmanager
+def atomic_write(file_name):
+    """A context manager for writing a file that other processes may try to read at the same time.
+
+    The file is written under a temporary name, which is then renamed to ``file_name`` at the
+    end of the ``with`` block, so other processes never see a partially written file.  If the
+    block raises an exception, the temporary file is removed instead.  The directory of the file
+    is created if necessary.
+
+    Example::
+
+        >>> with galsim.utilities.atomic_write(file_name) as tmp_file:
+        ...     with open(tmp_file, 'wb') as fout:
+        ...         np.save(fout, data)
+
+    Parameters:
+        file_name:  The name of the file to write.
+
+    Returns:
+        the temporary file name to write to.
+    """
+    import threading
+    ensure_dir(file_name)
+    tmp_file = file_name + '.%d.%d.tmp'%(os.getpid(), threading.current_thread().ident)
+    try:
+        yield tmp_file
+        os.rename(tmp_file, file_name)
+    finally:
+        if os.path.exists(tmp_file):
+            os.remove(tmp_file)
+
+
+# The directories of the disk caches, keyed by the kind of cache.  See get_cache_dir.
+cache_dirs = {}
+
+def get_cache_dir(kind, cache_dir=None):
+    """Return the directory of the disk cache of a given kind, or None if there is none.
+
+    Some classes save data that are expensive to compute or read in a cache directory, so
+    that other processes can read them from there rather than repeating the work.  The kinds of
+    disk caches are:
+
+        - 'silicon': the vertex data of the `SiliconSensor` models.
+        - 'table': the lookup tables of `SecondKick` and `VonKarman`.
+        - 'effective_prof': the effective profiles made by `ChromaticConvolution.drawImage`.
+
+    The directory for each kind is ``galsim.utilities.cache_dirs[kind]`` if this is set (where
+    None means not to use a disk cache), or else the value of the environment variable
+    GALSIM_<KIND>_CACHE_DIR, e.g. GALSIM_TABLE_CACHE_DIR.  If neither is set, there is no disk
+    cache.
+
+    Parameters:
+        kind:       The kind of disk cache.
+        cache_dir:  A directory to use instead, if not None. [default: None]
+
+    Returns:
+        the directory name or None.
+    """
+    if cache_dir is not None:
+        return cache_dir
+    if kind in cache_dirs:
+        return cache_dirs[kind]
+    return os.environ.get('GALSIM_%s_CACHE_DIR'%kind.upper(), None)
+
+
 def find_out_of_bounds_position(x, y, bounds, grid=False):
     """Given arrays of x and y values that are known to contain at least one
     position that is out-of-bounds of the given bounds instance, return one
@@ -1864,3 +2069,10 @@ def set_omp_threads(num_threads, logger=None):
             logger.warning("Unable to use multiple threads, since OpenMP is not enabled.")
 
     return num_threads
+
+def get_omp_threads():
+    """Get the current number of OpenMP threads to be used in the C++ layer.
+
+    :returns:           The number of threads OpenMP reports that it will use.
+    """
+    return _galsim.GetOMPThreads()
@@ -26,6 +26,7 @@ from .position import PositionD
 from .angle import arcsec, AngleUnit
 from .errors import GalSimError, convert_cpp_errors, galsim_warn
 from .errors import GalSimIncompatibleValuesError
+from .table import _load_cached_tables, _table_cache_info
 
 
 class VonKarman(GSObject):
@@ -66,6 +67,12 @@ class VonKarman(GSObject):
         drawing using method='fft'.  If for some reason you want to keep the delta function
         though, then you can pass the do_delta=True argument to the VonKarman initializer.
 
+    The lookup tables for this profile depend only on ``lam/r0``, ``L0/r0``, ``do_delta`` and
+    ``gsparams``, and they are shared by all VonKarman instances in a process.  If there is a
+    'table' disk cache directory (cf. `utilities.get_cache_dir`), they are also saved in that
+    directory, so other processes read them rather than computing them again.  See `VonKarman.prewarm_cache` and
+    `VonKarman.table_cache_info`.
+
     Parameters:
         lam:                Wavelength in nanometers.
         r0:                 Fried parameter at specified wavelength ``lam`` in meters.  Exactly one
@@ -133,6 +140,7 @@ class VonKarman(GSObject):
     @lazy_property
     def _sbvk(self):
         with convert_cpp_errors():
+            _load_vk_tables(self._lam, self._r0, self._L0, self._do_delta, self._gsparams)
             sbvk = _galsim.SBVonKarman(self._lam, self._r0, self._L0, self._flux,
                                        self._scale, self._do_delta, self._gsparams._gsp)
 
@@ -149,6 +157,68 @@ class VonKarman(GSObject):
                                            self._do_delta, self._gsparams._gsp)
         return sbvk
 
+    @staticmethod
+    def prewarm_cache(lam, r0=None, r0_500=None, L0=25.0, do_delta=False, gsparams=None,
+                      cache_dir=None):
+        """Compute the lookup tables for a given set of parameters ahead of time.
+
+        Calling this function in the parent process before starting worker processes means that
+        the workers (at least those that are forked) start with these tables already available.
+        If ``cache_dir`` is given (or there is a 'table' disk cache directory), the tables are
+        also saved there, or read from there if some other process already saved them.
+
+        Parameters:
+            lam:        Wavelength in nanometers.
+            r0:         Fried parameter at specified wavelength ``lam`` in meters.  Exactly one
+                        of r0 and r0_500 should be specified.
+            r0_500:     Fried parameter at 500 nm in meters.  Exactly one of r0 and r0_500
+                        should be specified.
+            L0:         Outer scale in meters.  [default: 25.0]
+            do_delta:   Include delta-function at origin?  [default: False]
+            gsparams:   An optional `GSParams` argument. [default: None]
+            cache_dir:  A directory in which to save the tables.  [default: None, which means to
+                        use ``galsim.utilities.get_cache_dir('table')``]
+
+        Returns:
+            the name of the cache file, or None if no cache directory is being used.
+        """
+        # This needs to match the processing of these parameters in the constructor.
+        if r0 is not None and r0_500 is not None:
+            raise GalSimIncompatibleValuesError(
+                "Only one of r0 and r0_500 may be specified",
+                r0=r0, r0_500=r0_500)
+        if r0 is None and r0_500 is None:
+            raise GalSimIncompatibleValuesError(
+                "Either r0 or r0_500 must be specified",
+                r0=r0, r0_500=r0_500)
+        if r0_500 is not None:
+            r0 = r0_500 * (lam/500.)**1.2
+        lam = float(lam)
+        r0 = float(r0)
+        L0 = float(min(L0, 1e10))
+        do_delta = bool(do_delta)
+        gsparams = GSParams.check(gsparams)
+        with convert_cpp_errors():
+            file_name = _load_vk_tables(lam, r0, L0, do_delta, gsparams, cache_dir)
+            if file_name is None:
+                _galsim.GetVonKarmanTables(lam, r0, L0, do_delta, gsparams._gsp)
+        return file_name
+
+    @staticmethod
+    def table_cache_info(cache_dir=None):
+        """Return information about the cached VonKarman lookup tables.
+
+        Parameters:
+            cache_dir:  The directory of the disk cache.  [default: None, which means to use
+                        ``galsim.utilities.get_cache_dir('table')``]
+
+        Returns:
+            a dict with the number of sets of tables in memory (currsize), the cache directory
+            (cache_dir), and the number of files (disk_files) and their total size in bytes
+            (disk_bytes) in the cache directory.
+        """
+        return _table_cache_info('vonkarman', _galsim.VonKarmanCacheSize(), cache_dir)
+
     @lazy_property
     def _sbp(self):
         # Add in a delta function with appropriate amplitude if requested.
@@ -293,3 +363,13 @@ class VonKarman(GSObject):
         return VonKarman(lam=self.lam, r0=self.r0, L0=self.L0, flux=flux,
                          scale_unit=self.scale_unit, do_delta=self.do_delta,
                          suppress_warning=self._suppress, gsparams=self.gsparams)
+
+def _load_vk_tables(lam, r0, L0, do_delta, gsparams, cache_dir=None):
+    gsp = gsparams._gsp
+    # The C++ tables are keyed by lam/r0 and L0/r0 (computed the same way as here).
+    return _load_cached_tables(
+        'vonkarman', (1e-9*lam/r0, L0/r0, do_delta, gsparams),
+        lambda: _galsim.HasVonKarmanTables(lam, r0, L0, do_delta, gsp),
+        lambda: _galsim.GetVonKarmanTables(lam, r0, L0, do_delta, gsp),
+        lambda data, n: _galsim.SetVonKarmanTables(lam, r0, L0, do_delta, gsp, data, n),
+        cache_dir)
@@ -18,7 +18,7 @@
 
 import numpy as np
 
-from .utilities import LRU_Cache, binomial, horner2d, nCr, lazy_property
+from .utilities import LRU_Cache, LRU_Dict, binomial, horner2d, nCr, lazy_property
 from .errors import GalSimValueError, GalSimRangeError
 
 # Some utilities for working with Zernike polynomials
@@ -700,6 +700,114 @@ class Zernike(object):
         return out
 
 
+class ZernikeBatch(object):
+    """A set of Zernike polynomial series with the same ``R_outer`` and ``R_inner``, which are
+    evaluated together at the same points.
+
+    This is useful when many sets of coefficients need to be evaluated on the same grid, e.g. the
+    wavefronts of an optical system at many positions on the focal plane.  Rather than evaluating
+    each series separately, the Zernike basis (and its gradient) is evaluated once at the given
+    points, and the series are then all evaluated together as a single matrix product.  The bases
+    for the most recent few sets of points are cached (keyed by the values of x and y, not just
+    their identity), so evaluating another batch on the same points skips that step as well.
+
+    For example::
+
+        >>> coefs = np.array([aberrations(pos) for pos in positions])  # [npos, jmax+1]
+        >>> batch = galsim.zernike.ZernikeBatch(coefs, R_outer=diam/2)
+        >>> wf = batch.evalCartesian(aper.u, aper.v)        # [npos, npix, npix]
+        >>> dwdx, dwdy = batch.evalCartesianGrad(aper.u, aper.v)
+
+    Each slice ``wf[i]`` is the same as ``batch[i].evalCartesian(aper.u, aper.v)`` up to rounding
+    errors, where ``batch[i]`` is the `Zernike` with coefficients ``coefs[i]``.
+
+    Parameters:
+        coefs:      Zernike series coefficients as a 2-d array-like, with one row per series.
+                    As for `Zernike`, ``coefs[i,j]`` corresponds to Z_j under the Noll index
+                    convention, and ``coefs[:,0]`` is ignored.
+        R_outer:    Outer radius.  [default: 1.0]
+        R_inner:    Inner radius.  [default: 0.0]
+    """
+    def __init__(self, coefs, R_outer=1.0, R_inner=0.0):
+        self.coefs = np.array(coefs, dtype=float)
+        if self.coefs.ndim != 2:
+            raise GalSimValueError("coefs must be a 2-d array.", coefs)
+        if self.coefs.shape[1] <= 1:
+            self.coefs = np.zeros((self.coefs.shape[0], 2), dtype=float)
+        self.R_outer = float(R_outer)
+        self.R_inner = float(R_inner)
+
+    @property
+    def jmax(self):
+        """The maximum Noll index of the series.
+        """
+        return self.coefs.shape[1]-1
+
+    def __len__(self):
+        return len(self.coefs)
+
+    def __getitem__(self, i):
+        """The `Zernike` series of the ith set of coefficients.
+        """
+        return Zernike(self.coefs[i], R_outer=self.R_outer, R_inner=self.R_inner)
+
+    def _eval(self, basis, shape):
+        # basis is [jmax+1, npoints]; the 0th row is zero, so skip it.
+        out = np.dot(self.coefs[:,1:], basis[1:])
+        return out.reshape((len(self),) + shape)
+
+    def evalCartesian(self, x, y):
+        """Evaluate all the Zernike polynomial series at Cartesian coordinates x and y.
+
+        Parameters:
+            x:    x-coordinate of evaluation points.  Can be list-like.
+            y:    y-coordinate of evaluation points.  Can be list-like.
+
+        Returns:
+            Series evaluations as numpy array with shape [len(self), x.shape].
+        """
+        grid = _ZernikeGrid(x, y)
+        basis = _zernike_basis(self.jmax, grid, self.R_outer, self.R_inner)
+        return self._eval(basis, grid.shape)
+
+    def evalCartesianGrad(self, x, y):
+        """Evaluate the gradient of all the Zernike polynomial series at Cartesian coordinates
+        x and y.
+
+        Parameters:
+            x:    x-coordinate of evaluation points.  Can be list-like.
+            y:    y-coordinate of evaluation points.  Can be list-like.
+
+        Returns:
+            Tuple of arrays for x-gradient and y-gradient, each with shape [len(self), x.shape].
+        """
+        grid = _ZernikeGrid(x, y)
+        dx, dy = _zernike_grad_bases(self.jmax, grid, self.R_outer, self.R_inner)
+        return self._eval(dx, grid.shape), self._eval(dy, grid.shape)
+
+    def __eq__(self, other):
+        return (self is other or
+                (isinstance(other, ZernikeBatch) and
+                 np.array_equal(self.coefs, other.coefs) and
+                 self.R_outer == other.R_outer and
+                 self.R_inner == other.R_inner))
+
+    def __hash__(self):
+        return hash(("galsim.ZernikeBatch", self.coefs.shape, tuple(self.coefs.ravel()),
+                     self.R_outer, self.R_inner))
+
+    def __repr__(self):
+        out = "galsim.zernike.ZernikeBatch("
+        # Use tolist() to get the full precision of the coefficients.
+        out += "array({!r})".format(self.coefs.tolist())
+        if self.R_outer != 1.0:
+            out += ", R_outer={!r}".format(self.R_outer)
+        if self.R_inner != 0.0:
+            out += ", R_inner={!r}".format(self.R_inner)
+        out += ")"
+        return out
+
+
 def zernikeRotMatrix(jmax, theta):
     """Construct Zernike basis rotation matrix.  This matrix can be used to convert a set of Zernike
     polynomial series coefficients expressed in one coordinate system to an equivalent set of
@@ -805,3 +913,83 @@ def zernikeBasis(jmax, x, y, R_outer=1.0, R_inner=0.0):
     out[1:] = np.array([horner2d(x/R_outer, y/R_outer, nc, dtype=float)
                         for nc in noll_coef.transpose(2,0,1)])
     return out
+
+
+def zernikeGradBases(jmax, x, y, R_outer=1.0, R_inner=0.0):
+    """Construct bases of Zernike polynomial series gradients up to Noll index ``jmax``, evaluated
+    at a specific set of points ``x`` and ``y``.
+
+    Note that since we follow the Noll indexing scheme for Zernike polynomials, which begins at 1,
+    but python sequences are indexed from 0, the length of the second dimension in the result is
+    ``jmax+1`` instead of ``jmax``.  As for `zernikeBasis`, the 0th slice along this dimension is
+    filled with 0s.
+
+    Parameters:
+         jmax:      Maximum Noll index to use.
+         x:         x-coordinates (can be list-like, congruent to y)
+         y:         y-coordinates (can be list-like, congruent to x)
+         R_outer:   Outer radius.  [default: 1.0]
+         R_inner:   Inner radius.  [default: 0.0]
+
+    Returns:
+        [2, jmax+1, x.shape] array.  The first index selects the x or y derivative.  Slicing over
+        the second index gives basis vectors corresponding to individual Zernike polynomials.
+    """
+    R_outer = float(R_outer)
+    R_inner = float(R_inner)
+    eps = R_inner / R_outer
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+
+    out = np.zeros(tuple((2, jmax+1)+x.shape), dtype=float)
+    for k, noll_coef in enumerate([_noll_coef_array_xy_gradx(jmax, eps),
+                                   _noll_coef_array_xy_grady(jmax, eps)]):
+        out[k, 1:] = np.array([horner2d(x/R_outer, y/R_outer, nc, dtype=float)
+                               for nc in noll_coef.transpose(2,0,1)])
+    # df/dx = df/d(x/R) * d(x/R)/dx = df/d(x/R) * 1/R
+    out /= R_outer
+    return out
+
+
+class _ZernikeGrid(object):
+    # The points at which to evaluate the bases for ZernikeBatch, hashed by their values, so the
+    # bases can be cached even when the same grid is remade as a new array.
+    def __init__(self, x, y):
+        import hashlib
+        self.x = np.ascontiguousarray(x, dtype=float)
+        self.y = np.ascontiguousarray(y, dtype=float)
+        if self.x.shape != self.y.shape:
+            raise GalSimValueError("x and y must have the same shape.", (x, y))
+        self.shape = self.x.shape
+        self._hash = hash((self.shape, hashlib.md5(self.x).hexdigest(),
+                           hashlib.md5(self.y).hexdigest()))
+
+    def __hash__(self):
+        return self._hash
+
+    def __eq__(self, other):
+        return (self is other or
+                (isinstance(other, _ZernikeGrid) and self._hash == other._hash and
+                 np.array_equal(self.x, other.x) and np.array_equal(self.y, other.y)))
+
+# The bases used by ZernikeBatch.  These can be large, so the caches are limited by their total
+# size in bytes as well as by the number of grids.
+_zernike_basis_cache = LRU_Dict(maxsize=4, max_bytes=2**28, nbytes=lambda basis: basis.nbytes)
+_zernike_grad_bases_cache = LRU_Dict(maxsize=4, max_bytes=2**28,
+                                     nbytes=lambda bases: bases[0].nbytes + bases[1].nbytes)
+
+def _zernike_basis(jmax, grid, R_outer, R_inner):
+    key = (jmax, grid, R_outer, R_inner)
+    basis = _zernike_basis_cache.get(key)
+    if basis is None:
+        basis = zernikeBasis(jmax, grid.x.ravel(), grid.y.ravel(), R_outer, R_inner)
+        _zernike_basis_cache[key] = basis
+    return basis
+
+def _zernike_grad_bases(jmax, grid, R_outer, R_inner):
+    key = (jmax, grid, R_outer, R_inner)
+    bases = _zernike_grad_bases_cache.get(key)
+    if bases is None:
+        bases = zernikeGradBases(jmax, grid.x.ravel(), grid.y.ravel(), R_outer, R_inner)
+        _zernike_grad_bases_cache[key] = bases
+    return bases
@@ -813,6 +813,26 @@ namespace galsim {
     void cfft(const BaseImage<T>& in, ImageView<std::complex<double> > out,
               bool inverse, bool shift_in=true, bool shift_out=true);
 
+    /**
+     *  @brief Compute the power spectra of a batch of sparsely filled complex images.
+     *
+     *  For each of nbatch images, the nvals values for that image are placed at the given
+     *  (flat, row-major) indices of an otherwise zero Ny x Nx image.  The images are all Fourier
+     *  transformed together, and |FT|^2 for each is written to out, with the zero frequency at
+     *  (Nx/2, Ny/2).  This is equivalent to abs(fft2(im, shift_in, shift_out))**2, since
+     *  shift_in only changes the sign of the output values.
+     *
+     *  @param[in] vals         The values to place in the images.  (nbatch x nvals)
+     *  @param[in] index        The flat index in each image of each value.  (nvals)
+     *  @param[in] nvals        The number of values in each image.
+     *  @param[in] nbatch       The number of images.
+     *  @param[in] Nx           The size of the images in x.  Must be even.
+     *  @param[in] Ny           The size of the images in y.  Must be even.
+     *  @param[out] out         The output power spectra.  (nbatch x Ny x Nx)
+     */
+    void powerSpectra(const std::complex<double>* vals, const int* index, int nvals,
+                      int nbatch, int Nx, int Ny, double* out);
+
     /**
      *  @brief Wrap the full image onto a subset of the image and return that subset.
      *
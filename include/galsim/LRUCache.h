@@ -196,6 +196,33 @@ namespace galsim {
             }
         }
 
+        /**
+         * @brief Add a Value that was built some other way (e.g. restored from a file).
+         *
+         * If there is already a Value for this Key, it is replaced.
+         */
+        void set(const Key& key, shared_ptr<Value> value)
+        {
+            MapIter iter = _cache.find(key);
+            if (iter != _cache.end()) {
+                _entries.erase(iter->second);
+                _cache.erase(iter);
+            }
+            while (_entries.size() >= _nmax) {
+                _cache.erase(_entries.back().first);
+                _entries.pop_back();
+            }
+            _entries.push_front(Entry(key,value));
+            _cache[key] = _entries.begin();
+            assert(_entries.size() == _cache.size());
+        }
+
+        /// @brief Whether there is a Value for this Key in the cache.
+        bool has(const Key& key) const { return _cache.find(key) != _cache.end(); }
+
+        /// @brief The number of Values currently in the cache.
+        size_t size() const { return _entries.size(); }
+
     private:
 
         size_t _nmax;
@@ -223,6 +223,43 @@ namespace galsim {
          */
         void convolveShuffle(const PhotonArray& rhs, BaseDeviate rng);
 
+        /**
+         * @brief Apply a fused sequence of the standard surface operations in a single pass.
+         *
+         * This implements the combined effect of WavelengthSampler, FRatioAngles and PhotonDCR
+         * (in that order), each of which is optional.  The random numbers are not generated here.
+         * Rather, on input the wavelength array holds uniform deviates if wave_cdf is given and
+         * the dxdz, dydz arrays hold uniform deviates if do_angles is true.  These are converted
+         * in place into wavelengths and directions.
+         *
+         * The DCR refraction uses the same formulae as galsim.dcr.get_refraction with the
+         * pressure and water vapor terms precomputed into pfactor and wfactor.
+         *
+         * @param[in] wave_cdf          Cumulative probability of the wavelength distribution at
+         *                              each of the wave_vals, or NULL to use the existing
+         *                              wavelengths.
+         * @param[in] wave_vals         The wavelengths at which wave_cdf is tabulated.
+         * @param[in] nwave             The size of the wave_cdf and wave_vals arrays.
+         * @param[in] wave_factor       Factor to multiply the sampled wavelengths by (1+z).
+         * @param[in] do_angles         Whether to assign directions from the uniform deviates.
+         * @param[in] sin_obs           Sine of the obscuration angle.
+         * @param[in] sin_pupil         Sine of the pupil angle.
+         * @param[in] do_dcr            Whether to apply DCR.
+         * @param[in] alpha             Power law index for the chromatic seeing.
+         * @param[in] base_wave         Wavelength of the fiducial photon positions.
+         * @param[in] cenx, ceny        Center about which to apply the chromatic seeing.
+         * @param[in] tan_zenith        Tangent of the zenith angle.
+         * @param[in] base_refraction   Refraction at base_wave.
+         * @param[in] pfactor           Pressure term of the refractive index.
+         * @param[in] wfactor           Water vapor term of the refractive index.
+         * @param[in] ax, ay            Change in x,y per radian of refraction.
+         */
+        void applySurfaceOps(const double* wave_cdf, const double* wave_vals, int nwave,
+                             double wave_factor, bool do_angles, double sin_obs, double sin_pupil,
+                             bool do_dcr, double alpha, double base_wave, double cenx, double ceny,
+                             double tan_zenith, double base_refraction,
+                             double pfactor, double wfactor, double ax, double ay);
+
         /**
          * @brief Add flux of photons to an image by binning into pixels.
          *
@@ -287,6 +324,25 @@ namespace galsim {
         std::vector<double> _vflux;
     };
 
+    /**
+     * @brief Convert uniform deviates into draws from a tabulated distribution.
+     *
+     * The cumulative distribution is inverted by linear interpolation, using a guide table to
+     * find the right interval for each value quickly.  This is the same calculation that
+     * PhotonArray::applySurfaceOps uses for the wavelengths.
+     *
+     * @param[in,out] u         On input, uniform deviates in [0,1).  On output, the sampled
+     *                          values times factor.
+     * @param[in] n             The size of the u array.
+     * @param[in] cdf           Cumulative probability at each of vals.  Must start at 0 and
+     *                          end at 1.
+     * @param[in] vals          The values at which cdf is tabulated.
+     * @param[in] ncdf          The size of the cdf and vals arrays.
+     * @param[in] factor        Factor by which to multiply the sampled values.
+     */
+    void SampleInverseCDF(double* u, int n, const double* cdf, const double* vals, int ncdf,
+                          double factor);
+
 } // end namespace galsim
 
 #endif
@@ -64,6 +64,24 @@ namespace galsim {
 
         double structureFunction(double) const;
 
+        /**
+         * The lookup tables for a given kcrit and gsparams are shared by all SBSecondKick
+         * instances through a cache.  These functions let the Python layer save the tables
+         * to a disk cache and restore them from there, rather than computing them again.
+         *
+         * hasTables returns whether the tables are currently in the cache.
+         * getTables returns the tables as a string of space-separated values, computing them
+         * if necessary.
+         * setTables builds the tables from the values in such a string and adds them to the
+         * cache.
+         * cacheSize returns the number of sets of tables in the cache.
+         */
+        static bool hasTables(double kcrit, const GSParamsPtr& gsparams);
+        static std::string getTables(double kcrit, const GSParamsPtr& gsparams);
+        static void setTables(double kcrit, const GSParamsPtr& gsparams,
+                              const double* data, int n);
+        static int cacheSize();
+
     protected:
 
         class SBSecondKickImpl;
@@ -41,6 +41,7 @@ namespace galsim {
     {
     public:
         SKInfo(double kcrit, const GSParamsPtr& gsparams);
+        SKInfo(double kcrit, const GSParamsPtr& gsparams, const double* data, int n);
         ~SKInfo() {}
 
         double stepK() const { return _stepk; }
@@ -55,6 +56,8 @@ namespace galsim {
         double structureFunction(double rho) const;
         void shoot(PhotonArray& photons, UniformDeviate ud) const;
 
+        std::string getTables() const;
+
     private:
         SKInfo(const SKInfo& rhs); ///<Hide the copy constructor
         void operator=(const SKInfo& rhs); ///<Hide the assignment operator
@@ -72,6 +75,7 @@ namespace galsim {
 
         void _buildRadial();
         void _buildKVLUT();
+        void _buildSampler();
     };
 
     //
@@ -119,6 +123,11 @@ namespace galsim {
 
         std::string serialize() const;
 
+        static bool hasInfo(double kcrit, const GSParamsPtr& gsparams);
+        static shared_ptr<SKInfo> getInfo(double kcrit, const GSParamsPtr& gsparams);
+        static void setInfo(double kcrit, const GSParamsPtr& gsparams, shared_ptr<SKInfo> info);
+        static int cacheSize();
+
     private:
 
         double _lam_over_r0;
@@ -67,6 +67,27 @@ namespace galsim {
 
         double structureFunction(double) const;
 
+        /**
+         * The lookup tables for a given lam/r0, L0/r0, doDelta and gsparams are shared by all
+         * SBVonKarman instances through a cache.  These functions let the Python layer save the
+         * tables to a disk cache and restore them from there, rather than computing them again.
+         * The arguments are the same as for the constructor.
+         *
+         * hasTables returns whether the tables are currently in the cache.
+         * getTables returns the tables as a string of space-separated values, computing them
+         * if necessary.
+         * setTables builds the tables from the values in such a string and adds them to the
+         * cache.
+         * cacheSize returns the number of sets of tables in the cache.
+         */
+        static bool hasTables(double lam, double r0, double L0, bool doDelta,
+                              const GSParams& gsparams);
+        static std::string getTables(double lam, double r0, double L0, bool doDelta,
+                                     const GSParams& gsparams);
+        static void setTables(double lam, double r0, double L0, bool doDelta,
+                              const GSParams& gsparams, const double* data, int n);
+        static int cacheSize();
+
         friend class VKXIntegrand;
 
     protected:
@@ -40,6 +40,8 @@ namespace galsim {
     {
     public:
         VonKarmanInfo(double lam, double L0, bool doDelta, const GSParamsPtr& gsparams);
+        VonKarmanInfo(double lam, double L0, bool doDelta, const GSParamsPtr& gsparams,
+                      const double* data, int n);
 
         ~VonKarmanInfo() {}
 
@@ -56,6 +58,8 @@ namespace galsim {
         double kValueNoTrunc(double) const;
         double rawXValue(double) const;
 
+        std::string getTables() const;
+
     private:
         VonKarmanInfo(const VonKarmanInfo& rhs); ///<Hide the copy constructor
         void operator=(const VonKarmanInfo& rhs); ///<Hide the assignment operator
@@ -78,6 +82,7 @@ namespace galsim {
         shared_ptr<OneDimensionalDeviate> _sampler;
 
         void _buildRadialFunc();
+        void _buildSampler();
     };
 
     //
@@ -152,6 +157,14 @@ namespace galsim {
 
         std::string serialize() const;
 
+        typedef Tuple<double,double,bool,GSParamsPtr> CacheKey;
+        static CacheKey makeKey(double lam, double r0, double L0, bool doDelta,
+                                const GSParams& gsparams);
+        static bool hasInfo(const CacheKey& key);
+        static shared_ptr<VonKarmanInfo> getInfo(const CacheKey& key);
+        static void setInfo(const CacheKey& key, shared_ptr<VonKarmanInfo> info);
+        static int cacheSize();
+
     private:
 
         double _lam;
@@ -52,6 +52,15 @@ namespace galsim
         template <typename T>
         void updatePixelDistortions(ImageView<T> target);
 
+        // Precompute the tree ring displacements of the pixel vertices for all pixels in the
+        // given bounds, given in the original image coordinates.  addTreeRingDistortions reads
+        // from these values whenever the target image falls within these bounds.
+        void initializeTreeRings(const Bounds<int>& bounds);
+
+        // Calculate the tree ring displacements of the vertices of pixel (i,j), given in the
+        // original image coordinates, into d[0.._nv-1].
+        void calculateTreeRingDisplacements(int i, int j, Point* d) const;
+
         template <typename T>
         void addTreeRingDistortions(ImageView<T> target, Position<int> orig_center);
 
@@ -71,6 +80,8 @@ namespace galsim
         double _nrecalc, _diffStep, _pixelSize, _sensorThickness;
         Table _tr_radial_table;
         Position<double> _treeRingCenter;
+        Bounds<int> _treeRingBounds;
+        std::vector<Point> _treeRingDisplacements;
         Table _abs_length_table;
         bool _transpose;
         double _resume_next_recalc;
@@ -78,6 +89,7 @@ namespace galsim
     };
 
     int SetOMPThreads(int num_threads);
+    int GetOMPThreads();
 
 }
 
@@ -37,6 +37,17 @@ namespace galsim {
     // Used by LookupTable2D in Python.  Defined in Table.cpp
     void WrapArrayToPeriod(double* x, int n, double x0, double period);
 
+    // Used by AtmosphericScreen in Python.  Defined in Table.cpp
+    void SumWrappedGradients(const double* u, const double* v, const double* t,
+                             double* dfdx, double* dfdy, int n, int nlayers,
+                             const double* const* xargs, const double* const* yargs,
+                             const double* const* vals, const int* nx, const int* ny,
+                             const double* params);
+
+    // Used by thin_tabulated_values in Python.  Defined in Table.cpp
+    int ThinTabulatedValues(const double* x, const double* f, int n, double thresh,
+                            bool fast_search, int* index);
+
     class Interpolant;
 
     /**
@@ -105,6 +116,13 @@ namespace galsim {
 
         void finalize();
 
+        /// Write the entries to os as the number of entries followed by the args and the vals.
+        void write(std::ostream& os) const;
+
+        /// Read entries in the format written by write() from data and finalize the table.
+        /// Returns a pointer to the first value after the ones that were read.
+        const double* read(const double* data, const double* end);
+
     private:
 
         bool _final;
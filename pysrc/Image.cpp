@@ -59,6 +59,15 @@ namespace galsim {
         GALSIM_DOT def("invertImage", invert_func_type(&invertImage));
     }
 
+    static void _powerSpectra(size_t ivals, size_t iindex, int nvals, int nbatch,
+                              int Nx, int Ny, size_t iout)
+    {
+        const std::complex<double>* vals = reinterpret_cast<const std::complex<double>*>(ivals);
+        const int* index = reinterpret_cast<const int*>(iindex);
+        double* out = reinterpret_cast<double*>(iout);
+        powerSpectra(vals, index, nvals, nbatch, Nx, Ny, out);
+    }
+
     void pyExportImage(PY_MODULE& _galsim)
     {
         WrapImage<uint16_t>(_galsim, "US");
@@ -71,6 +80,7 @@ namespace galsim {
         WrapImage<std::complex<float> >(_galsim, "CF");
 
         GALSIM_DOT def("goodFFTSize", &goodFFTSize);
+        GALSIM_DOT def("powerSpectra", &_powerSpectra);
     }
 
 } // namespace galsim
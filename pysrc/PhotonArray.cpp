@@ -43,12 +43,40 @@ namespace galsim {
         return new PhotonArray(N, x, y, flux, dxdz, dydz, wave, is_corr);
     }
 
+    static void ApplySurfaceOps(PhotonArray& photons, size_t iwave_cdf, size_t iwave_vals,
+                                int nwave, double wave_factor,
+                                bool do_angles, double sin_obs, double sin_pupil,
+                                bool do_dcr, double alpha, double base_wave,
+                                double cenx, double ceny, double tan_zenith,
+                                double base_refraction, double pfactor, double wfactor,
+                                double ax, double ay)
+    {
+        const double* wave_cdf = reinterpret_cast<const double*>(iwave_cdf);
+        const double* wave_vals = reinterpret_cast<const double*>(iwave_vals);
+        photons.applySurfaceOps(wave_cdf, wave_vals, nwave, wave_factor,
+                                do_angles, sin_obs, sin_pupil,
+                                do_dcr, alpha, base_wave, cenx, ceny, tan_zenith,
+                                base_refraction, pfactor, wfactor, ax, ay);
+    }
+
+    static void _SampleInverseCDF(size_t iu, int n, size_t icdf, size_t ivals, int ncdf,
+                                  double factor)
+    {
+        double* u = reinterpret_cast<double*>(iu);
+        const double* cdf = reinterpret_cast<const double*>(icdf);
+        const double* vals = reinterpret_cast<const double*>(ivals);
+        SampleInverseCDF(u, n, cdf, vals, ncdf, factor);
+    }
+
     void pyExportPhotonArray(PY_MODULE& _galsim)
     {
+        GALSIM_DOT def("SampleInverseCDF", &_SampleInverseCDF);
+
         py::class_<PhotonArray> pyPhotonArray(GALSIM_COMMA "PhotonArray" BP_NOINIT);
         pyPhotonArray
             .def(PY_INIT(&construct))
-            .def("convolve", &PhotonArray::convolve);
+            .def("convolve", &PhotonArray::convolve)
+            .def("applySurfaceOps", &ApplySurfaceOps);
         WrapTemplates<double>(pyPhotonArray);
         WrapTemplates<float>(pyPhotonArray);
     }
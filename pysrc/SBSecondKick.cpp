@@ -22,6 +22,18 @@
 
 namespace galsim {
 
+    static void SetSKTables(double kcrit, const GSParams& gsparams, size_t idata, int n)
+    {
+        const double* data = reinterpret_cast<const double*>(idata);
+        SBSecondKick::setTables(kcrit, gsparams, data, n);
+    }
+
+    static bool HasSKTables(double kcrit, const GSParams& gsparams)
+    { return SBSecondKick::hasTables(kcrit, gsparams); }
+
+    static std::string GetSKTables(double kcrit, const GSParams& gsparams)
+    { return SBSecondKick::getTables(kcrit, gsparams); }
+
     void pyExportSBSecondKick(PY_MODULE& _galsim)
     {
         py::class_<SBSecondKick, BP_BASES(SBProfile)>(GALSIM_COMMA "SBSecondKick" BP_NOINIT)
@@ -29,6 +41,11 @@ namespace galsim {
             .def("getDelta", &SBSecondKick::getDelta)
             .def("structureFunction", &SBSecondKick::structureFunction)
             ;
+
+        GALSIM_DOT def("HasSKTables", &HasSKTables);
+        GALSIM_DOT def("GetSKTables", &GetSKTables);
+        GALSIM_DOT def("SetSKTables", &SetSKTables);
+        GALSIM_DOT def("SKCacheSize", &SBSecondKick::cacheSize);
     }
 
 } // namespace galsim
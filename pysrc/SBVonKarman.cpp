@@ -22,6 +22,13 @@
 
 namespace galsim {
 
+    static void SetVonKarmanTables(double lam, double r0, double L0, bool doDelta,
+                                   const GSParams& gsparams, size_t idata, int n)
+    {
+        const double* data = reinterpret_cast<const double*>(idata);
+        SBVonKarman::setTables(lam, r0, L0, doDelta, gsparams, data, n);
+    }
+
     void pyExportSBVonKarman(PY_MODULE& _galsim)
     {
         py::class_<SBVonKarman, BP_BASES(SBProfile)>(GALSIM_COMMA "SBVonKarman" BP_NOINIT)
@@ -30,6 +37,11 @@ namespace galsim {
             .def("getHalfLightRadius", &SBVonKarman::getHalfLightRadius)
             .def("structureFunction", &SBVonKarman::structureFunction)
             ;
+
+        GALSIM_DOT def("HasVonKarmanTables", &SBVonKarman::hasTables);
+        GALSIM_DOT def("GetVonKarmanTables", &SBVonKarman::getTables);
+        GALSIM_DOT def("SetVonKarmanTables", &SetVonKarmanTables);
+        GALSIM_DOT def("VonKarmanCacheSize", &SBVonKarman::cacheSize);
     }
 
 } // namespace galsim
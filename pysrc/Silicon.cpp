@@ -50,11 +50,13 @@ namespace galsim {
     {
         py::class_<Silicon> pySilicon(GALSIM_COMMA "Silicon" BP_NOINIT);
         pySilicon.def(PY_INIT(&MakeSilicon));
+        pySilicon.def("initialize_treerings", &Silicon::initializeTreeRings);
 
         WrapTemplates<double>(pySilicon);
         WrapTemplates<float>(pySilicon);
 
         GALSIM_DOT def("SetOMPThreads", &SetOMPThreads);
+        GALSIM_DOT def("GetOMPThreads", &GetOMPThreads);
     }
 
 } // namespace galsim
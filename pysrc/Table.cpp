@@ -141,6 +141,33 @@ namespace galsim {
         WrapArrayToPeriod(x,n,x0,period);
     }
 
+    static void _SumWrappedGradients(size_t iu, size_t iv, size_t it,
+                                     size_t idfdx, size_t idfdy, int n, int nlayers,
+                                     size_t ixargs, size_t iyargs, size_t ivals,
+                                     size_t inx, size_t iny, size_t iparams)
+    {
+        const double* u = reinterpret_cast<const double*>(iu);
+        const double* v = reinterpret_cast<const double*>(iv);
+        const double* t = reinterpret_cast<const double*>(it);
+        double* dfdx = reinterpret_cast<double*>(idfdx);
+        double* dfdy = reinterpret_cast<double*>(idfdy);
+        const double* const* xargs = reinterpret_cast<const double* const*>(ixargs);
+        const double* const* yargs = reinterpret_cast<const double* const*>(iyargs);
+        const double* const* vals = reinterpret_cast<const double* const*>(ivals);
+        const int* nx = reinterpret_cast<const int*>(inx);
+        const int* ny = reinterpret_cast<const int*>(iny);
+        const double* params = reinterpret_cast<const double*>(iparams);
+        SumWrappedGradients(u, v, t, dfdx, dfdy, n, nlayers, xargs, yargs, vals, nx, ny, params);
+    }
+
+    static int _ThinTabulatedValues(size_t ix, size_t iff, int n, double thresh,
+                                    bool fast_search, size_t iindex)
+    {
+        const double* x = reinterpret_cast<const double*>(ix);
+        const double* f = reinterpret_cast<const double*>(iff);
+        int* index = reinterpret_cast<int*>(iindex);
+        return ThinTabulatedValues(x, f, n, thresh, fast_search, index);
+    }
 
     void pyExportTable(PY_MODULE& _galsim)
     {
@@ -162,6 +189,8 @@ namespace galsim {
             .def("gradientGrid", &GradientGrid);
 
         GALSIM_DOT def("WrapArrayToPeriod", &_WrapArrayToPeriod);
+        GALSIM_DOT def("SumWrappedGradients", &_SumWrappedGradients);
+        GALSIM_DOT def("ThinTabulatedValues", &_ThinTabulatedValues);
     }
 
 } // namespace galsim
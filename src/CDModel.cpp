@@ -17,10 +17,25 @@
  *    and/or other materials provided with the distribution.
  */
 
+#include <vector>
+#include <algorithm>
+
 #include "CDModel.h"
 
 namespace galsim {
 
+    // Add coef * q[x+ix] to s[x] for all x in [xmin,xmax] (given relative to the row start).
+    static inline void addShifted(double* s, const double* q, double coef, int ix,
+                                  int xmin, int xmax)
+    {
+        if (coef == 0.) return;
+        const double* qq = q + ix;
+#ifdef _OPENMP
+#pragma omp simd
+#endif
+        for (int x=xmin; x<=xmax; ++x) s[x] += coef * qq[x];
+    }
+
     template <typename T>
     void ApplyCD(ImageView<T>& output, const BaseImage<T>& input,
                  const BaseImage<double>& aL, const BaseImage<double>& aR,
@@ -34,56 +49,163 @@ namespace galsim {
 
         // Perform sanity check
         if(dmax < 0) throw ImageError("Attempt to apply CD model with invalid extent");
+        if(output.getBounds() != input.getBounds())
+            throw ImageError("Attempt to apply CD model with output bounds != input bounds");
 
         // compare eqn. 4.5 in Antilogus+2014
         // output is
         //        (1)   input +
         //        (2)   interpolated version of image at pixel borders *
         //        (3)   image convolved with shift coefficients
+        //
+        // This is done in two passes over each row.  First, the shifts of the four borders of
+        // each pixel in the row, (3), are accumulated as a sum of shifted copies of the nearby
+        // rows of the input, each scaled by the corresponding coefficient.  Then these are
+        // multiplied by the flux at each border, (2).  The inner loops are simple strided
+        // multiply-adds along the row, which the compiler can vectorize.
+        // The changes are stored in a separate array and only added at the end, so output is
+        // allowed to be the same image as input.
+
+        const int x1 = input.getXMin();
+        const int x2 = input.getXMax();
+        const int y1 = input.getYMin();
+        const int y2 = input.getYMax();
+        const int nx = x2 - x1 + 1;
+        const int ny = y2 - y1 + 1;
+        const int na = 2*dmax + 1;
+
+        // Copy the coefficients into contiguous arrays indexed by (iy+dmax)*na + (ix+dmax).
+        std::vector<double> cL(na*na), cR(na*na), cB(na*na), cT(na*na);
+        for(int iy=-dmax; iy<=dmax; iy++){
+            for(int ix=-dmax; ix<=dmax; ix++){
+                int k = (iy+dmax)*na + (ix+dmax);
+                cL[k] = aL(ix+dmax+1, iy+dmax+1);
+                cR[k] = aR(ix+dmax+1, iy+dmax+1);
+                cB[k] = aB(ix+dmax+1, iy+dmax+1);
+                cT[k] = aT(ix+dmax+1, iy+dmax+1);
+            }
+        }
 
-        for(int x=input.getXMin(); x<=input.getXMax(); x++){
-            for(int y=input.getYMin(); y<=input.getYMax(); y++){
-
-                // (1) input image
-                double f = input(x, y);
-
-                // (2) interpolated version of image at pixel borders
-                double fT = 0.; if(y < input.getYMax()) fT = (f + input(x, y + 1)) / 2.;
-                double fB = 0.; if(y > input.getYMin()) fB = (f + input(x, y - 1)) / 2.;
-                double fR = 0.; if(x < input.getXMax()) fR = (f + input(x + 1, y)) / 2.;
-                double fL = 0.; if(x > input.getXMin()) fL = (f + input(x - 1, y)) / 2.;
+        const T* data = input.getData();
+        const int step = input.getStep();
+        const int stride = input.getStride();
+        std::vector<double> delta(size_t(nx) * ny);
+
+        {
+            // Each row buffer has dmax pixels of zero padding on each side, so the shifted
+            // reads in addShifted never go outside the buffer.
+            std::vector<double> qrow(nx + 2*dmax, 0.);
+            std::vector<double> f(nx), fdown(nx), fup(nx);
+            std::vector<double> sL(nx), sR(nx), sB(nx), sT(nx);
+            double* q = &qrow[dmax];
+
+            for(int j=0; j<ny; j++){
+                std::fill(sL.begin(), sL.end(), 0.);
+                std::fill(sR.begin(), sR.end(), 0.);
+                std::fill(sB.begin(), sB.end(), 0.);
+                std::fill(sT.begin(), sT.end(), 0.);
 
                 // (3) convolution of image with shift coefficient matrix
                 for(int iy=-dmax; iy<=dmax; iy++){
-                    for(int ix=-dmax; ix<=dmax; ix++){
-
-                        if(x+ix<input.getXMin() || x+ix>input.getXMax() ||
-                           y+iy<input.getYMin() || y+iy>input.getYMax()) {
-                            continue; // a non-existent pixel is not going to move us
-                        }
-                        double qkl = input(x + ix, y + iy) * gain_ratio;
-
-                        if(y + 1 - iy >= input.getYMin() && y + 1 - iy <= input.getYMax())
-                            // don't apply shift if pixel mirrored at t border non-existent
-                            f += qkl * fT * aT(ix+dmax+1, iy+dmax+1);
+                    int jj = j + iy;
+                    if (jj < 0 || jj >= ny) continue; // a non-existent pixel is not going to move us
+                    const T* ptr = data + jj * stride;
+                    for(int i=0; i<nx; i++, ptr+=step) q[i] = *ptr;
 
-                        if(y - 1 - iy >= input.getYMin() && y - 1 - iy <= input.getYMax())
-                            // don't apply shift if pixel mirrored at b border non-existent
-                            f += qkl * fB * aB(ix+dmax+1, iy+dmax+1);
-
-                        if(x - 1 - ix >= input.getXMin() && x - 1 - ix <= input.getXMax())
-                            // don't apply shift if pixel mirrored at l border non-existent
-                            f += qkl * fL * aL(ix+dmax+1, iy+dmax+1);
-
-                        if(x + 1 - ix >= input.getXMin() && x + 1 - ix <= input.getXMax())
-                            // don't apply shift if pixel mirrored at r border non-existent
-                            f += qkl * fR * aR(ix+dmax+1, iy+dmax+1);
+                    // don't apply shift if pixel mirrored at t or b border non-existent
+                    bool useT = (j + 1 - iy >= 0 && j + 1 - iy < ny);
+                    bool useB = (j - 1 - iy >= 0 && j - 1 - iy < ny);
 
+                    for(int ix=-dmax; ix<=dmax; ix++){
+                        int k = (iy+dmax)*na + (ix+dmax);
+                        double ct = useT ? cT[k] : 0.;
+                        double cb = useB ? cB[k] : 0.;
+                        double cl = cL[k];
+                        double cr = cR[k];
+                        // Only pixels with i+ix in the image contribute.
+                        int imin = std::max(0, -ix);
+                        int imax = std::min(nx-1, nx-1-ix);
+                        // don't apply shift if pixel mirrored at l or r border non-existent
+                        int lmin = std::max(imin, 1+ix);
+                        int lmax = std::min(imax, nx+ix);
+                        int rmin = std::max(imin, ix-1);
+                        int rmax = std::min(imax, nx-2+ix);
+
+                        // Do the range that is common to all four borders in a single pass.
+                        int i1 = std::max(lmin, rmin);
+                        int i2 = std::min(lmax, rmax);
+                        if (i1 > i2) {
+                            // Only possible for images narrower than the kernel.  Then there
+                            // is no common range, so just do each border over its own range.
+                            addShifted(&sT[0], q, ct, ix, imin, imax);
+                            addShifted(&sB[0], q, cb, ix, imin, imax);
+                            addShifted(&sL[0], q, cl, ix, lmin, lmax);
+                            addShifted(&sR[0], q, cr, ix, rmin, rmax);
+                            continue;
+                        }
+                        const double* qq = q + ix;
+                        double* pT = &sT[0];
+                        double* pB = &sB[0];
+                        double* pL = &sL[0];
+                        double* pR = &sR[0];
+#ifdef _OPENMP
+#pragma omp simd
+#endif
+                        for(int i=i1; i<=i2; i++){
+                            double qi = qq[i];
+                            pT[i] += ct * qi;
+                            pB[i] += cb * qi;
+                            pL[i] += cl * qi;
+                            pR[i] += cr * qi;
+                        }
+                        // Then the few pixels at the ends of the row.
+                        addShifted(&sT[0], q, ct, ix, imin, i1-1);
+                        addShifted(&sT[0], q, ct, ix, i2+1, imax);
+                        addShifted(&sB[0], q, cb, ix, imin, i1-1);
+                        addShifted(&sB[0], q, cb, ix, i2+1, imax);
+                        addShifted(&sL[0], q, cl, ix, lmin, i1-1);
+                        addShifted(&sL[0], q, cl, ix, i2+1, lmax);
+                        addShifted(&sR[0], q, cr, ix, rmin, i1-1);
+                        addShifted(&sR[0], q, cr, ix, i2+1, rmax);
                     }
                 }
-                output(x, y) = f;
+
+                // (2) interpolated version of image at pixel borders
+                const T* ptr = data + j * stride;
+                for(int i=0; i<nx; i++, ptr+=step) f[i] = *ptr;
+                if (j > 0) {
+                    ptr = data + (j-1) * stride;
+                    for(int i=0; i<nx; i++, ptr+=step) fdown[i] = *ptr;
+                }
+                if (j < ny-1) {
+                    ptr = data + (j+1) * stride;
+                    for(int i=0; i<nx; i++, ptr+=step) fup[i] = *ptr;
+                }
+                double* d = &delta[size_t(j) * nx];
+#ifdef _OPENMP
+#pragma omp simd
+#endif
+                for(int i=0; i<nx; i++){
+                    double fi = f[i];
+                    double fT = (j < ny-1) ? (fi + fup[i]) / 2. : 0.;
+                    double fB = (j > 0) ? (fi + fdown[i]) / 2. : 0.;
+                    double fR = (i < nx-1) ? (fi + f[i+1]) / 2. : 0.;
+                    double fL = (i > 0) ? (fi + f[i-1]) / 2. : 0.;
+                    d[i] = gain_ratio * (fT * sT[i] + fB * sB[i] + fL * sL[i] + fR * sR[i]);
+                }
             }
         }
+
+        // (1) add the changes to the input image.
+        T* out = output.getData();
+        const int out_step = output.getStep();
+        const int out_stride = output.getStride();
+        for(int j=0; j<ny; j++){
+            const T* in = data + j * stride;
+            T* ptr = out + j * out_stride;
+            const double* d = &delta[size_t(j) * nx];
+            for(int i=0; i<nx; i++, in+=step, ptr+=out_step) *ptr = T(*in + d[i]);
+        }
     }
 
     // instantiate template functions for expected types: float and double currently
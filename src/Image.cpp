@@ -22,6 +22,9 @@
 #include <sstream>
 #include <numeric>
 #include <cstring>
+#include <vector>
+#include <algorithm>
+
 
 #include "fftw3.h"
 #include "fmath/fmath.hpp"  // Use their compiler checks for the right SSE include.
@@ -926,6 +929,70 @@ void cfft(const BaseImage<T>& in, ImageView<std::complex<double> > out,
     }
 }
 
+void powerSpectra(const std::complex<double>* vals, const int* index, int nvals,
+                  int nbatch, int Nx, int Ny, double* out)
+{
+    dbg<<"Start powerSpectra: "<<nbatch<<" images of size "<<Nx<<','<<Ny<<std::endl;
+    if (Nx % 2 != 0 || Ny % 2 != 0)
+        throw ImageError("powerSpectra requires even image sizes");
+
+    const int Nxy = Nx * Ny;
+    if (nvals == 0 || nbatch == 0) {
+        std::fill(out, out + size_t(nbatch) * Nxy, 0.);
+        return;
+    }
+
+    // Only the rows j0..j1 have any non-zero values, so the FFTs along the other rows can be
+    // skipped.  Typically this is about half of them, since the pupil is padded by a factor of 2.
+    // Multiplying the input by (-1)^(i+j) puts the zero frequency of the output at the center.
+    int j0 = Ny;
+    int j1 = -1;
+    std::vector<double> sign(nvals);
+    for (int m=0; m<nvals; ++m) {
+        const int j = index[m] / Nx;
+        const int i = index[m] % Nx;
+        if (j < j0) j0 = j;
+        if (j > j1) j1 = j;
+        sign[m] = ((i+j) % 2 == 0) ? 1. : -1.;
+    }
+
+    fftw_complex* w = reinterpret_cast<fftw_complex*>(fftw_malloc(sizeof(fftw_complex) * Nxy));
+    if (!w) throw std::runtime_error("fftw_malloc failed in powerSpectra");
+    std::complex<double>* kptr = reinterpret_cast<std::complex<double>*>(w);
+
+    // First the FFTs along the non-zero rows, then along all the columns.
+    int nx[1] = { Nx };
+    int ny[1] = { Ny };
+    fftw_plan row_plan = fftw_plan_many_dft(1, nx, j1-j0+1, w + j0*Nx, NULL, 1, Nx,
+                                            w + j0*Nx, NULL, 1, Nx, FFTW_FORWARD, FFTW_ESTIMATE);
+    fftw_plan col_plan = fftw_plan_many_dft(1, ny, Nx, w, NULL, Nx, 1, w, NULL, Nx, 1,
+                                            FFTW_FORWARD, FFTW_ESTIMATE);
+    if (row_plan==NULL || col_plan==NULL) {
+        if (row_plan) fftw_destroy_plan(row_plan);
+        if (col_plan) fftw_destroy_plan(col_plan);
+        fftw_free(w);
+        throw std::runtime_error("fftw_plan cannot be created");
+    }
+
+    for (int k=0; k<nbatch; ++k) {
+        const std::complex<double>* vptr = vals + size_t(k) * nvals;
+        std::fill(kptr, kptr + Nxy, std::complex<double>(0.));
+        for (int m=0; m<nvals; ++m)
+            kptr[index[m]] = sign[m] * vptr[m];
+
+        fftw_execute(row_plan);
+        fftw_execute(col_plan);
+
+        double* optr = out + size_t(k) * Nxy;
+        for (int i=0; i<Nxy; ++i)
+            optr[i] = std::norm(kptr[i]);
+    }
+
+    fftw_destroy_plan(row_plan);
+    fftw_destroy_plan(col_plan);
+    fftw_free(w);
+}
+
 template <typename T>
 void invertImage(ImageView<T> im)
 { im.invertSelf(); }
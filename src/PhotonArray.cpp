@@ -24,6 +24,7 @@
 
 #include <algorithm>
 #include <numeric>
+#include <vector>
 #include "PhotonArray.h"
 
 namespace galsim {
@@ -190,6 +191,106 @@ namespace galsim {
         }
     }
 
+    // Invert a tabulated cdf by linear interpolation, the same as a linear Table would do.
+    // But rather than search for each index, make a guide table of where to start looking
+    // for each of n equal bins in the cumulative probability.
+    class InverseCDF
+    {
+    public:
+        InverseCDF(const double* cdf, const double* vals, int n) :
+            _cdf(cdf), _vals(vals), _n(n), _guide(n+1)
+        {
+            if (n < 2) return;
+            int i = 1;
+            for (int k=0; k<=n; ++k) {
+                double p = double(k) / n;
+                while (i < n-1 && cdf[i] <= p) ++i;
+                _guide[k] = i;
+            }
+        }
+
+        double operator()(double p) const
+        {
+            int k = int(p * _n);
+            k = std::max(0, std::min(k, _n));
+            int j = _guide[k];
+            while (j < _n-1 && _cdf[j] <= p) ++j;
+            while (j > 1 && _cdf[j-1] > p) --j;
+            double a = (_cdf[j] - p) / (_cdf[j] - _cdf[j-1]);
+            double b = 1.0 - a;
+            return _vals[j]*b + _vals[j-1]*a;
+        }
+
+    private:
+        const double* _cdf;
+        const double* _vals;
+        const int _n;
+        std::vector<int> _guide;
+    };
+
+    void SampleInverseCDF(double* u, int n, const double* cdf, const double* vals, int ncdf,
+                          double factor)
+    {
+        if (ncdf < 2)
+            throw std::runtime_error("SampleInverseCDF requires ncdf >= 2");
+        const InverseCDF inv_cdf(cdf, vals, ncdf);
+        for (int i=0; i<n; ++i) {
+            u[i] = inv_cdf(u[i]) * factor;
+        }
+    }
+
+    void PhotonArray::applySurfaceOps(
+        const double* wave_cdf, const double* wave_vals, int nwave, double wave_factor,
+        bool do_angles, double sin_obs, double sin_pupil,
+        bool do_dcr, double alpha, double base_wave, double cenx, double ceny,
+        double tan_zenith, double base_refraction,
+        double pfactor, double wfactor, double ax, double ay)
+    {
+        if ((wave_cdf || do_dcr) && !_wave)
+            throw std::runtime_error("PhotonArray::applySurfaceOps requires wavelengths");
+        if (do_angles && !(_dxdz && _dydz))
+            throw std::runtime_error("PhotonArray::applySurfaceOps requires angles");
+
+        if (wave_cdf && nwave < 2)
+            throw std::runtime_error("PhotonArray::applySurfaceOps requires nwave >= 2");
+        const InverseCDF inv_cdf(wave_cdf, wave_vals, wave_cdf ? nwave : 0);
+
+        const double dsin = sin_pupil - sin_obs;
+        const int N = _N;
+        for (int i=0; i<N; ++i) {
+            if (wave_cdf) {
+                _wave[i] = inv_cdf(_wave[i]) * wave_factor;
+            }
+            if (do_angles) {
+                double phi = _dxdz[i] * (2. * M_PI);
+                double sintheta = sin_obs + dsin * _dydz[i];
+                double sinsq = sintheta * sintheta;
+                double tantheta = std::sqrt(sinsq / (1. - sinsq));
+                _dxdz[i] = tantheta * std::sin(phi);
+                _dydz[i] = tantheta * std::cos(phi);
+            }
+            if (do_dcr) {
+                double w = _wave[i];
+                if (alpha != 0.) {
+                    double scale = std::pow(w / base_wave, alpha);
+                    _x[i] = scale * (_x[i] - cenx) + cenx;
+                    _y[i] = scale * (_y[i] - ceny) + ceny;
+                }
+                // cf. galsim.dcr.air_refractive_index_minus_one and get_refraction
+                double s = w * 1.e-3;
+                double sigma_squared = 1. / (s * s);
+                double nm1 = (64.328 + (29498.1 / (146.0 - sigma_squared))
+                              + (255.4 / (41.0 - sigma_squared))) * 1.e-6;
+                nm1 *= pfactor;
+                nm1 -= (0.0624 - 0.000680 * sigma_squared) * wfactor * 1.e-6;
+                double r0 = nm1 * (nm1+2) / 2.0 / (nm1*nm1 + 2*nm1 + 1);
+                double shift = r0 * tan_zenith - base_refraction;
+                _x[i] += shift * ax;
+                _y[i] += shift * ay;
+            }
+        }
+    }
+
     template <class T>
     double PhotonArray::addTo(ImageView<T> target) const
     {
@@ -77,6 +77,22 @@ namespace galsim {
         return static_cast<const SBSecondKickImpl&>(*_pimpl).structureFunction(rho);
     }
 
+    bool SBSecondKick::hasTables(double kcrit, const GSParamsPtr& gsparams)
+    { return SBSecondKickImpl::hasInfo(kcrit, gsparams); }
+
+    std::string SBSecondKick::getTables(double kcrit, const GSParamsPtr& gsparams)
+    { return SBSecondKickImpl::getInfo(kcrit, gsparams)->getTables(); }
+
+    void SBSecondKick::setTables(double kcrit, const GSParamsPtr& gsparams,
+                                 const double* data, int n)
+    {
+        shared_ptr<SKInfo> info(new SKInfo(kcrit, gsparams, data, n));
+        SBSecondKickImpl::setInfo(kcrit, gsparams, info);
+    }
+
+    int SBSecondKick::cacheSize()
+    { return SBSecondKickImpl::cacheSize(); }
+
     double SBSecondKick::kValue(double k) const
     {
         assert(dynamic_cast<const SBSecondKickImpl*>(_pimpl.get()));
@@ -135,6 +151,33 @@ namespace galsim {
 #endif
     }
 
+    SKInfo::SKInfo(double kcrit, const GSParamsPtr& gsparams, const double* data, int n) :
+        _kcrit(kcrit), _gsparams(gsparams),
+        _radial(Table::spline),
+        _kvLUT(Table::spline)
+    {
+        // Restore the values written by getTables().
+        const double* end = data + n;
+        if (n < 3) throw std::runtime_error("Not enough values to restore SKInfo");
+        _maxk = data[0];
+        _stepk = data[1];
+        _delta = data[2];
+        data = _kvLUT.read(data+3, end);
+        data = _radial.read(data, end);
+        if (data != end) throw std::runtime_error("Too many values to restore SKInfo");
+        _buildSampler();
+    }
+
+    std::string SKInfo::getTables() const
+    {
+        std::ostringstream oss;
+        oss.precision(std::numeric_limits<double>::digits10 + 4);
+        oss << _maxk << ' ' << _stepk << ' ' << _delta;
+        _kvLUT.write(oss);
+        _radial.write(oss);
+        return oss.str();
+    }
+
     inline double pow4(double x) { double x2 = x*x; return x2*x2; }
 
     class SKISFIntegrand : public std::unary_function<double,double>
@@ -313,12 +356,7 @@ namespace galsim {
             _radial.addEntry(2., 0.);
             _radial.finalize();
             _stepk = 1.e10;
-            std::vector<double> range(2,0.);
-            range[1] = _radial.argMax();
-            dbg<<"range = "<<range[0]<<"  "<<range[1]<<std::endl;
-            dbg<<"Make ODD\n";
-            _sampler.reset(new OneDimensionalDeviate(_radial, range, true, 1.0, *_gsparams));
-            dbg<<"Made ODD\n";
+            _buildSampler();
             return;
         }
 
@@ -403,11 +441,17 @@ namespace galsim {
         _stepk = M_PI / R;
         dbg<<"stepk = "<<_stepk<<std::endl;
 
+        _buildSampler();
+        //set_verbose(1);
+    }
+
+    void SKInfo::_buildSampler()
+    {
         std::vector<double> range(2,0.);
         range[1] = _radial.argMax();
+        dbg<<"range = "<<range[0]<<"  "<<range[1]<<std::endl;
         _sampler.reset(new OneDimensionalDeviate(_radial, range, true, 1.0, *_gsparams));
         dbg<<"made sampler\n";
-        //set_verbose(1);
     }
 
     void SKInfo::shoot(PhotonArray& photons, UniformDeviate ud) const
@@ -435,6 +479,20 @@ namespace galsim {
         _info(cache.get(MakeTuple(kcrit, GSParamsPtr(gsparams))))
     {}
 
+    bool SBSecondKick::SBSecondKickImpl::hasInfo(double kcrit, const GSParamsPtr& gsparams)
+    { return cache.has(MakeTuple(kcrit, gsparams)); }
+
+    shared_ptr<SKInfo> SBSecondKick::SBSecondKickImpl::getInfo(double kcrit,
+                                                               const GSParamsPtr& gsparams)
+    { return cache.get(MakeTuple(kcrit, gsparams)); }
+
+    void SBSecondKick::SBSecondKickImpl::setInfo(double kcrit, const GSParamsPtr& gsparams,
+                                                 shared_ptr<SKInfo> info)
+    { cache.set(MakeTuple(kcrit, gsparams), info); }
+
+    int SBSecondKick::SBSecondKickImpl::cacheSize()
+    { return int(cache.size()); }
+
     double SBSecondKick::SBSecondKickImpl::maxK() const
     { return _info->maxK()*_k0; }
 
@@ -99,6 +99,32 @@ namespace galsim {
         return static_cast<const SBVonKarmanImpl&>(*_pimpl).structureFunction(rho);
     }
 
+    bool SBVonKarman::hasTables(double lam, double r0, double L0, bool doDelta,
+                                const GSParams& gsparams)
+    {
+        return SBVonKarmanImpl::hasInfo(
+            SBVonKarmanImpl::makeKey(lam, r0, L0, doDelta, gsparams));
+    }
+
+    std::string SBVonKarman::getTables(double lam, double r0, double L0, bool doDelta,
+                                       const GSParams& gsparams)
+    {
+        return SBVonKarmanImpl::getInfo(
+            SBVonKarmanImpl::makeKey(lam, r0, L0, doDelta, gsparams))->getTables();
+    }
+
+    void SBVonKarman::setTables(double lam, double r0, double L0, bool doDelta,
+                                const GSParams& gsparams, const double* data, int n)
+    {
+        SBVonKarmanImpl::CacheKey key = SBVonKarmanImpl::makeKey(lam, r0, L0, doDelta, gsparams);
+        shared_ptr<VonKarmanInfo> info(
+            new VonKarmanInfo(key.first, key.second, key.third, key.fourth, data, n));
+        SBVonKarmanImpl::setInfo(key, info);
+    }
+
+    int SBVonKarman::cacheSize()
+    { return SBVonKarmanImpl::cacheSize(); }
+
     //
     //
     //
@@ -163,6 +189,36 @@ namespace galsim {
         _buildRadialFunc();
     }
 
+    VonKarmanInfo::VonKarmanInfo(double lam, double L0, bool doDelta,
+                                 const GSParamsPtr& gsparams, const double* data, int n) :
+        _lam(lam), _L0(L0),
+        _L0_invcuberoot(fast_pow(_L0, -1./3)), _L053(fast_pow(L0, 5./3)),
+        _delta(exp(-0.5*magic1*_L053)),
+        _deltaScale(1./(1.-_delta)),
+        _lam_arcsec(_lam * ARCSEC2RAD / (2.*M_PI)),
+        _doDelta(doDelta), _gsparams(gsparams),
+        _radial(Table::spline)
+    {
+        // Restore the values written by getTables().
+        const double* end = data + n;
+        if (n < 3) throw std::runtime_error("Not enough values to restore VonKarmanInfo");
+        _maxk = data[0];
+        _stepk = data[1];
+        _hlr = data[2];
+        data = _radial.read(data+3, end);
+        if (data != end) throw std::runtime_error("Too many values to restore VonKarmanInfo");
+        _buildSampler();
+    }
+
+    std::string VonKarmanInfo::getTables() const
+    {
+        std::ostringstream oss;
+        oss.precision(std::numeric_limits<double>::digits10 + 4);
+        oss << _maxk << ' ' << _stepk << ' ' << _hlr;
+        _radial.write(oss);
+        return oss.str();
+    }
+
     double vkStructureFunction(double rho, double L0, double L0_invcuberoot, double L053) {
         // rho in units of r0
 
@@ -342,6 +398,11 @@ namespace galsim {
         if (sum < 1-_gsparams->folding_threshold)
             throw SBError("Could not determine appropriate stepk, given folding_threshold");
 
+        _buildSampler();
+    }
+
+    void VonKarmanInfo::_buildSampler()
+    {
         std::vector<double> range(2, 0.);
         range[1] = _radial.argMax();
         _sampler.reset(new OneDimensionalDeviate(_radial, range, true, 1.0, *_gsparams));
@@ -374,9 +435,26 @@ namespace galsim {
         _flux(flux),
         _scale(scale),
         _doDelta(doDelta),
-        _info(cache.get(MakeTuple(1e-9*lam/r0, L0/r0, doDelta, GSParamsPtr(gsparams))))
+        _info(cache.get(makeKey(lam, r0, L0, doDelta, gsparams)))
     {}
 
+    SBVonKarman::SBVonKarmanImpl::CacheKey SBVonKarman::SBVonKarmanImpl::makeKey(
+        double lam, double r0, double L0, bool doDelta, const GSParams& gsparams)
+    { return MakeTuple(1e-9*lam/r0, L0/r0, doDelta, GSParamsPtr(gsparams)); }
+
+    bool SBVonKarman::SBVonKarmanImpl::hasInfo(const CacheKey& key)
+    { return cache.has(key); }
+
+    shared_ptr<VonKarmanInfo> SBVonKarman::SBVonKarmanImpl::getInfo(const CacheKey& key)
+    { return cache.get(key); }
+
+    void SBVonKarman::SBVonKarmanImpl::setInfo(const CacheKey& key,
+                                               shared_ptr<VonKarmanInfo> info)
+    { cache.set(key, info); }
+
+    int SBVonKarman::SBVonKarmanImpl::cacheSize()
+    { return int(cache.size()); }
+
     double SBVonKarman::SBVonKarmanImpl::maxK() const
     { return _info->maxK()*_scale; }
 
@@ -227,6 +227,49 @@ namespace galsim {
         }
     }
 
+    void Silicon::initializeTreeRings(const Bounds<int>& bounds)
+    {
+        dbg<<"initializeTreeRings "<<bounds<<std::endl;
+        // This computes the shift of each vertex of an undistorted pixel due to the tree
+        // rings for every pixel in bounds.  The tree ring radial function and center are
+        // fixed for a given Silicon object, so these only need to be computed once for
+        // a given region of the sensor.  Then any image within this region just reads off
+        // the displacements for its own pixels.
+        if (!bounds.isDefined())
+            throw std::runtime_error("Attempting to initialize tree rings with undefined Bounds");
+
+        const int i1 = bounds.getXMin();
+        const int i2 = bounds.getXMax();
+        const int j1 = bounds.getYMin();
+        const int j2 = bounds.getYMax();
+        const int ny = j2-j1+1;
+        _treeRingBounds = bounds;
+        _treeRingDisplacements.resize(size_t(i2-i1+1) * ny * _nv);
+
+        for (int i=i1; i<=i2; ++i) {
+            for (int j=j1; j<=j2; ++j) {
+                int index = (i - i1) * ny + (j - j1);
+                calculateTreeRingDisplacements(i, j, &_treeRingDisplacements[size_t(index) * _nv]);
+            }
+        }
+    }
+
+    void Silicon::calculateTreeRingDisplacements(int i, int j, Point* d) const
+    {
+        // The displacements of the _nv vertices of pixel (i,j) in the original image coordinates.
+        for (int n=0; n<_nv; n++) {
+            double tx = (double)i + _emptypoly[n].x - _treeRingCenter.x;
+            double ty = (double)j + _emptypoly[n].y - _treeRingCenter.y;
+            xdbg<<"tx,ty = "<<tx<<','<<ty<<std::endl;
+            double r = sqrt(tx * tx + ty * ty);
+            double shift = _tr_radial_table.lookup(r);
+            xdbg<<"r = "<<r<<", shift = "<<shift<<std::endl;
+            // Shifts are along the radial vector in direction of the doping gradient
+            d[n].x = shift * tx / r;
+            d[n].y = shift * ty / r;
+        }
+    }
+
     template <typename T>
     void Silicon::addTreeRingDistortions(ImageView<T> target, Position<int> orig_center)
     {
@@ -238,47 +281,47 @@ namespace galsim {
         dbg<<"addTreeRings\n";
         // This updates the pixel distortions in the _imagepolys
         // pixel list based on a model of tree rings.
-        // The coordinates _treeRingCenter are the coordinates
-        // of the tree ring center, shifted to compensate for the
-        // fact that target has its origin shifted to (0,0).
+        // The displacements are calculated in the original image coordinates, so shift
+        // the target bounds by orig_center to find the corresponding region.
+        // If this region has been precomputed by initializeTreeRings, read them from there.
+        // Otherwise, compute them directly for this image, leaving the precomputed ones alone.
         Bounds<int> b = target.getBounds();
+        Bounds<int> orig_b = b.makeShifted(orig_center);
+        const bool use_cache = _treeRingBounds.includes(orig_b);
+        std::vector<Point> local(use_cache ? 0 : _nv);
+
         const int i1 = b.getXMin();
         const int i2 = b.getXMax();
         const int j1 = b.getYMin();
         const int j2 = b.getYMax();
         const int ny = j2-j1+1;
-        double shift = 0.0;
+        const int tr_i1 = _treeRingBounds.getXMin() - orig_center.x;
+        const int tr_j1 = _treeRingBounds.getYMin() - orig_center.y;
+        const int tr_ny = _treeRingBounds.getYMax() - _treeRingBounds.getYMin() + 1;
+
         // Now we cycle through the pixels in the target image and add
         // the (small) distortions due to tree rings
-        std::vector<bool> changed(_imagepolys.size(), false);
         for (int i=i1; i<=i2; ++i) {
             for (int j=j1; j<=j2; ++j) {
                 int index = (i - i1) * ny + (j - j1);
+                const Point* tr;
+                if (use_cache) {
+                    tr = &_treeRingDisplacements[
+                        (size_t((i - tr_i1) * tr_ny) + (j - tr_j1)) * _nv];
+                } else {
+                    calculateTreeRingDisplacements(i + orig_center.x, j + orig_center.y,
+                                                   &local[0]);
+                    tr = &local[0];
+                }
+                Polygon& poly = _imagepolys[index];
                 for (int n=0; n<_nv; n++) {
-                    xdbg<<"i,j,n = "<<i<<','<<j<<','<<n<<": x,y = "<<
-                        _imagepolys[index][n].x <<"  "<< _imagepolys[index][n].y<<std::endl;
-                    double tx = (double)i + _imagepolys[index][n].x - _treeRingCenter.x +
-                        (double)orig_center.x;
-                    double ty = (double)j + _imagepolys[index][n].y - _treeRingCenter.y +
-                        (double)orig_center.y;
-                    xdbg<<"tx,ty = "<<tx<<','<<ty<<std::endl;
-                    double r = sqrt(tx * tx + ty * ty);
-                    shift = _tr_radial_table.lookup(r);
-                    xdbg<<"r = "<<r<<", shift = "<<shift<<std::endl;
-                    // Shifts are along the radial vector in direction of the doping gradient
-                    double dx = shift * tx / r;
-                    double dy = shift * ty / r;
-                    xdbg<<"dx,dy = "<<dx<<','<<dy<<std::endl;
-                    _imagepolys[index][n].x += dx;
-                    _imagepolys[index][n].y += dy;
-                    xdbg<<"    x,y => "<<_imagepolys[index][n].x <<"  "<< _imagepolys[index][n].y;
+                    const Point& d = tr[n];
+                    poly[n].x += d.x;
+                    poly[n].y += d.y;
                 }
-                changed[index] = true;
+                poly.updateBounds();
             }
         }
-        for (size_t k=0; k<_imagepolys.size(); ++k) {
-            if (changed[k]) _imagepolys[k].updateBounds();
-        }
     }
 
     template <typename T>
@@ -748,6 +791,15 @@ namespace galsim {
 #endif
     }
 
+    int GetOMPThreads()
+    {
+#ifdef _OPENMP
+        return omp_get_max_threads();
+#else
+        return 1;
+#endif
+    }
+
     template bool Silicon::insidePixel(int ix, int iy, double x, double y, double zconv,
                                        ImageView<double> target, bool*) const;
     template bool Silicon::insidePixel(int ix, int iy, double x, double y, double zconv,
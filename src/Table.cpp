@@ -21,6 +21,7 @@
 
 #include <cmath>
 #include <vector>
+#include <algorithm>
 #include <iostream>
 #include <deque>
 
@@ -530,6 +531,24 @@ namespace galsim {
         _final = true;
     }
 
+    void TableBuilder::write(std::ostream& os) const
+    {
+        os << ' ' << _xvec.size();
+        for (size_t i=0; i<_xvec.size(); ++i) os << ' ' << _xvec[i];
+        for (size_t i=0; i<_fvec.size(); ++i) os << ' ' << _fvec[i];
+    }
+
+    const double* TableBuilder::read(const double* data, const double* end)
+    {
+        if (data >= end) throw std::runtime_error("Not enough values to read table");
+        int n = int(*data++);
+        if (n < 2 || end - data < 2*n) throw std::runtime_error("Invalid table size");
+        _xvec.assign(data, data+n);
+        _fvec.assign(data+n, data+2*n);
+        finalize();
+        return data + 2*n;
+    }
+
     // The hierarchy for Table2DImpl looks like:
     // Table2DImpl <- ABC
     // T2DCRTP<T> : Table2DImpl <- curiously recurring template pattern
@@ -1051,4 +1070,381 @@ namespace galsim {
             *x -= period * floor((*x-x0)/period);
 #endif
     }
+
+    // std::floor is a function call without SSE4.1, and converting to an integer and back, or
+    // branching to fix up rounding, is also surprisingly slow in the loop below.  So this uses
+    // the trick of adding and subtracting 1.5 * 2^52 to round x-0.5 to the nearest integer.
+    // This is floor(x), except that it may be floor(x)-1 when x is exactly an integer, which is
+    // fine for wrapping into a table that includes both ends of the period.  Only valid for
+    // |x| < 2^51.
+    static inline double WrapFloor(double x)
+    {
+        const double magic = 6755399441055744.;
+        return ((x - 0.5) + magic) - magic;
+    }
+
+    // Add the gradient of one periodic linearly interpolated table, sampled at
+    // (u - t*vx + du, v - t*vy + dv) wrapped into its fundamental period, to g.
+    // uvt holds (u,v,t) for each of the n points, and g holds (dfdx,dfdy).  q holds the values
+    // precomputed for the layer in SumWrappedGradients.
+    static void AddWrappedGradient(const double* uvt, double* g, int n, const double* q,
+                                   const double* xa, const double* ya, const double* f,
+                                   int nxl, int nyl)
+    {
+        // Copy the layer values to locals, so the compiler knows that writing to g doesn't
+        // change them.
+        const double x0 = q[0], y0 = q[1], xperiod = q[2], yperiod = q[3];
+        const double xperiodinv = q[4], yperiodinv = q[5], vx = q[6], vy = q[7];
+        const double du = q[8], dv = q[9], xa0 = q[10], ya0 = q[11];
+        const double dxinv = q[12], dyinv = q[13], dx = q[14], dy = q[15];
+        int k=0;
+#ifdef __SSE2__
+        // Do two points at a time.  This is the same sequence of operations as the scalar
+        // loop below, so the results are identical.
+        const __m128d xx0 = _mm_set1_pd(x0);
+        const __m128d yy0 = _mm_set1_pd(y0);
+        const __m128d xxperiod = _mm_set1_pd(xperiod);
+        const __m128d yyperiod = _mm_set1_pd(yperiod);
+        const __m128d xxperiodinv = _mm_set1_pd(xperiodinv);
+        const __m128d yyperiodinv = _mm_set1_pd(yperiodinv);
+        const __m128d vvx = _mm_set1_pd(vx);
+        const __m128d vvy = _mm_set1_pd(vy);
+        const __m128d ddu = _mm_set1_pd(du);
+        const __m128d ddv = _mm_set1_pd(dv);
+        const __m128d xxa0 = _mm_set1_pd(xa0);
+        const __m128d yya0 = _mm_set1_pd(ya0);
+        const __m128d ddx = _mm_set1_pd(dx);
+        const __m128d ddy = _mm_set1_pd(dy);
+        const __m128d ddxinv = _mm_set1_pd(dxinv);
+        const __m128d ddyinv = _mm_set1_pd(dyinv);
+        const __m128d half = _mm_set1_pd(0.5);
+        const __m128d magic = _mm_set1_pd(6755399441055744.);
+        const __m128d one = _mm_set1_pd(1.);
+        const __m128d imax = _mm_set1_pd(nxl-1);
+        const __m128d jmax = _mm_set1_pd(nyl-1);
+        for (; k+1<n; k+=2) {
+            const double* p = uvt + 3*k;
+            __m128d uu = _mm_loadh_pd(_mm_load_sd(p), p+3);
+            __m128d vv = _mm_loadh_pd(_mm_load_sd(p+1), p+4);
+            __m128d tt = _mm_loadh_pd(_mm_load_sd(p+2), p+5);
+            __m128d x = _mm_add_pd(_mm_sub_pd(uu, _mm_mul_pd(tt, vvx)), ddu);
+            __m128d y = _mm_add_pd(_mm_sub_pd(vv, _mm_mul_pd(tt, vvy)), ddv);
+            __m128d wx = _mm_mul_pd(_mm_sub_pd(x, xx0), xxperiodinv);
+            __m128d wy = _mm_mul_pd(_mm_sub_pd(y, yy0), yyperiodinv);
+            wx = _mm_sub_pd(_mm_add_pd(_mm_sub_pd(wx, half), magic), magic);
+            wy = _mm_sub_pd(_mm_add_pd(_mm_sub_pd(wy, half), magic), magic);
+            x = _mm_sub_pd(x, _mm_mul_pd(xxperiod, wx));
+            y = _mm_sub_pd(y, _mm_mul_pd(yyperiod, wy));
+            // The indices are kept as doubles until they are needed for the lookups.
+            __m128d zx = _mm_div_pd(_mm_sub_pd(x, xxa0), ddx);
+            __m128d zy = _mm_div_pd(_mm_sub_pd(y, yya0), ddy);
+            __m128d di = _mm_cvtepi32_pd(_mm_cvttpd_epi32(zx));
+            __m128d dj = _mm_cvtepi32_pd(_mm_cvttpd_epi32(zy));
+            di = _mm_add_pd(di, _mm_and_pd(_mm_cmplt_pd(di, zx), one));
+            dj = _mm_add_pd(dj, _mm_and_pd(_mm_cmplt_pd(dj, zy), one));
+            di = _mm_max_pd(_mm_min_pd(di, imax), one);
+            dj = _mm_max_pd(_mm_min_pd(dj, jmax), one);
+            __m128i ii = _mm_cvttpd_epi32(di);
+            __m128i jj = _mm_cvttpd_epi32(dj);
+            int i0 = _mm_cvtsi128_si32(ii);
+            int i1 = _mm_cvtsi128_si32(_mm_shuffle_epi32(ii, 1));
+            int j0 = _mm_cvtsi128_si32(jj);
+            int j1 = _mm_cvtsi128_si32(_mm_shuffle_epi32(jj, 1));
+
+            const double* fij0 = f + (i0-1)*nyl + j0-1;
+            const double* fij1 = f + (i1-1)*nyl + j1-1;
+            __m128d f00 = _mm_loadh_pd(_mm_load_sd(fij0), fij1);
+            __m128d f01 = _mm_loadh_pd(_mm_load_sd(fij0+1), fij1+1);
+            __m128d f10 = _mm_loadh_pd(_mm_load_sd(fij0+nyl), fij1+nyl);
+            __m128d f11 = _mm_loadh_pd(_mm_load_sd(fij0+nyl+1), fij1+nyl+1);
+            __m128d xai = _mm_loadh_pd(_mm_load_sd(xa+i0), xa+i1);
+            __m128d yaj = _mm_loadh_pd(_mm_load_sd(ya+j0), ya+j1);
+            __m128d ax = _mm_mul_pd(_mm_sub_pd(xai, x), ddxinv);
+            __m128d bx = _mm_sub_pd(one, ax);
+            __m128d ay = _mm_mul_pd(_mm_sub_pd(yaj, y), ddyinv);
+            __m128d by = _mm_sub_pd(one, ay);
+            __m128d gx = _mm_add_pd(_mm_mul_pd(_mm_sub_pd(f10, f00), ay),
+                                    _mm_mul_pd(_mm_sub_pd(f11, f01), by));
+            __m128d gy = _mm_add_pd(_mm_mul_pd(_mm_sub_pd(f01, f00), ax),
+                                    _mm_mul_pd(_mm_sub_pd(f11, f10), bx));
+            gx = _mm_mul_pd(gx, ddxinv);
+            gy = _mm_mul_pd(gy, ddyinv);
+            double* gk = g + 2*k;
+            _mm_storeu_pd(gk, _mm_add_pd(_mm_loadu_pd(gk), _mm_unpacklo_pd(gx, gy)));
+            _mm_storeu_pd(gk+2, _mm_add_pd(_mm_loadu_pd(gk+2), _mm_unpackhi_pd(gx, gy)));
+        }
+#endif
+        for (; k<n; ++k) {
+            const double* p = uvt + 3*k;
+            double x = p[0] - p[2]*vx + du;
+            double y = p[1] - p[2]*vy + dv;
+            x -= xperiod * WrapFloor((x-x0)*xperiodinv);
+            y -= yperiod * WrapFloor((y-y0)*yperiodinv);
+            // The upper index of the grid cell containing x,y, matching ArgVec::upperIndex
+            // when x or y is exactly on a grid line.  (That's common, since the aperture
+            // and screen grids are often aligned.)
+            double zx = (x-xa0) / dx;
+            double zy = (y-ya0) / dy;
+            int i = int(zx);
+            int j = int(zy);
+            i += (i < zx);
+            j += (j < zy);
+            if (i >= nxl) i = nxl-1;
+            if (i <= 0) i = 1;
+            if (j >= nyl) j = nyl-1;
+            if (j <= 0) j = 1;
+
+            const double* fij = f + (i-1)*nyl + j-1;
+            double f00 = fij[0];
+            double f01 = fij[1];
+            double f10 = fij[nyl];
+            double f11 = fij[nyl+1];
+            double ax = (xa[i] - x) * dxinv;
+            double bx = 1.0 - ax;
+            double ay = (ya[j] - y) * dyinv;
+            double by = 1.0 - ay;
+            g[2*k] += ( (f10-f00)*ay + (f11-f01)*by ) * dxinv;
+            g[2*k+1] += ( (f01-f00)*ax + (f11-f10)*bx ) * dyinv;
+        }
+    }
+
+    // Add up the gradients of several periodic linearly interpolated tables, each sampled at
+    // (u - t*vx + du, v - t*vy + dv), wrapped into its fundamental period.  This is the same
+    // calculation as Table2D::gradientMany with T2DLinear for each table after wrapping the
+    // positions with WrapArrayToPeriod, up to rounding errors.  The tables must have equally
+    // spaced args that include both ends of the period, as made by LookupTable2D with
+    // edge_mode='wrap'.  For each layer, params holds (x0, y0, xperiod, yperiod, vx, vy, du, dv).
+    //
+    // For large screens, the time is dominated by cache misses in the table lookups, since
+    // the frozen flow spreads the points over the whole screen.  So the points are first
+    // sorted into bins in t (with a counting sort, which keeps their order within each bin),
+    // such that within each bin the points of each layer only cover a small patch of its
+    // screen, and then the layers are done one at a time for each bin.
+    void SumWrappedGradients(const double* u, const double* v, const double* t,
+                             double* dfdx, double* dfdy, int n, int nlayers,
+                             const double* const* xargs, const double* const* yargs,
+                             const double* const* vals, const int* nx, const int* ny,
+                             const double* params)
+    {
+        // The number of points to sort into bins at a time, the minimum number of points
+        // in each bin for the sorting to be worthwhile, and the maximum number of bins.
+        // (With more bins, writing to all of them at once gets slow.)
+        const int chunk_size = 1<<20;
+        const int min_bin_size = 16384;
+        const int max_nbins = 64;
+
+        // Precompute everything we need for each layer, so the loop over points only does
+        // multiplications.
+        std::vector<double> lp(16*nlayers);
+        double speed = 0.;
+        for (int l=0; l<nlayers; ++l) {
+            const double* p = params + 8*l;
+            double* q = &lp[16*l];
+            q[0] = p[0];                                    // x0
+            q[1] = p[1];                                    // y0
+            q[2] = p[2];                                    // xperiod
+            q[3] = p[3];                                    // yperiod
+            q[4] = 1./p[2];
+            q[5] = 1./p[3];
+            q[6] = p[4];                                    // vx
+            q[7] = p[5];                                    // vy
+            q[8] = p[6];                                    // du
+            q[9] = p[7];                                    // dv
+            q[10] = xargs[l][0];
+            q[11] = yargs[l][0];
+            q[14] = (xargs[l][nx[l]-1] - xargs[l][0]) / (nx[l]-1);   // dx
+            q[15] = (yargs[l][ny[l]-1] - yargs[l][0]) / (ny[l]-1);   // dy
+            q[12] = 1. / q[14];
+            q[13] = 1. / q[15];
+            speed = std::max(speed, std::max(std::abs(p[4]), std::abs(p[5])));
+        }
+
+        // The sorted (u,v,t) and (dfdx,dfdy) are stored together for each point, since that
+        // is faster to write than separate arrays.  pos[k] is the index of point k in these.
+        std::vector<double> uvt(3*std::min(n, chunk_size));
+        std::vector<double> g(2*std::min(n, chunk_size));
+        std::vector<int> pos(std::min(n, chunk_size));
+        std::vector<int> start(max_nbins+1);
+        std::vector<int> next(max_nbins);
+        for (int k0=0; k0<n; k0+=chunk_size) {
+            const int m = std::min(chunk_size, n-k0);
+            const double* uk = u + k0;
+            const double* vk = v + k0;
+            const double* tk = t + k0;
+
+            // Choose bins in t such that the wind moves each layer by at most the size of the
+            // region covered by u,v during each one.
+            double umin = uk[0], umax = uk[0], vmin = vk[0], vmax = vk[0];
+            double tmin = tk[0], tmax = tk[0];
+            for (int k=1; k<m; ++k) {
+                umin = std::min(umin, uk[k]); umax = std::max(umax, uk[k]);
+                vmin = std::min(vmin, vk[k]); vmax = std::max(vmax, vk[k]);
+                tmin = std::min(tmin, tk[k]); tmax = std::max(tmax, tk[k]);
+            }
+            double width = std::max(umax-umin, vmax-vmin);
+            double travel = speed * (tmax-tmin);
+            int nbins = std::max(1, std::min(m / min_bin_size, max_nbins));
+            if (travel <= width) nbins = 1;
+            else if (width > 0.) nbins = int(std::min(std::ceil(travel/width), double(nbins)));
+
+            // Counting sort into the bins.
+            std::fill(start.begin(), start.end(), 0);
+            const double tscale = nbins > 1 ? nbins / (tmax-tmin) : 0.;
+            for (int k=0; k<m; ++k) {
+                int b = int((tk[k]-tmin) * tscale);
+                if (b >= nbins) b = nbins-1;
+                pos[k] = b;
+                ++start[b+1];
+            }
+            for (int b=0; b<nbins; ++b) start[b+1] += start[b];
+            std::copy(start.begin(), start.begin()+nbins, next.begin());
+            for (int k=0; k<m; ++k) {
+                int p = next[pos[k]]++;
+                pos[k] = p;
+                uvt[3*p] = uk[k];
+                uvt[3*p+1] = vk[k];
+                uvt[3*p+2] = tk[k];
+            }
+
+            std::fill(g.begin(), g.begin()+2*m, 0.);
+            for (int b=0; b<nbins; ++b) {
+                int s = start[b];
+                int nb = start[b+1] - s;
+                for (int l=0; l<nlayers; ++l)
+                    AddWrappedGradient(&uvt[0] + 3*s, &g[0] + 2*s, nb, &lp[16*l],
+                                       xargs[l], yargs[l], vals[l], nx[l], ny[l]);
+            }
+
+            for (int k=0; k<m; ++k) {
+                dfdx[k0+k] = g[2*pos[k]];
+                dfdy[k0+k] = g[2*pos[k]+1];
+            }
+        }
+    }
+
+    // The integral of |f - g| over x[0..n-1], where g is the straight line from (x[0],f[0])
+    // to (x[n-1],f[n-1]), using the trapezoidal rule.
+    static double LinApproxErr(const double* x, const double* f, int n)
+    {
+        double m = (f[n-1]-f[0]) / (x[n-1]-x[0]);
+        double err = 0.;
+        double prev = std::abs(f[0] - (f[0] + m*0.));  // (nan if m is infinite, like numpy)
+        for (int j=1; j<n; ++j) {
+            double next = std::abs(f[j] - (f[0] + m*(x[j]-x[0])));
+            err += (x[j]-x[j-1]) * (prev + next) / 2.;
+            prev = next;
+        }
+        return err;
+    }
+
+    // Choose the point k in 1..n-2 at which to split the piecewise linear approximation of
+    // f(x) over x[0..n-1].  If fast_search, this minimizes the integral of the squared error,
+    // which only takes O(n) time.  Otherwise, it minimizes the integral of the absolute error
+    // directly, which takes O(n^2) time.  Either way, the absolute errors of the two halves
+    // are returned in errleft and errright.
+    static int LinApproxSplit(const double* x, const double* f, int n, bool fast_search,
+                              double& errleft, double& errright)
+    {
+        int kbest = 1;
+        if (fast_search) {
+            // The integrals of the squared error of the line through points 0 and k, using
+            // weights dx_j = x[j+1]-x[j-1], are accumulated from the left, and likewise from
+            // the right for the line through points k and n-1.
+            std::vector<double> err(n-2);
+            double s1=0., s2=0., s3=0.;
+            for (int k=1; k<n-1; ++k) {
+                double dx = x[k+1] - x[k-1];
+                double ff = f[k] - f[0];
+                double xx = x[k] - x[0];
+                double m = ff / xx;
+                s1 += dx*ff*ff;
+                s2 += dx*ff*xx;
+                s3 += dx*xx*xx;
+                err[k-1] = s1 - 2*m*s2 + m*m*s3;
+            }
+            s1 = s2 = s3 = 0.;
+            for (int k=n-2; k>0; --k) {
+                double dx = x[k+1] - x[k-1];
+                double ff = f[k] - f[n-1];
+                double xx = x[k] - x[n-1];
+                double m = ff / xx;
+                s1 += dx*ff*ff;
+                s2 += dx*ff*xx;
+                s3 += dx*xx*xx;
+                err[k-1] += s1 - 2*m*s2 + m*m*s3;
+            }
+            // Like np.argmin, take the first minimum, or the first nan if there is one.
+            for (int k=1; k<n-1; ++k) {
+                if (std::isnan(err[k-1])) { kbest = k; break; }
+                if (err[k-1] < err[kbest-1]) kbest = k;
+            }
+            errleft = LinApproxErr(x, f, kbest+1);
+            errright = LinApproxErr(x+kbest, f+kbest, n-kbest);
+        } else {
+            double best = 0.;
+            for (int k=1; k<n-1; ++k) {
+                double el = LinApproxErr(x, f, k+1);
+                double er = LinApproxErr(x+k, f+k, n-k);
+                double e = el + er;
+                if (k == 1 || e < best || (std::isnan(e) && !std::isnan(best))) {
+                    kbest = k; best = e; errleft = el; errright = er;
+                }
+            }
+        }
+        return kbest;
+    }
+
+    // An interval of the tabulation in the heap used by ThinTabulatedValues.  The heap is
+    // ordered by the largest error first, then by the indices, like (-err, left, right) tuples
+    // in a Python heapq.
+    struct ThinInterval
+    {
+        double err;
+        int left, right;
+        ThinInterval(double _err, int _left, int _right) : err(_err), left(_left), right(_right) {}
+        bool operator<(const ThinInterval& rhs) const
+        {
+            if (err != rhs.err) return err < rhs.err;
+            if (left != rhs.left) return left > rhs.left;
+            return right > rhs.right;
+        }
+    };
+
+    int ThinTabulatedValues(const double* x, const double* f, int n, double thresh,
+                            bool fast_search, int* index)
+    {
+        // Start with no interior points and then greedily add them back one at a time,
+        // splitting the interval with the largest error, until the total error is at most
+        // thresh.  The heap starts with one interval whose error is large enough to trigger
+        // the first split.
+        std::vector<ThinInterval> heap;
+        heap.push_back(ThinInterval(2*thresh, 0, n-1));
+        // Summing the errors in the heap at each step would make this O(N^2) in the number of
+        // points kept.  So keep a running total, and only add up the heap when this gets close
+        // to thresh.
+        double total_err = 2*thresh;
+        for (;;) {
+            if (!(total_err > thresh * (1.+1.e-8))) {
+                double sum = 0.;
+                for (size_t k=0; k<heap.size(); ++k) sum += heap[k].err;
+                if (!(sum > thresh)) break;
+            }
+            std::pop_heap(heap.begin(), heap.end());
+            ThinInterval iv = heap.back();
+            heap.pop_back();
+            double errleft, errright;
+            int k = LinApproxSplit(x+iv.left, f+iv.left, iv.right-iv.left+1, fast_search,
+                                   errleft, errright);
+            heap.push_back(ThinInterval(errleft, iv.left, iv.left+k));
+            std::push_heap(heap.begin(), heap.end());
+            heap.push_back(ThinInterval(errright, iv.left+k, iv.right));
+            std::push_heap(heap.begin(), heap.end());
+            total_err += errleft + errright - iv.err;
+        }
+        int nkeep = 0;
+        index[nkeep++] = 0;
+        for (size_t k=0; k<heap.size(); ++k) index[nkeep++] = heap[k].right;
+        std::sort(index, index+nkeep);
+        return nkeep;
+    }
 }
@@ -20,6 +20,7 @@ from __future__ import print_function
 import os
 import numpy as np
 import sys
+import time
 from astropy import units
 
 import galsim
@@ -338,6 +339,60 @@ def test_thin():
         assert np.abs(thin_err) < err, "Thinned bandpass failed accuracy goal, w/ range shrinkage."
 
 
+@timer
+def test_thin_large():
+    """Test thinning a finely sampled bandpass, and the cache of thinned values."""
+    x = np.linspace(300, 1100, 50001)
+    f = np.exp(-0.5*((x-700)/80)**6) * (1 + 0.02*np.sin(x/0.7))
+    bp = galsim.Bandpass(galsim.LookupTable(x, f, interpolant='linear'), 'nm')
+    s = galsim.SED('1', wave_type='nm', flux_type='fphotons')
+    flux = s.calculateFlux(bp)
+    for err in [1.e-3, 1.e-5]:
+        for preserve_range in [True, False]:
+            t1 = time.time()
+            thin_bp = bp.thin(rel_err=err, preserve_range=preserve_range)
+            t2 = time.time()
+            thin_flux = s.calculateFlux(thin_bp)
+            thin_err = (flux-thin_flux)/flux
+            print("err = %s, num samples = %d, realized error = %s, time = %s"%(
+                  err, len(thin_bp.wave_list), thin_err, t2-t1))
+            assert np.abs(thin_err) < err
+            assert len(thin_bp.wave_list) < len(bp.wave_list)
+
+    # Thinning the same values again uses the cache.
+    galsim.utilities.resize_thin_cache(100)
+    bp_th1 = bp.thin(rel_err=1.e-4)
+    ncache = len(galsim.utilities._thin_cache)
+    bp2 = galsim.Bandpass(galsim.LookupTable(x, f, interpolant='linear'), 'nm')
+    bp_th2 = bp2.thin(rel_err=1.e-4)
+    assert bp_th2 == bp_th1
+    assert len(galsim.utilities._thin_cache) == ncache
+    # But not if any of the parameters are different.
+    bp_th3 = bp2.thin(rel_err=2.e-4)
+    assert bp_th3 != bp_th1
+    assert len(galsim.utilities._thin_cache) == ncache + 1
+    bp_th4 = bp2.thin(rel_err=1.e-4, preserve_range=False)
+    assert len(galsim.utilities._thin_cache) == ncache + 2
+
+    # Modifying the returned values doesn't change the cached ones.
+    x1, f1 = galsim.utilities.thin_tabulated_values(x, f)
+    f1_copy = f1.copy()
+    f1[:] = 0.
+    x2, f2 = galsim.utilities.thin_tabulated_values(x, f)
+    np.testing.assert_array_equal(x1, x2)
+    np.testing.assert_array_equal(f2, f1_copy)
+
+    galsim.utilities.resize_thin_cache(1)
+    assert len(galsim.utilities._thin_cache) == 1
+    galsim.utilities.resize_thin_cache(0)
+    assert len(galsim.utilities._thin_cache) == 0
+    bp_th5 = bp2.thin(rel_err=1.e-4)
+    assert bp_th5 == bp_th1
+    assert len(galsim.utilities._thin_cache) == 0
+    assert_raises(ValueError, galsim.utilities.resize_thin_cache, -1)
+    galsim.utilities.resize_thin_cache(100)
+
+
 @timer
 def test_zp():
     """Check that the zero points are maintained in an appropriate way when thinning, truncating."""
@@ -396,5 +451,6 @@ if __name__ == "__main__":
     test_Bandpass_wave_type()
     test_ne()
     test_thin()
+    test_thin_large()
     test_zp()
     test_truncate_inputs()
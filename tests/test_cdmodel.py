@@ -367,6 +367,105 @@ def test_exampleimage():
         # that the difference images do not show coherent structure other than a border feature
         # which is expected
 
+def _applycd_reference(image, cd, gain_ratio=1.):
+    """A numpy implementation of eqn. 4.5 in Antilogus+2014, independent of the C++ one, for
+    checking it.  Each term of the kernel is applied to the whole image at once.
+    """
+    a = image.array.astype(np.float64)
+    ny, nx = a.shape
+    n = cd.n
+    y = np.arange(ny)[:,np.newaxis]
+    x = np.arange(nx)[np.newaxis,:]
+
+    # (2) interpolated version of image at pixel borders
+    fT = np.zeros_like(a)
+    fB = np.zeros_like(a)
+    fL = np.zeros_like(a)
+    fR = np.zeros_like(a)
+    fT[:-1,:] = (a[:-1,:] + a[1:,:]) / 2.
+    fB[1:,:] = (a[1:,:] + a[:-1,:]) / 2.
+    fR[:,:-1] = (a[:,:-1] + a[:,1:]) / 2.
+    fL[:,1:] = (a[:,1:] + a[:,:-1]) / 2.
+
+    # (3) convolution of image with shift coefficient matrix.  Pixels outside the image are
+    # zero in the padded copy, so they don't move us.
+    padded = np.zeros((ny+2*n, nx+2*n))
+    padded[n:n+ny, n:n+nx] = a
+    delta = np.zeros_like(a)
+    for iy in range(-n, n+1):
+        # don't apply shift if pixel mirrored at t or b border non-existent
+        mT = (y+1-iy >= 0) & (y+1-iy < ny)
+        mB = (y-1-iy >= 0) & (y-1-iy < ny)
+        for ix in range(-n, n+1):
+            # don't apply shift if pixel mirrored at l or r border non-existent
+            mL = (x-1-ix >= 0) & (x-1-ix < nx)
+            mR = (x+1-ix >= 0) & (x+1-ix < nx)
+            q = padded[n+iy:n+iy+ny, n+ix:n+ix+nx]
+            delta += q * (fT * mT * cd.a_t.array[iy+n,ix+n] +
+                          fB * mB * cd.a_b.array[iy+n,ix+n] +
+                          fL * mL * cd.a_l.array[iy+n,ix+n] +
+                          fR * mR * cd.a_r.array[iy+n,ix+n])
+    return a + gain_ratio * delta
+
+
+@timer
+def test_reference_implementation():
+    """Test the optimized model application against a numpy implementation, including
+    the in_place option and non-contiguous image views.
+    """
+    rng = np.random.RandomState(rseed)
+    n = 2
+    shape = (2*n+1, 2*n+1)
+    # Use asymmetric random coefficients so that any mix-up of borders or offsets shows up.
+    cd = galsim.cdmodel.BaseCDModel(*[1.e-3 * rng.normal(size=shape) for i in range(4)])
+    for dtype in (np.float64, np.float32):
+        image = galsim.Image(rng.uniform(50., 150., size=(17,13)).astype(dtype), xmin=3, ymin=-2)
+        for gain_ratio in (1., 1.7):
+            ref = _applycd_reference(image, cd, gain_ratio)
+            test = cd.applyForward(image, gain_ratio)
+            np.testing.assert_allclose(test.array, ref, rtol=1.e-6,
+                                       err_msg="applyForward disagrees with reference")
+            np.testing.assert_equal(test.bounds, image.bounds)
+            assert test.dtype == dtype
+
+        # in_place modifies and returns the input image.
+        im2 = image.copy()
+        ret = cd.applyForward(im2, in_place=True)
+        assert ret is im2
+        np.testing.assert_allclose(im2.array, cd.applyForward(image).array, rtol=1.e-6)
+        im2 = image.copy()
+        cd.applyBackward(im2, in_place=True)
+        np.testing.assert_allclose(im2.array, cd.applyBackward(image).array, rtol=1.e-6)
+
+        # Subimages and transposed arrays have non-trivial steps.
+        sub = image.subImage(galsim.BoundsI(5, 12, 0, 11))
+        np.testing.assert_allclose(cd.applyForward(sub).array, _applycd_reference(sub, cd),
+                                   rtol=1.e-6)
+        trans = galsim.Image(image.array.T, xmin=-4, ymin=7)
+        np.testing.assert_allclose(cd.applyForward(trans).array, _applycd_reference(trans, cd),
+                                   rtol=1.e-6)
+
+
+@timer
+def test_narrow_images():
+    """Test images that are narrower (or shorter) than the kernel against the reference
+    implementation.
+    """
+    rng = np.random.RandomState(rseed)
+    for n in (1, 2, 3):
+        shape = (2*n+1, 2*n+1)
+        cd = galsim.cdmodel.BaseCDModel(*[1.e-3 * rng.normal(size=shape) for i in range(4)])
+        for nx in (1, 2, 3, 4):
+            for ny in (1, 3, 9):
+                for arr in (rng.uniform(50., 150., size=(ny,nx)),
+                            rng.uniform(50., 150., size=(nx,ny))):
+                    image = galsim.Image(arr)
+                    ref = _applycd_reference(image, cd)
+                    np.testing.assert_allclose(
+                        cd.applyForward(image).array, ref, rtol=1.e-10,
+                        err_msg="applyForward disagrees with reference for n=%d, shape=%s"%(
+                            n, arr.shape))
+
 
 if __name__ == "__main__":
     test_simplegeometry()
@@ -375,3 +474,5 @@ if __name__ == "__main__":
     test_forwardbackward()
     test_gainratio()
     test_exampleimage()
+    test_reference_implementation()
+    test_narrow_images()
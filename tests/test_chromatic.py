@@ -18,6 +18,7 @@
 
 from __future__ import print_function
 import os
+import pickle
 import numpy as np
 
 import galsim
@@ -1191,6 +1192,190 @@ def test_ChromaticObject_compound_affine_transformation():
     repr(a); repr(b); repr(c); repr(d)
 
 
+@timer
+def test_effective_prof_cache():
+    """Test the cache of effective profiles used by ChromaticConvolution.drawImage.
+    """
+    import shutil
+    cache = galsim.ChromaticConvolution
+    sed = galsim.SED(os.path.join(sedpath, 'CWW_Sbc_ext.sed'), 'A', 'flambda').thin(1.e-3)
+    bp = bandpass.thin(1.e-3)
+
+    def make_gal():
+        psf = galsim.ChromaticAtmosphere(galsim.Kolmogorov(fwhm=0.7), base_wavelength=500.,
+                                         zenith_angle=30*galsim.degrees,
+                                         parallactic_angle=20*galsim.degrees)
+        return galsim.Convolve(galsim.Exponential(half_light_radius=0.4) * sed, psf)
+
+    cache.clear_effective_prof_cache()
+    im1 = make_gal().drawImage(bp, nx=32, ny=32, scale=0.2)
+    info = cache.effective_prof_cache_info()
+    print('info = ',info)
+    assert info['hits'] == 0
+    assert info['misses'] == 1
+    assert info['currsize'] == 1
+    assert info['nbytes'] > 0
+
+    # An equivalent, but new, object hits the cache.
+    im2 = make_gal().drawImage(bp, nx=32, ny=32, scale=0.2)
+    np.testing.assert_array_equal(im2.array, im1.array)
+    assert cache.effective_prof_cache_info()['hits'] == 1
+
+    # With a disk cache, other processes (simulated here by clearing the in-memory cache) can
+    # read the effective profile rather than drawing it.
+    cache_dir = os.path.join('output', 'effective_prof_cache')
+    shutil.rmtree(cache_dir, ignore_errors=True)
+    galsim.utilities.cache_dirs['effective_prof'] = cache_dir
+    try:
+        cache.clear_effective_prof_cache()
+        im3 = make_gal().drawImage(bp, nx=32, ny=32, scale=0.2)
+        assert len(os.listdir(cache_dir)) == 1
+        assert cache.effective_prof_cache_info()['disk_hits'] == 0
+        cache.clear_effective_prof_cache()
+        im4 = make_gal().drawImage(bp, nx=32, ny=32, scale=0.2)
+        info = cache.effective_prof_cache_info()
+        assert info['misses'] == 1
+        assert info['disk_hits'] == 1
+        np.testing.assert_array_equal(im3.array, im1.array)
+        np.testing.assert_array_equal(im4.array, im1.array)
+
+        # Objects with a lambda function in their repr don't use the disk cache.
+        psf = galsim.ChromaticObject(galsim.Moffat(fwhm=0.7, beta=3)).dilate(
+                lambda w: (w/500.)**-0.2)
+        gal = galsim.Convolve(galsim.Exponential(half_light_radius=0.4) * sed, psf)
+        gal.drawImage(bp, nx=32, ny=32, scale=0.2)
+        assert len(os.listdir(cache_dir)) == 1
+    finally:
+        del galsim.utilities.cache_dirs['effective_prof']
+
+    # Limit the cache by the number of bytes.
+    info = cache.effective_prof_cache_info()
+    assert info['currsize'] == 2
+    max_bytes = info['nbytes'] - 1
+    cache.resize_effective_prof_cache(max_bytes=max_bytes)
+    info = cache.effective_prof_cache_info()
+    assert info['currsize'] == 1
+    assert info['max_bytes'] == max_bytes
+    assert info['nbytes'] <= max_bytes
+    cache.resize_effective_prof_cache(maxsize=20, max_bytes=0)
+    info = cache.effective_prof_cache_info()
+    assert info['maxsize'] == 20
+    assert info['max_bytes'] == 0
+    assert info['currsize'] == 1
+
+    assert_raises(ValueError, cache.resize_effective_prof_cache, 0)
+    assert_raises(ValueError, cache.resize_effective_prof_cache, None, -1)
+    cache.resize_effective_prof_cache(10)
+
+
+@timer
+def test_effective_prof_cache_large_arrays():
+    """Test that PSFs that differ only inside arrays too large for numpy to print in full don't
+    share an effective profile.
+    """
+    cache = galsim.ChromaticConvolution
+    bp = bandpass.thin(1.e-3)
+    gal = galsim.Exponential(half_light_radius=0.4) * galsim.SED('1', 'nm', 'fphotons')
+
+    rng = np.random.RandomState(1234)
+    arr = galsim.Gaussian(sigma=0.6).drawImage(nx=64, ny=64, scale=0.1).array
+    arr1 = arr * (1. + 0.01 * rng.uniform(size=arr.shape))
+    arr2 = arr1.copy()
+    # Change some pixels well away from the edges, where numpy would elide them in the repr,
+    # and others by less than numpy's default 8 digits of precision.
+    arr2[30:34,30:34] *= 2.
+    arr2[0,0] *= 1. + 1.e-12
+    assert repr(arr1) == repr(arr2)
+
+    def make_gal(arr):
+        psf = galsim.InterpolatedImage(galsim.Image(arr, scale=0.1))
+        psf = galsim.ChromaticAtmosphere(psf, base_wavelength=500.,
+                                         zenith_angle=30*galsim.degrees)
+        return galsim.Convolve(gal, psf)
+
+    cache.clear_effective_prof_cache()
+    im1 = make_gal(arr1).drawImage(bp, nx=32, ny=32, scale=0.2)
+    im2 = make_gal(arr2).drawImage(bp, nx=32, ny=32, scale=0.2)
+    assert cache.effective_prof_cache_info()['hits'] == 0
+    assert cache.effective_prof_cache_info()['misses'] == 2
+    assert np.max(np.abs(im1.array - im2.array)) > 1.e-3 * np.max(im1.array)
+
+    # Equal PSFs still hit, and the keys are content hashes, so they can use the disk cache.
+    im3 = make_gal(arr2.copy()).drawImage(bp, nx=32, ny=32, scale=0.2)
+    assert cache.effective_prof_cache_info()['hits'] == 1
+    np.testing.assert_array_equal(im3.array, im2.array)
+    psf = galsim.InterpolatedImage(galsim.Image(arr2, scale=0.1))
+    key = galsim.chromatic._effective_prof_key(psf, bp, 1., 'quadratic', None)
+    assert isinstance(key, str)
+
+    # If a repr is abbreviated, the arguments themselves are used as the key.
+    class AbbreviatedRepr(object):
+        def __repr__(self): return 'AbbreviatedRepr(...)'
+    key = galsim.chromatic._effective_prof_key(AbbreviatedRepr(), bp, 1., 'quadratic', None)
+    assert isinstance(key, tuple)
+
+
+@timer
+def test_eval_plan():
+    """Check that the evaluation plans used for drawing match evaluateAtWavelength.
+    """
+    import pickle
+    from galsim.chromatic import _make_eval_plan
+    sed1 = galsim.SED(os.path.join(sedpath, 'CWW_E_ext.sed'), 'A', 'flambda')
+    sed2 = galsim.SED(os.path.join(sedpath, 'CWW_Im_ext.sed'), 'A', 'flambda')
+    bandpass = galsim.Bandpass(os.path.join(bppath, 'LSST_r.dat'), 'nm').thin(1.e-2)
+    bulge = galsim.DeVaucouleurs(half_light_radius=0.5) * sed1
+    disk = galsim.Exponential(half_light_radius=1.0).shear(g1=0.2) * sed2
+    gal = (bulge + disk).dilate(lambda w: (w/600.)**0.1).shift(0.1, 0.2)
+    psf = galsim.ChromaticAtmosphere(galsim.Kolmogorov(fwhm=0.7), 500.,
+                                     zenith_angle=30*galsim.degrees)
+    psf = galsim.Convolve(psf, galsim.ChromaticAiry(lam=600., diam=4.))
+    obj = galsim.Convolve(gal, psf.shear(g2=0.05))
+
+    waves = np.linspace(bandpass.blue_limit, bandpass.red_limit, 11)
+    plan = _make_eval_plan(obj, waves)
+    for w in waves:
+        assert plan(w) == obj.evaluateAtWavelength(w)
+    # Wavelengths not given in advance are also ok.
+    for w in [560., 612.3]:
+        assert plan(w) == obj.evaluateAtWavelength(w)
+    # As is not preparing the plan at all.
+    plan = _make_eval_plan(obj)
+    assert plan(waves[3]) == obj.evaluateAtWavelength(waves[3])
+
+    # Picklable if the object is.
+    obj2 = galsim.Convolve(bulge + disk, psf)
+    plan = _make_eval_plan(obj2, waves)
+    assert plan(waves[2]) == obj2.evaluateAtWavelength(waves[2])
+    plan2 = pickle.loads(pickle.dumps(plan))
+    assert plan2(waves[2]) == obj2.evaluateAtWavelength(waves[2])
+
+    # Drawing uses the plans, but the results should be as before.
+    obj3 = (psf * sed2).rotate(10*galsim.degrees)
+    assert type(obj3) is galsim.ChromaticTransformation
+    for integrator in [galsim.integ.ContinuousIntegrator(galsim.integ.midptRule, N=5),
+                       galsim.integ.AdaptiveIntegrator(rel_err=1.e-2, N_initial=3)]:
+        im1 = obj3.drawImage(bandpass, image=galsim.ImageD(32, 32, scale=0.2),
+                             integrator=integrator)
+        im2 = galsim.ImageD(32, 32, scale=0.2)
+        # drawImage gives the integrator the tabulated wavelengths of the SED too.
+        wave_list, _, _ = galsim.utilities.combine_wave_list(obj3, bandpass)
+        im2 = integrator(obj3.evaluateAtWavelength, bandpass, im2, {}, wave_list=wave_list)
+        np.testing.assert_array_equal(im1.array, im2.array)
+
+    # The plans can be pickled, both before and after they are prepared for a set of wavelengths
+    # and first used.
+    waves = bandpass.wave_list[::10]
+    for obj in [obj3, galsim.Add(obj3, obj3.shift(0.3, 0.2))]:
+        plan = galsim.chromatic._make_eval_plan(obj)
+        plan2 = galsim.chromatic._make_eval_plan(obj, waves)
+        plan2(waves[0])
+        for p in [plan, plan2]:
+            p = pickle.loads(pickle.dumps(p))
+            for w in waves:
+                assert p(w) == obj.evaluateAtWavelength(w)
+
+
 @timer
 def test_analytic_integrator():
     """Test that the analytic (i.e., not sampled) versions of SEDs and Bandpasses produce the
@@ -1260,6 +1445,241 @@ def test_analytic_integrator():
                          integrator=galsim.integ.SampleIntegrator(rule=galsim.integ.trapzRule))
 
 
+@timer
+def test_adaptive_integrator():
+    """Test the AdaptiveIntegrator against a fine ContinuousIntegrator.
+    """
+    psf = galsim.ChromaticObject(galsim.Moffat(fwhm=1.0, beta=2.7)).dilate(lambda w:(w/500)**1.1)
+    bandpass = galsim.Bandpass('1', 'nm', blue_limit=500, red_limit=750)
+    sed = galsim.SED('wave**1.1', wave_type='nm', flux_type='fphotons').withFluxDensity(1.0, 500)
+    final = galsim.Convolve(galsim.Gaussian(fwhm=1.0) * sed, psf)
+
+    ref_integrator = galsim.integ.ContinuousIntegrator(galsim.integ.trapzRule, N=1000)
+    ref_image = galsim.ChromaticObject.drawImage(final, bandpass, nx=32, ny=32, scale=0.2,
+                                                 integrator=ref_integrator)
+    ref_kimage = galsim.ChromaticObject.drawKImage(final, bandpass, nx=32, ny=32, scale=0.2,
+                                                   integrator=ref_integrator)
+    norm = np.sum(np.abs(ref_image.array))
+    knorm = np.sum(np.abs(ref_kimage.array))
+
+    for rel_err in [1.e-3, 1.e-4, 1.e-5]:
+        integrator = galsim.integ.AdaptiveIntegrator(rel_err=rel_err)
+        image = galsim.ChromaticObject.drawImage(final, bandpass, nx=32, ny=32, scale=0.2,
+                                                 integrator=integrator)
+        print(rel_err, integrator.last_n_eval, integrator.last_rel_err,
+              np.sum(np.abs(image.array - ref_image.array)) / norm)
+        assert integrator.last_rel_err <= rel_err
+        assert np.sum(np.abs(image.array - ref_image.array)) <= rel_err * norm
+        assert integrator.last_n_eval == len(integrator.last_waves)
+        assert integrator.last_n_eval < ref_integrator.last_n_eval
+        assert integrator.last_n_eval % 2 == 1
+        np.testing.assert_array_equal(integrator.last_waves, np.unique(integrator.last_waves))
+        assert integrator.last_waves[0] == bandpass.blue_limit
+        assert integrator.last_waves[-1] == bandpass.red_limit
+        assert final._last_n_eval == integrator.last_n_eval
+
+        kimage = galsim.ChromaticObject.drawKImage(final, bandpass, nx=32, ny=32, scale=0.2,
+                                                   integrator=integrator)
+        assert np.sum(np.abs(kimage.array - ref_kimage.array)) <= rel_err * knorm
+
+    # ChromaticConvolution.drawImage uses the integrator for the effective PSF.
+    integrator = galsim.integ.AdaptiveIntegrator(rel_err=1.e-5)
+    image = final.drawImage(bandpass, nx=32, ny=32, scale=0.2, integrator=integrator)
+    ref_image = final.drawImage(bandpass, nx=32, ny=32, scale=0.2, integrator=ref_integrator)
+    assert integrator.last_n_eval < ref_integrator.last_n_eval
+    np.testing.assert_allclose(image.array, ref_image.array, rtol=0, atol=1.e-5*norm)
+
+    # Hitting max_eval gives a warning.
+    integrator = galsim.integ.AdaptiveIntegrator(rel_err=1.e-8, max_eval=21)
+    with assert_warns(galsim.GalSimWarning):
+        galsim.ChromaticObject.drawImage(final, bandpass, nx=32, ny=32, scale=0.2,
+                                         integrator=integrator)
+    assert integrator.last_n_eval == 21
+    assert integrator.last_rel_err > 1.e-8
+
+    # An achromatic profile only needs the initial draws.
+    integrator = galsim.integ.AdaptiveIntegrator(N_initial=3)
+    flat = galsim.SED('1', wave_type='nm', flux_type='fphotons')
+    delta = galsim.ChromaticObject(galsim.DeltaFunction()).dilate(lambda w: 1.)
+    gal = galsim.Convolve(galsim.Gaussian(fwhm=1.0) * flat, delta)
+    image = galsim.ChromaticObject.drawImage(gal, bandpass, nx=32, ny=32, scale=0.2,
+                                             integrator=integrator)
+    assert integrator.last_n_eval == 7
+    image2 = galsim.Gaussian(fwhm=1.0, flux=250.).drawImage(nx=32, ny=32, scale=0.2)
+    np.testing.assert_allclose(image.array, image2.array, rtol=0, atol=1.e-6*image2.array.max())
+
+    # A narrow feature in a tabulated bandpass falls between the evenly spaced initial
+    # wavelengths, so the tabulated wavelengths need to be used as the initial edges.
+    spike = galsim.Bandpass(galsim.LookupTable([500, 600, 601, 605, 606, 750],
+                                               [0.1, 0.1, 1.0, 1.0, 0.1, 0.1],
+                                               interpolant='linear'), 'nm')
+    ref_image = galsim.ChromaticObject.drawImage(final, spike, nx=32, ny=32, scale=0.2,
+                                                 integrator=ref_integrator)
+    norm = np.sum(np.abs(ref_image.array))
+    integrator = galsim.integ.AdaptiveIntegrator(rel_err=1.e-4)
+    image = galsim.ChromaticObject.drawImage(final, spike, nx=32, ny=32, scale=0.2,
+                                             integrator=integrator)
+    print('spike', integrator.last_n_eval, np.sum(np.abs(image.array - ref_image.array)) / norm)
+    assert np.all(np.isin(spike.wave_list, integrator.last_waves))
+    assert integrator.last_n_eval < ref_integrator.last_n_eval
+    assert np.sum(np.abs(image.array - ref_image.array)) <= 1.e-3 * norm
+
+    # Tabulated SED wavelengths are used too.
+    sed_spike = galsim.SED(galsim.LookupTable([400, 600, 601, 605, 606, 800],
+                                              [0.1, 0.1, 1.0, 1.0, 0.1, 0.1],
+                                              interpolant='linear'), 'nm', 'fphotons')
+    final2 = galsim.Convolve(galsim.Gaussian(fwhm=1.0) * sed_spike, psf)
+    ref_image = galsim.ChromaticObject.drawImage(final2, bandpass, nx=32, ny=32, scale=0.2,
+                                                 integrator=ref_integrator)
+    norm = np.sum(np.abs(ref_image.array))
+    image = galsim.ChromaticObject.drawImage(final2, bandpass, nx=32, ny=32, scale=0.2,
+                                             integrator=integrator)
+    print('sed spike', integrator.last_n_eval,
+          np.sum(np.abs(image.array - ref_image.array)) / norm)
+    assert np.all(np.isin([600, 601, 605, 606], integrator.last_waves))
+    assert np.sum(np.abs(image.array - ref_image.array)) <= 1.e-3 * norm
+    galsim.ChromaticObject.drawKImage(final2, bandpass, nx=32, ny=32, scale=0.2,
+                                      integrator=integrator)
+    assert np.all(np.isin([600, 601, 605, 606], integrator.last_waves))
+
+    # If there are too many tabulated wavelengths, a subset of them is used within max_eval.
+    dense = galsim.Bandpass(galsim.LookupTable(np.linspace(500, 750, 101),
+                                               1. + 0.1 * np.sin(np.arange(101)),
+                                               interpolant='linear'), 'nm')
+    integrator = galsim.integ.AdaptiveIntegrator(rel_err=1.e-8, max_eval=41)
+    with assert_warns(galsim.GalSimWarning):
+        galsim.ChromaticObject.drawImage(final, dense, nx=32, ny=32, scale=0.2,
+                                         integrator=integrator)
+    assert integrator.last_n_eval == 41
+    assert integrator.last_waves[0] == dense.blue_limit
+    assert integrator.last_waves[-1] == dense.red_limit
+    assert np.all(np.isin(integrator.last_waves[::2], dense.wave_list))
+
+    assert_raises(ValueError, galsim.integ.AdaptiveIntegrator, rel_err=0.)
+    assert_raises(ValueError, galsim.integ.AdaptiveIntegrator, N_initial=0)
+    assert_raises(ValueError, galsim.integ.AdaptiveIntegrator, N_initial=10, max_eval=20)
+
+
+@timer
+def test_chromatic_photon_shooting():
+    """Test that method='phot' shoots each photon at its own wavelength.
+    """
+    bandpass = galsim.Bandpass('LSST_r.dat', 'nm').thin(1.e-3)
+    sed = galsim.SED('CWW_E_ext.sed', 'A', 'flambda').thin(1.e-3).withFlux(1.e6, bandpass)
+    sed2 = galsim.SED('CWW_Im_ext.sed', 'A', 'flambda').thin(1.e-3).withFlux(3.e5, bandpass)
+    gal = galsim.Exponential(half_light_radius=0.5) * sed
+    gal2 = galsim.DeVaucouleurs(half_light_radius=0.3).shift(0.2,0.1) * sed2
+    atm = galsim.ChromaticAtmosphere(galsim.Kolmogorov(fwhm=0.7), base_wavelength=500.,
+                                     zenith_angle=40*galsim.degrees,
+                                     parallactic_angle=20*galsim.degrees)
+    airy = galsim.ChromaticAiry(lam=500., diam=4., obscuration=0.3)
+    dilate = galsim.ChromaticObject(galsim.Gaussian(fwhm=0.6))
+    dilate = dilate.dilate(lambda w: (w/500.)**0.6).shift(lambda w: (0.3*(w-600.)/100., 0.))
+    kwargs = dict(nx=64, ny=64, scale=0.2)
+
+    for final in [galsim.Convolve(gal, atm),
+                  galsim.Convolve(gal + gal2, atm, airy),
+                  galsim.Convolve(gal, dilate),
+                  galsim.Convolve(gal, galsim.Gaussian(fwhm=0.6))]:
+        assert final._shootable
+        im_fft = final.drawImage(bandpass, **kwargs)
+        im_phot = final.drawImage(bandpass, method='phot', rng=galsim.BaseDeviate(1234),
+                                  save_photons=True, **kwargs)
+        print(final)
+        print('flux: ', im_fft.array.sum(), im_phot.array.sum())
+        np.testing.assert_allclose(im_phot.array.sum(), im_fft.array.sum(), rtol=3.e-3)
+        mom_fft = im_fft.FindAdaptiveMom()
+        mom_phot = im_phot.FindAdaptiveMom()
+        print('centroid: ', mom_fft.moments_centroid, mom_phot.moments_centroid)
+        print('sigma: ', mom_fft.moments_sigma, mom_phot.moments_sigma)
+        np.testing.assert_allclose(mom_phot.moments_centroid.x, mom_fft.moments_centroid.x,
+                                   atol=0.01)
+        np.testing.assert_allclose(mom_phot.moments_centroid.y, mom_fft.moments_centroid.y,
+                                   atol=0.01)
+        np.testing.assert_allclose(mom_phot.moments_sigma, mom_fft.moments_sigma, rtol=5.e-3)
+        np.testing.assert_allclose(mom_phot.observed_shape.e1, mom_fft.observed_shape.e1,
+                                   atol=5.e-3)
+        np.testing.assert_allclose(mom_phot.observed_shape.e2, mom_fft.observed_shape.e2,
+                                   atol=5.e-3)
+
+        # The photons should have wavelengths drawn from the SED * bandpass.
+        photons = im_phot.photons
+        assert photons.hasAllocatedWavelengths()
+        assert np.all(photons.wavelength >= bandpass.blue_limit)
+        assert np.all(photons.wavelength <= bandpass.red_limit)
+
+    # The positions should correspond to the photon wavelengths.  With DCR, blue photons land
+    # closer to the zenith than red ones, and they are more spread out by the atmosphere.
+    final = galsim.Convolve(galsim.Gaussian(sigma=1.e-3) * sed, atm)
+    im = final.drawImage(bandpass, method='phot', rng=galsim.BaseDeviate(1234),
+                         save_photons=True, **kwargs)
+    photons = im.photons
+    w = photons.wavelength
+    shift = galsim.dcr.get_refraction(w, 40*galsim.degrees) - atm.base_refraction
+    shift *= galsim.radians / galsim.arcsec / kwargs['scale']
+    sinp, cosp = (20*galsim.degrees).sincos()
+    x = photons.x + shift * sinp
+    y = photons.y - shift * cosp
+    blue = w < np.median(w)
+    red = w >= np.median(w)
+    print('DCR shift = ', np.median(shift[red]) - np.median(shift[blue]))
+    assert np.abs(np.median(shift[red]) - np.median(shift[blue])) > 0.1
+    np.testing.assert_allclose(np.median(x[red]), np.median(x[blue]), atol=0.01)
+    np.testing.assert_allclose(np.median(y[red]), np.median(y[blue]), atol=0.01)
+    r = np.sqrt((x-np.median(x))**2 + (y-np.median(y))**2)
+    ratio = np.median(r[red]) / np.median(r[blue])
+    expected_ratio = (np.mean(w[red]) / np.mean(w[blue]))**(-0.2)
+    print('size ratio = ', ratio, expected_ratio)
+    np.testing.assert_allclose(ratio, expected_ratio, rtol=3.e-3)
+
+    # The same rng gives the same image.
+    final = galsim.Convolve(gal, atm)
+    im1 = final.drawImage(bandpass, method='phot', rng=galsim.BaseDeviate(1234), **kwargs)
+    im2 = final.drawImage(bandpass, method='phot', rng=galsim.BaseDeviate(1234), maxN=100000,
+                          **kwargs)
+    im3 = final.drawImage(bandpass, method='phot', rng=galsim.BaseDeviate(1234), **kwargs)
+    np.testing.assert_array_equal(im1.array, im3.array)
+    np.testing.assert_allclose(im2.array.sum(), im1.array.sum(), rtol=3.e-3)
+
+    # Picking the component of a sum for each photon needs all the SEDs to be non-negative.
+    # Otherwise, the integrator is used.
+    final = galsim.Convolve(gal + gal2 * -0.1, atm)
+    assert not final.obj_list[0]._shootable
+    assert not final._shootable
+    im_fft = final.drawImage(bandpass, **kwargs)
+    im = final.drawImage(bandpass, method='phot', rng=galsim.BaseDeviate(1234), **kwargs)
+    np.testing.assert_allclose(im.array.sum(), final.calculateFlux(bandpass), rtol=2.e-2)
+    np.testing.assert_allclose(im.array.sum(), im_fft.array.sum(), rtol=2.e-2)
+    sed_neg = galsim.SED(galsim.LookupTable([300, 600, 1200], [1., -0.1, 1.]), 'nm', 'fphotons')
+    assert not (gal + galsim.Gaussian(fwhm=1.) * sed_neg)._shootable
+    sed_neg = galsim.SED('(wave-400)/200', 'nm', 'fphotons')
+    assert not (gal + galsim.Gaussian(fwhm=1.) * sed_neg)._shootable
+    assert (gal + galsim.Gaussian(fwhm=1.) * galsim.SED('wave/200', 'nm', 'fphotons'))._shootable
+
+    # An explicit integrator turns off the chromatic photon shooting.  Then a separable profile
+    # is drawn as before, shooting the achromatic profile with the integrated flux.
+    final = galsim.Convolve(gal, galsim.Gaussian(fwhm=0.6))
+    im1 = final.drawImage(bandpass, method='phot', integrator='trapezoidal',
+                          rng=galsim.BaseDeviate(1234), save_photons=True, **kwargs)
+    assert not im1.photons.hasAllocatedWavelengths()
+    achrom = galsim.Convolve(galsim.Exponential(half_light_radius=0.5), galsim.Gaussian(fwhm=0.6))
+    achrom = achrom.withFlux(final.calculateFlux(bandpass))
+    im2 = achrom.drawImage(method='phot', rng=galsim.BaseDeviate(1234), **kwargs)
+    np.testing.assert_allclose(im1.array, im2.array, rtol=1.e-5)
+    im3 = final.drawImage(bandpass, method='phot', rng=galsim.BaseDeviate(1234),
+                          save_photons=True, **kwargs)
+    assert im3.photons.hasAllocatedWavelengths()
+
+    # Profiles that cannot be shot at arbitrary wavelengths still use the integrator.
+    interp = galsim.InterpolatedChromaticObject(atm, np.linspace(500, 720, 5))
+    final = galsim.Convolve(gal.withScaledFlux(0.1), interp)
+    assert not final._shootable
+    im = final.drawImage(bandpass, method='phot', rng=galsim.BaseDeviate(1234), **kwargs)
+    np.testing.assert_allclose(im.added_flux, final.calculateFlux(bandpass), rtol=2.e-2)
+    with assert_raises(galsim.GalSimNotImplementedError):
+        interp._shoot(galsim.PhotonArray(10, wavelength=600.), galsim.BaseDeviate(1234))
+
+
 @timer
 def test_gsparams():
     """Check that gsparams actually gets processed by ChromaticObjects.
@@ -1716,6 +2136,112 @@ def test_interpolated_ChromaticObject():
     assert not hasattr(trans_interp_psf, 'waves')
 
 
+@timer
+def test_interpolated_ChromaticObject_file():
+    """Test writing and reading the images of an InterpolatedChromaticObject.
+    """
+    import pickle
+    import json
+    atm = galsim.ChromaticAtmosphere(galsim.Kolmogorov(fwhm=0.7), base_wavelength=500.,
+                                     zenith_angle=30*galsim.degrees,
+                                     parallactic_angle=20*galsim.degrees)
+    psf = galsim.Convolve(atm, galsim.ChromaticAiry(lam=700., diam=4.))
+    waves = np.linspace(500., 720., 12)
+    file_name = os.path.join('output', 'interp_psf.npy')
+    if os.path.isfile(file_name):
+        os.remove(file_name)
+
+    interp = psf.interpolate(waves, oversample_fac=1.5)
+    interp.write(file_name)
+    interp2 = galsim.InterpolatedChromaticObject.read(file_name)
+    interp3 = galsim.InterpolatedChromaticObject.read(file_name, original=psf)
+    assert interp2 == interp
+    assert interp3 == interp
+    assert interp2.deinterpolated == psf
+    for im, im2 in zip(interp.ims, interp2.ims):
+        assert isinstance(im2.array.base, np.memmap)
+        assert im2.isconst
+        np.testing.assert_array_equal(im2.array, im.array)
+        assert im2.scale == im.scale
+    np.testing.assert_array_equal(interp2.stepk_vals, interp.stepk_vals)
+    np.testing.assert_array_equal(interp2.maxk_vals, interp.maxk_vals)
+    np.testing.assert_array_equal(interp2.fluxes, interp.fluxes)
+
+    # Drawing gives identical images.
+    gal = galsim.Exponential(half_light_radius=0.5) * galsim.SED('CWW_E_ext.sed', 'A', 'flambda')
+    im = galsim.Convolve(gal, interp).drawImage(bandpass, nx=32, ny=32, scale=0.2)
+    im2 = galsim.Convolve(gal, interp2).drawImage(bandpass, nx=32, ny=32, scale=0.2)
+    np.testing.assert_array_equal(im2.array, im.array)
+    np.testing.assert_array_equal(interp2.evaluateAtWavelength(612.).drawImage(scale=0.2).array,
+                                  interp.evaluateAtWavelength(612.).drawImage(scale=0.2).array)
+
+    # Pickling just maps the file again.
+    interp4 = pickle.loads(pickle.dumps(interp2))
+    assert interp4 == interp
+    assert isinstance(interp4.ims[0].array.base, np.memmap)
+    assert len(pickle.dumps(interp2)) < len(pickle.dumps(interp)) / 10
+    do_pickle(interp2)
+
+    # With file_name, the first one builds the images and writes the file.  Later ones read it.
+    os.remove(file_name)
+    interp5 = psf.interpolate(waves, oversample_fac=1.5, file_name=file_name)
+    assert os.path.isfile(file_name)
+    assert interp5 == interp
+    assert isinstance(interp5.ims[0].array.base, np.memmap)
+    interp6 = galsim.InterpolatedChromaticObject(psf, waves, oversample_fac=1.5,
+                                                 file_name=file_name)
+    for im5, im6 in zip(interp5.ims, interp6.ims):
+        np.testing.assert_array_equal(im6.array, im5.array)
+
+    # The file has to match the object being interpolated.
+    with assert_raises(galsim.GalSimIncompatibleValuesError):
+        galsim.InterpolatedChromaticObject(psf, waves, file_name=file_name)
+    with assert_raises(galsim.GalSimIncompatibleValuesError):
+        galsim.InterpolatedChromaticObject(psf, waves[1:], oversample_fac=1.5,
+                                           file_name=file_name)
+    with assert_raises(galsim.GalSimIncompatibleValuesError):
+        galsim.InterpolatedChromaticObject.read(file_name, original=atm)
+
+    # Changing the gsparams rebuilds the images in memory.
+    interp7 = interp5.withGSParams(galsim.GSParams(folding_threshold=1.e-3))
+    assert interp7._file_name is None
+    assert not isinstance(interp7.ims[0].array.base, np.memmap)
+
+    # The file is two plain .npy arrays: the JSON description and the images.
+    with open(file_name, 'rb') as fin:
+        meta = json.loads(np.load(fin).tobytes().decode('utf-8'))
+        cube = np.load(fin)
+    np.testing.assert_array_equal(meta['waves'], waves)
+    np.testing.assert_array_equal(cube, [im.array for im in interp.ims])
+
+    # The check of the original object uses all of the values in any arrays, even when numpy
+    # would abbreviate them in a repr.
+    arr = galsim.Gaussian(sigma=0.6).drawImage(nx=64, ny=64, scale=0.1).array
+    arr2 = arr.copy()
+    arr2[30:34,30:34] *= 2.
+    arr2[0,0] *= 1. + 1.e-12
+    assert repr(arr) == repr(arr2)
+    atm1, atm2 = [galsim.ChromaticAtmosphere(galsim.InterpolatedImage(galsim.Image(a, scale=0.1)),
+                                             base_wavelength=500., zenith_angle=30*galsim.degrees)
+                  for a in (arr, arr2)]
+    os.remove(file_name)
+    interp8 = atm1.interpolate(waves[:3], file_name=file_name)
+    interp9 = galsim.InterpolatedChromaticObject(atm1, waves[:3], file_name=file_name)
+    np.testing.assert_array_equal(interp9.ims[1].array, interp8.ims[1].array)
+    assert galsim.InterpolatedChromaticObject.read(file_name).deinterpolated == atm1
+    with assert_raises(galsim.GalSimIncompatibleValuesError):
+        galsim.InterpolatedChromaticObject(atm2, waves[:3], file_name=file_name)
+
+    # If the repr doesn't describe the object, the file can be written, but not checked later.
+    psf_lam = galsim.ChromaticObject(galsim.Moffat(fwhm=0.7, beta=3)).dilate(
+            lambda w: (w/500.)**-0.2)
+    os.remove(file_name)
+    interp10 = psf_lam.interpolate(waves[:3], file_name=file_name)
+    assert isinstance(interp10.ims[0].array.base, np.memmap)
+    with assert_raises(galsim.GalSimIncompatibleValuesError):
+        galsim.InterpolatedChromaticObject(psf_lam, waves[:3], file_name=file_name)
+
+
 @timer
 def test_ChromaticOpticalPSF():
     """Test the ChromaticOpticalPSF functionality."""
@@ -2502,11 +3028,17 @@ if __name__ == "__main__":
     test_ChromaticObject_shear()
     test_ChromaticObject_shift()
     test_ChromaticObject_compound_affine_transformation()
+    test_effective_prof_cache()
+    test_effective_prof_cache_large_arrays()
+    test_eval_plan()
     test_analytic_integrator()
+    test_adaptive_integrator()
+    test_chromatic_photon_shooting()
     test_gsparams()
     test_separable_ChromaticSum()
     test_centroid()
     test_interpolated_ChromaticObject()
+    test_interpolated_ChromaticObject_file()
     test_ChromaticOpticalPSF()
     test_ChromaticAiry()
     test_chromatic_fiducial_wavelength()
@@ -414,6 +414,58 @@ def test_opticalpsf():
         galsim.config.BuildGSObject(config, 'bad3')
 
 
+@timer
+def test_opticalpsffield():
+    """Test building an OpticalPSFField PSF from the optical_psf_field input item
+    """
+    config = {
+        'input' : { 'optical_psf_field' :
+                        { 'xmin' : 0, 'xmax' : 1000, 'ymin' : 0, 'ymax' : 1000,
+                          'lam' : 874.0, 'diam' : 7.4, 'nx' : 2, 'ny' : 2,
+                          'obscuration' : 0.1,
+                          'aberrations' : [0.06, 0.12, -0.08],
+                          'aberrations_x' : [0.02],
+                          'aberrations_y' : [0.0, -0.01, 0.03] }
+                  },
+        'image_pos' : galsim.PositionD(300, 700),
+        'psf1' : { 'type' : 'OpticalPSFField' },
+        'psf2' : { 'type' : 'OpticalPSFField', 'flux' : 30,
+                   'shear' : galsim.Shear(g1=0.03, g2=-0.05) },
+        'bad1' : { 'type' : 'OpticalPSFField', 'aberrations' : [0.1] },
+        'bad2' : { 'type' : 'OpticalPSFField' },
+        'bad3' : { 'type' : 'OpticalPSFField' },
+    }
+    galsim.config.ProcessInput(config)
+
+    def aberrations(pos):
+        u = (pos.x - 500.) / 500.
+        v = (pos.y - 500.) / 500.
+        return [0., 0., 0., 0., 0.06 + 0.02*u, 0.12 - 0.01*v, -0.08 + 0.03*v]
+    field = galsim.OpticalPSFField(galsim.BoundsD(0, 1000, 0, 1000), lam=874.0, diam=7.4,
+                                   aberrations=aberrations, nx=2, ny=2, obscuration=0.1)
+
+    psf1a = galsim.config.BuildGSObject(config, 'psf1')[0]
+    psf1b = field.getPSF(galsim.PositionD(300, 700))
+    gsobject_compare(psf1a, psf1b)
+
+    psf2a = galsim.config.BuildGSObject(config, 'psf2')[0]
+    psf2b = psf1b.withFlux(30).shear(g1=0.03, g2=-0.05)
+    gsobject_compare(psf2a, psf2b)
+
+    with assert_raises(galsim.GalSimConfigError):
+        galsim.config.BuildGSObject(config, 'bad1')
+    del config['image_pos']
+    with assert_raises(galsim.GalSimConfigError):
+        galsim.config.BuildGSObject(config, 'bad2')
+    config['image_pos'] = galsim.PositionD(300, 1700)
+    with assert_raises(galsim.GalSimBoundsError):
+        galsim.config.BuildGSObject(config, 'bad3')
+    config['input']['optical_psf_field']['aberrations'] = 0.1
+    del config['_input_objs']
+    with assert_raises(galsim.GalSimConfigError):
+        galsim.config.ProcessInput(config)
+
+
 @timer
 def test_exponential():
     """Test various ways to build a Exponential
@@ -1715,6 +1767,7 @@ if __name__ == "__main__":
     test_airy()
     test_kolmogorov()
     test_opticalpsf()
+    test_opticalpsffield()
     test_exponential()
     test_sersic()
     test_devaucouleurs()
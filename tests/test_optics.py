@@ -892,6 +892,85 @@ def test_geometric_shoot():
         assert np.isclose(im_shoot.array.sum(), psf.flux, rtol=3.e-4)
 
 
+@timer
+def test_OpticalPSFField():
+    """Test the field-interpolated OpticalPSFField class.
+    """
+    lam = 700.
+    diam = 4.
+    bounds = galsim.BoundsD(0., 2048., 0., 2048.)
+    def aberrations(pos):
+        u = (pos.x - 1024.) / 1024.
+        v = (pos.y - 1024.) / 1024.
+        return [0., 0., 0., 0., 0.1*u, 0.05*v, 0.02, -0.03*u*v]
+    kwargs = dict(obscuration=0.3, nstruts=4)
+
+    field = galsim.OpticalPSFField(bounds, lam=lam, diam=diam, aberrations=aberrations,
+                                   nx=3, ny=3, **kwargs)
+    assert field.interpolation_error is None
+    nyq = galsim.OpticalPSF(lam=lam, diam=diam, aberrations=aberrations(galsim.PositionD(0,0)),
+                            **kwargs).nyquist_scale
+    np.testing.assert_almost_equal(field.scale, nyq)
+
+    # At the nodes, the PSF should match the direct OpticalPSF image exactly.
+    for pos in [galsim.PositionD(0., 0.), galsim.PositionD(1024., 2048.),
+                galsim.PositionI(2048, 1024)]:
+        psf = field.getPSF(pos)
+        assert isinstance(psf, galsim.InterpolatedImage)
+        np.testing.assert_almost_equal(psf.flux, 1.)
+        direct = galsim.OpticalPSF(lam=lam, diam=diam, aberrations=aberrations(pos), **kwargs)
+        im1 = psf.drawImage(nx=field.image_size, ny=field.image_size, scale=field.scale,
+                            method='no_pixel')
+        im2 = direct.drawImage(nx=field.image_size, ny=field.image_size, scale=field.scale,
+                               method='no_pixel')
+        # The interpolated PSF is normalized to unit flux within the image.
+        im2 /= im2.array.sum()
+        np.testing.assert_allclose(im1.array, im2.array, rtol=0, atol=1.e-4 * im2.array.max())
+
+    # Between the nodes, it should be close, and closer for a finer grid.
+    pos = galsim.PositionD(700., 1500.)
+    direct = galsim.OpticalPSF(lam=lam, diam=diam, aberrations=aberrations(pos), **kwargs)
+    im2 = direct.drawImage(nx=64, ny=64, scale=0.02)
+    im1 = field.getPSF(pos).drawImage(nx=64, ny=64, scale=0.02)
+    err3 = np.max(np.abs(im1.array - im2.array)) / np.max(im2.array)
+    field5 = galsim.OpticalPSFField(bounds, lam=lam, diam=diam, aberrations=aberrations,
+                                    tolerance=0.5, **kwargs)
+    im1 = field5.getPSF(pos).drawImage(nx=64, ny=64, scale=0.02)
+    err5 = np.max(np.abs(im1.array - im2.array)) / np.max(im2.array)
+    print('err3, err5 = ',err3,err5)
+    assert err5 < 0.06
+    assert err5 < err3 / 2.
+
+    # Constant aberrations and flux
+    field2 = galsim.OpticalPSFField(galsim.BoundsI(1, 512, 1, 512), lam=lam, diam=diam,
+                                    aberrations=[0., 0., 0., 0., 0.1], flux=17.,
+                                    scale=0.02, image_size=64, interpolant='lanczos5')
+    assert field2.image_size == 64
+    psf = field2.getPSF(galsim.PositionD(100., 300.))
+    np.testing.assert_almost_equal(psf.flux, 17.)
+    assert psf.x_interpolant == galsim.Lanczos(5)
+    direct = galsim.OpticalPSF(lam=lam, diam=diam, defocus=0.1, flux=17.)
+    im1 = psf.drawImage(nx=32, ny=32, scale=0.02, method='no_pixel')
+    im2 = direct.drawImage(nx=32, ny=32, scale=0.02, method='no_pixel')
+    np.testing.assert_allclose(im1.array, im2.array, rtol=0, atol=0.02 * im2.array.max())
+
+    # With a tolerance, the interpolation error at the cell centers is checked.
+    print('interpolation_error = ',field5.interpolation_error)
+    assert 0. < field5.interpolation_error < 0.05
+    with assert_warns(galsim.GalSimWarning):
+        field3 = galsim.OpticalPSFField(bounds, lam=lam, diam=diam, aberrations=aberrations,
+                                        nx=3, ny=3, tolerance=0.05, **kwargs)
+    assert field3.interpolation_error > field5.interpolation_error
+
+    assert_raises(galsim.GalSimBoundsError, field.getPSF, galsim.PositionD(-1., 100.))
+    assert_raises(galsim.GalSimBoundsError, field.getPSF, galsim.PositionD(100., 2049.))
+    assert_raises(galsim.GalSimRangeError, galsim.OpticalPSFField, bounds, lam=lam, diam=diam,
+                  nx=1)
+    assert_raises(galsim.GalSimValueError, galsim.OpticalPSFField, galsim.BoundsD(),
+                  lam=lam, diam=diam)
+    assert_raises(galsim.GalSimValueError, galsim.OpticalPSFField,
+                  galsim.BoundsD(0., 0., 0., 10.), lam=lam, diam=diam)
+
 
 if __name__ == "__main__":
     test_OpticalPSF_flux()
@@ -907,3 +986,4 @@ if __name__ == "__main__":
     test_stepk_maxk_iipad()
     test_ne()
     test_geometric_shoot()
+    test_OpticalPSFField()
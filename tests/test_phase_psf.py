@@ -103,6 +103,87 @@ def test_aperture():
         ap._illuminated
 
 
+@timer
+def test_pupil_cache():
+    """Test that Apertures with the same pupil plane share the cached arrays."""
+    galsim.Aperture.clear_pupil_cache()
+    aper1 = galsim.Aperture(diam=1.7, obscuration=0.3, nstruts=3)
+    aper2 = galsim.Aperture(diam=1.7, obscuration=0.3, nstruts=3)
+    assert aper1.illuminated is aper2.illuminated
+    assert aper1.u is aper2.u
+    assert aper1.u_illuminated is aper2.u_illuminated
+    np.testing.assert_array_equal(aper2.u_illuminated, aper2.u[aper2.illuminated])
+    np.testing.assert_array_equal(aper2.v_illuminated, aper2.v[aper2.illuminated])
+    assert aper1 == aper2
+    info = galsim.Aperture.pupil_cache_info()
+    assert info['hits'] == 1
+    assert info['misses'] == 1
+    assert info['currsize'] == 1
+    npix = aper1.npix
+    assert info['nbytes'] == npix**2 * 17 + 2 * 8 * np.sum(aper1.illuminated)
+
+    # The shared arrays are read-only.
+    with assert_raises(ValueError):
+        aper1.illuminated[0,0] = True
+    with assert_raises(ValueError):
+        aper1.u[0,0] = 0.
+
+    # A different geometry is a different pupil plane.
+    aper3 = galsim.Aperture(diam=1.7, obscuration=0.3, nstruts=4)
+    assert aper3.illuminated is not aper1.illuminated
+    assert galsim.Aperture.pupil_cache_info()['currsize'] == 2
+
+    # Unpickled Apertures find the same arrays again.
+    aper4 = pickle.loads(pickle.dumps(aper1))
+    assert aper4.illuminated is aper1.illuminated
+    do_pickle(aper1)
+
+    # Pupil plane images are keyed by their content, or by the file name and modification time.
+    im = galsim.fits.read(os.path.join(imgdir, pp_file))
+    aper5 = galsim.Aperture(diam=1.7, pupil_plane_im=im, pupil_angle=10*galsim.degrees)
+    aper6 = galsim.Aperture(diam=1.7, pupil_plane_im=im.copy(), pupil_angle=10*galsim.degrees)
+    assert aper6.illuminated is aper5.illuminated
+    assert aper6.pupil_plane_scale == aper5.pupil_plane_scale
+    im.array[10,10] += 1
+    aper7 = galsim.Aperture(diam=1.7, pupil_plane_im=im, pupil_angle=10*galsim.degrees)
+    assert aper7.illuminated is not aper5.illuminated
+    aper8 = galsim.Aperture(diam=1.7, pupil_plane_im=os.path.join(imgdir, pp_file))
+    aper9 = galsim.Aperture(diam=1.7, pupil_plane_im=os.path.join(imgdir, pp_file))
+    assert aper9.illuminated is aper8.illuminated
+    assert aper8 == galsim.Aperture(diam=1.7, pupil_plane_im=galsim.fits.read(
+        os.path.join(imgdir, pp_file)))
+    do_pickle(aper8)
+
+    # OpticalPSFs use the cache too.
+    psf1 = galsim.OpticalPSF(lam=500., diam=1.7, obscuration=0.3, nstruts=3, defocus=0.1)
+    psf2 = galsim.OpticalPSF(lam=500., diam=1.7, obscuration=0.3, nstruts=3, coma1=0.2)
+    assert psf1._aper.illuminated is psf2._aper.illuminated
+
+    # The cache is limited by the number of pupil planes and optionally by their total size.
+    info = galsim.Aperture.pupil_cache_info()
+    assert info['maxsize'] == 10
+    assert info['max_bytes'] == 2**30
+    assert info['currsize'] > 3
+    galsim.Aperture.resize_pupil_cache(maxsize=3)
+    assert galsim.Aperture.pupil_cache_info()['currsize'] == 3
+    galsim.Aperture.resize_pupil_cache(max_bytes=1)
+    info = galsim.Aperture.pupil_cache_info()
+    assert info['currsize'] == 1
+    assert info['maxsize'] == 3
+    assert info['max_bytes'] == 1
+    # Apertures that were already using an evicted pupil plane keep it.
+    np.testing.assert_array_equal(aper3.illuminated, galsim.Aperture(
+        diam=1.7, obscuration=0.3, nstruts=4).illuminated)
+    assert_raises(ValueError, galsim.Aperture.resize_pupil_cache, maxsize=0)
+    assert_raises(ValueError, galsim.Aperture.resize_pupil_cache, max_bytes=-1)
+
+    galsim.Aperture.resize_pupil_cache(maxsize=10, max_bytes=2**30)
+    galsim.Aperture.clear_pupil_cache()
+    info = galsim.Aperture.pupil_cache_info()
+    assert info['hits'] == info['misses'] == info['currsize'] == info['nbytes'] == 0
+    assert info['maxsize'] == 10
+
+
 @timer
 def test_atm_screen_size():
     """Test for consistent AtmosphericScreen size and scale."""
@@ -397,6 +478,40 @@ def test_phase_psf_reset():
     np.testing.assert_array_equal(wf1, wf3, "Phase screen didn't reset")
 
 
+@timer
+def test_boiling_updates():
+    """Test that several boiling updates done at once match doing them one at a time."""
+    rng = galsim.BaseDeviate(2468)
+    kwargs = dict(screen_size=20.0, screen_scale=0.1, altitude=1.0, r0_500=0.15, L0=20.0,
+                  vx=1.0, alpha=0.95, time_step=0.01)
+    aper = galsim.Aperture(diam=2.0, lam=500.0)
+    atm1 = galsim.AtmosphericScreen(rng=rng.duplicate(), **kwargs)
+    atm2 = galsim.AtmosphericScreen(rng=rng.duplicate(), **kwargs)
+    atm1.instantiate()
+    atm2.instantiate()
+    for t in np.arange(1, 31)*0.01:
+        atm1._seek(t)
+    atm2._seek(0.30)
+    wf1 = atm1._wavefront(aper.u, aper.v, None, theta0)
+    wf2 = atm2._wavefront(aper.u, aper.v, None, theta0)
+    # Only rounding errors differ.
+    np.testing.assert_allclose(wf2, wf1, rtol=0, atol=1.e-12*np.max(np.abs(wf1)))
+    # And the rng is left in the same state.
+    assert atm1.rng.serialize() == atm2.rng.serialize()
+
+    # Check the combined update against the explicit formula for a single extra update.
+    screen = atm1._screen.copy()
+    rng3 = atm1.rng.duplicate()
+    atm1._seek(0.31)
+    noise = galsim.utilities.rand_arr(screen.shape, galsim.GaussianDeviate(rng3))
+    psi = atm1._psi_block(np.fft.fftfreq(atm1.npix, 0.1), np.fft.fftfreq(atm1.npix, 0.1))
+    screen = (0.95*screen + np.sqrt(1.-0.95**2) * np.fft.ifft2(np.fft.fft2(noise)*psi).real)
+    np.testing.assert_allclose(atm1._screen, screen, rtol=0, atol=1.e-12*np.max(np.abs(screen)))
+    np.testing.assert_array_equal(atm1._tab2d.f[:-1,:-1], atm1._screen)
+    np.testing.assert_array_equal(atm1._tab2d.f[-1,:-1], atm1._screen[0])
+    np.testing.assert_array_equal(atm1._tab2d.f[:-1,-1], atm1._screen[:,0])
+
+
 @timer
 def test_phase_psf_batch():
     """Test that PSFs generated and drawn serially match those generated and drawn in batch."""
@@ -427,6 +542,151 @@ def test_phase_psf_batch():
             "Individually generated AtmosphericPSF differs from AtmosphericPSF generated in batch")
 
 
+@timer
+def test_phase_psf_batch_size():
+    """Test that PSFs stepped together in batches match the direct calculation."""
+    def make_atm():
+        rng = galsim.BaseDeviate(5678)
+        atm = galsim.Atmosphere(screen_size=10.0, altitude=[0.0, 10.0], speed=[5.0, 10.0],
+                                r0_500=0.2, rng=rng)
+        atm.append(galsim.OpticalScreen(diam=1.0, defocus=0.3, coma1=0.2))
+        return atm
+
+    thetas = [(i*galsim.arcsec, (5-i)*galsim.arcsec) for i in range(7)]
+    kwargs = [dict(lam=1000.0, exptime=0.05),
+              dict(lam=700.0, exptime=0.05),
+              dict(lam=1000.0, exptime=0.1, time_step=0.05),
+              dict(lam=1000.0, exptime=0.05, t0=0.025)]
+
+    results = []
+    for batch_size in [1, 3, None]:
+        atm = make_atm()
+        if batch_size is not None:
+            atm.batch_size = batch_size
+        aper = galsim.Aperture(diam=1.0, lam=1000.0, screen_list=atm)
+        psfs = []
+        for kw in kwargs:
+            for th in thetas:
+                if kw['lam'] == 1000.0:
+                    psfs.append(atm.makePSF(theta=th, aper=aper, **kw))
+                else:
+                    psfs.append(atm.makePSF(theta=th, diam=1.0, **kw))
+        atm._prepareDraw()
+        results.append([psf._img.array for psf in psfs])
+    for imgs in results[1:]:
+        for img1, img2 in zip(results[0], imgs):
+            np.testing.assert_array_equal(img1, img2)
+
+    # Check one of them against the direct calculation.
+    atm = make_atm()
+    aper = galsim.Aperture(diam=1.0, lam=1000.0, screen_list=atm)
+    atm.instantiate(check='FFT')
+    theta = thetas[2]
+    img = np.zeros(aper.illuminated.shape)
+    for t in [0.0, 0.025]:
+        atm._seek(t)
+        wf = atm._wavefront(aper.u_illuminated, aper.v_illuminated, None, theta)
+        expwf_grid = np.zeros_like(aper.illuminated, dtype=np.complex128)
+        expwf_grid[aper.illuminated] = np.exp((2j*np.pi/1000.0) * wf)
+        img += np.abs(galsim.fft.fft2(expwf_grid, shift_in=True, shift_out=True))**2
+    img /= img.sum()
+    np.testing.assert_allclose(results[0][2], img, rtol=1.e-10, atol=1.e-14)
+
+
+@timer
+def test_phase_psf_max_size():
+    """Test computing only the central part of the PSF image with max_size."""
+    def make_atm():
+        rng = galsim.BaseDeviate(2468)
+        atm = galsim.Atmosphere(screen_size=10.0, altitude=[0.0, 10.0], speed=[5.0, 10.0],
+                                r0_500=0.2, rng=rng)
+        atm.append(galsim.OpticalScreen(diam=1.0, defocus=0.3, coma1=0.2))
+        return atm
+
+    atm = make_atm()
+    aper = galsim.Aperture(diam=1.0, lam=1000.0, screen_list=atm)
+    kwargs = dict(lam=1000.0, exptime=0.05, aper=aper)
+    thetas = [(0*galsim.arcsec, 0*galsim.arcsec), (3*galsim.arcsec, -2*galsim.arcsec)]
+    full = [atm.makePSF(theta=th, **kwargs) for th in thetas]
+    small = [atm.makePSF(theta=th, max_size=1.5, **kwargs) for th in thetas]
+    medium = [atm.makePSF(theta=th, max_size=10.0, **kwargs) for th in thetas]
+    big = atm.makePSF(theta=thetas[0], max_size=1.e3, **kwargs)
+    atm._prepareDraw()
+
+    # max_size is rounded up to an even number of pixels, and can't be larger than the full image.
+    npix = aper.npix
+    scale = full[0].scale
+    nsmall = small[0]._img.array.shape[0]
+    assert small[0]._img.array.shape == (nsmall, nsmall)
+    assert nsmall % 2 == 0
+    assert nsmall * scale >= 1.5
+    assert (nsmall - 2) * scale < 1.5
+    assert big._img.array.shape == (npix, npix)
+    np.testing.assert_array_equal(big._img.array, full[0]._img.array)
+    assert big != full[0]
+    assert small[0] != full[0]
+    assert small[0] != medium[0]
+
+    # The small images use the matrix Fourier transform and the medium ones crop the full FFT.
+    shape = aper.illuminated.shape
+    bounds = aper._pupil.illuminated_bounds
+    assert galsim.phase_psf._use_mft(shape, bounds, nsmall)
+    nmedium = medium[0]._img.array.shape[0]
+    assert nsmall < nmedium < npix
+    assert not galsim.phase_psf._use_mft(shape, bounds, nmedium)
+    assert not galsim.phase_psf._use_mft(shape, bounds, npix)
+
+    # Either way, they match the central pixels of the full image up to the normalization.
+    for psf, psf_small, psf_medium in zip(full, small, medium):
+        for p, n in [(psf_small, nsmall), (psf_medium, nmedium)]:
+            k0 = npix//2 - n//2
+            center = psf._img.array[k0:k0+n, k0:k0+n]
+            np.testing.assert_allclose(p._img.array, center / center.sum(), rtol=1.e-9,
+                                       atol=1.e-14)
+            np.testing.assert_almost_equal(p._img.array.sum(), 1.0)
+
+    # And the drawn images have nearly the same shape as the full ones, although the flux that
+    # fell outside of max_size has been redistributed within it.
+    im1 = full[1].drawImage(nx=5, ny=5, scale=0.2)
+    im2 = small[1].drawImage(nx=5, ny=5, scale=0.2)
+    assert im2.array.sum() > im1.array.sum()
+    np.testing.assert_allclose(im2.array / im2.array.sum(), im1.array / im1.array.sum(),
+                               rtol=0, atol=0.01*im1.array.max())
+    assert small[1].stepk > full[1].stepk
+
+    # The matrix Fourier transform matches the full FFT for any output size.
+    ud = galsim.UniformDeviate(1234)
+    expwf = np.empty((3, np.sum(aper.illuminated)), dtype=float)
+    ud.generate(expwf)
+    expwf = np.exp(2j*np.pi*expwf)
+    index = np.flatnonzero(aper.illuminated).astype(np.int32)
+    img = np.empty((3,) + shape, dtype=float)
+    galsim._galsim.powerSpectra(expwf.ctypes.data, index.ctypes.data, len(index), 3,
+                                shape[1], shape[0], img.ctypes.data)
+    for n in [2, 10, nsmall, npix]:
+        k0 = npix//2 - n//2
+        mft = galsim.phase_psf._mft_power_spectra(expwf, aper.illuminated, bounds, n)
+        np.testing.assert_allclose(mft, img[:, k0:k0+n, k0:k0+n], rtol=1.e-10,
+                                   atol=1.e-10*img.max())
+
+    # Check the other ways to make and use them.
+    psf = galsim.PhaseScreenPSF(make_atm(), max_size=1.5, **kwargs)
+    assert psf.max_size == 1.5
+    assert psf._nout == nsmall
+    psf2 = psf.withFlux(3.0)
+    assert psf2.max_size == 1.5
+    psf2.drawImage(nx=5, ny=5, scale=0.2)
+    assert psf2._img.array.shape == (nsmall, nsmall)
+    np.testing.assert_almost_equal(psf2._img.array.sum(), 3.0)
+    do_pickle(psf)
+    do_pickle(psf, lambda x: x.drawImage(nx=5, ny=5, scale=0.2))
+
+    with assert_raises(galsim.GalSimRangeError):
+        atm.makePSF(max_size=0., **kwargs)
+    with assert_raises(galsim.GalSimRangeError):
+        atm.makePSF(max_size=-1., **kwargs)
+
+
 @timer
 def test_opt_indiv_aberrations():
     """Test that aberrations specified by name match those specified in `aberrations` list."""
@@ -907,6 +1167,64 @@ def test_phase_gradient_shoot():
     psf.shoot(1)
 
 
+@timer
+def test_sum_wavefront_gradients():
+    """Test that the combined gradient of several screens matches the sum over the layers."""
+    rng = galsim.BaseDeviate(13579)
+    atm = galsim.Atmosphere(screen_size=10.0, screen_scale=0.1, altitude=[0, 1, 5],
+                            r0_500=0.15, speed=[3, 10, 20],
+                            direction=[0*galsim.degrees, 65*galsim.degrees, 200*galsim.degrees],
+                            rng=rng)
+    atm.append(galsim.OpticalScreen(diam=2.0, defocus=0.3, coma1=0.2))
+    atm.instantiate()
+
+    ud = galsim.UniformDeviate(rng)
+    u = galsim.utilities.rand_arr((10000,), ud) * 4.0 - 2.0
+    v = galsim.utilities.rand_arr((10000,), ud) * 4.0 - 2.0
+    t = galsim.utilities.rand_arr((10000,), ud) * 30.0
+    # Include some points exactly on the screen grid, where the choice of cell matters.
+    u[:100] = np.round(u[:100], 1)
+    v[:100] = np.round(v[:100], 1)
+    t[:50] = 0.
+    for theta in [theta0, (0.3*galsim.arcmin, -0.4*galsim.arcmin)]:
+        gx, gy = atm._wavefront_gradient(u, v, t, theta)
+        gx1 = np.zeros_like(u)
+        gy1 = np.zeros_like(u)
+        for layer in atm:
+            dx, dy = layer._wavefront_gradient(u, v, t, theta)
+            gx1 += dx
+            gy1 += dy
+        np.testing.assert_allclose(gx, gx1, rtol=1.e-10, atol=1.e-10*np.max(np.abs(gx1)))
+        np.testing.assert_allclose(gy, gy1, rtol=1.e-10, atol=1.e-10*np.max(np.abs(gy1)))
+
+    # With many points, they are sorted into bins in t first.  The results are the same.
+    u = galsim.utilities.rand_arr((100000,), ud) * 4.0 - 2.0
+    v = galsim.utilities.rand_arr((100000,), ud) * 4.0 - 2.0
+    t = galsim.utilities.rand_arr((100000,), ud) * 30.0
+    u[:100] = np.round(u[:100], 1)
+    v[:100] = np.round(v[:100], 1)
+    gx, gy = atm._wavefront_gradient(u, v, t, theta0)
+    gx1 = np.zeros_like(u)
+    gy1 = np.zeros_like(u)
+    for layer in atm:
+        dx, dy = layer._wavefront_gradient(u, v, t, theta0)
+        gx1 += dx
+        gy1 += dy
+    np.testing.assert_allclose(gx, gx1, rtol=1.e-10, atol=1.e-10*np.max(np.abs(gx1)))
+    np.testing.assert_allclose(gy, gy1, rtol=1.e-10, atol=1.e-10*np.max(np.abs(gy1)))
+    # And the same as doing them in several smaller batches, which aren't binned.
+    for k in range(0, 100000, 10000):
+        gx2, gy2 = atm._wavefront_gradient(u[k:k+10000], v[k:k+10000], t[k:k+10000], theta0)
+        np.testing.assert_array_equal(gx2, gx[k:k+10000])
+        np.testing.assert_array_equal(gy2, gy[k:k+10000])
+
+    # A scalar t is also allowed.
+    gx, gy = atm._wavefront_gradient(u, v, 1.5, theta0)
+    gx1, gy1 = atm._wavefront_gradient(u, v, np.full_like(u, 1.5), theta0)
+    np.testing.assert_array_equal(gx, gx1)
+    np.testing.assert_array_equal(gy, gy1)
+
+
 @timer
 def test_input():
     """Check that exceptions are raised for invalid input"""
@@ -1271,6 +1589,57 @@ def test_shared_memory():
         )
 
 
+def _fork_omp_draws(seed):
+    # The drawing done by test_fork_omp in both the parent and a forked child process.
+    atm = galsim.Atmosphere(screen_size=10.0, screen_scale=0.1, altitude=[0, 5], r0_500=0.15,
+                            speed=[5, 10], rng=galsim.BaseDeviate(seed))
+    psf = atm.makePSF(lam=700.0, diam=4.0, exptime=1.0)
+    im = psf.drawImage(nx=32, ny=32, scale=0.1, method='phot', n_photons=100000,
+                       rng=galsim.BaseDeviate(seed))
+    # FFT-drawn PSFs at several field angles have their power spectra done in one batch.
+    fft_psfs = [atm.makePSF(lam=700.0, diam=4.0, exptime=0.05, time_step=0.01,
+                            theta=(0.1*i*galsim.arcmin, 0.0*galsim.arcmin))
+                for i in range(4)]
+    fft_ims = [fft_psf.drawImage(nx=32, ny=32, scale=0.1).array for fft_psf in fft_psfs]
+    # The fused photon ops sample wavelengths and angles for all the photons in one C++ call.
+    sed = galsim.SED('CWW_E_ext.sed', wave_type='ang', flux_type='flambda')
+    bandpass = galsim.Bandpass('LSST_r.dat', 'nm')
+    photons = galsim.Gaussian(fwhm=0.8).shoot(100000, galsim.BaseDeviate(seed))
+    rng = galsim.BaseDeviate(seed)
+    pipeline = galsim.PhotonOpPipeline([galsim.WavelengthSampler(sed, bandpass, rng),
+                                        galsim.FRatioAngles(1.234, 0.606, rng)])
+    pipeline.applyTo(photons)
+    return [im.array] + fft_ims + [photons.wavelength, photons.dxdz, photons.dydz]
+
+
+@timer
+def test_fork_omp():
+    """Test that drawing works in a forked process after the parent has used several OpenMP
+    threads.
+    """
+    import multiprocessing as mp
+    if sys.version_info < (3,4) or 'fork' not in mp.get_all_start_methods():
+        return
+    orig_num_threads = galsim.get_omp_threads()
+    try:
+        # GNU's OpenMP implementation isn't fork safe.  Once the parent has started a team of
+        # threads, any OpenMP parallel region in a forked child hangs.  SiliconSensor uses OpenMP,
+        # so this starts a team of 2 threads.
+        galsim.set_omp_threads(2)
+        sensor = galsim.SiliconSensor(rng=galsim.BaseDeviate(1234))
+        galsim.Gaussian(flux=1000, sigma=0.3).drawImage(nx=16, ny=16, scale=0.2, method='phot',
+                                                        sensor=sensor,
+                                                        rng=galsim.BaseDeviate(1234))
+        ref = _fork_omp_draws(1234)
+        with mp.get_context("fork").Pool(1) as pool:
+            # If the child hangs, this raises a TimeoutError.
+            res = pool.apply_async(_fork_omp_draws, (1234,)).get(timeout=60)
+    finally:
+        galsim.set_omp_threads(orig_num_threads)
+    for a1, a2 in zip(ref, res):
+        np.testing.assert_array_equal(a1, a2)
+
+
 @timer
 def test_pickle():
     # This is response to ImSim issue #234
@@ -1365,19 +1734,153 @@ def test_pickle():
         np.testing.assert_equal(wf, wf3)
 
 
+@timer
+def test_memmap_screen():
+    """Test that a memory-mapped AtmosphericScreen matches an in-memory one.
+    """
+    rng = galsim.BaseDeviate(5678)
+    kwargs = dict(screen_size=30.0, screen_scale=0.1, altitude=1.0, r0_500=0.15, L0=20.0,
+                  vx=3.0, vy=-1.0)
+    memmap_file = os.path.join('output', 'atm_memmap_test.dat')
+    atm = galsim.AtmosphericScreen(rng=rng.duplicate(), **kwargs)
+    atm_mm = galsim.AtmosphericScreen(rng=rng.duplicate(), memmap_file=memmap_file, **kwargs)
+    # Use small blocks so the out-of-core generation works on many blocks of rows and columns.
+    atm_mm._memmap_block_size = 16 * atm_mm.npix * 7
+    atm.instantiate(kmax=5.0)
+    atm_mm.instantiate(kmax=5.0)
+    assert atm_mm == atm
+    assert os.path.isfile(memmap_file)
+    assert os.path.getsize(memmap_file) == 8 * (atm_mm.npix+1)**2
+    # The temporary files used during generation should be gone.
+    assert [f for f in os.listdir('output') if f.startswith('atm_memmap_test.dat.')] == []
+    # And the full screen shouldn't have been allocated in shared memory.
+    assert len(atm_mm._objDict['f']) == 0
+
+    ud = galsim.UniformDeviate(rng)
+    u = np.empty((20, 20))
+    v = np.empty((20, 20))
+    ud.generate(u)
+    ud.generate(v)
+    u = 40.*u - 20.
+    v = 40.*v - 20.
+    for t in [0.0, 1.3]:
+        wf = atm.wavefront(u, v, t)
+        wf_mm = atm_mm.wavefront(u, v, t)
+        np.testing.assert_allclose(wf_mm, wf, rtol=0, atol=1.e-10*np.max(np.abs(wf)))
+        theta = (0.01*galsim.degrees, -0.02*galsim.degrees)
+        grad = atm.wavefront_gradient(u, v, t, theta)
+        grad_mm = atm_mm.wavefront_gradient(u, v, t, theta)
+        np.testing.assert_allclose(grad_mm[0], grad[0], rtol=0,
+                                   atol=1.e-10*np.max(np.abs(grad[0])))
+        np.testing.assert_allclose(grad_mm[1], grad[1], rtol=0,
+                                   atol=1.e-10*np.max(np.abs(grad[1])))
+
+    # Pickling with the shared memory reads the screen back from the same file.
+    with galsim.utilities.pickle_shared():
+        s = pickle.dumps(atm_mm)
+    del atm_mm
+    atm_mm = pickle.loads(s)
+    np.testing.assert_equal(atm_mm.wavefront(u, v, 1.3), wf_mm)
+
+    with assert_raises(galsim.GalSimNotImplementedError):
+        galsim.AtmosphericScreen(rng=rng, alpha=0.9, time_step=0.1, memmap_file=memmap_file,
+                                 **kwargs)
+
+
+@timer
+def test_screen_write_read():
+    """Test writing and reading back instantiated AtmosphericScreens and PhaseScreenLists.
+    """
+    rng = galsim.BaseDeviate(1357)
+    kwargs = dict(screen_size=30.0, screen_scale=0.1, altitude=1.0, r0_500=0.15, L0=20.0,
+                  vx=3.0, vy=-1.0)
+    u = np.linspace(-20, 20, 37)
+    v = np.linspace(15, -15, 37)
+
+    # A frozen-flow screen, read back into shared memory or memory-mapped.
+    atm = galsim.AtmosphericScreen(rng=rng.duplicate(), **kwargs)
+    atm.instantiate(kmax=5.0)
+    wf = atm.wavefront(u, v, 1.3)
+    file_name = os.path.join('output', 'atm_screen_test.npy')
+    atm.write(file_name)
+    for memmap in [False, True]:
+        atm2 = galsim.AtmosphericScreen.read(file_name, memmap=memmap)
+        assert atm2 == atm
+        assert atm2.npix == atm.npix
+        assert atm2.kmax == 5.0
+        np.testing.assert_equal(atm2.wavefront(u, v, 1.3), wf)
+    assert len(atm2._objDict['f']) == 0
+
+    # The screen is read back with the same number of pixels, even when screen_size/screen_scale
+    # rounds up past a good FFT size.  (Here, 0.1*96/0.1 > 96.)
+    atm = galsim.AtmosphericScreen(screen_size=9.6, screen_scale=0.1, rng=rng.duplicate())
+    assert atm.npix == 96
+    atm.write(file_name)
+    atm2 = galsim.AtmosphericScreen.read(file_name)
+    assert atm2.npix == 96
+    assert atm2 == atm
+
+    # A memory-mapped screen can be written too.
+    atm_mm = galsim.AtmosphericScreen(rng=rng.duplicate(), memmap_file=file_name+'.dat', **kwargs)
+    atm_mm.write(file_name)
+    atm2 = galsim.AtmosphericScreen.read(file_name)
+    assert atm2 == atm_mm
+    assert atm2.kmax == np.inf
+    np.testing.assert_equal(atm2.wavefront(u, v, 0.5), atm_mm.wavefront(u, v, 0.5))
+
+    # A boiling screen continues from its current time and rng state, and can still be rewound.
+    atm = galsim.AtmosphericScreen(rng=galsim.UniformDeviate(rng), alpha=0.9, time_step=0.1,
+                                   **kwargs)
+    atm.instantiate()
+    atm._seek(0.35)
+    atm.write(file_name)
+    atm2 = galsim.AtmosphericScreen.read(file_name)
+    assert atm2 == atm
+    assert atm2._time == 0.35
+    np.testing.assert_equal(atm2.wavefront(u, v, 0.75), atm.wavefront(u, v, 0.75))
+    np.testing.assert_equal(atm2.wavefront(u, v, 0.05), atm.wavefront(u, v, 0.05))
+    with assert_raises(galsim.GalSimNotImplementedError):
+        galsim.AtmosphericScreen.read(file_name, memmap=True)
+
+    # A PhaseScreenList with an OpticalScreen.
+    screens = galsim.Atmosphere(screen_size=20.0, altitude=[0.0, 5.0], r0_500=0.2,
+                                speed=[5.0, 10.0], rng=rng)
+    screens.append(galsim.OpticalScreen(diam=4.0, defocus=0.3))
+    wf = screens.wavefront(u, v, 0.5)
+    file_name = os.path.join('output', 'atm_list_test.npy')
+    screens.write(file_name)
+    for memmap in [False, True]:
+        screens2 = galsim.PhaseScreenList.read(file_name, memmap=memmap)
+        assert screens2 == screens
+        np.testing.assert_equal(screens2.wavefront(u, v, 0.5), wf)
+        psf = screens.makePSF(lam=700.0, diam=4.0, exptime=0.05, time_step=0.025)
+        psf2 = screens2.makePSF(lam=700.0, diam=4.0, exptime=0.05, time_step=0.025)
+        np.testing.assert_equal(psf2.drawImage(nx=32, ny=32, scale=0.2).array,
+                                psf.drawImage(nx=32, ny=32, scale=0.2).array)
+
+    # Only a single AtmosphericScreen can be read by AtmosphericScreen.read
+    with assert_raises(galsim.GalSimValueError):
+        galsim.AtmosphericScreen.read(file_name)
+
+
 if __name__ == "__main__":
     test_aperture()
+    test_pupil_cache()
     test_atm_screen_size()
     test_structure_function()
     test_phase_screen_list()
     test_frozen_flow()
     test_phase_psf_reset()
+    test_boiling_updates()
     test_phase_psf_batch()
+    test_phase_psf_batch_size()
+    test_phase_psf_max_size()
     test_opt_indiv_aberrations()
     test_scale_unit()
     test_stepk_maxk()
     test_ne()
     test_phase_gradient_shoot()
+    test_sum_wavefront_gradients()
     test_input()
     test_r0_weights()
     test_speedup()
@@ -1385,4 +1888,7 @@ if __name__ == "__main__":
     test_gc()
     test_withGSP()
     test_shared_memory()
+    test_fork_omp()
     test_pickle()
+    test_memmap_screen()
+    test_screen_write_read()
@@ -876,6 +876,79 @@ def test_dcr_moments():
     assert moments['Mx'] < 0   # left
     assert moments['Mxy'] > 0  # e2 > 0
 
+@timer
+def test_photon_op_pipeline():
+    """Test that PhotonOpPipeline matches applying the surface ops one at a time.
+    """
+    bandpass = galsim.Bandpass('LSST_r.dat', 'nm')
+    sed = galsim.SED('CWW_E_ext.sed', wave_type='ang', flux_type='flambda').atRedshift(0.3)
+    obj = galsim.Gaussian(fwhm=0.8, flux=100)
+    wcs = galsim.JacobianWCS(0.21, 0.03, -0.02, 0.18).withOrigin(galsim.PositionD(2.3, -1.7))
+    local_wcs = wcs.local(galsim.PositionD(0,0)).withOrigin(galsim.PositionD(2.3, -1.7))
+
+    def make_ops(seed):
+        rng = galsim.BaseDeviate(seed)
+        sampler = galsim.WavelengthSampler(sed, bandpass, rng)
+        angles = galsim.FRatioAngles(1.234, 0.606, rng)
+        dcr = galsim.PhotonDCR(base_wavelength=bandpass.effective_wavelength,
+                               zenith_angle=37*galsim.degrees,
+                               parallactic_angle=-23*galsim.degrees,
+                               temperature=280, pressure=70, H2O_pressure=1.1,
+                               alpha=-0.2)
+        return sampler, angles, dcr
+
+    class Shift(object):
+        # A custom surface op that can't be fused.
+        def applyTo(self, photon_array, local_wcs=None):
+            photon_array.x += 0.3
+            photon_array.y -= 0.1
+
+    for order in ([0,1,2], [1,0,2], [0,2,1], [2,0,1], [0,3,2], [0,2,0,2]):
+        photons1 = obj.shoot(10000, galsim.BaseDeviate(1234))
+        photons2 = obj.shoot(10000, galsim.BaseDeviate(1234))
+        if order[0] == 2:
+            # DCR first needs some existing wavelengths.
+            photons1.wavelength = photons2.wavelength = np.linspace(500,700,10000)
+        ops1 = make_ops(5678) + (Shift(),)
+        ops2 = make_ops(5678) + (Shift(),)
+        for i in order:
+            ops1[i].applyTo(photons1, local_wcs)
+        pipeline = galsim.PhotonOpPipeline([ops2[i] for i in order])
+        print(pipeline)
+        pipeline.applyTo(photons2, local_wcs)
+        np.testing.assert_allclose(photons2.x, photons1.x, rtol=1.e-12, atol=1.e-12)
+        np.testing.assert_allclose(photons2.y, photons1.y, rtol=1.e-12, atol=1.e-12)
+        np.testing.assert_array_equal(photons2.flux, photons1.flux)
+        np.testing.assert_allclose(photons2.wavelength, photons1.wavelength, rtol=1.e-12)
+        if 1 in order:
+            np.testing.assert_allclose(photons2.dxdz, photons1.dxdz, rtol=1.e-12, atol=1.e-12)
+            np.testing.assert_allclose(photons2.dydz, photons1.dydz, rtol=1.e-12, atol=1.e-12)
+        else:
+            assert not photons2.hasAllocatedAngles()
+
+    # Nested pipelines are flattened.
+    sampler, angles, dcr = make_ops(5678)
+    pipeline = galsim.PhotonOpPipeline([sampler, galsim.PhotonOpPipeline([angles, dcr])])
+    assert pipeline.ops == [sampler, angles, dcr]
+
+    # DCR requires wavelengths.
+    photons = obj.shoot(100, galsim.BaseDeviate(1234))
+    assert_raises(galsim.GalSimError, galsim.PhotonOpPipeline([dcr]).applyTo, photons, local_wcs)
+    assert_raises(galsim.GalSimError, dcr.applyTo, photons, local_wcs)
+
+    # drawImage uses the pipeline.  Check that it gives the same image as applying the ops
+    # explicitly.
+    im1 = galsim.ImageD(32, 32, wcs=wcs)
+    im2 = galsim.ImageD(32, 32, wcs=wcs)
+    obj.drawImage(im1, method='phot', rng=galsim.BaseDeviate(1234), surface_ops=make_ops(5678),
+                  maxN=3000)
+    class Unfused(object):
+        def __init__(self, op): self.op = op
+        def applyTo(self, photon_array, local_wcs=None): self.op.applyTo(photon_array, local_wcs)
+    obj.drawImage(im2, method='phot', rng=galsim.BaseDeviate(1234),
+                  surface_ops=[Unfused(op) for op in make_ops(5678)], maxN=3000)
+    np.testing.assert_allclose(im1.array, im2.array, rtol=1.e-10, atol=1.e-10)
+
 
 if __name__ == '__main__':
     test_photon_array()
@@ -887,3 +960,4 @@ if __name__ == '__main__':
     if not no_astroplan:
         test_dcr_angles()
     test_dcr_moments()
+    test_photon_op_pipeline()
@@ -18,6 +18,7 @@
 
 from __future__ import print_function
 import numpy as np
+import os
 import galsim
 import time
 
@@ -289,6 +290,81 @@ def test_sk_ne():
             galsim.SecondKick(lam=500.0, r0=0.2, diam=4.0, gsparams=gsp)]
     all_obj_diff(objs)
 
+@timer
+def test_sk_table_cache():
+    """Test saving the SecondKick lookup tables in a disk cache.
+    """
+    import shutil
+    cache_dir = os.path.join('output', 'table_cache')
+    if os.path.isdir(cache_dir):
+        shutil.rmtree(cache_dir)
+    # Use gsparams that no other test uses, so the tables aren't already in memory.
+    gsp = galsim.GSParams(kvalue_accuracy=1.3e-5)
+    kcrit = 0.3
+
+    info = galsim.SecondKick.table_cache_info(cache_dir)
+    print('info = ',info)
+    assert info['cache_dir'] == cache_dir
+    assert info['disk_files'] == 0
+    assert info['disk_bytes'] == 0
+    currsize = info['currsize']
+
+    cache_file = galsim.SecondKick.prewarm_cache(kcrit, gsparams=gsp, cache_dir=cache_dir)
+    print('cache_file = ',cache_file)
+    assert os.path.dirname(cache_file) == cache_dir
+    assert os.path.isfile(cache_file)
+    info = galsim.SecondKick.table_cache_info(cache_dir)
+    print('info = ',info)
+    assert info['currsize'] == currsize + 1
+    assert info['disk_files'] == 1
+    assert info['disk_bytes'] == os.path.getsize(cache_file)
+
+    # Doing it again doesn't compute or write anything new.
+    assert galsim.SecondKick.prewarm_cache(kcrit, gsparams=gsp, cache_dir=cache_dir) == cache_file
+    assert galsim.SecondKick.table_cache_info(cache_dir) == info
+
+    try:
+        # Without a cache directory, the tables are only computed in memory.
+        galsim.utilities.cache_dirs['table'] = None
+        assert galsim.SecondKick.prewarm_cache(0.4, gsparams=gsp) is None
+        assert galsim.SecondKick.table_cache_info()['currsize'] == currsize + 2
+        assert galsim.SecondKick.table_cache_info()['disk_files'] == 0
+
+        # With a cache directory, constructing a SecondKick reads the tables from the cache
+        # if they are there.  To check that this happens, copy the file to the name that
+        # would be used for a different gsparams, whose tables are then not computed.
+        galsim.utilities.cache_dirs['table'] = cache_dir
+        gsp2 = galsim.GSParams(kvalue_accuracy=1.7e-5)
+        cache_file2 = galsim.table._table_cache_file(cache_dir, 'second_kick', (kcrit, gsp2))
+        shutil.copy(cache_file, cache_file2)
+        sk1 = galsim.SecondKick(lam=700, r0=0.15, diam=4., kcrit=kcrit, gsparams=gsp)
+        sk2 = galsim.SecondKick(lam=700, r0=0.15, diam=4., kcrit=kcrit, gsparams=gsp2)
+        sk3 = galsim.SecondKick(lam=700, r0=0.15, diam=4., kcrit=kcrit,
+                                gsparams=galsim.GSParams(kvalue_accuracy=1.7e-5))
+        # (The kValues computed with gsp2 would differ in the 5th digit.)
+        assert sk2.maxk == sk1.maxk
+        assert sk2.stepk == sk1.stepk
+        np.testing.assert_array_equal(sk2.kValue(0.3, 0.2), sk1.kValue(0.3, 0.2))
+        np.testing.assert_array_equal(sk3.kValue(0.3, 0.2), sk1.kValue(0.3, 0.2))
+        np.testing.assert_array_equal(sk2.xValue(0.3, 0.2), sk1.xValue(0.3, 0.2))
+        im1 = sk1.drawImage(nx=32, ny=32, scale=0.1, method='phot', n_photons=1000,
+                            rng=galsim.BaseDeviate(1234))
+        im2 = sk2.drawImage(nx=32, ny=32, scale=0.1, method='phot', n_photons=1000,
+                            rng=galsim.BaseDeviate(1234))
+        np.testing.assert_array_equal(im2.array, im1.array)
+
+        # A new parameter set is computed and written to the cache.
+        sk4 = galsim.SecondKick(lam=700, r0=0.15, diam=4., kcrit=0.5, gsparams=gsp)
+        sk4.drawImage(nx=32, ny=32, scale=0.1)
+        assert galsim.SecondKick.table_cache_info()['disk_files'] == 3
+    finally:
+        del galsim.utilities.cache_dirs['table']
+
+    # The tables match a direct calculation.
+    sk5 = galsim.SecondKick(lam=700, r0=0.15, diam=4., kcrit=0.5, gsparams=gsp)
+    assert sk5.maxk == sk4.maxk
+    np.testing.assert_array_equal(sk5.kValue(0.3, 0.2), sk4.kValue(0.3, 0.2))
+
 
 if __name__ == '__main__':
     from argparse import ArgumentParser
@@ -309,6 +385,7 @@ if __name__ == '__main__':
     test_sk_scale()
     test_sk_shoot()
     test_sk_ne()
+    test_sk_table_cache()
 
     if args.profile:
         pr.disable()
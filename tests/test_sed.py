@@ -974,6 +974,246 @@ def test_thin():
     np.testing.assert_equal(s.wave_list, [0,1])
 
 
+@timer
+def test_BatchFluxCalculator():
+    """Check that BatchFluxCalculator matches SED.calculateFlux and calculateMagnitude.
+    """
+    bands = [galsim.Bandpass(os.path.join(bppath, 'LSST_%s.dat'%b), 'nm').withZeropoint('AB')
+             for b in 'ugrizy']
+    seds = [galsim.SED(os.path.join(sedpath, 'CWW_%s_ext.sed'%t), 'A', 'flambda')
+            for t in ['E', 'Sbc', 'Scd', 'Im']]
+    calc = galsim.BatchFluxCalculator(bands)
+    do_pickle(calc)
+    assert calc.weights.shape == (len(bands), len(calc.waves))
+    for bp in bands:
+        assert bp.blue_limit in calc.waves
+        assert bp.red_limit in calc.waves
+
+    # A single SED, or a list of SEDs, without redshifts.
+    sed = seds[1].atRedshift(0.3)
+    flux = calc.calculateFlux(sed)
+    assert flux.shape == (len(bands),)
+    np.testing.assert_allclose(flux, [sed.calculateFlux(bp) for bp in bands], rtol=1.e-3)
+    flux = calc.calculateFlux(seds)
+    assert flux.shape == (len(seds), len(bands))
+    np.testing.assert_allclose(flux, [[s.calculateFlux(bp) for bp in bands] for s in seds],
+                               rtol=1.e-3)
+
+    # Templates at many redshifts.  The batch calculation samples the SEDs on a finer grid than
+    # SED.calculateFlux, so there are differences at the few x 1.e-3 level near sharp features.
+    rng = np.random.RandomState(1234)
+    ngal = 30
+    z = rng.uniform(0, 2, size=ngal)
+    index = rng.randint(0, len(seds), size=ngal)
+    flux = calc.calculateFlux(seds, redshift=z, index=index)
+    mag = calc.calculateMagnitude(seds, redshift=z, index=index)
+    assert flux.shape == mag.shape == (ngal, len(bands))
+    for i in range(ngal):
+        s = seds[index[i]].atRedshift(z[i])
+        np.testing.assert_allclose(flux[i], [s.calculateFlux(bp) for bp in bands], rtol=1.e-2)
+        np.testing.assert_allclose(mag[i], [s.calculateMagnitude(bp) for bp in bands], atol=1.e-2)
+
+    # Chunking doesn't change the results.
+    calc2 = galsim.BatchFluxCalculator(bands, max_size=5000)
+    np.testing.assert_allclose(calc2.calculateFlux(seds, redshift=z, index=index), flux,
+                               rtol=1.e-12)
+
+    # A single template, and one redshift per SED.
+    np.testing.assert_allclose(calc.calculateFlux(seds[2], redshift=z)[index == 2],
+                               flux[index == 2], rtol=1.e-12)
+    z4 = z[:len(seds)]
+    np.testing.assert_allclose(calc.calculateFlux(seds, redshift=z4),
+                               [calc.calculateFlux(s.atRedshift(zz)) for s, zz in zip(seds, z4)],
+                               rtol=1.e-10)
+    # Template that already has a redshift.
+    np.testing.assert_allclose(calc.calculateFlux(sed, redshift=z),
+                               calc.calculateFlux(seds[1], redshift=z), rtol=1.e-10)
+
+    # Finer grid converges.
+    calc3 = galsim.BatchFluxCalculator(bands, dw=0.25)
+    np.testing.assert_allclose(calc3.calculateFlux(seds, redshift=z, index=index), flux,
+                               rtol=1.e-3)
+
+    # Errors
+    assert_raises(galsim.GalSimValueError, galsim.BatchFluxCalculator, [])
+    assert_raises(galsim.GalSimRangeError, galsim.BatchFluxCalculator, bands, dw=0.)
+    assert_raises(galsim.GalSimRangeError, galsim.BatchFluxCalculator, bands, max_size=0)
+    assert_raises(galsim.GalSimSEDError, calc.calculateFlux,
+                  galsim.SED('1', 'nm', '1'), redshift=z)
+    assert_raises(galsim.GalSimIncompatibleValuesError, calc.calculateFlux, seds, index=index)
+    assert_raises(galsim.GalSimIncompatibleValuesError, calc.calculateFlux, seds, redshift=z)
+    assert_raises(galsim.GalSimIncompatibleValuesError, calc.calculateFlux, seds,
+                  redshift=z, index=index[:3])
+    assert_raises(galsim.GalSimRangeError, calc.calculateFlux, seds, redshift=z, index=index+1)
+    assert_raises(galsim.GalSimRangeError, calc.calculateFlux, seds[0], redshift=-1.)
+    short_sed = galsim.SED(galsim.LookupTable([400, 700], [1, 1], interpolant='linear'), 'nm', 'fphotons')
+    assert_raises(galsim.GalSimRangeError, calc.calculateFlux, short_sed)
+    assert_raises(galsim.GalSimRangeError, calc.calculateFlux, short_sed, redshift=[0.5])
+    nozp = galsim.BatchFluxCalculator([galsim.Bandpass('1', 'nm', 500, 600)])
+    assert_raises(galsim.GalSimError, nozp.calculateMagnitude, seds[0])
+
+
+@timer
+def test_SED_sampler_cache():
+    """Check that equal SEDs share the tables used by sampleWavelength.
+    """
+    sed_tab = galsim.LookupTable([1,2,3,4,5], [0.,1.,0.5,1.,0.])
+    bandpass = galsim.Bandpass(galsim.LookupTable([1,2,3,4,5], [0,0,1,1,0], interpolant='linear'),
+                               'nm')
+    sed1 = galsim.SED(sed_tab, wave_type='nm', flux_type='fphotons').atRedshift(0.3)
+    out1 = sed1.sampleWavelength(1000, bandpass, rng=1234)
+    info1 = galsim.SED.sampler_cache_info()
+
+    # An equal, but separately constructed, SED uses the cached table.
+    sed2 = galsim.SED(sed_tab, wave_type='nm', flux_type='fphotons').atRedshift(0.3)
+    assert sed2 == sed1 and sed2 is not sed1
+    out2 = sed2.sampleWavelength(1000, bandpass, rng=1234)
+    np.testing.assert_array_equal(out2, out1)
+    info2 = galsim.SED.sampler_cache_info()
+    assert info2['hits'] == info1['hits'] + 1
+    assert info2['misses'] == info1['misses']
+    assert sed2._cache_deviate[(bandpass,None)] is sed1._cache_deviate[(bandpass,None)]
+
+    # A different redshift is a new table.
+    sed3 = sed1.atRedshift(0.5)
+    out3 = sed3.sampleWavelength(1000, bandpass, rng=1234)
+    assert galsim.SED.sampler_cache_info()['misses'] == info1['misses'] + 1
+    assert np.all(out3 >= bandpass.blue_limit) and np.all(out3 <= bandpass.red_limit)
+
+    # The samples are the inverse cdf of uniform deviates.
+    cdf, waves = sed1._cache_deviate[(bandpass,None)]
+    u = np.empty(1000)
+    galsim.UniformDeviate(1234).generate(u)
+    np.testing.assert_allclose(out1, np.interp(u, cdf, waves) * 1.3, rtol=1.e-12)
+
+    # Resizing the cache
+    galsim.SED.resize_sampler_cache(1)
+    assert galsim.SED.sampler_cache_info()['maxsize'] == 1
+    assert galsim.SED.sampler_cache_info()['currsize'] == 1
+    galsim.SED.resize_sampler_cache(100)
+
+
+@timer
+def test_SEDTemplateSet():
+    """Check that SEDTemplateSet matches the equivalent redshifted SEDs.
+    """
+    bands = [galsim.Bandpass(os.path.join(bppath, 'LSST_%s.dat'%b), 'nm').withZeropoint('AB')
+             for b in 'ugrizy']
+    seds = [galsim.SED(os.path.join(sedpath, 'CWW_%s_ext.sed'%t), 'A', 'flambda')
+            for t in ['E', 'Sbc', 'Scd', 'Im']]
+    templates = galsim.SEDTemplateSet(seds)
+    do_pickle(templates)
+    assert templates.spec.shape == (len(seds), len(templates.waves))
+    np.testing.assert_allclose(np.diff(np.log(templates.waves[:-1])), templates.dlnw)
+    assert templates.blue_limit == templates.waves[0]
+    assert templates.red_limit == templates.waves[-1]
+
+    rng = np.random.RandomState(1234)
+    ngal = 30
+    z = rng.uniform(0, 2, size=ngal)
+    index = rng.randint(0, len(seds), size=ngal)
+    amp = rng.uniform(0.5, 2, size=ngal)
+
+    # Evaluation matches the SED, to the accuracy of the tabulation.  (The CWW templates have
+    # kinks between their tabulated wavelengths, so resampling them differs at the 1.e-3 level.)
+    waves = np.linspace(400, 1000, 50)
+    vals = templates(waves, index, z, amp)
+    assert vals.shape == (ngal, len(waves))
+    for i in range(ngal):
+        sed = seds[index[i]].atRedshift(z[i]) * amp[i]
+        np.testing.assert_allclose(vals[i], sed(waves), rtol=5.e-3)
+        # getSED is exactly the same as the tabulated template.
+        sed2 = templates.getSED(index[i], z[i], amp[i])
+        np.testing.assert_allclose(vals[i], sed2(waves), rtol=1.e-12)
+        assert sed2.redshift == z[i]
+    np.testing.assert_allclose(templates(400., index[0], z[0], amp[0]), vals[0,0], rtol=1.e-12)
+    np.testing.assert_allclose(templates(waves, index[0], z[0], amp[0]), vals[0], rtol=1.e-12)
+
+    # Fluxes and magnitudes are calculated by BatchFluxCalculator, the same as for the list
+    # of SEDs.
+    calc = galsim.BatchFluxCalculator(bands)
+    flux = calc.calculateFlux(templates, redshift=z, index=index)
+    mag = calc.calculateMagnitude(templates, redshift=z, index=index)
+    assert flux.shape == mag.shape == (ngal, len(bands))
+    np.testing.assert_allclose(flux, calc.calculateFlux(seds, redshift=z, index=index),
+                               rtol=1.e-2)
+    for i in range(ngal):
+        sed = seds[index[i]].atRedshift(z[i])
+        np.testing.assert_allclose(flux[i], [sed.calculateFlux(bp) for bp in bands], rtol=1.e-2)
+        np.testing.assert_allclose(mag[i], [sed.calculateMagnitude(bp) for bp in bands],
+                                   atol=1.e-2)
+        sed2 = templates.getSED(index[i], z[i], amp[i])
+        np.testing.assert_allclose(flux[i] * amp[i], [sed2.calculateFlux(bp) for bp in bands],
+                                   rtol=1.e-3)
+    calc2 = galsim.BatchFluxCalculator(bands[2])
+    np.testing.assert_allclose(calc2.calculateFlux(templates, redshift=z, index=index),
+                               flux[:,2:3], rtol=1.e-12)
+    np.testing.assert_allclose(calc.calculateFlux(templates, redshift=z[:1], index=index[:1]),
+                               flux[:1], rtol=1.e-12)
+    # Without redshifts, the templates are at rest.
+    np.testing.assert_allclose(calc.calculateFlux(templates), calc.calculateFlux(seds),
+                               rtol=1.e-2)
+    np.testing.assert_allclose(calc.calculateFlux(templates),
+                               calc.calculateFlux(templates, redshift=np.zeros(len(seds))),
+                               rtol=1.e-12)
+    one = galsim.SEDTemplateSet(seds[1])
+    np.testing.assert_allclose(calc.calculateFlux(one, redshift=z),
+                               calc.calculateFlux(seds[1], redshift=z), rtol=1.e-2)
+
+    # The flux tables are cached for each bandpass, with a limited size.
+    assert isinstance(templates._flux_tables, galsim.utilities.LRU_Dict)
+    assert len(templates._flux_tables) == len(bands)
+    assert templates._flux_tables.maxsize > 0
+    assert 0 < templates._flux_tables.nbytes <= templates._flux_tables.max_bytes
+    import pickle
+    templates2 = pickle.loads(pickle.dumps(templates))
+    assert templates2 == templates
+    assert len(templates2._flux_tables) == 0
+    np.testing.assert_allclose(calc.calculateFlux(templates2, redshift=z, index=index), flux,
+                               rtol=1.e-12)
+
+    # The SEDs from getSED for the same template share its table.
+    assert templates.getSED(1, 0.3)._orig_spec is templates.getSED(1, 1.7)._orig_spec
+
+    # Wavelength sampling is the same as for the SED from getSED.
+    out1 = templates.sampleWavelength(1000, bands[2], index[0], z[0], rng=1234)
+    out2 = templates.getSED(index[0], z[0]).sampleWavelength(1000, bands[2], rng=1234)
+    np.testing.assert_allclose(out1, out2, rtol=1.e-10)
+    out1 = templates.sampleWavelength(1000, None, index[0], z[0], rng=1234)
+    out2 = templates.getSED(index[0], z[0]).sampleWavelength(1000, None, rng=1234)
+    np.testing.assert_allclose(out1, out2, rtol=1.e-10)
+
+    # It can be used as the SED of a ChromaticObject
+    obj = galsim.Gaussian(sigma=1) * templates.getSED(index[0], z[0], amp[0])
+    np.testing.assert_allclose(obj.calculateFlux(bands[3]), flux[0,3] * amp[0], rtol=1.e-3)
+
+    # Errors
+    assert_raises(galsim.GalSimValueError, galsim.SEDTemplateSet, [])
+    assert_raises(galsim.GalSimSEDError, galsim.SEDTemplateSet, [galsim.SED('1', 'nm', '1')])
+    assert_raises(galsim.GalSimRangeError, galsim.SEDTemplateSet, seds, dlnw=0.)
+    assert_raises(galsim.GalSimRangeError, galsim.SEDTemplateSet, seds, blue_limit=1.)
+    assert_raises(galsim.GalSimRangeError, galsim.SEDTemplateSet, seds, red_limit=1.e5)
+    assert_raises(galsim.GalSimRangeError, galsim.SEDTemplateSet, seds, 1.e-3, 600, 500)
+    assert_raises(galsim.GalSimRangeError, galsim.SEDTemplateSet,
+                  [galsim.SED('wave', 'nm', 'flambda')])
+    assert_raises(galsim.GalSimRangeError, templates, waves, 4, 0.5)
+    assert_raises(galsim.GalSimRangeError, templates, waves, -1, 0.5)
+    assert_raises(galsim.GalSimRangeError, templates, waves, 1, -1.)
+    assert_raises(galsim.GalSimRangeError, templates, 1.e5, 1, 0.5)
+    assert_raises(galsim.GalSimIncompatibleValuesError, templates, waves, index, z[:3])
+    assert_raises(galsim.GalSimValueError, templates, waves, [[1,2]], 0.5)
+    assert_raises(galsim.GalSimRangeError, templates.getSED, 4)
+    assert_raises(galsim.GalSimRangeError, calc.calculateFlux, templates, [100.], [0])
+    assert_raises(galsim.GalSimIncompatibleValuesError, calc.calculateFlux, templates, z)
+    assert_raises(galsim.GalSimValueError, templates.sampleWavelength, 10, bands[0], index, z)
+    nozp = galsim.Bandpass('1', 'nm', 500, 600)
+    assert_raises(galsim.GalSimError, galsim.BatchFluxCalculator(nozp).calculateMagnitude,
+                  templates, [0.5], [0])
+    small = galsim.SEDTemplateSet(seds, blue_limit=400, red_limit=450)
+    assert_raises(galsim.GalSimRangeError, calc.calculateFlux, small)
+    assert_raises(galsim.GalSimRangeError, small.sampleWavelength, 10, bands[5], 0, 0.)
+
+
 if __name__ == "__main__":
     test_SED_basic()
     test_SED_add()
@@ -991,6 +1231,9 @@ if __name__ == "__main__":
     test_SED_calculateDCRMomentShifts()
     test_SED_calculateSeeingMomentRatio()
     test_SED_sampleWavelength()
+    test_SED_sampler_cache()
     test_fnu_vs_flambda()
     test_ne()
     test_thin()
+    test_BatchFluxCalculator()
+    test_SEDTemplateSet()
@@ -751,6 +751,52 @@ def test_treerings():
     assert_raises(TypeError, galsim.SiliconSensor, treering_func=lambda x:np.cos(x))
     assert_raises(TypeError, galsim.SiliconSensor, treering_func=tr7, treering_center=(3,4))
 
+    # Precomputing the tree rings for a larger region gives the same pixel areas as computing
+    # them for each image as needed.
+    sensor8 = galsim.SiliconSensor(treering_func=tr2, treering_center=galsim.PositionD(-100,30))
+    sensor8.initialize_treerings(galsim.BoundsI(1,200,1,200))
+    sensor9 = galsim.SiliconSensor(treering_func=tr2, treering_center=galsim.PositionD(-100,30))
+    for x0, y0 in [(1,1), (57,83), (181,170)]:
+        stamp = galsim.ImageD(galsim.BoundsI(x0, x0+19, y0, y0+19))
+        area8 = sensor8.calculate_pixel_areas(stamp)
+        area9 = sensor9.calculate_pixel_areas(stamp)
+        np.testing.assert_allclose(area8.array, area9.array, rtol=1.e-12)
+        # Check that the tree rings are actually there.
+        assert np.std(area8.array) > 1.e-4
+        # An image with its center moved to (0,0) gives the same answer with the appropriate
+        # orig_center, which is how drawImage calls the sensor.
+        stamp.setCenter(0,0)
+        area8b = sensor8.calculate_pixel_areas(stamp, orig_center=galsim.PositionI(x0+10,y0+10))
+        np.testing.assert_allclose(area8b.array, area8.array, rtol=1.e-12)
+
+    # Regions outside the precomputed bounds are computed as needed, without replacing the
+    # precomputed region.
+    stamp = galsim.ImageD(galsim.BoundsI(190, 230, 190, 230))
+    area8 = sensor8.calculate_pixel_areas(stamp)
+    area9 = sensor9.calculate_pixel_areas(stamp)
+    np.testing.assert_allclose(area8.array, area9.array, rtol=1.e-12)
+    assert sensor8._treering_bounds == galsim.BoundsI(1,200,1,200)
+    assert sensor9._treering_bounds is None
+    stamp = galsim.ImageD(galsim.BoundsI(21, 40, 31, 50))
+    np.testing.assert_allclose(sensor8.calculate_pixel_areas(stamp).array,
+                               sensor9.calculate_pixel_areas(stamp).array, rtol=1.e-12)
+
+    # The precomputed region survives pickling.
+    import pickle
+    sensor8b = pickle.loads(pickle.dumps(sensor8))
+    assert sensor8b._treering_bounds == galsim.BoundsI(1,200,1,200)
+    stamp = galsim.ImageD(galsim.BoundsI(60, 80, 90, 110))
+    np.testing.assert_allclose(sensor8b.calculate_pixel_areas(stamp).array,
+                               sensor9.calculate_pixel_areas(stamp).array, rtol=1.e-12)
+
+    # Without tree rings, this is a no-op.
+    sensor1.initialize_treerings(galsim.BoundsI(1,200,1,200))
+    assert sensor1._treering_bounds is None
+
+    assert_raises(TypeError, sensor8.initialize_treerings, galsim.BoundsD(1,200,1,200))
+    assert_raises(galsim.GalSimUndefinedBoundsError, sensor8.initialize_treerings,
+                  galsim.BoundsI())
+
 
 @timer
 def test_resume():
@@ -988,6 +1034,172 @@ def test_flat():
     np.testing.assert_allclose(cov20 / counts_total, 0., atol=2*toler)
     np.testing.assert_allclose(cov02 / counts_total, 0., atol=2*toler)
 
+@timer
+def test_approx_silicon():
+    """Test the fast approximation to the SiliconSensor brighter-fatter effect.
+    """
+    s0 = galsim.Sensor()
+    s1 = galsim.SiliconSensor(rng=galsim.BaseDeviate(1234), diffusion_factor=0.)
+    s2 = galsim.ApproxSiliconSensor(rng=galsim.BaseDeviate(1234), diffusion_factor=0.)
+
+    # The deflection coefficients are self-consistent across each boundary.
+    cd = s2.cd_model
+    n = cd.n
+    assert n == 3
+    np.testing.assert_array_equal(cd.a_l.array[:,:-1], -cd.a_r.array[:,1:])
+    np.testing.assert_array_equal(cd.a_b.array[:-1,:], -cd.a_t.array[1:,:])
+    np.testing.assert_array_equal(cd.a_b.array[-1,:], 0.)
+    # Charge in the pixel itself shrinks it, charge in the neighbor expands it.
+    assert cd.a_r.array[n,n] < 0.
+    assert cd.a_r.array[n,n+1] > 0.
+    assert cd.a_t.array[n,n] < 0.
+    assert cd.a_t.array[n+1,n] > 0.
+    # BF is stronger along the columns (y) than across the rows (x).
+    assert abs(cd.a_t.array[n,n]) > abs(cd.a_r.array[n,n])
+    s2t = galsim.ApproxSiliconSensor(transpose=True)
+    np.testing.assert_array_equal(s2t.cd_model.a_r.array, cd.a_t.array.T)
+    np.testing.assert_array_equal(s2t.cd_model.a_b.array, cd.a_l.array.T)
+
+    # Accuracy comparison for the increase in Mxx + Myy of a bright star relative to no BF
+    # effect.  ApproxSiliconSensor overestimates it by 13-17%.  The charge deflection model with the same coefficients, applied to the final
+    # image with CDModel.applyForward, overestimates the effect by a factor of ~2, since the
+    # full charge is not present while the electrons are being collected.
+    #
+    #     flux      SiliconSensor   ApproxSiliconSensor   CDModel.applyForward
+    #     1.e5          0.0031            0.0036                 0.0071
+    #     3.e5          0.0091            0.0106                 0.0213
+    #     1.e6          0.0316            0.0355                 0.0710
+    for flux in [1.e5, 3.e5, 1.e6]:
+        obj = galsim.Gaussian(flux=flux, sigma=0.2)
+        im0 = obj.drawImage(nx=32, ny=32, scale=0.2, method='phot', sensor=s0,
+                            rng=galsim.BaseDeviate(5678))
+        im1 = obj.drawImage(nx=32, ny=32, scale=0.2, method='phot', sensor=s1,
+                            rng=galsim.BaseDeviate(5678))
+        im2 = obj.drawImage(nx=32, ny=32, scale=0.2, method='phot', sensor=s2,
+                            rng=galsim.BaseDeviate(5678))
+        im3 = cd.applyForward(im0)
+        r0, r1, r2, r3 = [galsim.utilities.unweighted_moments(im)['Mxx'] +
+                          galsim.utilities.unweighted_moments(im)['Myy']
+                          for im in (im0, im1, im2, im3)]
+        print('flux = %.0e: dr^2 = %.4f (Silicon) %.4f (Approx) %.4f (CDModel)'%(
+                flux, r1-r0, r2-r0, r3-r0))
+        # Flux is conserved.
+        np.testing.assert_allclose(im2.array.sum(), im0.array.sum(), rtol=1.e-6)
+        assert r2-r0 > r1-r0
+        np.testing.assert_allclose(r2-r0, r1-r0, rtol=0.2)
+        assert abs((r2-r0) - (r1-r0)) < abs((r3-r0) - (r1-r0))
+
+    # With the same rng and no BF, the photon conversion matches SiliconSensor.
+    obj = galsim.Gaussian(flux=1000, sigma=0.3)
+    im1 = obj.drawImage(nx=32, ny=32, scale=0.2, method='phot', rng=galsim.BaseDeviate(5678),
+                        sensor=galsim.SiliconSensor(strength=1.e-10))
+    im2 = obj.drawImage(nx=32, ny=32, scale=0.2, method='phot', rng=galsim.BaseDeviate(5678),
+                        sensor=galsim.ApproxSiliconSensor(strength=1.e-10))
+    m1 = galsim.utilities.unweighted_moments(im1)
+    m2 = galsim.utilities.unweighted_moments(im2)
+    np.testing.assert_allclose(m2['Mxx'], m1['Mxx'], rtol=0.1)
+    np.testing.assert_allclose(m2['Myy'], m1['Myy'], rtol=0.1)
+
+    # Above the flux threshold, the full SiliconSensor calculation is used.
+    s3 = galsim.ApproxSiliconSensor(rng=galsim.BaseDeviate(1234), diffusion_factor=0.,
+                                    flux_threshold=1.e5)
+    s4 = galsim.SiliconSensor(rng=galsim.BaseDeviate(1234), diffusion_factor=0.)
+    obj = galsim.Gaussian(flux=3.e5, sigma=0.2)
+    im3 = obj.drawImage(nx=32, ny=32, scale=0.2, method='phot', sensor=s3,
+                        rng=galsim.BaseDeviate(5678))
+    im4 = obj.drawImage(nx=32, ny=32, scale=0.2, method='phot', sensor=s4,
+                        rng=galsim.BaseDeviate(5678))
+    np.testing.assert_array_equal(im3.array, im4.array)
+    # Below it, the fast approximation is used.
+    obj = galsim.Gaussian(flux=3.e4, sigma=0.2)
+    im3 = obj.drawImage(nx=32, ny=32, scale=0.2, method='phot', sensor=s3,
+                        rng=galsim.BaseDeviate(5678))
+    im2 = obj.drawImage(nx=32, ny=32, scale=0.2, method='phot', sensor=s2,
+                        rng=galsim.BaseDeviate(5678))
+    np.testing.assert_array_equal(im3.array, im2.array)
+
+    # With maxN, the chunks after the first follow the same path.  Here the first chunk of 2.e5
+    # photons is above the threshold, and the second one of 1.e5 is below it, but it resumes
+    # the full calculation, so the result is the same as a single pass.
+    s3 = galsim.ApproxSiliconSensor(rng=galsim.BaseDeviate(1234), diffusion_factor=0.,
+                                    flux_threshold=1.5e5)
+    s4 = galsim.SiliconSensor(rng=galsim.BaseDeviate(1234), diffusion_factor=0.)
+    obj = galsim.Gaussian(flux=3.e5, sigma=0.2)
+    im3 = obj.drawImage(nx=32, ny=32, scale=0.2, method='phot', sensor=s3, maxN=200000,
+                        rng=galsim.BaseDeviate(5678))
+    assert s3._last_exact
+    im4 = obj.drawImage(nx=32, ny=32, scale=0.2, method='phot', sensor=s4,
+                        rng=galsim.BaseDeviate(5678))
+    np.testing.assert_array_equal(im3.array, im4.array)
+    # Likewise, a first chunk below the threshold keeps using the approximation.
+    s3 = galsim.ApproxSiliconSensor(rng=galsim.BaseDeviate(1234), diffusion_factor=0.,
+                                    flux_threshold=2.5e5)
+    im3 = obj.drawImage(nx=32, ny=32, scale=0.2, method='phot', sensor=s3, maxN=200000,
+                        rng=galsim.BaseDeviate(5678))
+    assert not s3._last_exact
+    s2 = galsim.ApproxSiliconSensor(rng=galsim.BaseDeviate(1234), diffusion_factor=0.)
+    im2 = obj.drawImage(nx=32, ny=32, scale=0.2, method='phot', sensor=s2, maxN=200000,
+                        rng=galsim.BaseDeviate(5678))
+    np.testing.assert_array_equal(im3.array, im2.array)
+
+    do_pickle(s2)
+    do_pickle(s3)
+    assert s2 != s1
+    assert s1 != s2
+    assert s3 != galsim.ApproxSiliconSensor(rng=galsim.BaseDeviate(1234), diffusion_factor=0.)
+    assert_raises(galsim.GalSimUndefinedBoundsError, s2.accumulate, galsim.PhotonArray(3),
+                  galsim.ImageD())
+
+
+@timer
+def test_silicon_cache():
+    """Test the cache of sensor data shared by SiliconSensor instances.
+    """
+    cache_dir = os.path.join('output', 'silicon_cache')
+    if os.path.isdir(cache_dir):
+        for f in os.listdir(cache_dir):
+            os.remove(os.path.join(cache_dir, f))
+
+    # Without a cache directory, nothing is written.
+    assert galsim.SiliconSensor.prewarm_cache('lsst_itl_8') is None
+
+    cache_file = galsim.SiliconSensor.prewarm_cache('lsst_itl_8', cache_dir=cache_dir)
+    assert os.path.isfile(cache_file)
+    assert os.path.dirname(cache_file) == cache_dir
+
+    # A second call just finds the existing file.
+    mtime = os.path.getmtime(cache_file)
+    assert galsim.SiliconSensor.prewarm_cache('lsst_itl_8', cache_dir=cache_dir) == cache_file
+    assert os.path.getmtime(cache_file) == mtime
+
+    # The memory-mapped data match the text file.
+    _, vertex_file = galsim.SiliconSensor._find_sensor_files('lsst_itl_8')
+    mapped = np.load(cache_file, mmap_mode='r')
+    np.testing.assert_array_equal(mapped, np.loadtxt(vertex_file, skiprows=1))
+
+    # Sensors built using the binary cache give identical results to ones that parse the file.
+    obj = galsim.Gaussian(flux=3539, sigma=0.3)
+    im1 = galsim.ImageD(64, 64, scale=0.3)
+    im2 = galsim.ImageD(64, 64, scale=0.3)
+    sensor1 = galsim.SiliconSensor(rng=galsim.BaseDeviate(5678))
+    obj.drawImage(im1, method='phot', sensor=sensor1, rng=galsim.BaseDeviate(5678))
+    try:
+        galsim.utilities.cache_dirs['silicon'] = cache_dir
+        sensor2 = galsim.SiliconSensor(rng=galsim.BaseDeviate(5678))
+        obj.drawImage(im2, method='phot', sensor=sensor2, rng=galsim.BaseDeviate(5678))
+    finally:
+        del galsim.utilities.cache_dirs['silicon']
+    assert sensor1 == sensor2
+    np.testing.assert_array_equal(im2.array, im1.array)
+
+    # The parsed config is shared, but each sensor gets its own copy.
+    sensor1.config['Vbb'] = 1234
+    assert sensor2.config['Vbb'] != 1234
+
+    # Unknown names still raise the same error.
+    assert_raises(OSError, galsim.SiliconSensor.prewarm_cache, 'junk', cache_dir=cache_dir)
+
+
 def test_omp():
     """Test setting the number of omp threads.
     """
@@ -1002,6 +1214,7 @@ def test_omp():
 
     # If num_threads == 1, it should always set to 1
     assert galsim.set_omp_threads(1) == 1
+    assert galsim.get_omp_threads() == 1
 
     # If num_threads > 1, it could be 1 or up to the input num_threads
     assert galsim.set_omp_threads(2) >= 1
@@ -1079,4 +1292,6 @@ if __name__ == "__main__":
     test_treerings()
     test_resume()
     test_flat()
+    test_approx_silicon()
+    test_silicon_cache()
     test_omp()
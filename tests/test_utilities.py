@@ -844,6 +844,74 @@ def test_python_LRU_Cache():
     assert_raises(ValueError, cache.resize, 0)
     assert_raises(ValueError, cache.resize, -20)
 
+    # Check the hit and miss counts.
+    cache = galsim.utilities.LRU_Cache(f, maxsize=3)
+    for i in [0, 1, 0, 2, 3, 1]:
+        cache(i)
+    info = cache.cache_info()
+    print('info = ',info)
+    assert info == dict(hits=1, misses=5, maxsize=3, currsize=3)
+    assert cache.hits == 1
+    assert cache.misses == 5
+    cache.clear()
+    assert cache.cache_info() == dict(hits=0, misses=0, maxsize=3, currsize=0)
+    assert cache(2) == f(2)
+    assert cache.cache_info() == dict(hits=0, misses=1, maxsize=3, currsize=1)
+
+
+@timer
+def test_LRU_Dict():
+    """Test the dict-like LRU cache limited by number of items and bytes.
+    """
+    cache = galsim.utilities.LRU_Dict(maxsize=3)
+    for i in range(4):
+        cache[i] = np.zeros(i+1)
+    assert len(cache) == 3
+    assert 0 not in cache
+    assert cache.get(0) is None
+    assert cache.get(0, 17) == 17
+    # Looking up 1 makes it the most recently used, so 2 is the next to go.
+    assert len(cache.get(1)) == 2
+    cache[4] = np.zeros(5)
+    assert 2 not in cache
+    assert 1 in cache
+    info = cache.cache_info()
+    print('info = ',info)
+    assert info == dict(hits=1, misses=2, maxsize=3, max_bytes=0, currsize=3, nbytes=0)
+
+    # Limit by bytes.  The sizes are recomputed when needed.
+    cache = galsim.utilities.LRU_Dict(maxsize=10, max_bytes=100, nbytes=lambda a: a.nbytes)
+    for i in range(5):
+        cache[i] = np.zeros(4)  # 32 bytes each
+    assert len(cache) == 3
+    assert cache.nbytes == 96
+    cache[1] = np.zeros(2)   # Replace a value
+    assert cache.nbytes == 80
+    cache.resize(max_bytes=40)
+    assert list(cache._cache) == [1]
+    # The most recent one is always kept.
+    cache[5] = np.zeros(100)
+    assert len(cache) == 1
+    assert cache.nbytes == 800
+    cache.resize(maxsize=2, max_bytes=0)
+    cache[6] = np.zeros(100)
+    assert len(cache) == 2
+    assert cache.cache_info()['maxsize'] == 2
+
+    # maxsize=0 turns off the caching.
+    cache.resize(0)
+    assert len(cache) == 0
+    cache[7] = 7
+    assert len(cache) == 0
+
+    cache.clear()
+    assert cache.cache_info() == dict(hits=0, misses=0, maxsize=0, max_bytes=0, currsize=0,
+                                      nbytes=0)
+    assert_raises(ValueError, cache.resize, -1)
+    assert_raises(ValueError, cache.resize, None, -1)
+    assert_raises(ValueError, galsim.utilities.LRU_Dict, -1)
+    assert_raises(ValueError, galsim.utilities.LRU_Dict, 10, -1)
+
 
 @timer
 def test_rand_with_replacement():
@@ -1259,6 +1327,51 @@ def test_horner2d():
         galsim.utilities.horner2d(x, y[:10], coef)
 
 
+@timer
+def test_disk_cache_helpers():
+    """Test atomic_write and get_cache_dir
+    """
+    file_name = os.path.join('output', 'atomic_write', 'test.txt')
+    if os.path.exists(file_name):
+        os.remove(file_name)
+    with galsim.utilities.atomic_write(file_name) as tmp_file:
+        assert tmp_file != file_name
+        with open(tmp_file, 'w') as fout:
+            fout.write('test')
+        # The file only appears under its real name once it is complete.
+        assert not os.path.exists(file_name)
+    with open(file_name) as fin:
+        assert fin.read() == 'test'
+    assert os.listdir(os.path.dirname(file_name)) == ['test.txt']
+
+    # If writing fails, neither the file nor the temporary file is left behind.
+    file_name2 = os.path.join('output', 'atomic_write', 'test2.txt')
+    with assert_raises(ValueError):
+        with galsim.utilities.atomic_write(file_name2) as tmp_file:
+            with open(tmp_file, 'w') as fout:
+                fout.write('test')
+            raise ValueError("Failed")
+    assert os.listdir(os.path.dirname(file_name)) == ['test.txt']
+
+    save_env = os.environ.pop('GALSIM_TABLE_CACHE_DIR', None)
+    try:
+        assert galsim.utilities.get_cache_dir('table') is None
+        assert galsim.utilities.get_cache_dir('table', 'dir1') == 'dir1'
+        os.environ['GALSIM_TABLE_CACHE_DIR'] = 'dir2'
+        assert galsim.utilities.get_cache_dir('table') == 'dir2'
+        galsim.utilities.cache_dirs['table'] = 'dir3'
+        assert galsim.utilities.get_cache_dir('table') == 'dir3'
+        assert galsim.utilities.get_cache_dir('table', 'dir1') == 'dir1'
+        galsim.utilities.cache_dirs['table'] = None
+        assert galsim.utilities.get_cache_dir('table') is None
+    finally:
+        galsim.utilities.cache_dirs.pop('table', None)
+        if save_env is None:
+            os.environ.pop('GALSIM_TABLE_CACHE_DIR', None)
+        else:
+            os.environ['GALSIM_TABLE_CACHE_DIR'] = save_env
+
+
 if __name__ == "__main__":
     test_pos()
     test_bounds()
@@ -1271,6 +1384,7 @@ if __name__ == "__main__":
     test_deInterleaveImage()
     test_interleaveImages()
     test_python_LRU_Cache()
+    test_LRU_Dict()
     test_rand_with_replacement()
     test_position_type_promotion()
     test_unweighted_moments()
@@ -1278,3 +1392,4 @@ if __name__ == "__main__":
     test_nCr()
     test_horner()
     test_horner2d()
+    test_disk_cache_helpers()
@@ -281,6 +281,58 @@ def test_vk_r0():
             vk = galsim.VonKarman(L0=L0,lam=lam,r0_500=r0_500)
             #check_basic(vk, "VonKarman, r0_500=%s"%r0_500)
 
+
+@timer
+def test_vk_table_cache():
+    """Test saving the VonKarman lookup tables in a disk cache.
+    """
+    import shutil
+    cache_dir = os.path.join('output', 'vk_table_cache')
+    if os.path.isdir(cache_dir):
+        shutil.rmtree(cache_dir)
+    # Use gsparams that no other test uses, so the tables aren't already in memory.
+    gsp = galsim.GSParams(xvalue_accuracy=1.3e-5)
+
+    info = galsim.VonKarman.table_cache_info(cache_dir)
+    print('info = ',info)
+    assert info['disk_files'] == 0
+    currsize = info['currsize']
+
+    cache_file = galsim.VonKarman.prewarm_cache(700., r0_500=0.2, L0=30., gsparams=gsp,
+                                                cache_dir=cache_dir)
+    assert os.path.dirname(cache_file) == cache_dir
+    info = galsim.VonKarman.table_cache_info(cache_dir)
+    print('info = ',info)
+    assert info['currsize'] == currsize + 1
+    assert info['disk_files'] == 1
+    assert info['disk_bytes'] == os.path.getsize(cache_file)
+    r0 = 0.2 * (700./500.)**1.2
+    assert galsim.VonKarman.prewarm_cache(700., r0=r0, L0=30., gsparams=gsp,
+                                          cache_dir=cache_dir) == cache_file
+
+    try:
+        # Copy the file to the name that would be used for a different gsparams, and check that
+        # constructing a VonKarman with these gsparams reads it rather than computing new tables.
+        galsim.utilities.cache_dirs['table'] = cache_dir
+        gsp2 = galsim.GSParams(xvalue_accuracy=1.7e-5)
+        key2 = (1e-9*700./r0, 30./r0, False, gsp2)
+        cache_file2 = galsim.table._table_cache_file(cache_dir, 'vonkarman', key2)
+        shutil.copy(cache_file, cache_file2)
+        vk1 = galsim.VonKarman(700., r0_500=0.2, L0=30., gsparams=gsp)
+        vk2 = galsim.VonKarman(700., r0_500=0.2, L0=30., gsparams=gsp2)
+        assert vk2.stepk == vk1.stepk
+        assert vk2.maxk == vk1.maxk
+        assert vk2.half_light_radius == vk1.half_light_radius
+        np.testing.assert_array_equal(vk2.xValue(0.3, 0.2), vk1.xValue(0.3, 0.2))
+        assert galsim.VonKarman.table_cache_info()['disk_files'] == 2
+    finally:
+        del galsim.utilities.cache_dirs['table']
+
+    assert_raises(galsim.GalSimIncompatibleValuesError, galsim.VonKarman.prewarm_cache, 700.)
+    assert_raises(galsim.GalSimIncompatibleValuesError, galsim.VonKarman.prewarm_cache, 700.,
+                  r0=0.2, r0_500=0.2)
+
+
 if __name__ == "__main__":
     from argparse import ArgumentParser
     parser = ArgumentParser()
@@ -303,6 +355,7 @@ if __name__ == "__main__":
     test_vk_fitting_formulae()
     test_vk_gsp()
     test_vk_r0()
+    test_vk_table_cache()
     if args.benchmark:
         vk_benchmark()
 
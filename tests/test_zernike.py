@@ -419,6 +419,61 @@ def test_gradient():
     assert Z == Z.gradX == Z.gradX.gradX == Z.gradY == Z.gradY.gradY
 
 
+@timer
+def test_ZernikeBatch():
+    """Test that ZernikeBatch matches evaluating each Zernike separately."""
+    u = galsim.UniformDeviate(57721)
+    x = np.linspace(-1.3, 1.3, 50)
+    x, y = np.meshgrid(x, x)
+
+    for jmax, R_outer, R_inner in [(11, 1.0, 0.0), (22, 1.3, 0.4), (37, 4.2, 1.2)]:
+        # zernikeGradBases matches the gradients of the individual Zernikes.
+        gradBases = galsim.zernike.zernikeGradBases(jmax, x, y, R_outer=R_outer, R_inner=R_inner)
+        assert gradBases.shape == (2, jmax+1) + x.shape
+        np.testing.assert_array_equal(gradBases[:,0], 0.)
+        for j in range(1, jmax+1):
+            Z = galsim.zernike.Zernike([0]*j+[1], R_outer=R_outer, R_inner=R_inner)
+            dx, dy = Z.evalCartesianGrad(x, y)
+            np.testing.assert_allclose(gradBases[0,j], dx, atol=1.e-10, rtol=0)
+            np.testing.assert_allclose(gradBases[1,j], dy, atol=1.e-10, rtol=0)
+
+        coefs = np.array([[u()-0.5 for _ in range(jmax+1)] for _ in range(20)])
+        batch = galsim.zernike.ZernikeBatch(coefs, R_outer=R_outer, R_inner=R_inner)
+        assert len(batch) == 20
+        assert batch.jmax == jmax
+        wf = batch.evalCartesian(x, y)
+        dwdx, dwdy = batch.evalCartesianGrad(x, y)
+        assert wf.shape == dwdx.shape == dwdy.shape == (20,) + x.shape
+        for i in range(len(batch)):
+            Z = galsim.zernike.Zernike(coefs[i], R_outer=R_outer, R_inner=R_inner)
+            assert batch[i] == Z
+            np.testing.assert_allclose(wf[i], Z.evalCartesian(x, y), atol=1.e-10, rtol=0)
+            dx, dy = Z.evalCartesianGrad(x, y)
+            np.testing.assert_allclose(dwdx[i], dx, atol=1.e-10, rtol=0)
+            np.testing.assert_allclose(dwdy[i], dy, atol=1.e-10, rtol=0)
+
+        # Evaluating again on the same grid, even if it is a new array, uses the cached bases.
+        hits = galsim.zernike._zernike_basis_cache.hits
+        wf2 = batch.evalCartesian(x.copy(), y.copy())
+        np.testing.assert_array_equal(wf2, wf)
+        assert galsim.zernike._zernike_basis_cache.hits == hits + 1
+        # But not on a different grid.
+        wf3 = batch.evalCartesian(x[:10], y[:10])
+        np.testing.assert_array_equal(wf3, wf[:,:10])
+        assert galsim.zernike._zernike_basis_cache.hits == hits + 1
+        assert galsim.zernike._zernike_basis_cache.nbytes <= 2**28
+
+        do_pickle(batch)
+
+    # 1-d list-like points work too.
+    batch = galsim.zernike.ZernikeBatch([[0, 1, 2, 3, 4], [0, 0, 0, 0, 1]])
+    np.testing.assert_allclose(batch.evalCartesian([0.1, 0.2], [0.3, 0.4])[1],
+                               galsim.zernike.Zernike([0, 0, 0, 0, 1])([0.1, 0.2], [0.3, 0.4]))
+    assert batch != galsim.zernike.ZernikeBatch([[0, 1, 2, 3, 4], [0, 0, 0, 0, 1]], R_outer=2)
+    assert_raises(ValueError, galsim.zernike.ZernikeBatch, [0, 1, 2])
+    assert_raises(ValueError, batch.evalCartesian, x, y[:10])
+
+
 @timer
 def test_sum():
     """Test that __add__, __sub__, and __neg__ all work as expected.
@@ -669,6 +724,7 @@ if __name__ == "__main__":
     test_Zernike_basis()
     test_fit()
     test_gradient()
+    test_ZernikeBatch()
     test_sum()
     test_product()
     test_laplacian()
@@ -0,0 +1,11 @@
+
+#include <iostream>
+#include <vector>
+int main() {
+    int n = 500;
+    std::vector<double> x(n,0.);
+    for (int i=0; i<n; ++i) x[i] = 2*i+1;
+    double sum=0.;
+    for (int i=0; i<n; ++i) sum += x[i];
+    return sum;
+}